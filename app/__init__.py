@@ -1,16 +1,22 @@
 from flask import Flask
 from flask_cors import CORS
 
+from . import compression, db, json_provider
 from .auth import auth_bp
 from .analysis import analysis_bp
 from .alert import alert_bp
-from .api import api_bp
+from .api import api_bp, bulk_import
 
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object('config.Config')
-    CORS(app)
+    # 分页信息与 ETag 放在响应头里，需要显式暴露给跨域的前端
+    CORS(app, expose_headers=["Link", "X-Next-Cursor", "ETag"])
+    db.init_app(app)
+    json_provider.init_app(app)
+    compression.init_app(app)
+    bulk_import.init_app(app)
 
     # 注册蓝图
     app.register_blueprint(auth_bp)
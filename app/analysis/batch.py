@@ -0,0 +1,444 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from app.analysis.services import (
+    DEFAULT_GRADE_BINS,
+    AnalysisServiceRepository,
+    validate_grade_bins,
+    validate_sweep_params,
+)
+from app.analysis.statistics import CoMoments
+from app.analysis.streaks import ConsecutiveRule, StreakEngine, parse_rule
+from utils.table_version_util import freeze
+
+
+"""
+批量分析：一次请求执行多个分析（POST /analysis/analysis）。
+
+- 所有分析共用一个连接，并在同一个读事务（BEGIN ... ROLLBACK）里执行：
+  WAL 模式下整批结果来自同一个数据库快照，不会出现“出勤来自写入前、成绩来自写入后”
+- 参数完全相同的分析只计算一次
+- 读同一张表的分析合并为一次扫描（“融合”）：
+    survey_responses：stress_high、stress_streaks、stress_grade_by_module（不含 spearman）
+        按 (student_id, module_id, week_number, stress_level) 顺序扫描一遍，每个分析是一个 sink，
+        各自按 module_id / include_inactive 过滤
+    grades：grade_distribution（默认分桶或 edges）以及相关系数需要的成绩查找表
+  只有至少两个分析读同一张表时才融合；单个分析直接调用 AnalysisServiceRepository 的方法（走各自优化过的 SQL）
+- 其余分析（或不能融合的参数组合）直接调用服务方法，但仍在同一个连接与快照上
+
+批量执行不使用结果缓存：快照可能早于当前的表版本，缓存会把旧快照的结果记在新版本下。
+"""
+
+MAX_BATCH_SIZE = 20
+
+
+# =========================================================
+# 请求解析
+# =========================================================
+def _as_int(value: Any) -> int:
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"expected an integer, got {value!r}")
+    return int(value)
+
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in {"1", "true", "yes", "on"}
+
+
+def _as_int_list(value: Any) -> List[int]:
+    values = value.split(",") if isinstance(value, str) else value
+    if not isinstance(values, list):
+        raise ValueError(f"expected a list of integers, got {value!r}")
+    return [_as_int(v) for v in values if str(v).strip()]
+
+
+def _as_float_list(value: Any) -> List[float]:
+    values = value.split(",") if isinstance(value, str) else value
+    if not isinstance(values, list):
+        raise ValueError(f"expected a list of numbers, got {value!r}")
+    return [float(v) for v in values]
+
+
+def _as_rules(value: Any) -> list:
+    values = value.split(",") if isinstance(value, str) else value
+    if not isinstance(values, list) or not values:
+        raise ValueError("rules must be a non-empty list of rule specs")
+    return [parse_rule(str(spec)) for spec in values]
+
+
+_COMMON = {"module_id": _as_int, "include_inactive": _as_bool}
+
+# 分析名 -> (参数名 -> 转换函数, 必填参数)；参数名与服务方法的参数同名
+ANALYSES: Dict[str, Tuple[Dict[str, Callable[[Any], Any]], Tuple[str, ...]]] = {
+    "attendance_averages": (dict(_COMMON), ()),
+    "stress_trend": ({**_COMMON, "student_id": _as_int}, ("student_id",)),
+    "stress_high": ({**_COMMON, "threshold": _as_int}, ()),
+    "stress_streaks": ({**_COMMON, "rules": _as_rules, "latest_only": _as_bool}, ("rules",)),
+    "threshold_sweep": (
+        {**_COMMON, "min_threshold": _as_int, "max_threshold": _as_int, "max_weeks": _as_int},
+        (),
+    ),
+    "grade_distribution": (
+        {
+            **_COMMON,
+            "edges": _as_float_list,
+            "equal_width": _as_int,
+            "quantiles": _as_int,
+            "by_module": _as_bool,
+        },
+        (),
+    ),
+    "stress_grade_by_module": (
+        {"module_ids": _as_int_list, "include_inactive": _as_bool, "include_spearman": _as_bool},
+        (),
+    ),
+}
+
+
+# 分析名 -> 参数检查（转换之后、执行之前；不合法时抛 ValueError），与对应路由的检查相同
+VALIDATORS: Dict[str, Callable[[Dict[str, Any]], None]] = {
+    "threshold_sweep": lambda p: validate_sweep_params(
+        p.get("min_threshold", 1), p.get("max_threshold", 5), p.get("max_weeks", 4)
+    ),
+    "grade_distribution": lambda p: validate_grade_bins(
+        edges=p.get("edges"), equal_width=p.get("equal_width"), quantiles=p.get("quantiles")
+    ),
+}
+
+
+@dataclass
+class AnalysisRequest:
+    key: str
+    name: str
+    params: Dict[str, Any]
+
+    @property
+    def include_inactive(self) -> bool:
+        return self.params.get("include_inactive", False)
+
+    @property
+    def module_ids(self) -> Optional[frozenset]:
+        """该分析只关心的课程（None 表示全部）。"""
+        if self.params.get("module_ids"):
+            return frozenset(self.params["module_ids"])
+        if self.params.get("module_id") is not None:
+            return frozenset([self.params["module_id"]])
+        return None
+
+    def identity(self) -> Hashable:
+        return self.name, freeze(self.params)
+
+
+def parse_batch(payload: Any) -> List[AnalysisRequest]:
+    """
+    解析请求体 {"analyses": [{"name": "stress_high", "params": {"threshold": 4}, "key": "high"}, ...]}。
+    key 可省略（默认为 name），同一批次内不能重复。格式不对时抛 ValueError。
+    """
+    items = payload.get("analyses") if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValueError("analyses must be a non-empty list")
+    if len(items) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} analyses per request")
+
+    requests: List[AnalysisRequest] = []
+    keys = set()
+    for item in items:
+        if not isinstance(item, dict) or item.get("name") not in ANALYSES:
+            raise ValueError(f"each analysis needs a name, one of {sorted(ANALYSES)}")
+        name = item["name"]
+        key = str(item.get("key") or name)
+        if key in keys:
+            raise ValueError(f"duplicate analysis key {key!r}; set a distinct key")
+        keys.add(key)
+
+        schema, required = ANALYSES[name]
+        raw = item.get("params") or {}
+        if not isinstance(raw, dict):
+            raise ValueError(f"{key}: params must be an object")
+        unknown = sorted(set(raw) - set(schema))
+        if unknown:
+            raise ValueError(f"{key}: unknown parameter(s) {', '.join(unknown)}")
+        missing = [field for field in required if raw.get(field) in (None, "")]
+        if missing:
+            raise ValueError(f"{key}: missing required parameter(s) {', '.join(missing)}")
+        try:
+            params = {field: schema[field](value) for field, value in raw.items() if value is not None}
+            if name in VALIDATORS:
+                VALIDATORS[name](params)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{key}: {e}")
+        requests.append(AnalysisRequest(key, name, params))
+    return requests
+
+
+# =========================================================
+# 融合扫描的 sink
+# =========================================================
+class _Sink:
+    """融合扫描中的一个分析：feed() 接收通过了自身过滤条件的行，result() 返回与服务方法相同结构的结果。"""
+
+    def __init__(self, include_inactive: bool, module_ids: Optional[frozenset]):
+        self.include_inactive = include_inactive
+        self.module_ids = module_ids
+
+    def accepts(self, module_id: Optional[int], is_active: int) -> bool:
+        if not (self.include_inactive or is_active):
+            return False
+        return self.module_ids is None or module_id in self.module_ids
+
+
+class _StreakSink(_Sink):
+    def __init__(self, request: AnalysisRequest):
+        super().__init__(request.include_inactive, request.module_ids)
+        self.high_stress = request.name == "stress_high"
+        if self.high_stress:
+            # 连续两周 >= threshold 等价于 ConsecutiveRule(2, threshold)
+            rules = [ConsecutiveRule(2, request.params.get("threshold", 4))]
+        else:
+            rules = request.params["rules"]
+        self.latest_only = request.params.get("latest_only", False)
+        self.engine = StreakEngine(rules)
+        self.events: List[Dict[str, Any]] = []
+        self.latest: Dict[tuple, Dict[str, Any]] = {}
+
+    def feed(self, student_id: int, module_id: Optional[int], week: int, stress: int) -> None:
+        for event in self.engine.feed(student_id, module_id, week, stress):
+            if self.latest_only:
+                self.latest[(student_id, module_id, event["rule"])] = event
+            else:
+                self.events.append(event)
+
+    def result(self) -> List[Dict[str, Any]]:
+        if self.high_stress:
+            return [
+                {
+                    "student_id": evt["student_id"],
+                    "module_id": evt["module_id"],
+                    "week_start": evt["week_start"],
+                    "week_next": evt["week_end"],
+                    "stress_prev": evt["stress_levels"][0],
+                    "stress_curr": evt["stress_levels"][1],
+                }
+                for evt in self.events
+            ]
+        return list(self.latest.values()) if self.latest_only else self.events
+
+
+class _CorrelationSink(_Sink):
+    """survey_responses ⋈ grades 的相关系数：成绩来自 grades 扫描建立的查找表，问卷来自 survey 扫描。"""
+
+    def __init__(self, request: AnalysisRequest, grades: Dict[tuple, List[Tuple[float, int]]]):
+        super().__init__(request.include_inactive, request.module_ids)
+        self.grades = grades
+        self.groups: Dict[int, CoMoments] = {}
+
+    def feed(self, student_id: int, module_id: Optional[int], week: int, stress: int) -> None:
+        matches = self.grades.get((student_id, module_id))
+        if not matches:
+            return
+        acc = self.groups.get(module_id)
+        if acc is None:
+            acc = self.groups[module_id] = CoMoments()
+        for grade, is_active in matches:
+            if self.include_inactive or is_active:
+                acc.add(stress, grade)
+
+    def result(self) -> List[Dict[str, Any]]:
+        return [
+            AnalysisServiceRepository._build_corr_row(module_id, self.groups[module_id])
+            for module_id in sorted(self.groups)
+            if self.groups[module_id].n
+        ]
+
+
+class _GradeDistributionSink(_Sink):
+    def __init__(self, request: AnalysisRequest):
+        super().__init__(request.include_inactive, request.module_ids)
+        edges = request.params.get("edges")
+        if edges is not None:
+            if len(edges) < 2 or edges != sorted(edges):
+                raise ValueError(f"{request.key}: edges must contain at least two ascending values")
+            self.buckets = AnalysisServiceRepository._buckets_from_edges(edges)
+        else:
+            self.buckets = [(low, high, False) for low, high in DEFAULT_GRADE_BINS]
+        self.by_module = request.params.get("by_module", False)
+        self.counts: Dict[Optional[int], List[int]] = {}
+
+    def feed(self, module_id: int, grade: float) -> None:
+        key = module_id if self.by_module else None
+        counts = self.counts.get(key)
+        if counts is None:
+            counts = self.counts[key] = [0] * len(self.buckets)
+        # 与 SQL 的 CASE 相同：落入第一个匹配的桶
+        for idx, (low, high, closed) in enumerate(self.buckets):
+            if grade >= low and (grade <= high if closed else grade < high):
+                counts[idx] += 1
+                break
+
+    def result(self) -> List[Dict[str, Any]]:
+        render = AnalysisServiceRepository._render_buckets
+        if self.by_module:
+            return [
+                {"module_id": module_id, "bins": render(self.buckets, self.counts[module_id])}
+                for module_id in sorted(self.counts)
+            ]
+        return render(self.buckets, self.counts.get(None, [0] * len(self.buckets)))
+
+
+# =========================================================
+# 批量执行
+# =========================================================
+_SURVEY_READERS = {"stress_high", "stress_streaks", "stress_trend", "threshold_sweep", "stress_grade_by_module"}
+_GRADE_READERS = {"grade_distribution", "stress_grade_by_module"}
+
+# 分析名 -> 服务方法名（不融合时直接调用）
+_SERVICE_METHODS = {
+    "attendance_averages": "get_students_average_attendance",
+    "stress_trend": "get_student_stress_trend",
+    "stress_high": "detect_consecutive_high_stress",
+    "stress_streaks": "detect_streaks",
+    "threshold_sweep": "sweep_high_stress_thresholds",
+    "grade_distribution": "get_grade_distribution",
+    "stress_grade_by_module": "compare_stress_grade_by_module",
+}
+
+
+class BatchAnalysisRunner:
+    def __init__(self, conn):
+        self.conn = conn
+        self.service = AnalysisServiceRepository(conn)
+        # 每张表实际扫描的次数（融合扫描计 1 次），便于观察融合效果
+        self.scans: Dict[str, int] = {}
+
+    def run(self, requests: List[AnalysisRequest]) -> Dict[str, Any]:
+        """在同一个读快照中执行全部分析，返回 {key: 结果}（顺序与请求一致）。"""
+        started = not self.conn.in_transaction
+        if started:
+            self.conn.execute("BEGIN;")
+        try:
+            return self._run(requests)
+        finally:
+            if started:
+                self.conn.rollback()  # 只读事务，结束快照
+
+    def _run(self, requests: List[AnalysisRequest]) -> Dict[str, Any]:
+        # 参数完全相同的分析只保留一个
+        unique: Dict[Hashable, AnalysisRequest] = {}
+        for req in requests:
+            unique.setdefault(req.identity(), req)
+        distinct = list(unique.values())
+
+        survey_fusable = [
+            r for r in distinct
+            if r.name in ("stress_high", "stress_streaks")
+            or (r.name == "stress_grade_by_module" and not r.params.get("include_spearman"))
+        ]
+        grade_fusable = [
+            r for r in distinct
+            if r.name == "grade_distribution"
+            and r.params.get("equal_width") is None
+            and r.params.get("quantiles") is None
+        ]
+        fuse_survey = len(survey_fusable) >= 2
+        correlations = [r for r in survey_fusable if r.name == "stress_grade_by_module"] if fuse_survey else []
+        fuse_grades = bool(correlations) or len(grade_fusable) >= 2
+
+        results: Dict[Hashable, Any] = {}
+        grade_lookup: Dict[tuple, List[Tuple[float, int]]] = {}
+        if fuse_grades:
+            sinks = {r.identity(): _GradeDistributionSink(r) for r in grade_fusable}
+            self._scan_grades(list(sinks.values()), grade_lookup if correlations else None, correlations)
+            results.update({identity: sink.result() for identity, sink in sinks.items()})
+        if fuse_survey:
+            sinks = {
+                r.identity(): _CorrelationSink(r, grade_lookup) if r.name == "stress_grade_by_module" else _StreakSink(r)
+                for r in survey_fusable
+            }
+            self._scan_surveys(list(sinks.values()))
+            results.update({identity: sink.result() for identity, sink in sinks.items()})
+
+        for req in distinct:
+            if req.identity() not in results:
+                results[req.identity()] = self._call_service(req)
+        return {req.key: results[req.identity()] for req in requests}
+
+    def _call_service(self, req: AnalysisRequest) -> Any:
+        for table, readers in (("survey_responses", _SURVEY_READERS), ("grades", _GRADE_READERS)):
+            if req.name in readers:
+                self._count_scan(table)
+        if req.name == "attendance_averages":
+            self._count_scan("attendance_records")
+        return getattr(self.service, _SERVICE_METHODS[req.name])(**req.params)
+
+    def _count_scan(self, table: str) -> None:
+        self.scans[table] = self.scans.get(table, 0) + 1
+
+    @staticmethod
+    def _pushdown(sinks: Iterable[_Sink]) -> Tuple[bool, Optional[int]]:
+        """所有 sink 都只看活跃数据时在 SQL 里过滤 is_active；都只看同一门课时再过滤 module_id。"""
+        sinks = list(sinks)
+        active_only = all(not sink.include_inactive for sink in sinks)
+        module_sets = {sink.module_ids for sink in sinks}
+        module_id = None
+        if len(module_sets) == 1:
+            only = next(iter(module_sets))
+            if only is not None and len(only) == 1:
+                module_id = next(iter(only))
+        return active_only, module_id
+
+    def _where(self, sinks: Iterable[_Sink], *extra: str) -> Tuple[str, List[Any], bool]:
+        active_only, module_id = self._pushdown(sinks)
+        conditions: List[str] = list(extra)
+        params: List[Any] = []
+        if active_only:
+            conditions.append("is_active = 1")
+        if module_id is not None:
+            conditions.append("module_id = ?")
+            params.append(module_id)
+        return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params, active_only
+
+    def _scan_surveys(self, sinks: List[_Sink]) -> None:
+        where_clause, params, active_only = self._where(sinks)
+        # 只看活跃数据时 is_active 恒为 1，不读该列，保持 idx_survey_active_student_module_week 的覆盖扫描
+        active_sql = "1" if active_only else "is_active"
+        cursor = self.conn.execute(
+            f"""
+            SELECT student_id, module_id, week_number, stress_level, {active_sql}
+            FROM survey_responses
+            {where_clause}
+            ORDER BY student_id, module_id, week_number, stress_level;
+            """,
+            params,
+        )
+        self._count_scan("survey_responses")
+        for student_id, module_id, week, stress, is_active in cursor:
+            for sink in sinks:
+                if sink.accepts(module_id, is_active):
+                    sink.feed(student_id, module_id, week, stress)
+
+    def _scan_grades(
+        self,
+        sinks: List[_GradeDistributionSink],
+        lookup: Optional[Dict[tuple, List[Tuple[float, int]]]],
+        correlations: List[AnalysisRequest],
+    ) -> None:
+        consumers: List[_Sink] = list(sinks)
+        if lookup is not None:
+            # 查找表服务于所有相关系数分析：过滤条件取它们的并集（每个 sink 在 feed 时再按 is_active 过滤）
+            consumers.append(_Sink(any(r.include_inactive for r in correlations), None))
+        # 成绩为 NULL 的记录既不落入任何分桶，也不参与相关系数（与单独执行时的 SQL 一致）
+        where_clause, params, active_only = self._where(consumers, "grade IS NOT NULL")
+        active_sql = "1" if active_only else "is_active"
+        cursor = self.conn.execute(
+            f"SELECT student_id, module_id, grade, {active_sql} FROM grades {where_clause};",
+            params,
+        )
+        self._count_scan("grades")
+        for student_id, module_id, grade, is_active in cursor:
+            if lookup is not None and module_id is not None:
+                lookup.setdefault((student_id, module_id), []).append((grade, is_active))
+            for sink in sinks:
+                if sink.accepts(module_id, is_active):
+                    sink.feed(module_id, grade)
@@ -0,0 +1,390 @@
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.models.Alert import Alert
+from app.repositories.AlertRepository import AlertRepository
+from utils.table_version_util import notify_write
+
+
+"""
+增量的“连续两周高压”预警引擎：
+
+全量模式（create_high_stress_alerts 默认）每次都扫描整张 survey_responses，再删掉并重建 alerts，
+既是 O(全部问卷)，又会把员工已标记的 resolved 清掉。增量模式只处理“变化的部分”：
+
+- 水位线（alert_watermarks）：每个 scope（阈值 + 课程过滤 + 是否含已删除）记录处理到的最大问卷 id，
+  下次只读 id 更大的新问卷（走主键范围扫描）
+- 脏数据（alert_dirty_pairs）：survey_responses 上的 UPDATE / DELETE 触发器记录受影响的
+  (student_id, module_id)，这些组合在下次运行时按索引重算
+- 连续状态（alert_streak_state）：每个 scope、每个 (student_id, module_id) 保存最后一周的周次与压力值、
+  最近一次命中以及对应的 alert id；新问卷的周次都在已处理周次之后时，直接从状态接着扫描，不回读历史
+- 只对命中发生变化的组合写 alerts：新命中插入或更新（新的一段连续高压会重新打开 resolved），
+  命中消失的组合把 alert 逻辑删除；命中不变的 alert（包括 resolved 标记）保持原样
+
+第一次运行某个 scope 时水位线为 0，相当于一次全量扫描；已有的同一 (student_id, module_id) 的
+未删除 alert 会被接管而不是重复插入。所有 scope 共用 alerts 表，alert_scopes 记录每条 alert 属于哪个 scope：
+只接管还没有归属的 alert（例如全量模式生成的）或本 scope 自己的，不同 scope 互不收回对方的 alert。
+
+全量模式清空 alerts 时调用 reset_state，丢弃所有 scope 的状态与水位线（下次增量运行重新全量扫描并接管新 alert）。
+"""
+
+
+SCHEMA_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS alert_watermarks (
+        scope TEXT PRIMARY KEY,
+        last_survey_id INTEGER NOT NULL DEFAULT 0,
+        last_dirty_seq INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS alert_streak_state (
+        scope TEXT NOT NULL,
+        student_id INTEGER NOT NULL,
+        module_key INTEGER NOT NULL,     -- module_id，NULL 记为 0（id 从 1 开始）
+        last_week INTEGER,
+        last_stress INTEGER,
+        hit_week_start INTEGER,
+        hit_week_next INTEGER,
+        alert_id INTEGER,
+        PRIMARY KEY (scope, student_id, module_key)
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS alert_scopes (
+        alert_id INTEGER PRIMARY KEY,
+        scope TEXT NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS alert_dirty_pairs (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        student_id INTEGER NOT NULL,
+        module_id INTEGER
+    );
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_survey_alert_dirty_update
+    AFTER UPDATE OF student_id, module_id, week_number, stress_level, is_active ON survey_responses
+    BEGIN
+        INSERT INTO alert_dirty_pairs (student_id, module_id) VALUES (OLD.student_id, OLD.module_id);
+        INSERT INTO alert_dirty_pairs (student_id, module_id)
+        SELECT NEW.student_id, NEW.module_id
+        WHERE NEW.student_id IS NOT OLD.student_id OR NEW.module_id IS NOT OLD.module_id;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_survey_alert_dirty_delete
+    AFTER DELETE ON survey_responses
+    BEGIN
+        INSERT INTO alert_dirty_pairs (student_id, module_id) VALUES (OLD.student_id, OLD.module_id);
+    END;
+    """,
+]
+
+
+def ensure_schema(conn) -> None:
+    """创建增量引擎用到的状态表与触发器（可重复执行）。"""
+    for statement in SCHEMA_STATEMENTS:
+        conn.execute(statement)
+
+
+def reset_state(conn) -> None:
+    """
+    丢弃增量引擎的全部状态（连续状态、水位线、alert 归属、脏记录），在 alerts 被整体重建后调用。
+    不提交，由调用方与删除 alerts 放在同一个事务里。
+    """
+    ensure_schema(conn)
+    for table in ("alert_streak_state", "alert_watermarks", "alert_scopes", "alert_dirty_pairs"):
+        conn.execute(f"DELETE FROM {table};")
+
+
+# 一个组合的连续状态：(last_week, last_stress, hit_week_start, hit_week_next, alert_id)
+_EMPTY_STATE = (None, None, None, None, None)
+
+# 接管已有 alert 时，IN 列表每批的学生数（远低于 SQLite 的变量上限）
+_ADOPT_CHUNK = 500
+
+
+def scan_streak(
+    rows: Iterable[Tuple[int, int]],
+    threshold: int,
+    last_week: Optional[int] = None,
+    last_stress: Optional[int] = None,
+    hit: Optional[Tuple[int, int]] = None,
+) -> Tuple[Optional[int], Optional[int], Optional[Tuple[int, int]]]:
+    """
+    在一个 (student_id, module_id) 内按周次顺序扫描 (week_number, stress_level)，
+    规则与 detect_consecutive_high_stress 相同；可以从上次的状态接着扫描。
+    返回 (最后一周, 最后一周压力, 最近一次命中 (week_start, week_next) 或 None)。
+    """
+    for week, stress in rows:
+        if (
+            last_week is not None
+            and week == last_week + 1
+            and last_stress is not None
+            and last_stress >= threshold
+            and stress >= threshold
+        ):
+            hit = (last_week, week)
+        last_week, last_stress = week, stress
+    return last_week, last_stress, hit
+
+
+class IncrementalAlertEngine:
+    def __init__(self, conn):
+        self.conn = conn
+        self.alert_repo = AlertRepository(conn)
+
+    @staticmethod
+    def scope_key(threshold: int, module_id: Optional[int], include_inactive: bool) -> str:
+        module_part = "*" if module_id is None else str(module_id)
+        return f"consecutive:{threshold}:{module_part}:{int(include_inactive)}"
+
+    def run(
+        self,
+        threshold: int = 4,
+        module_id: Optional[int] = None,
+        include_inactive: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        处理上次运行以来的新问卷与被修改 / 删除的问卷，只改动受影响的 alerts。
+        返回本次改动的预警列表，每条带 action："inserted" / "updated" / "retired"。
+        """
+        ensure_schema(self.conn)
+        scope = self.scope_key(threshold, module_id, include_inactive)
+        cursor = self.conn.cursor()
+
+        row = cursor.execute(
+            "SELECT last_survey_id, last_dirty_seq FROM alert_watermarks WHERE scope = ?;", (scope,)
+        ).fetchone()
+        last_survey_id, last_dirty_seq = row if row else (0, 0)
+        max_survey_id = cursor.execute("SELECT IFNULL(MAX(id), 0) FROM survey_responses;").fetchone()[0]
+        max_dirty_seq = cursor.execute("SELECT IFNULL(MAX(seq), 0) FROM alert_dirty_pairs;").fetchone()[0]
+
+        # 1) 被修改 / 删除过的组合：整组重算
+        dirty_sql = "SELECT DISTINCT student_id, module_id FROM alert_dirty_pairs WHERE seq > ? AND seq <= ?"
+        dirty_params: List[Any] = [last_dirty_seq, max_dirty_seq]
+        if module_id is not None:
+            dirty_sql += " AND module_id = ?"
+            dirty_params.append(module_id)
+        dirty = {(s, m) for s, m in cursor.execute(dirty_sql + ";", dirty_params)}
+
+        # 2) 新问卷：id 在 (水位线, 当前最大 id] 之间，按组合 + 周次排序
+        conditions = ["id > ?", "id <= ?"]
+        params: List[Any] = [last_survey_id, max_survey_id]
+        if not include_inactive:
+            conditions.append("is_active = 1")
+        if module_id is not None:
+            conditions.append("module_id = ?")
+            params.append(module_id)
+        new_rows = cursor.execute(
+            f"""
+            SELECT student_id, module_id, week_number, stress_level
+            FROM survey_responses
+            WHERE {' AND '.join(conditions)}
+            ORDER BY student_id, module_id, week_number, id;
+            """,
+            params,
+        ).fetchall()
+
+        changes: Dict[Tuple[int, Optional[int]], Tuple] = {}
+        for pair, group in groupby(new_rows, key=lambda r: (r[0], r[1])):
+            if pair in dirty:
+                continue  # 下面整组重算
+            weeks = [(r[2], r[3]) for r in group]
+            state = self._load_state(scope, pair)
+            if state[0] is not None and weeks[0][0] <= state[0]:
+                dirty.add(pair)  # 插入了更早的周次（补录），不能接着状态扫描
+                continue
+            hit = (state[2], state[3]) if state[2] is not None else None
+            changes[pair] = scan_streak(weeks, threshold, state[0], state[1], hit) + (state,)
+
+        for pair in dirty:
+            state = self._load_state(scope, pair)
+            changes[pair] = scan_streak(self._pair_rows(pair, include_inactive), threshold) + (state,)
+
+        results = self._apply(scope, threshold, changes)
+
+        cursor.execute(
+            """
+            INSERT INTO alert_watermarks (scope, last_survey_id, last_dirty_seq, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(scope) DO UPDATE SET
+                last_survey_id = excluded.last_survey_id,
+                last_dirty_seq = excluded.last_dirty_seq,
+                updated_at = excluded.updated_at;
+            """,
+            (scope, max_survey_id, max_dirty_seq, datetime.now().isoformat(timespec="seconds")),
+        )
+        # 所有 scope 都处理过的脏记录可以删掉
+        cursor.execute(
+            "DELETE FROM alert_dirty_pairs WHERE seq <= (SELECT MIN(last_dirty_seq) FROM alert_watermarks);"
+        )
+        self.conn.commit()
+        notify_write(self.conn, "alerts")
+        return results
+
+    # ------------------------------------------------------------------
+    # 内部方法
+    # ------------------------------------------------------------------
+    def _load_state(self, scope: str, pair: Tuple[int, Optional[int]]) -> Tuple:
+        row = self.conn.execute(
+            """
+            SELECT last_week, last_stress, hit_week_start, hit_week_next, alert_id
+            FROM alert_streak_state
+            WHERE scope = ? AND student_id = ? AND module_key = ?;
+            """,
+            (scope, pair[0], pair[1] or 0),
+        ).fetchone()
+        return row or _EMPTY_STATE
+
+    def _pair_rows(self, pair: Tuple[int, Optional[int]], include_inactive: bool) -> List[Tuple[int, int]]:
+        active_sql = "" if include_inactive else "AND is_active = 1"
+        return self.conn.execute(
+            f"""
+            SELECT week_number, stress_level
+            FROM survey_responses
+            WHERE student_id = ? AND module_id IS ? {active_sql}
+            ORDER BY week_number, id;
+            """,
+            pair,
+        ).fetchall()
+
+    def _apply(self, scope: str, threshold: int, changes: Dict) -> List[Dict[str, Any]]:
+        now_ts = datetime.now().isoformat(timespec="seconds")
+        to_insert: List[Tuple[Tuple, Alert]] = []
+        to_update: List[Tuple[Tuple, Alert, str]] = []
+        to_retire: List[Tuple[Tuple, int]] = []
+        state_rows: List[Tuple] = []
+        ownership: List[Tuple[int, str]] = []
+
+        # 已有的 alert（状态里记录的，以及首次运行时要接管的）一次性读出
+        owned = {pair: change[3][4] for pair, change in changes.items() if change[3][4] is not None}
+        unowned = [pair for pair in changes if pair not in owned]
+        adopted = self._adoptable_alerts(scope, unowned)
+        existing = self.alert_repo.get_many(list(owned.values()) + list(adopted.values()))
+
+        for pair, (last_week, last_stress, hit, state) in changes.items():
+            alert = existing.get(owned.get(pair) or adopted.get(pair))
+            if alert is not None and not alert.is_active:
+                alert = None  # 被人工删除的 alert 不再复用
+            alert_id = alert.id if alert is not None else None
+
+            if alert is not None and pair in adopted:
+                ownership.append((alert.id, scope))
+
+            if hit is None:
+                if alert is not None:
+                    to_retire.append((pair, alert.id))
+                alert_id = None
+            elif alert is None:
+                new_alert = self._build_alert(pair, hit, threshold, now_ts)
+                to_insert.append((pair, new_alert))
+            elif alert.week_number != hit[1]:
+                # 命中只由第二周决定；周次不变（包括接管的 alert）时保持原样，resolved 不动
+                alert.week_number = hit[1]
+                alert.reason = self._reason(pair, hit, threshold)
+                alert.created_at = now_ts
+                alert.resolved = False  # 新的一段连续高压：重新打开
+                to_update.append((pair, alert, "updated"))
+
+            state_rows.append(
+                [scope, pair[0], pair[1] or 0, last_week, last_stress,
+                 hit[0] if hit else None, hit[1] if hit else None, alert_id]
+            )
+
+        results: List[Dict[str, Any]] = []
+        if to_insert:
+            self.alert_repo.add_many([alert for _, alert in to_insert])
+            inserted_ids = {pair: alert.id for pair, alert in to_insert}
+            for row in state_rows:
+                pair = (row[1], row[2] or None)
+                if pair in inserted_ids:
+                    row[7] = inserted_ids[pair]
+            ownership.extend((alert.id, scope) for _, alert in to_insert)
+            results.extend(self._result(alert, "inserted") for _, alert in to_insert)
+        if to_update:
+            self.alert_repo.update_many([alert for _, alert, _ in to_update])
+            results.extend(self._result(alert, action) for _, alert, action in to_update)
+        if to_retire:
+            self.alert_repo.soft_delete_many([alert_id for _, alert_id in to_retire])
+            for pair, alert_id in to_retire:
+                retired = existing[alert_id]
+                retired.is_active = False
+                results.append(self._result(retired, "retired"))
+
+        self.conn.executemany(
+            """
+            INSERT OR REPLACE INTO alert_streak_state (
+                scope, student_id, module_key, last_week, last_stress,
+                hit_week_start, hit_week_next, alert_id
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+            """,
+            state_rows,
+        )
+        self.conn.executemany("INSERT OR REPLACE INTO alert_scopes (alert_id, scope) VALUES (?, ?);", ownership)
+        return results
+
+    def _adoptable_alerts(self, scope: str, pairs: List[Tuple[int, Optional[int]]]) -> Dict[Tuple, int]:
+        """
+        首次处理某组合时，接管该组合已有的最新一条未删除 alert（例如全量模式生成的）。
+        已归属其他 scope 的 alert 不接管。
+        """
+        adopted: Dict[Tuple, int] = {}
+        if not pairs:
+            return adopted
+        wanted = set(pairs)
+        students = sorted({student_id for student_id, _ in pairs})
+        for start in range(0, len(students), _ADOPT_CHUNK):
+            chunk = students[start:start + _ADOPT_CHUNK]
+            rows = self.conn.execute(
+                f"""
+                SELECT a.student_id, a.module_id, a.id
+                FROM alerts a
+                LEFT JOIN alert_scopes s ON s.alert_id = a.id
+                WHERE a.is_active = 1
+                  AND a.student_id IN ({', '.join('?' * len(chunk))})
+                  AND (s.scope IS NULL OR s.scope = ?)
+                ORDER BY a.id;
+                """,
+                chunk + [scope],
+            )
+            for student_id, module_id, alert_id in rows:
+                if (student_id, module_id) in wanted:
+                    adopted[(student_id, module_id)] = alert_id  # 按 id 升序，最后一条即最新
+        return adopted
+
+    @staticmethod
+    def _reason(pair: Tuple[int, Optional[int]], hit: Tuple[int, int], threshold: int) -> str:
+        return (
+            f"Stress >= {threshold} in consecutive weeks "
+            f"{hit[0]} and {hit[1]} "
+            f"(module_id={pair[1]})."
+        )
+
+    def _build_alert(self, pair, hit, threshold: int, now_ts: str) -> Alert:
+        return Alert(
+            student_id=pair[0],
+            module_id=pair[1],
+            week_number=hit[1],
+            reason=self._reason(pair, hit, threshold),
+            created_at=now_ts,
+            resolved=False,
+        )
+
+    @staticmethod
+    def _result(alert: Alert, action: str) -> Dict[str, Any]:
+        return {
+            "alert_id": alert.id,
+            "action": action,
+            "student_id": alert.student_id,
+            "module_id": alert.module_id,
+            "week_number": alert.week_number,
+            "reason": alert.reason,
+            "resolved": int(alert.resolved),
+            "created_at": alert.created_at,
+        }
@@ -1,8 +1,14 @@
-from flask import request, jsonify
+from flask import current_app, request, jsonify
 
 from utils.json_convert_util import JsonHelper
+from app.conditional import conditional_get
+from app.db import get_db, get_result_cache, run_write
+from app.streaming import stream_json, wants_stream
+from utils.serializer_util import columnar_records
 from . import analysis_bp
-from .services import AnalysisServiceRepository
+from .batch import BatchAnalysisRunner, parse_batch
+from .services import AnalysisServiceRepository, DEFAULT_SAMPLE_SEED, DETECTION_ENGINES, validate_sweep_params
+from .streaks import parse_rule
 
 
 def _to_bool(val: str) -> bool:
@@ -10,9 +16,28 @@ def _to_bool(val: str) -> bool:
     return str(val).lower() in {"1", "true", "yes", "on"}
 
 
+def _service() -> AnalysisServiceRepository:
+    """请求内的分析服务：使用连接池连接与应用级结果缓存。"""
+    return AnalysisServiceRepository(get_db(), cache=get_result_cache())
+
+
+def _wants_columnar(args) -> bool:
+    """format=rows（默认）/ columnar；columnar 时 data 为 {"columns": [...], "data": {列名: [值...]}}。"""
+    fmt = args.get("format", "rows")
+    if fmt not in ("rows", "columnar"):
+        raise ValueError("format must be rows or columnar")
+    return fmt == "columnar"
+
+
+def _parse_rules(values):
+    """rule 参数可重复或逗号分隔，例如 rule=consecutive:3:4&rule=rising:3；格式不对时抛 ValueError。"""
+    specs = [spec for value in values for spec in value.split(",") if spec.strip()]
+    return [parse_rule(spec) for spec in specs]
+
+
 @analysis_bp.route("/analysis-test")
 def analysis_test_route():
-    service = AnalysisServiceRepository()
+    service = _service()
     msg = service.test()
     return jsonify(JsonHelper.success_dict({"msg": msg}))
 
@@ -21,6 +46,7 @@ def analysis_test_route():
 # 功能：展示学生压力变化曲线
 # -----------------------------
 @analysis_bp.route("/analysis/stress-trend", methods=["GET"])
+@conditional_get("survey_responses")
 def analysis_stress_trend():
     """
     压力趋势：指定学生（可选课程）的按周压力列表。
@@ -33,7 +59,7 @@ def analysis_stress_trend():
     module_id = request.args.get("module_id", type=int)
     include_inactive = _to_bool(request.args.get("include_inactive", "false"))
 
-    service = AnalysisServiceRepository()
+    service = _service()
     try:
         data = service.get_student_stress_trend(
             student_id=student_id,
@@ -49,19 +75,26 @@ def analysis_stress_trend():
 # 功能：统计学生平均出勤率
 # -----------------------------
 @analysis_bp.route("/analysis/attendance/averages", methods=["GET"])
+@conditional_get("attendance_records")
 def analysis_attendance_averages():
     """
     出勤率：返回所有学生的平均出勤率，可按课程过滤。
-    Query: module_id (可选), include_inactive (可选: true/false)
+    Query: module_id (可选), include_inactive (可选: true/false),
+           format (可选: rows / columnar，默认 rows；columnar 时按列返回，键名不在每一行重复)
     """
     module_id = request.args.get("module_id", type=int)
     include_inactive = _to_bool(request.args.get("include_inactive", "false"))
+    try:
+        columnar = _wants_columnar(request.args)
+    except ValueError as e:
+        return jsonify(JsonHelper.error_dict(str(e))), 400
 
-    service = AnalysisServiceRepository()
+    service = _service()
     try:
         data = service.get_students_average_attendance(
             module_id=module_id,
             include_inactive=include_inactive,
+            columnar=columnar,
         )
         return jsonify(JsonHelper.success_dict(data))
     except Exception as e:
@@ -72,10 +105,12 @@ def analysis_attendance_averages():
 # 功能：对比压力与成绩关系
 # -----------------------------
 @analysis_bp.route("/analysis/stress-grade/by-module", methods=["GET"])
+@conditional_get("survey_responses", "grades")
 def analysis_stress_grade_by_module():
     """
-    压力-成绩对比：按模块返回平均压力、平均成绩、样本量和相关系数。
-    Query: module_id (可选, 逗号分隔), include_inactive (可选: true/false)
+    压力-成绩对比：按模块返回平均压力、平均成绩、样本量、相关系数和线性回归的斜率 / 截距。
+    Query: module_id (可选, 逗号分隔), include_inactive (可选: true/false),
+           spearman (可选: true/false，额外返回 Spearman 秩相关)
     """
     raw_modules = request.args.get("module_id")
     module_ids = None
@@ -86,12 +121,14 @@ def analysis_stress_grade_by_module():
             return jsonify(JsonHelper.error_dict("module_id must be int or comma-separated ints")), 400
 
     include_inactive = _to_bool(request.args.get("include_inactive", "false"))
+    include_spearman = _to_bool(request.args.get("spearman", "false"))
 
-    service = AnalysisServiceRepository()
+    service = _service()
     try:
         data = service.compare_stress_grade_by_module(
             module_ids=module_ids,
             include_inactive=include_inactive,
+            include_spearman=include_spearman,
         )
         return jsonify(JsonHelper.success_dict(data))
     except Exception as e:
@@ -102,21 +139,41 @@ def analysis_stress_grade_by_module():
 # 功能：成绩分布（饼图）
 # -----------------------------
 @analysis_bp.route("/analysis/grades/distribution", methods=["GET"])
+@conditional_get("grades")
 def analysis_grade_distribution():
     """
     成绩分布：按分桶统计成绩数量。
-    Query: module_id (可选), include_inactive (可选: true/false)
+    Query: module_id (可选), include_inactive (可选: true/false),
+           分桶方式（最多一种，默认 0-60/60-70/70-80/80-90/90-100）：
+             edges (逗号分隔的升序边界，如 0,40,60,100) / equal_width (等宽桶个数) / quantiles (等频桶个数),
+           by_module (可选: true/false，按课程分别统计)
     """
     module_id = request.args.get("module_id", type=int)
     include_inactive = _to_bool(request.args.get("include_inactive", "false"))
+    equal_width = request.args.get("equal_width", type=int)
+    quantiles = request.args.get("quantiles", type=int)
+    by_module = _to_bool(request.args.get("by_module", "false"))
+    edges = None
+    raw_edges = request.args.get("edges")
+    if raw_edges:
+        try:
+            edges = [float(part) for part in raw_edges.split(",")]
+        except ValueError:
+            return jsonify(JsonHelper.error_dict("edges must be comma-separated numbers")), 400
 
-    service = AnalysisServiceRepository()
+    service = _service()
     try:
         data = service.get_grade_distribution(
             module_id=module_id,
             include_inactive=include_inactive,
+            edges=edges,
+            equal_width=equal_width,
+            quantiles=quantiles,
+            by_module=by_module,
         )
         return jsonify(JsonHelper.success_dict(data))
+    except ValueError as e:
+        return jsonify(JsonHelper.error_dict(str(e))), 400
     except Exception as e:
         return jsonify(JsonHelper.error_dict(f"failed: {e}")), 500
 
@@ -125,19 +182,59 @@ def analysis_grade_distribution():
 # 功能：压力-成绩散点数据
 # -----------------------------
 @analysis_bp.route("/analysis/stress-grade/pairs", methods=["GET"])
+@conditional_get("survey_responses", "grades")
 def analysis_stress_grade_pairs():
     """
     压力-成绩散点：返回原始点集（student/module/week 对应的压力与成绩）。
-    Query: module_id (可选), include_inactive (可选: true/false)
+    Query: module_id (可选), include_inactive (可选: true/false),
+           stream (可选: true/false，分批读取并边序列化边发送，响应结构不变),
+           mode (可选: raw / grid / student_mean / sample，默认 raw；非 raw 时在服务端聚合或抽样),
+           grade_bin (grid 模式的成绩桶宽，默认 10), max_points (sample 模式的点数上限，默认 1000),
+           seed (sample 模式的随机种子，默认 0；抽样是确定的，同一 URL 与数据版本对应同一个样本，ETag 才有效),
+           format (可选: rows / columnar，默认 rows；columnar 时 data 为 {"columns": [...], "data": {列名: [值...]}}，
+                   raw 模式直接由查询元组转置；不能与 stream 同用)
     """
     module_id = request.args.get("module_id", type=int)
     include_inactive = _to_bool(request.args.get("include_inactive", "false"))
+    mode = request.args.get("mode", "raw")
+    try:
+        columnar = _wants_columnar(request.args)
+    except ValueError as e:
+        return jsonify(JsonHelper.error_dict(str(e))), 400
+    if columnar and wants_stream(request.args):
+        return jsonify(JsonHelper.error_dict("format=columnar cannot be combined with stream")), 400
+
+    service = _service()
+    if mode != "raw":
+        try:
+            data = service.get_stress_grade_summary(
+                mode,
+                module_id=module_id,
+                include_inactive=include_inactive,
+                grade_bin=request.args.get("grade_bin", default=10, type=float),
+                max_points=request.args.get("max_points", default=1000, type=int),
+                seed=request.args.get("seed", default=DEFAULT_SAMPLE_SEED, type=int),
+            )
+            # 聚合 / 抽样后的结果集很小，直接把逐行 dict 转为列式
+            return jsonify(JsonHelper.success_dict(columnar_records(data) if columnar else data))
+        except ValueError as e:
+            return jsonify(JsonHelper.error_dict(str(e))), 400
+        except Exception as e:
+            return jsonify(JsonHelper.error_dict(f"failed: {e}")), 500
 
-    service = AnalysisServiceRepository()
     try:
+        if wants_stream(request.args):
+            batch_size = current_app.config.get("API_STREAM_BATCH_SIZE", 500)
+            points = service.iter_stress_grade_pairs(
+                module_id=module_id,
+                include_inactive=include_inactive,
+                batch_size=batch_size,
+            )
+            return stream_json(JsonHelper.iter_success_json(points, chunk_size=batch_size))
         data = service.get_stress_grade_pairs(
             module_id=module_id,
             include_inactive=include_inactive,
+            columnar=columnar,
         )
         return jsonify(JsonHelper.success_dict(data))
     except Exception as e:
@@ -148,21 +245,97 @@ def analysis_stress_grade_pairs():
 # 功能：检测连续两周高压
 # -----------------------------
 @analysis_bp.route("/analysis/stress/high", methods=["GET"])
+@conditional_get("survey_responses")
 def analysis_detect_high_stress():
     """
     连续高压检测：返回连续两周压力 >= 阈值的事件列表。
-    Query: threshold (默认 4), module_id (可选), include_inactive (可选: true/false)
+    Query: threshold (默认 4), module_id (可选), include_inactive (可选: true/false),
+           engine (可选: python / sql，默认 python)
     """
     threshold = request.args.get("threshold", default=4, type=int)
     module_id = request.args.get("module_id", type=int)
     include_inactive = _to_bool(request.args.get("include_inactive", "false"))
+    engine = request.args.get("engine", "python")
+    if engine not in DETECTION_ENGINES:
+        return jsonify(JsonHelper.error_dict(f"engine must be one of {sorted(DETECTION_ENGINES)}")), 400
 
-    service = AnalysisServiceRepository()
+    service = _service()
     try:
         data = service.detect_consecutive_high_stress(
             threshold=threshold,
             module_id=module_id,
             include_inactive=include_inactive,
+            engine=engine,
+        )
+        return jsonify(JsonHelper.success_dict(data))
+    except Exception as e:
+        return jsonify(JsonHelper.error_dict(f"failed: {e}")), 500
+
+
+# -----------------------------
+# 功能：阈值扫描（校准 threshold）
+# -----------------------------
+@analysis_bp.route("/analysis/stress/sweep", methods=["GET"])
+@conditional_get("survey_responses")
+def analysis_threshold_sweep():
+    """
+    阈值扫描：一次请求返回每个阈值、每个连续周数下会命中的学生数与 (学生, 课程) 组合数。
+    Query: min_threshold (默认 1), max_threshold (默认 5)，阈值须在压力量表 1~5 内,
+           max_weeks (默认 4，2~52),
+           module_id (可选), include_inactive (可选: true/false)
+    """
+    min_threshold = request.args.get("min_threshold", default=1, type=int)
+    max_threshold = request.args.get("max_threshold", default=5, type=int)
+    max_weeks = request.args.get("max_weeks", default=4, type=int)
+    module_id = request.args.get("module_id", type=int)
+    include_inactive = _to_bool(request.args.get("include_inactive", "false"))
+    try:
+        validate_sweep_params(min_threshold, max_threshold, max_weeks)
+    except ValueError as e:
+        return jsonify(JsonHelper.error_dict(str(e))), 400
+
+    service = _service()
+    try:
+        data = service.sweep_high_stress_thresholds(
+            min_threshold=min_threshold,
+            max_threshold=max_threshold,
+            max_weeks=max_weeks,
+            module_id=module_id,
+            include_inactive=include_inactive,
+        )
+        return jsonify(JsonHelper.success_dict(data))
+    except Exception as e:
+        return jsonify(JsonHelper.error_dict(f"failed: {e}")), 500
+
+
+# -----------------------------
+# 功能：多规则连续 / 滑动窗口检测
+# -----------------------------
+@analysis_bp.route("/analysis/stress/streaks", methods=["GET"])
+@conditional_get("survey_responses")
+def analysis_detect_streaks():
+    """
+    多规则检测：一遍扫描同时评估多条规则。
+    Query: rule（必填，可重复或逗号分隔：consecutive:N:t / window:k:w:t / rising:N），
+           module_id (可选), include_inactive (可选: true/false), latest_only (可选: true/false)
+    """
+    try:
+        rules = _parse_rules(request.args.getlist("rule"))
+    except ValueError as e:
+        return jsonify(JsonHelper.error_dict(str(e))), 400
+    if not rules:
+        return jsonify(JsonHelper.error_dict("rule is required")), 400
+    module_id = request.args.get("module_id", type=int)
+    include_inactive = _to_bool(request.args.get("include_inactive", "false"))
+    latest_only = _to_bool(request.args.get("latest_only", "false"))
+
+    service = _service()
+    try:
+        data = service.detect_streaks(
+            rules,
+            module_id=module_id,
+            include_inactive=include_inactive,
+            latest_only=latest_only,
         )
         return jsonify(JsonHelper.success_dict(data))
     except Exception as e:
@@ -176,20 +349,33 @@ def analysis_detect_high_stress():
 def analysis_generate_alerts():
     """
     自动创建预警：基于连续高压结果写入 alerts。
-    Query/Body: threshold (默认 4), module_id (可选), include_inactive (可选: true/false), clear_old (默认 true)
+    Query/Body: threshold (默认 4), module_id (可选), include_inactive (可选: true/false), clear_old (默认 true),
+                incremental (默认 false：增量生成，只改动受新增 / 修改问卷影响的预警，保留 resolved),
+                rule (可选，可重复：按自定义规则生成，格式同 /analysis/stress/streaks；不能与 incremental 同用)
     """
     threshold = request.values.get("threshold", default=4, type=int)
     module_id = request.values.get("module_id", type=int)
     include_inactive = _to_bool(request.values.get("include_inactive", "false"))
     clear_old = _to_bool(request.values.get("clear_old", "true"))
+    incremental = _to_bool(request.values.get("incremental", "false"))
+    try:
+        rules = _parse_rules(request.values.getlist("rule"))
+    except ValueError as e:
+        return jsonify(JsonHelper.error_dict(str(e))), 400
+    if rules and incremental:
+        return jsonify(JsonHelper.error_dict("rule cannot be combined with incremental")), 400
 
-    service = AnalysisServiceRepository()
     try:
-        data = service.create_high_stress_alerts(
-            threshold=threshold,
-            module_id=module_id,
-            include_inactive=include_inactive,
-            clear_old=clear_old,
+        # 写操作交给单写线程，在其事务内完成“检测 + 写入 alerts”
+        data = run_write(
+            lambda conn: AnalysisServiceRepository(conn).create_high_stress_alerts(
+                threshold=threshold,
+                module_id=module_id,
+                include_inactive=include_inactive,
+                clear_old=clear_old,
+                incremental=incremental,
+                rules=rules or None,
+            )
         )
         return jsonify(JsonHelper.success_dict(data))
     except Exception as e:
@@ -202,8 +388,62 @@ def analysis_generate_alerts():
 #    参数：module_id（可选），include_inactive（可选）
 # 2) 成绩分布饼图：
 #    GET /analysis/grades/distribution
-#    参数：module_id（可选），include_inactive（可选）
+#    参数：module_id（可选），include_inactive（可选），edges / equal_width / quantiles（可选），by_module（可选）
 # 3) 压力与成绩散点图：
 #    GET /analysis/stress-grade/pairs
-#    参数：module_id（可选），include_inactive（可选）
+#    参数：module_id（可选），include_inactive（可选），stream（可选，数据量大时使用），
+#          mode=grid / student_mean / sample（可选，服务端聚合或抽样，点数多时使用）
 # ------------------------------------------------------------
+
+
+# -----------------------------
+# 功能：批量分析（一个连接、一个快照，读同一张表的分析合并扫描）
+# -----------------------------
+@analysis_bp.route("/analysis", methods=["POST"])
+def analysis_batch():
+    """
+    一次请求执行多个分析，见 app/analysis/batch.py。
+    Body (JSON): {"analyses": [{"name": "attendance_averages"},
+                               {"name": "grade_distribution", "params": {"module_id": 1}},
+                               {"name": "stress_grade_by_module"},
+                               {"name": "stress_high", "params": {"threshold": 4}, "key": "high"}]}
+    name 可选 attendance_averages / stress_trend / stress_high / stress_streaks / threshold_sweep /
+    grade_distribution / stress_grade_by_module；params 与对应服务方法的参数同名
+    （stress_streaks 的 rules 为规则字符串列表）。
+    返回：{"success": true, "data": {"<key>": 结果, ...}}，key 默认为 name。
+    """
+    try:
+        analyses = parse_batch(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify(JsonHelper.error_dict(str(e))), 400
+
+    try:
+        data = BatchAnalysisRunner(get_db()).run(analyses)
+        return jsonify(JsonHelper.success_dict(data))
+    except ValueError as e:
+        return jsonify(JsonHelper.error_dict(str(e))), 400
+    except Exception as e:
+        return jsonify(JsonHelper.error_dict(f"failed: {e}")), 500
+
+
+# -----------------------------
+# 功能：结果缓存统计
+# -----------------------------
+@analysis_bp.route("/analysis/cache/stats", methods=["GET"])
+def analysis_cache_stats():
+    """
+    分析结果缓存的命中 / 未命中 / 淘汰 / 失效次数，以及当前各表的版本号（只读；清空缓存用 DELETE /analysis/cache）。
+    """
+    return jsonify(JsonHelper.success_dict(get_result_cache().stats()))
+
+
+@analysis_bp.route("/analysis/cache", methods=["DELETE"])
+def analysis_cache_clear():
+    """
+    清空分析结果缓存，返回清空前的统计。
+    不放在 GET 上：爬虫、浏览器预取或条件请求的重放都不应该清掉共享缓存。
+    """
+    cache = get_result_cache()
+    stats = cache.stats()
+    cache.clear()
+    return jsonify(JsonHelper.success_dict(stats))
@@ -1,10 +1,63 @@
-from typing import List, Optional, Dict, Any
+import random
+import sqlite3
+from typing import List, Optional, Dict, Any, Iterator, Sequence, Tuple, Union
 from datetime import datetime
 
-from utils.db_connect_util import get_conn
+from app.db import get_db
 from app.repositories.AttendanceRecordRepository import AttendanceRecordRepository
 from app.repositories.GradeRepository import GradeRepository
 from app.repositories.SurveyResponseRepository import SurveyResponseRepository
+from app.analysis.incremental_alerts import IncrementalAlertEngine, reset_state as reset_incremental_state
+from app.analysis.streaks import StreakEngine, StreakRule
+from app.analysis.statistics import CoMoments, grouped_comoments
+from utils.serializer_util import columnar as _columnar  # 参数名 columnar 会遮蔽同名函数
+from utils.table_version_util import ResultCache, memoize, notify_write
+
+
+# 连续高压检测的实现方式（见 detect_consecutive_high_stress）
+DETECTION_ENGINES = {"sql", "python"}
+# LAG() 等窗口函数需要 SQLite 3.25+
+WINDOW_FUNCTIONS_SUPPORTED = sqlite3.sqlite_version_info >= (3, 25, 0)
+# 压力-成绩散点的降采样模式（见 get_stress_grade_summary）
+STRESS_GRADE_MODES = {"grid", "student_mean", "sample"}
+# sample 模式的默认随机种子：同样的参数与数据总是得到同一个样本（ETag / 结果缓存才成立）
+DEFAULT_SAMPLE_SEED = 0
+# 压力量表（stress_level 的取值范围）与阈值扫描的连续周数上限（一学年）
+STRESS_SCALE = (1, 5)
+MAX_SWEEP_WEEKS = 52
+# 成绩分布每个桶占一列结果，远低于 SQLite 默认的 2000 列上限
+MAX_GRADE_BINS = 500
+# 默认成绩分桶（左闭右开；上界 101 让 100 分落在最后一个桶，标签仍显示 90-100）
+DEFAULT_GRADE_BINS = [(0, 60), (60, 70), (70, 80), (80, 90), (90, 101)]
+# 压力-成绩散点每个点的字段（与 _stress_grade_pairs_query 的 SELECT 顺序一致）
+STRESS_GRADE_PAIR_COLUMNS = ("student_id", "module_id", "week_number", "stress_level", "grade")
+
+
+def validate_sweep_params(min_threshold: int, max_threshold: int, max_weeks: int) -> None:
+    """阈值扫描的参数检查：阈值在压力量表内，连续周数 2..MAX_SWEEP_WEEKS；不合法时抛 ValueError。"""
+    low, high = STRESS_SCALE
+    if not low <= min_threshold <= max_threshold <= high:
+        raise ValueError(f"require {low} <= min_threshold <= max_threshold <= {high}")
+    if not 2 <= max_weeks <= MAX_SWEEP_WEEKS:
+        raise ValueError(f"max_weeks must be between 2 and {MAX_SWEEP_WEEKS}")
+
+
+def validate_grade_bins(
+    bins: Optional[List[tuple]] = None,
+    edges: Optional[Sequence[float]] = None,
+    equal_width: Optional[int] = None,
+    quantiles: Optional[int] = None,
+) -> None:
+    """成绩分桶参数检查：最多一种分桶方式，桶数 1..MAX_GRADE_BINS，edges 升序；不合法时抛 ValueError。"""
+    if sum(option is not None for option in (bins, edges, equal_width, quantiles)) > 1:
+        raise ValueError("Specify at most one of bins, edges, equal_width, quantiles")
+    if equal_width is not None and equal_width < 1 or quantiles is not None and quantiles < 1:
+        raise ValueError("Bin count must be >= 1")
+    if edges is not None and (len(edges) < 2 or list(edges) != sorted(edges)):
+        raise ValueError("edges must contain at least two ascending values")
+    counts = (len(bins or ()), len(edges or ()) - 1, equal_width or 0, quantiles or 0)
+    if max(counts) > MAX_GRADE_BINS:
+        raise ValueError(f"At most {MAX_GRADE_BINS} bins are supported")
 
 
 class AnalysisServiceRepository:
@@ -14,12 +67,17 @@ class AnalysisServiceRepository:
     - 当前已实现：统计学生平均出勤率。
     """
 
-    def __init__(self, conn=None):
+    def __init__(self, conn=None, cache: Optional[ResultCache] = None):
         """
         初始化数据库连接与仓储。
-        - conn: 可外部注入，方便测试；未提供则使用默认测试库连接。
+        - conn: 可外部注入；路由中传入 app.db.get_db() 的连接池连接，
+          测试中传入内存库。未提供时使用当前应用上下文的 get_db() 连接（需要应用上下文，随上下文归还）。
+        - cache: 可选的结果缓存（utils/table_version_util.ResultCache）。提供时，标注了 @memoize 的
+          查询方法按参数缓存结果，相关表经 Repository 写入后自动失效；路由传入 app 级共享缓存。
+          缓存返回的是同一个对象，调用方不要修改。
         """
-        self.conn = conn or get_conn()
+        self.conn = conn if conn is not None else get_db()
+        self.cache = cache
         self.attendance_repo = AttendanceRecordRepository(self.conn)
         self.survey_repo = SurveyResponseRepository(self.conn)
         self.grade_repo = GradeRepository(self.conn)
@@ -30,17 +88,20 @@ class AnalysisServiceRepository:
     # ------------------------------------------------------------------
     # 功能：统计学生平均出勤率（所有学生）
     # ------------------------------------------------------------------
+    @memoize("attendance_records")
     def get_students_average_attendance(
         self,
         module_id: Optional[int] = None,
         include_inactive: bool = False,
-    ) -> List[Dict[str, Any]]:
+        columnar: bool = False,
+    ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
         """
         统计“所有学生”的平均出勤率（attendance_rate 的平均值）。
 
         参数：
         - module_id：可选，指定课程时只统计该课程的数据；不填则统计全部课程。
         - include_inactive：是否包含 is_active=0 的记录；默认 False 仅看活跃数据。
+        - columnar：True 时返回列式结构 {"columns": [...], "data": {列名: [值...]}}，直接由查询元组转置。
 
         返回：
         [
@@ -77,6 +138,8 @@ class AnalysisServiceRepository:
             )
             rows = cursor.fetchall()
 
+            if columnar:
+                return _columnar(("student_id", "average_attendance_rate"), rows)
             return [
                 {"student_id": row[0], "average_attendance_rate": row[1]}
                 for row in rows
@@ -87,6 +150,7 @@ class AnalysisServiceRepository:
     # ------------------------------------------------------------------
     # 功能：统计单个学生的平均出勤率
     # ------------------------------------------------------------------
+    @memoize("attendance_records")
     def get_student_average_attendance(
         self,
         student_id: int,
@@ -134,6 +198,7 @@ class AnalysisServiceRepository:
     # ------------------------------------------------------------------
     # 功能：展示学生压力变化曲线（按周列表）
     # ------------------------------------------------------------------
+    @memoize("survey_responses")
     def get_student_stress_trend(
         self,
         student_id: int,
@@ -188,11 +253,13 @@ class AnalysisServiceRepository:
     # ------------------------------------------------------------------
     # 功能：检测连续两周压力 >= threshold 的学生
     # ------------------------------------------------------------------
+    @memoize("survey_responses")
     def detect_consecutive_high_stress(
         self,
         threshold: int = 4,
         module_id: Optional[int] = None,
         include_inactive: bool = False,
+        engine: str = "python",
     ) -> List[Dict[str, Any]]:
         """
         检测“连续两周压力等级都 >= threshold”的情形，返回详细列表。
@@ -201,6 +268,9 @@ class AnalysisServiceRepository:
         - threshold：阈值，默认 4。
         - module_id：可选，只检测某门课；不填则按“学生 + 课程”组合分别检测。
         - include_inactive：是否包含 is_active=0 的问卷记录。
+        - engine："python"（默认，逐行扫描）或 "sql"（窗口函数在数据库内完成检测，只返回命中行）。
+          两者结果相同；benchmarks/bench_stress_detection.py 中 "sql" 反而更慢（约 0.65~0.85 倍），因此只作为可选项；
+          SQLite 版本过低不支持窗口函数时 "sql" 自动退回 "python"。
 
         返回（列表，每一条代表一次“连续两周高压”事件）：
         [
@@ -220,76 +290,124 @@ class AnalysisServiceRepository:
         2. 对相邻两条记录，若周次连续且两次压力都 >= threshold，则记为一次命中。
         3. module_id 不填时，依然按“学生 + 课程”组合分组，避免跨课程串联周次。
         """
-        try:
-            cursor = self.conn.cursor()
-
-            conditions = []
-            params: List[Any] = []
+        if engine not in DETECTION_ENGINES:
+            raise ValueError(f"engine must be one of {sorted(DETECTION_ENGINES)}")
+        if engine == "sql" and not WINDOW_FUNCTIONS_SUPPORTED:
+            engine = "python"  # SQLite < 3.25 没有窗口函数
 
-            if not include_inactive:
-                conditions.append("is_active = 1")
-
-            if module_id is not None:
-                conditions.append("module_id = ?")
-                params.append(module_id)
-
-            where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        try:
+            if engine == "sql":
+                return self._detect_consecutive_high_stress_sql(threshold, module_id, include_inactive)
+            return self._detect_consecutive_high_stress_python(threshold, module_id, include_inactive)
+        except Exception as e:
+            raise RuntimeError(
+                f"检测连续高压失败: {e}"
+            )
 
-            cursor.execute(
-                f"""
-                SELECT student_id, module_id, week_number, stress_level
+    def _detect_consecutive_high_stress_sql(
+        self,
+        threshold: int,
+        module_id: Optional[int],
+        include_inactive: bool,
+    ) -> List[Dict[str, Any]]:
+        """
+        SQL 引擎：在 SQLite 里用 LAG() 取同一 (student_id, module_id) 内按周次排序的“前一条”，
+        阈值与周次连续的判断也在 SQL 里完成，只有命中的行返回给 Python。
+        窗口内的排序键 (week_number, stress_level) 与 Python 引擎的 ORDER BY 一致，
+        同一周有多条问卷时两种引擎的结果也相同（两键都相同的行互换顺序不影响结果）；
+        is_active = 1 时窗口直接按 idx_survey_active_student_module_week 的顺序读取，不需要额外排序。
+        """
+        conditions = []
+        params: List[Any] = []
+        if not include_inactive:
+            conditions.append("is_active = 1")
+        if module_id is not None:
+            conditions.append("module_id = ?")
+            params.append(module_id)
+        where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.extend([threshold, threshold])
+
+        sql = f"""
+            SELECT student_id, module_id, week_start, week_next, stress_prev, stress_curr
+            FROM (
+                SELECT
+                    student_id,
+                    module_id,
+                    LAG(week_number) OVER w AS week_start,
+                    week_number AS week_next,
+                    LAG(stress_level) OVER w AS stress_prev,
+                    stress_level AS stress_curr
                 FROM survey_responses
-                {where_clause}
-                ORDER BY student_id ASC, module_id ASC, week_number ASC;
-                """,
-                params,
+                {where_sql}
+                WINDOW w AS (
+                    PARTITION BY student_id, module_id
+                    ORDER BY week_number, stress_level
+                )
             )
-            rows = cursor.fetchall()
-
-            results: List[Dict[str, Any]] = []
-
-            prev_student: Optional[int] = None
-            prev_module: Optional[int] = None
-            prev_week: Optional[int] = None
-            prev_stress: Optional[int] = None
-
-            for student_id_val, module_id_val, week_num, stress_val in rows:
-                # 当学生或课程发生变化时，重置“前一条”状态
-                if (student_id_val != prev_student) or (module_id_val != prev_module):
-                    prev_student = student_id_val
-                    prev_module = module_id_val
-                    prev_week = week_num
-                    prev_stress = stress_val
-                    continue
-
-                # 判断是否为连续周次且两周压力都 >= threshold
-                if (
-                    prev_week is not None
-                    and week_num == prev_week + 1
-                    and prev_stress is not None
-                    and prev_stress >= threshold
-                    and stress_val >= threshold
-                ):
-                    results.append(
-                        {
-                            "student_id": student_id_val,
-                            "module_id": module_id_val,
-                            "week_start": prev_week,
-                            "week_next": week_num,
-                            "stress_prev": prev_stress,
-                            "stress_curr": stress_val,
-                        }
-                    )
+            WHERE stress_curr >= ?
+              AND stress_prev >= ?
+              AND week_next = week_start + 1
+            ORDER BY student_id, module_id, week_next;
+        """
+        keys = ("student_id", "module_id", "week_start", "week_next", "stress_prev", "stress_curr")
+        return [dict(zip(keys, row)) for row in self.conn.execute(sql, params)]
 
-                # 更新“前一条”状态，继续扫描后续数据
+    def _detect_consecutive_high_stress_python(
+        self,
+        threshold: int,
+        module_id: Optional[int],
+        include_inactive: bool,
+    ) -> List[Dict[str, Any]]:
+        """Python 引擎：按顺序读出全部问卷，逐行比较相邻两条（SQLite 不支持窗口函数时的后备方案）。"""
+        # 按 (student_id, module_id, week_number) 顺序分批读取，只需要扫描一遍
+        filters = {} if module_id is None else {"module_id": module_id}
+        rows = self.survey_repo.iter_where(
+            columns=("student_id", "module_id", "week_number", "stress_level"),
+            order_by=["student_id", "module_id", "week_number", "stress_level"],
+            include_inactive=include_inactive,
+            **filters,
+        )
+
+        results: List[Dict[str, Any]] = []
+
+        prev_student: Optional[int] = None
+        prev_module: Optional[int] = None
+        prev_week: Optional[int] = None
+        prev_stress: Optional[int] = None
+
+        for student_id_val, module_id_val, week_num, stress_val in rows:
+            # 当学生或课程发生变化时，重置“前一条”状态
+            if (student_id_val != prev_student) or (module_id_val != prev_module):
+                prev_student = student_id_val
+                prev_module = module_id_val
                 prev_week = week_num
                 prev_stress = stress_val
+                continue
+
+            # 判断是否为连续周次且两周压力都 >= threshold
+            if (
+                prev_week is not None
+                and week_num == prev_week + 1
+                and prev_stress is not None
+                and prev_stress >= threshold
+                and stress_val >= threshold
+            ):
+                results.append(
+                    {
+                        "student_id": student_id_val,
+                        "module_id": module_id_val,
+                        "week_start": prev_week,
+                        "week_next": week_num,
+                        "stress_prev": prev_stress,
+                        "stress_curr": stress_val,
+                    }
+                )
 
-            return results
-        except Exception as e:
-            raise RuntimeError(
-                f"检测连续高压失败: {e}"
-            )
+            # 更新“前一条”状态，继续扫描后续数据
+            prev_week = week_num
+            prev_stress = stress_val
+
+        return results
 
     # ------------------------------------------------------------------
     # 功能：自动创建预警记录（基于连续两周高压）
@@ -300,6 +418,8 @@ class AnalysisServiceRepository:
         module_id: Optional[int] = None,
         include_inactive: bool = False,
         clear_old: bool = True,
+        incremental: bool = False,
+        rules: Optional[Sequence[StreakRule]] = None,
     ) -> List[Dict[str, Any]]:
         """
         自动生成压力预警（写入 alerts 表）。
@@ -311,6 +431,11 @@ class AnalysisServiceRepository:
         - module_id：可选，仅对某门课生成；不填则对所有课程分别处理。
         - include_inactive：是否包含 is_active=0 的问卷。
         - clear_old：生成前是否清空旧预警（默认 True，防止重复）。
+        - incremental：增量模式（见 app/analysis/incremental_alerts.py）。只处理上次运行后新增 / 修改的问卷，
+          只插入、更新或逻辑删除受影响的 alerts，不清空旧预警、保留 resolved；此时忽略 clear_old，
+          返回的每条记录额外带 alert_id 与 action（inserted / updated / retired）。
+        - rules：可选，自定义规则列表（见 detect_streaks）。提供时 threshold 不再使用，
+          每个 (student_id, module_id, 规则) 生成一条最近命中的预警，返回记录额外带 rule；暂不支持与 incremental 同用。
 
         返回：已插入的预警记录列表（字典），示例：
         [
@@ -324,25 +449,68 @@ class AnalysisServiceRepository:
         3) 视 clear_old 决定是否先删旧 alerts（全表或按 module_id）。
         4) 插入新的预警记录并返回结果。
         """
+        if incremental and rules:
+            raise ValueError("incremental mode only supports the default consecutive-weeks rule")
+        if incremental:
+            try:
+                return IncrementalAlertEngine(self.conn).run(
+                    threshold=threshold,
+                    module_id=module_id,
+                    include_inactive=include_inactive,
+                )
+            except Exception as e:
+                raise RuntimeError(f"创建预警记录失败: {e}")
+
         try:
             cursor = self.conn.cursor()
 
-            # 步骤 1：先找出所有命中的连续高压事件
-            events = self.detect_consecutive_high_stress(
-                threshold=threshold,
-                module_id=module_id,
-                include_inactive=include_inactive,
-            )
+            if rules:
+                # 步骤 1+2（自定义规则）：一遍扫描同时评估所有规则，每个 (学生, 课程, 规则) 取最近一次命中
+                latest = [
+                    {
+                        "student_id": evt["student_id"],
+                        "module_id": evt["module_id"],
+                        "week_number": evt["week_end"],
+                        "reason": evt["reason"],
+                        "rule": evt["rule"],
+                    }
+                    for evt in self.detect_streaks(
+                        rules,
+                        module_id=module_id,
+                        include_inactive=include_inactive,
+                        latest_only=True,
+                    )
+                ]
+            else:
+                # 步骤 1：先找出所有命中的连续高压事件
+                events = self.detect_consecutive_high_stress(
+                    threshold=threshold,
+                    module_id=module_id,
+                    include_inactive=include_inactive,
+                )
 
-            # 步骤 2：对每个 (student_id, module_id) 只保留“最新”的一条（week_next 最大）
-            latest_by_key: Dict[tuple, Dict[str, Any]] = {}
-            for evt in events:
-                key = (evt["student_id"], evt["module_id"])
-                if key not in latest_by_key or evt["week_next"] > latest_by_key[key]["week_next"]:
-                    latest_by_key[key] = evt
+                # 步骤 2：对每个 (student_id, module_id) 只保留“最新”的一条（week_next 最大）
+                latest_by_key: Dict[tuple, Dict[str, Any]] = {}
+                for evt in events:
+                    key = (evt["student_id"], evt["module_id"])
+                    if key not in latest_by_key or evt["week_next"] > latest_by_key[key]["week_next"]:
+                        latest_by_key[key] = evt
+                latest = [
+                    {
+                        "student_id": evt["student_id"],
+                        "module_id": evt["module_id"],
+                        "week_number": evt["week_next"],  # 记录“第二周”的周次，便于定位最新
+                        "reason": (
+                            f"Stress >= {threshold} in consecutive weeks "
+                            f"{evt['week_start']} and {evt['week_next']} "
+                            f"(module_id={evt['module_id']})."
+                        ),
+                    }
+                    for evt in latest_by_key.values()
+                ]
 
             # 如果没有命中，直接返回空列表
-            if not latest_by_key:
+            if not latest:
                 return []
 
             # 步骤 3：根据 clear_old 决定是否清空旧 alerts
@@ -351,64 +519,189 @@ class AnalysisServiceRepository:
                     cursor.execute("DELETE FROM alerts;")
                 else:
                     cursor.execute("DELETE FROM alerts WHERE module_id = ?;", (module_id,))
+                # 增量模式的状态记录着刚删除的 alert，一并丢弃，下次增量运行重新扫描并接管新的 alert
+                reset_incremental_state(cursor)
 
             # 步骤 4：插入新预警
             now_ts = datetime.now().isoformat(timespec="seconds")
-            to_insert = []
-            for evt in latest_by_key.values():
-                reason = (
-                    f"Stress >= {threshold} in consecutive weeks "
-                    f"{evt['week_start']} and {evt['week_next']} "
-                    f"(module_id={evt['module_id']})."
-                )
-                to_insert.append(
-                    (
-                        evt["student_id"],
-                        evt["module_id"],
-                        evt["week_next"],  # 记录“第二周”的周次，便于定位最新
-                        reason,
-                        now_ts,
-                        0,  # resolved
-                        1,  # is_active
-                    )
-                )
-
             cursor.executemany(
                 """
                 INSERT INTO alerts (student_id, module_id, week_number, reason, created_at, resolved, is_active)
-                VALUES (?, ?, ?, ?, ?, ?, ?);
+                VALUES (?, ?, ?, ?, ?, 0, 1);
                 """,
-                to_insert,
+                [
+                    (item["student_id"], item["module_id"], item["week_number"], item["reason"], now_ts)
+                    for item in latest
+                ],
             )
             self.conn.commit()
+            notify_write(self.conn, "alerts")
 
             # 返回易用的字典列表
-            results = []
-            for idx, evt in enumerate(latest_by_key.values()):
-                results.append(
+            for item in latest:
+                item["resolved"] = 0
+                item["created_at"] = now_ts
+            return latest
+        except Exception as e:
+            raise RuntimeError(f"创建预警记录失败: {e}")
+
+    # ------------------------------------------------------------------
+    # 功能：多规则的连续 / 滑动窗口压力检测（一遍扫描）
+    # ------------------------------------------------------------------
+    @memoize("survey_responses")
+    def detect_streaks(
+        self,
+        rules: Sequence[StreakRule],
+        module_id: Optional[int] = None,
+        include_inactive: bool = False,
+        latest_only: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        按 (student_id, module_id, week_number) 顺序扫描一遍问卷，同时评估多条规则（见 app/analysis/streaks.py）。
+
+        参数：
+        - rules：规则对象列表，例如 [ConsecutiveRule(3, 4), WindowCountRule(3, 4, 4), RisingRule(3)]。
+        - module_id / include_inactive：同 detect_consecutive_high_stress。
+        - latest_only：每个 (student_id, module_id, 规则) 只返回最近一次命中。
+
+        返回示例：
+        [
+            {"rule": "consecutive:3:4", "student_id": 1, "module_id": 101, "week_start": 2, "week_end": 4,
+             "stress_levels": [4, 5, 5], "reason": "..."},
+            ...
+        ]
+        """
+        engine = StreakEngine(rules)
+        try:
+            filters = {} if module_id is None else {"module_id": module_id}
+            rows = self.survey_repo.iter_where(
+                columns=("student_id", "module_id", "week_number", "stress_level"),
+                order_by=["student_id", "module_id", "week_number", "stress_level"],
+                include_inactive=include_inactive,
+                **filters,
+            )
+            return engine.latest(rows) if latest_only else list(engine.scan(rows))
+        except Exception as e:
+            raise RuntimeError(f"规则检测失败: {e}")
+
+    # ------------------------------------------------------------------
+    # 功能：阈值扫描（一次扫描得到每个阈值 / 连续周数下的命中数量）
+    # ------------------------------------------------------------------
+    @memoize("survey_responses")
+    def sweep_high_stress_thresholds(
+        self,
+        min_threshold: int = 1,
+        max_threshold: int = 5,
+        max_weeks: int = 4,
+        module_id: Optional[int] = None,
+        include_inactive: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        阈值校准：对 threshold ∈ [min_threshold, max_threshold]、连续周数 weeks ∈ [2, max_weeks] 的每个组合，
+        统计“至少连续 weeks 周 stress_level >= threshold”会命中多少学生、多少 (student_id, module_id) 组合。
+        weeks = 2 的结果与 detect_consecutive_high_stress(threshold) 命中的学生 / 组合数一致。
+
+        返回示例（按 threshold、weeks 升序）：
+        [
+            {"threshold": 4, "weeks": 2, "flagged_students": 12, "flagged_pairs": 15},
+            ...
+        ]
+
+        实现：按 (student_id, module_id, week_number) 顺序只扫描一遍问卷。
+        对每个阈值维护“当前连续段长度”，每个组合结束时记下各阈值的最长连续段（封顶 max_weeks），
+        每个学生取其所有课程中的最大值；最后对直方图做后缀和，得到“最长连续段 >= weeks”的数量。
+        """
+        validate_sweep_params(min_threshold, max_threshold, max_weeks)
+
+        levels = list(range(min_threshold, max_threshold + 1))
+        n = len(levels)
+        # hist[i][L]：阈值 levels[i] 下最长连续段（封顶 max_weeks）为 L 的组合 / 学生数量
+        pair_hist = [[0] * (max_weeks + 1) for _ in levels]
+        student_hist = [[0] * (max_weeks + 1) for _ in levels]
+
+        try:
+            filters = {} if module_id is None else {"module_id": module_id}
+            rows = self.survey_repo.iter_where(
+                columns=("student_id", "module_id", "week_number", "stress_level"),
+                order_by=["student_id", "module_id", "week_number", "stress_level"],
+                include_inactive=include_inactive,
+                **filters,
+            )
+
+            prev_student: Any = object()
+            prev_pair: Any = None
+            prev_week: Optional[int] = None
+            runs = [0] * n
+            pair_best = [0] * n
+            student_best = [0] * n
+
+            for student_id_val, module_id_val, week_num, stress_val in rows:
+                pair = (student_id_val, module_id_val)
+                if pair != prev_pair:
+                    if prev_pair is not None:
+                        for i in range(n):
+                            pair_hist[i][pair_best[i]] += 1
+                    if student_id_val != prev_student:
+                        if prev_pair is not None:
+                            for i in range(n):
+                                student_hist[i][student_best[i]] += 1
+                        student_best = [0] * n
+                        prev_student = student_id_val
+                    prev_pair = pair
+                    prev_week = None
+                    pair_best = [0] * n
+
+                contiguous = prev_week is not None and week_num == prev_week + 1
+                prev_week = week_num
+                for i, level in enumerate(levels):
+                    if stress_val >= level:
+                        run = runs[i] + 1 if contiguous else 1
+                        runs[i] = run
+                        if run > pair_best[i] and pair_best[i] < max_weeks:
+                            pair_best[i] = min(run, max_weeks)
+                            if pair_best[i] > student_best[i]:
+                                student_best[i] = pair_best[i]
+                    else:
+                        runs[i] = 0
+
+            if prev_pair is not None:
+                for i in range(n):
+                    pair_hist[i][pair_best[i]] += 1
+                    student_hist[i][student_best[i]] += 1
+        except Exception as e:
+            raise RuntimeError(f"阈值扫描失败: {e}")
+
+        results: List[Dict[str, Any]] = []
+        for i, level in enumerate(levels):
+            pairs_at_least = students_at_least = 0
+            rows_for_level = []
+            # 后缀和：最长连续段 >= weeks 的数量
+            for weeks in range(max_weeks, 1, -1):
+                pairs_at_least += pair_hist[i][weeks]
+                students_at_least += student_hist[i][weeks]
+                rows_for_level.append(
                     {
-                        "student_id": evt["student_id"],
-                        "module_id": evt["module_id"],
-                        "week_number": evt["week_next"],
-                        "reason": to_insert[idx][3],
-                        "resolved": 0,
-                        "created_at": now_ts,
+                        "threshold": level,
+                        "weeks": weeks,
+                        "flagged_students": students_at_least,
+                        "flagged_pairs": pairs_at_least,
                     }
                 )
-            return results
-        except Exception as e:
-            raise RuntimeError(f"创建预警记录失败: {e}")
+            results.extend(reversed(rows_for_level))
+        return results
 
     # ------------------------------------------------------------------
     # 功能：对比不同模块的压力与成绩关系
     # ------------------------------------------------------------------
+    @memoize("survey_responses", "grades")
     def compare_stress_grade_by_module(
         self,
         module_ids: Optional[List[int]] = None,
         include_inactive: bool = False,
+        include_spearman: bool = False,
     ) -> List[Dict[str, Any]]:
         """
-        对比不同模块学生群体的压力与成绩关系，返回均值与简单皮尔逊相关系数。
+        对比不同模块学生群体的压力与成绩关系，返回均值、皮尔逊相关系数与线性回归（grade = slope * stress + intercept）。
 
         返回示例：
         [
@@ -418,179 +711,594 @@ class AnalysisServiceRepository:
                 "average_grade": 75.5,
                 "sample_size": 5,          # 联合记录条数（student+module 交集）
                 "pearson_corr": 0.42,      # n>=2 时给出相关系数，否则 None
+                "slope": -2.1,             # 压力每升 1 级，成绩的平均变化；n<2 或压力无变化时为 None
+                "intercept": 82.0,
+                "spearman_corr": 0.40,     # 仅 include_spearman=True 时返回（秩相关，并列取平均秩）
             },
             ...
         ]
+
+        统计量由 app/analysis/statistics.py 的 CoMoments 逐行累积（数值稳定，不保存原始数据）。
         """
         try:
-            cursor = self.conn.cursor()
-
-            conditions: List[str] = []
-            params: List[Any] = []
-
-            if not include_inactive:
-                conditions.append("sr.is_active = 1")
-                conditions.append("g.is_active = 1")
-
-            if module_ids:
-                placeholders = ",".join(["?"] * len(module_ids))
-                conditions.append(f"sr.module_id IN ({placeholders})")
-                params.extend(module_ids)
-
-            where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
-
-            cursor.execute(
+            join_sql, params = self._stress_grade_join(module_ids, include_inactive)
+            cursor = self.conn.execute(
                 f"""
-                SELECT sr.module_id,
-                       COUNT(*) AS n,
-                       AVG(sr.stress_level) AS avg_stress,
-                       AVG(g.grade) AS avg_grade,
-                       SUM(sr.stress_level * 1.0 * g.grade) AS sum_xy,
-                       SUM(sr.stress_level * 1.0 * sr.stress_level) AS sum_x2,
-                       SUM(g.grade * 1.0 * g.grade) AS sum_y2
-                  FROM survey_responses sr
-                  INNER JOIN grades g
-                    ON sr.student_id = g.student_id
-                   AND sr.module_id = g.module_id
-                {where_clause}
-                 GROUP BY sr.module_id
+                SELECT sr.module_id, sr.stress_level, g.grade
+                {join_sql}
                  ORDER BY sr.module_id ASC;
                 """,
                 params,
             )
-            rows = cursor.fetchall()
+            groups = grouped_comoments(cursor)
 
-            return [
-                self._build_corr_row(row) for row in rows
-            ]
+            spearman: Dict[Any, Optional[float]] = {}
+            if include_spearman and groups:
+                spearman = self._spearman_by_module(join_sql, params)
+
+            results = []
+            for module_id, acc in groups.items():
+                row = self._build_corr_row(module_id, acc)
+                if include_spearman:
+                    row["spearman_corr"] = spearman.get(module_id)
+                results.append(row)
+            return results
         except Exception as e:
             raise RuntimeError(f"对比压力与成绩失败: {e}")
 
     @staticmethod
-    def _build_corr_row(row: tuple) -> Dict[str, Any]:
-        module_id, n, avg_stress, avg_grade, sum_xy, sum_x2, sum_y2 = row
-        if n is None or n < 2:
-            corr = None
-        else:
-            # 皮尔逊相关系数公式： (sum_xy - n*mx*my) / sqrt((sum_x2 - n*mx^2)*(sum_y2 - n*my^2))
-            numerator = sum_xy - n * avg_stress * avg_grade
-            denom_left = sum_x2 - n * (avg_stress ** 2)
-            denom_right = sum_y2 - n * (avg_grade ** 2)
-            denominator = (denom_left * denom_right) ** 0.5
-            corr = None if denominator == 0 else numerator / denominator
+    def _stress_grade_join(module_ids: Optional[List[int]], include_inactive: bool) -> Tuple[str, List[Any]]:
+        """survey_responses ⋈ grades（同一学生 + 课程）的 FROM / WHERE 部分；成绩为 NULL 的记录不参与统计。"""
+        conditions: List[str] = ["g.grade IS NOT NULL"]
+        params: List[Any] = []
+
+        if not include_inactive:
+            conditions.append("sr.is_active = 1")
+            conditions.append("g.is_active = 1")
+
+        if module_ids:
+            placeholders = ",".join(["?"] * len(module_ids))
+            conditions.append(f"sr.module_id IN ({placeholders})")
+            params.extend(module_ids)
+
+        where_clause = f"WHERE {' AND '.join(conditions)}"
+        join_sql = f"""
+                  FROM survey_responses sr
+                  INNER JOIN grades g
+                    ON sr.student_id = g.student_id
+                   AND sr.module_id = g.module_id
+                {where_clause}"""
+        return join_sql, params
 
+    def _spearman_by_module(self, join_sql: str, params: List[Any]) -> Dict[Any, Optional[float]]:
+        """
+        在 SQL 里按课程算平均秩：RANK() + (并列个数 - 1) / 2，再逐行送进 CoMoments 求秩的皮尔逊相关。
+        需要窗口函数（SQLite 3.25+），不支持时返回空字典（spearman_corr 为 None）。
+        """
+        if not WINDOW_FUNCTIONS_SUPPORTED:
+            return {}
+        cursor = self.conn.execute(
+            f"""
+            SELECT module_id,
+                   RANK() OVER (PARTITION BY module_id ORDER BY x)
+                       + (COUNT(*) OVER (PARTITION BY module_id, x) - 1) / 2.0,
+                   RANK() OVER (PARTITION BY module_id ORDER BY y)
+                       + (COUNT(*) OVER (PARTITION BY module_id, y) - 1) / 2.0
+              FROM (
+                SELECT sr.module_id AS module_id, sr.stress_level AS x, g.grade AS y
+                {join_sql}
+              );
+            """,
+            params,
+        )
+        return {module_id: acc.pearson() for module_id, acc in grouped_comoments(cursor).items()}
+
+    @staticmethod
+    def _build_corr_row(module_id: Any, acc: CoMoments) -> Dict[str, Any]:
+        summary = acc.summary()
         return {
             "module_id": module_id,
-            "average_stress_level": avg_stress,
-            "average_grade": avg_grade,
-            "sample_size": n,
-            "pearson_corr": corr,
+            "average_stress_level": summary["mean_x"],
+            "average_grade": summary["mean_y"],
+            "sample_size": summary["n"],
+            "pearson_corr": summary["pearson_corr"],
+            "slope": summary["slope"],
+            "intercept": summary["intercept"],
         }
 
     # ------------------------------------------------------------------
     # 功能：成绩分布（柱状图/饼图）
     # ------------------------------------------------------------------
+    @memoize("grades")
     def get_grade_distribution(
         self,
         module_id: Optional[int] = None,
         include_inactive: bool = False,
         bins: Optional[List[tuple]] = None,
+        edges: Optional[Sequence[float]] = None,
+        equal_width: Optional[int] = None,
+        quantiles: Optional[int] = None,
+        by_module: bool = False,
     ) -> List[Dict[str, Any]]:
         """
         Count grade buckets. Default bins: 0-60, 60-70, 70-80, 80-90, 90-100.
-        Returns: [{"label": "80-90", "count": 5}, ...]
+        Returns: [{"label": "80-90", "low": 80, "high": 90, "count": 5}, ...]
+
+        分桶方式（最多指定一种）：
+        - bins：[(low, high), ...]，左闭右开，按顺序取第一个匹配的桶（与默认分桶相同）
+        - edges：升序边界 [e0, e1, ..., en]，得到 n 个相邻的桶，最后一个桶包含 en
+        - equal_width：n 个等宽桶，范围为筛选后成绩的 [最小值, 最大值]
+        - quantiles：n 个等频桶，边界取排序后成绩的分位点（重复的边界会合并）
+        by_module=True 时按课程分别统计：[{"module_id": 101, "bins": [...]}, ...]
+
+        统计在 SQLite 中完成（CASE 分桶 + 每桶一个 SUM），Python 只接收每个桶的计数，内存与成绩条数无关。
         """
-        bins = bins or [(0, 60), (60, 70), (70, 80), (80, 90), (90, 101)]
+        validate_grade_bins(bins, edges, equal_width, quantiles)
+
         try:
-            cursor = self.conn.cursor()
             conditions: List[str] = []
             params: List[Any] = []
-
             if not include_inactive:
                 conditions.append("is_active = 1")
-
             if module_id is not None:
                 conditions.append("module_id = ?")
                 params.append(module_id)
-
             where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
-            cursor.execute(
+
+            # 统一成 (low, high, 是否包含 high) 的列表
+            if edges is not None:
+                buckets = self._buckets_from_edges(list(edges))
+            elif equal_width is not None:
+                buckets = self._equal_width_buckets(where_clause, params, equal_width)
+            elif quantiles is not None:
+                buckets = self._quantile_buckets(where_clause, params, quantiles)
+            else:
+                buckets = [(low, high, False) for low, high in (bins or DEFAULT_GRADE_BINS)]
+
+            if not buckets:
+                return []
+
+            case_parts = []
+            case_params: List[Any] = []
+            for idx, (low, high, closed) in enumerate(buckets):
+                case_parts.append(f"WHEN grade >= ? AND grade {'<=' if closed else '<'} ? THEN {idx}")
+                case_params.extend([low, high])
+            bucket_sql = f"CASE {' '.join(case_parts)} END"
+            # 每个桶一列 SUM(bucket = i)：整张表只聚合成一行（by_module 时每门课一行），
+            # 不需要按计算出的 bucket 做 GROUP BY 排序；by_module 时按 (module_id, grade) 索引顺序分组
+            sums_sql = ", ".join(f"IFNULL(SUM(bucket = {idx}), 0)" for idx in range(len(buckets)))
+            module_sql = "module_id" if by_module else "NULL"
+            group_sql = "GROUP BY module_id ORDER BY module_id" if by_module else ""
+
+            rows = self.conn.execute(
                 f"""
-                SELECT grade
-                  FROM grades
-                {where_clause};
+                SELECT {module_sql}, {sums_sql}
+                FROM (
+                    SELECT module_id, {bucket_sql} AS bucket
+                    FROM grades
+                    {where_clause}
+                )
+                {group_sql};
                 """,
-                params,
+                case_params + params,
             )
-            grades = [row[0] for row in cursor.fetchall()]
-
-            results = []
-            for low, high in bins:
-                label = f"{int(low)}-{int(high) if high != 101 else 100}"
-                results.append({"label": label, "count": 0})
-
-            for g in grades:
-                for idx, (low, high) in enumerate(bins):
-                    if low <= g < high:
-                        results[idx]["count"] += 1
-                        break
-            return results
+            counts = {row[0]: list(row[1:]) for row in rows}
+
+            if by_module:
+                return [
+                    {"module_id": module_val, "bins": self._render_buckets(buckets, c)}
+                    for module_val, c in counts.items()
+                ]
+            return self._render_buckets(buckets, counts.get(None, [0] * len(buckets)))
         except Exception as e:
             raise RuntimeError(f"Failed to build grade distribution: {e}")
 
+    @classmethod
+    def _render_buckets(cls, buckets: List[tuple], bucket_counts: List[int]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "label": f"{cls._format_edge(low)}-{cls._format_edge(100 if high == 101 else high)}",
+                "low": low,
+                "high": high,
+                "count": bucket_counts[idx],
+            }
+            for idx, (low, high, _) in enumerate(buckets)
+        ]
+
+    @staticmethod
+    def _format_edge(value: float) -> str:
+        return str(int(value)) if float(value).is_integer() else f"{value:.2f}".rstrip("0")
+
+    @staticmethod
+    def _buckets_from_edges(edges: List[float]) -> List[tuple]:
+        """相邻边界组成桶；去掉宽度为 0 的桶，最后一个桶包含上边界。"""
+        unique = [e for i, e in enumerate(edges) if i == 0 or e != edges[i - 1]]
+        if len(unique) == 1:
+            return [(unique[0], unique[0], True)]
+        return [(low, high, i == len(unique) - 2) for i, (low, high) in enumerate(zip(unique, unique[1:]))]
+
+    def _equal_width_buckets(self, where_clause: str, params: List[Any], count: int) -> List[tuple]:
+        low, high = self.conn.execute(f"SELECT MIN(grade), MAX(grade) FROM grades {where_clause};", params).fetchone()
+        if low is None:
+            return []
+        width = (high - low) / count
+        return self._buckets_from_edges([low + width * i for i in range(count)] + [high])
+
+    def _quantile_buckets(self, where_clause: str, params: List[Any], count: int) -> List[tuple]:
+        """分位点用 ORDER BY grade LIMIT 1 OFFSET k 逐个取出（有成绩索引时是索引上的跳跃扫描）。"""
+        total = self.conn.execute(f"SELECT COUNT(*) FROM grades {where_clause};", params).fetchone()[0]
+        if total == 0:
+            return []
+        offsets = [min(total - 1, (total * i) // count) for i in range(count)] + [total - 1]
+        edges = [
+            self.conn.execute(
+                f"SELECT grade FROM grades {where_clause} ORDER BY grade LIMIT 1 OFFSET ?;",
+                params + [offset],
+            ).fetchone()[0]
+            for offset in offsets
+        ]
+        return self._buckets_from_edges(edges)
+
     # ------------------------------------------------------------------
     # 功能：显示应力等级下的散点图
     # ------------------------------------------------------------------
+    @memoize("survey_responses", "grades")
     def get_stress_grade_pairs(
         self,
         module_id: Optional[int] = None,
         include_inactive: bool = False,
-    ) -> List[Dict[str, Any]]:
+        columnar: bool = False,
+    ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
         """
         Join survey_responses and grades on student_id+module_id and return raw points.
         Each row: student_id, module_id, week_number, stress_level, grade.
+        columnar=True returns {"columns": [...], "data": {column: [values...]}} built
+        straight from the cursor tuples (no per-point dicts).
         """
         try:
             cursor = self.conn.cursor()
-            conditions: List[str] = []
-            params: List[Any] = []
+            cursor.execute(*self._stress_grade_pairs_query(module_id, include_inactive))
+            rows = cursor.fetchall()
+            if columnar:
+                return _columnar(STRESS_GRADE_PAIR_COLUMNS, rows)
+            return [self._stress_grade_pair(row) for row in rows]
+        except Exception as e:
+            raise RuntimeError(f"Failed to fetch stress-grade pairs: {e}")
 
-            if not include_inactive:
-                conditions.append("sr.is_active = 1")
-                conditions.append("g.is_active = 1")
+    def iter_stress_grade_pairs(
+        self,
+        module_id: Optional[int] = None,
+        include_inactive: bool = False,
+        batch_size: int = 1000,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming variant of get_stress_grade_pairs: same rows and order, read with
+        fetchmany(batch_size) so only one batch is held in memory at a time.
+        """
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(*self._stress_grade_pairs_query(module_id, include_inactive))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._stress_grade_pair(row)
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Failed to fetch stress-grade pairs: {e}")
 
-            if module_id is not None:
-                conditions.append("sr.module_id = ?")
-                params.append(module_id)
+    @memoize("survey_responses", "grades")
+    def get_stress_grade_summary(
+        self,
+        mode: str,
+        module_id: Optional[int] = None,
+        include_inactive: bool = False,
+        grade_bin: float = 10,
+        max_points: int = 1000,
+        seed: int = DEFAULT_SAMPLE_SEED,
+    ) -> List[Dict[str, Any]]:
+        """
+        压力-成绩散点的服务端降采样（每种模式都只扫描一遍联接结果）：
 
-            where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        - "grid"：二维计数网格（stress_level × 成绩分桶，桶宽 grade_bin），在 SQL 中 GROUP BY
+            [{"stress_level": 4, "grade_low": 70, "grade_high": 80, "count": 12}, ...]
+        - "student_mean"：每个学生一个点（该学生所有联接记录的平均压力 / 平均成绩）
+            [{"student_id": 1, "stress_level": 3.4, "grade": 71.2, "count": 18}, ...]
+        - "sample"：按 stress_level 分层的随机样本，最多 max_points 个点，字段与原始点相同
+          （每层各维护一个容量 max_points 的蓄水池，扫描结束后按各层行数比例分配名额；
+          seed 默认为 DEFAULT_SAMPLE_SEED，同样的参数与数据总是得到同一个样本）
 
-            cursor.execute(
-                f"""
-                SELECT sr.student_id,
-                       sr.module_id,
-                       sr.week_number,
-                       sr.stress_level,
-                       g.grade
-                  FROM survey_responses sr
-                  INNER JOIN grades g
-                    ON sr.student_id = g.student_id
-                   AND sr.module_id = g.module_id
-                {where_clause}
-                 ORDER BY sr.student_id ASC, sr.module_id ASC, sr.week_number ASC;
-                """,
-                params,
+        grid / student_mean 使用 _stress_grade_join，成绩为 NULL 的记录不计入。
+        """
+        if mode not in STRESS_GRADE_MODES:
+            raise ValueError(f"mode must be one of {sorted(STRESS_GRADE_MODES)}")
+        if grade_bin <= 0:
+            raise ValueError("grade_bin must be > 0")
+        if max_points < 1:
+            raise ValueError("max_points must be >= 1")
+
+        join_sql, params = self._stress_grade_join([module_id] if module_id is not None else None, include_inactive)
+        try:
+            if mode == "grid":
+                rows = self.conn.execute(
+                    f"""
+                    SELECT sr.stress_level, CAST(g.grade / ? AS INTEGER) AS grade_bucket, COUNT(*)
+                    {join_sql}
+                     GROUP BY sr.stress_level, grade_bucket
+                     ORDER BY sr.stress_level, grade_bucket;
+                    """,
+                    [grade_bin] + params,
+                )
+                return [
+                    {
+                        "stress_level": stress,
+                        "grade_low": bucket * grade_bin,
+                        "grade_high": (bucket + 1) * grade_bin,
+                        "count": count,
+                    }
+                    for stress, bucket, count in rows
+                ]
+
+            if mode == "student_mean":
+                rows = self.conn.execute(
+                    f"""
+                    SELECT sr.student_id, AVG(sr.stress_level), AVG(g.grade), COUNT(*)
+                    {join_sql}
+                     GROUP BY sr.student_id
+                     ORDER BY sr.student_id;
+                    """,
+                    params,
+                )
+                return [
+                    {"student_id": student_id, "stress_level": stress, "grade": grade, "count": count}
+                    for student_id, stress, grade, count in rows
+                ]
+
+            return self._stratified_sample(
+                self.conn.execute(*self._stress_grade_pairs_query(module_id, include_inactive)),
+                max_points,
+                random.Random(seed),
             )
-            rows = cursor.fetchall()
-            return [
-                {
-                    "student_id": row[0],
-                    "module_id": row[1],
-                    "week_number": row[2],
-                    "stress_level": row[3],
-                    "grade": row[4],
-                }
-                for row in rows
+        except Exception as e:
+            raise RuntimeError(f"Failed to summarise stress-grade pairs: {e}")
+
+    def _stratified_sample(self, cursor, max_points: int, rng: random.Random) -> List[Dict[str, Any]]:
+        # 每层（stress_level）一个蓄水池（Algorithm R），内存上限为 层数 × max_points
+        reservoirs: Dict[Any, List[Tuple[int, tuple]]] = {}
+        seen: Dict[Any, int] = {}
+        for index, row in enumerate(cursor):
+            stratum = row[3]
+            n = seen.get(stratum, 0) + 1
+            seen[stratum] = n
+            reservoir = reservoirs.setdefault(stratum, [])
+            if n <= max_points:
+                reservoir.append((index, row))
+            else:
+                slot = rng.randrange(n)
+                if slot < max_points:
+                    reservoir[slot] = (index, row)
+
+        # 按各层行数比例分配名额（最大余数法），每层不超过其蓄水池大小
+        total = sum(seen.values())
+        if total <= max_points:
+            quotas = {stratum: len(r) for stratum, r in reservoirs.items()}
+        else:
+            exact = {stratum: max_points * n / total for stratum, n in seen.items()}
+            quotas = {stratum: int(value) for stratum, value in exact.items()}
+            leftover = max_points - sum(quotas.values())
+            for stratum in sorted(exact, key=lambda k: exact[k] - quotas[k], reverse=True)[:leftover]:
+                quotas[stratum] += 1
+
+        picked = []
+        for stratum, reservoir in reservoirs.items():
+            picked.extend(rng.sample(reservoir, min(quotas[stratum], len(reservoir))))
+        picked.sort()  # 恢复原始顺序（student_id, module_id, week_number）
+        return [self._stress_grade_pair(row) for _, row in picked]
+
+    @staticmethod
+    def _stress_grade_pairs_query(
+        module_id: Optional[int],
+        include_inactive: bool,
+    ) -> Tuple[str, List[Any]]:
+        conditions: List[str] = []
+        params: List[Any] = []
+
+        if not include_inactive:
+            conditions.append("sr.is_active = 1")
+            conditions.append("g.is_active = 1")
+
+        if module_id is not None:
+            conditions.append("sr.module_id = ?")
+            params.append(module_id)
+
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        sql = f"""
+            SELECT sr.student_id,
+                   sr.module_id,
+                   sr.week_number,
+                   sr.stress_level,
+                   g.grade
+              FROM survey_responses sr
+              INNER JOIN grades g
+                ON sr.student_id = g.student_id
+               AND sr.module_id = g.module_id
+            {where_clause}
+             ORDER BY sr.student_id ASC, sr.module_id ASC, sr.week_number ASC;
+            """
+        return sql, params
+
+    @staticmethod
+    def _stress_grade_pair(row) -> Dict[str, Any]:
+        return {
+            "student_id": row[0],
+            "module_id": row[1],
+            "week_number": row[2],
+            "stress_level": row[3],
+            "grade": row[4],
+        }
+
+    # ------------------------------------------------------------------
+    # 功能：仪表盘汇总（KPI 卡片与图表所需的全部数据）
+    # ------------------------------------------------------------------
+    @memoize("students", "modules", "attendance_records", "submission_records", "survey_responses", "alerts")
+    def get_dashboard_summary(
+        self,
+        at_risk_threshold: int = 4,
+        at_risk_limit: int = 20,
+        upcoming_limit: int = 6,
+        recent_limit: int = 4,
+    ) -> Dict[str, Any]:
+        """
+        仪表盘首页的汇总数据（只统计 is_active = 1 的记录），代替前端下载五张表后自行计算：
+
+        {
+            "student_count": 50, "module_count": 6,
+            "average_attendance": 78,            # 每条出勤记录 attended/total 的百分比（0-100 取整）的平均值
+            "average_stress": 3.1,
+            "submissions": {"submitted": 120, "late": 18, "late_rate": 15, "on_time_rate": 85},
+            "stress_by_week": [{"week_number": 1, "average_stress": 2.9, "responses": 48}, ...],
+            "open_alerts": 7,
+            "open_alerts_by_module": [{"module_id": 1, "open_alerts": 3}, ...],
+            "at_risk_count": 9,                  # 有 stress >= at_risk_threshold 的问卷或未解决预警的学生
+            "at_risk_students": [{"id": 1, "full_name": "...", "course_name": "...", "year_of_study": 2}, ...],
+            "upcoming_submissions": [...],       # 未提交、截止日期最早的 upcoming_limit 条
+            "recent_surveys": [...],             # 最新的 recent_limit 条问卷
+        }
+
+        每部分都是一条聚合 SQL，返回的数据量与学生人数无关（列表部分都有上限）；
+        路由层叠加结果缓存与 ETag，数据未变化时重复请求不再访问数据库。
+        """
+        if min(at_risk_limit, upcoming_limit, recent_limit) < 0:
+            raise ValueError("limits must be >= 0")
+        try:
+            conn = self.conn
+            student_count, module_count = conn.execute(
+                """
+                SELECT (SELECT COUNT(*) FROM students WHERE is_active = 1),
+                       (SELECT COUNT(*) FROM modules WHERE is_active = 1);
+                """
+            ).fetchone()
+
+            # 与原前端算法一致：每条记录先换算成 0-100 的整数百分比（total_sessions 为 0 时记 0），再取平均
+            (average_attendance,) = conn.execute(
+                """
+                SELECT AVG(
+                    CASE WHEN total_sessions > 0
+                         THEN MIN(100, MAX(0, ROUND(100.0 * attended_sessions / total_sessions)))
+                         ELSE 0 END
+                )
+                FROM attendance_records
+                WHERE is_active = 1;
+                """
+            ).fetchone()
+
+            submitted, late = conn.execute(
+                """
+                SELECT IFNULL(SUM(is_submitted = 1), 0), IFNULL(SUM(is_submitted = 1 AND is_late = 1), 0)
+                FROM submission_records
+                WHERE is_active = 1;
+                """
+            ).fetchone()
+
+            stress_by_week = [
+                {"week_number": row[0], "average_stress": row[1], "responses": row[2]}
+                for row in conn.execute(
+                    """
+                    SELECT week_number, AVG(stress_level), COUNT(*)
+                    FROM survey_responses
+                    WHERE is_active = 1
+                    GROUP BY week_number
+                    ORDER BY week_number;
+                    """
+                )
+            ]
+            responses = sum(item["responses"] for item in stress_by_week)
+            average_stress = (
+                sum(item["average_stress"] * item["responses"] for item in stress_by_week) / responses
+                if responses else None
+            )
+
+            open_alerts_by_module = [
+                {"module_id": row[0], "open_alerts": row[1]}
+                for row in conn.execute(
+                    """
+                    SELECT module_id, COUNT(*)
+                    FROM alerts
+                    WHERE is_active = 1 AND resolved = 0
+                    GROUP BY module_id
+                    ORDER BY module_id;
+                    """
+                )
+            ]
+
+            at_risk_sql = """
+                FROM students s
+                WHERE s.is_active = 1
+                  AND (
+                    EXISTS (SELECT 1 FROM survey_responses sr
+                             WHERE sr.student_id = s.id AND sr.is_active = 1 AND sr.stress_level >= ?)
+                    OR EXISTS (SELECT 1 FROM alerts a
+                                WHERE a.student_id = s.id AND a.is_active = 1 AND a.resolved = 0)
+                  )
+            """
+            (at_risk_count,) = conn.execute(f"SELECT COUNT(*) {at_risk_sql};", (at_risk_threshold,)).fetchone()
+            at_risk_students = [
+                {"id": row[0], "full_name": row[1], "course_name": row[2], "year_of_study": row[3]}
+                for row in conn.execute(
+                    f"SELECT s.id, s.full_name, s.course_name, s.year_of_study {at_risk_sql} ORDER BY s.id LIMIT ?;",
+                    (at_risk_threshold, at_risk_limit),
+                )
             ]
+
+            upcoming_keys = ("id", "student_id", "module_id", "assessment_name", "due_date", "is_late")
+            upcoming_submissions = [
+                dict(zip(upcoming_keys, row))
+                for row in conn.execute(
+                    """
+                    SELECT id, student_id, module_id, assessment_name, due_date, is_late
+                    FROM submission_records
+                    WHERE is_active = 1 AND is_submitted = 0
+                    ORDER BY IFNULL(due_date, ''), id
+                    LIMIT ?;
+                    """,
+                    (upcoming_limit,),
+                )
+            ]
+
+            survey_keys = ("id", "student_id", "module_id", "week_number", "stress_level", "hours_slept", "mood_comment")
+            recent_surveys = [
+                dict(zip(survey_keys, row))
+                for row in conn.execute(
+                    """
+                    SELECT id, student_id, module_id, week_number, stress_level, hours_slept, mood_comment
+                    FROM survey_responses
+                    WHERE is_active = 1
+                    ORDER BY id DESC
+                    LIMIT ?;
+                    """,
+                    (recent_limit,),
+                )
+            ]
+
+            return {
+                "student_count": student_count,
+                "module_count": module_count,
+                "average_attendance": round(average_attendance) if average_attendance is not None else None,
+                "average_stress": average_stress,
+                "submissions": {
+                    "submitted": submitted,
+                    "late": late,
+                    "late_rate": round(100 * late / submitted) if submitted else None,
+                    "on_time_rate": round(100 * (submitted - late) / submitted) if submitted else None,
+                },
+                "stress_by_week": stress_by_week,
+                "open_alerts": sum(item["open_alerts"] for item in open_alerts_by_module),
+                "open_alerts_by_module": open_alerts_by_module,
+                "at_risk_count": at_risk_count,
+                "at_risk_students": at_risk_students,
+                "upcoming_submissions": upcoming_submissions,
+                "recent_surveys": recent_surveys,
+            }
         except Exception as e:
-            raise RuntimeError(f"Failed to fetch stress-grade pairs: {e}")
+            raise RuntimeError(f"生成仪表盘汇总失败: {e}")
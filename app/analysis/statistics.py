@@ -0,0 +1,144 @@
+import math
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+
+"""
+分析模块共用的流式统计工具：
+
+- Moments：单变量均值 / 方差（Welford 算法）
+- CoMoments：双变量的均值、方差与协方差（Welford 的二元形式），可得到皮尔逊相关系数与一元线性回归
+- 两者都支持 merge()：分区（例如按课程、按批次或多线程）各自累积后再合并，结果与一次性累积相同（Chan 等人的合并公式）
+- 只保存几个标量，逐行 add()，可以直接消费数据库游标，不需要把数据读进内存
+
+与直接用 SUM(x*y)、SUM(x^2) 计算相比，这里累积的是“相对当前均值的偏差”，
+在样本量大、数值偏移大时不会出现两个大数相减的灾难性抵消。
+
+Spearman 秩相关 = 秩的皮尔逊相关：秩（并列取平均秩）在 SQL 中用窗口函数算出，
+再把 (rank_x, rank_y) 流式送进 CoMoments（按组时用 grouped_comoments）。
+"""
+
+
+class Moments:
+    """单变量累积器。"""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # 偏差平方和 Σ(x - mean)^2
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def update(self, values: Iterable[float]) -> "Moments":
+        for x in values:
+            self.add(x)
+        return self
+
+    def merge(self, other: "Moments") -> "Moments":
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        return self
+
+    def variance(self, ddof: int = 1) -> Optional[float]:
+        return self.m2 / (self.n - ddof) if self.n > ddof else None
+
+    def stddev(self, ddof: int = 1) -> Optional[float]:
+        var = self.variance(ddof)
+        return None if var is None else math.sqrt(var)
+
+
+class CoMoments:
+    """双变量累积器：x、y 的均值与偏差平方和，以及交叉偏差和 Σ(x - mean_x)(y - mean_y)。"""
+
+    __slots__ = ("n", "mean_x", "mean_y", "m2_x", "m2_y", "c_xy")
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+        self.c_xy = 0.0
+
+    def add(self, x: float, y: float) -> None:
+        self.n += 1
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.mean_x += dx / self.n
+        self.mean_y += dy / self.n
+        # 用“旧均值的偏差 × 新均值的偏差”，与 Welford 单变量更新一致
+        self.m2_x += dx * (x - self.mean_x)
+        self.m2_y += dy * (y - self.mean_y)
+        self.c_xy += dx * (y - self.mean_y)
+
+    def update(self, pairs: Iterable[Tuple[float, float]]) -> "CoMoments":
+        for x, y in pairs:
+            self.add(x, y)
+        return self
+
+    def merge(self, other: "CoMoments") -> "CoMoments":
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        weight = self.n * other.n / n
+        self.mean_x += dx * other.n / n
+        self.mean_y += dy * other.n / n
+        self.m2_x += other.m2_x + dx * dx * weight
+        self.m2_y += other.m2_y + dy * dy * weight
+        self.c_xy += other.c_xy + dx * dy * weight
+        self.n = n
+        return self
+
+    def covariance(self, ddof: int = 1) -> Optional[float]:
+        return self.c_xy / (self.n - ddof) if self.n > ddof else None
+
+    def pearson(self) -> Optional[float]:
+        """样本数 < 2 或任一变量方差为 0 时返回 None。"""
+        if self.n < 2:
+            return None
+        denominator = math.sqrt(self.m2_x * self.m2_y)
+        if denominator == 0:
+            return None
+        # 舍入误差可能让结果略超出 [-1, 1]
+        return max(-1.0, min(1.0, self.c_xy / denominator))
+
+    def linear_regression(self) -> Optional[Tuple[float, float]]:
+        """最小二乘 y = slope * x + intercept；x 方差为 0 时返回 None。"""
+        if self.n < 2 or self.m2_x == 0:
+            return None
+        slope = self.c_xy / self.m2_x
+        return slope, self.mean_y - slope * self.mean_x
+
+    def summary(self) -> Dict[str, Any]:
+        regression = self.linear_regression()
+        return {
+            "n": self.n,
+            "mean_x": self.mean_x if self.n else None,
+            "mean_y": self.mean_y if self.n else None,
+            "pearson_corr": self.pearson(),
+            "slope": regression[0] if regression else None,
+            "intercept": regression[1] if regression else None,
+        }
+
+
+def grouped_comoments(rows: Iterable[Tuple[Hashable, float, float]]) -> Dict[Hashable, CoMoments]:
+    """按 (key, x, y) 流式分组累积；内存只与分组数有关。字典按 key 首次出现的顺序排列。"""
+    groups: Dict[Hashable, CoMoments] = {}
+    for key, x, y in rows:
+        acc = groups.get(key)
+        if acc is None:
+            acc = groups[key] = CoMoments()
+        acc.add(x, y)
+    return groups
@@ -0,0 +1,303 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+"""
+通用的“连续 / 滑动窗口”压力规则引擎：
+
+- 规则（StreakRule 子类）只描述“一个 (student_id, module_id) 内，逐周看到问卷时如何判断命中”，
+  每个组合通过 rule.consumer() 得到一个带状态的 consumer，按周次顺序调用 update(week, stress)
+- StreakEngine 对按 (student_id, module_id, week_number) 排序的问卷流只扫描一遍，
+  同时驱动所有规则的 consumer；增加规则不会增加全表扫描次数
+- 规则也可以用字符串描述（parse_rule），便于从接口参数传入：
+    consecutive:N:t   连续 N 周 stress >= t
+    window:k:w:t      最近 w 周中至少 k 周 stress >= t
+    rising:N          连续 N 周压力逐周上升
+
+周次的“连续”与 detect_consecutive_high_stress 一致：只比较相邻两条问卷，同一周重复填写会打断连续。
+"""
+
+
+# 一次命中：(week_start, week_end, 命中区间内参与判断的压力值)
+Hit = Tuple[int, int, Tuple[int, ...]]
+
+
+class StreakConsumer(ABC):
+    """单个 (student_id, module_id) 上某条规则的扫描状态（子类需要提供 last_hit 属性）。"""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def update(self, week: int, stress: int) -> Optional[Hit]:
+        """喂入下一条问卷（按周次升序），命中时返回 Hit。"""
+
+    def result(self) -> Optional[Hit]:
+        """到目前为止最近一次命中（没有命中时为 None）。"""
+        return self.last_hit
+
+
+class StreakRule(ABC):
+    """规则基类：子类是不可变的 dataclass，name 用作结果与预警中的规则标识。"""
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        ...
+
+    @abstractmethod
+    def consumer(self) -> StreakConsumer:
+        ...
+
+    @abstractmethod
+    def describe(self, hit: Hit, module_id: Optional[int]) -> str:
+        """生成写入 alerts.reason 的说明文字。"""
+
+
+# =========================================================
+# 1. 连续 N 周 >= t
+# =========================================================
+class _ConsecutiveConsumer(StreakConsumer):
+    __slots__ = ("weeks", "threshold", "prev_week", "levels", "last_hit")
+
+    def __init__(self, weeks: int, threshold: int):
+        self.weeks = weeks
+        self.threshold = threshold
+        self.prev_week: Optional[int] = None
+        self.levels: deque = deque(maxlen=weeks)  # 当前连续段末尾最多 N 周的压力值
+        self.last_hit: Optional[Hit] = None
+
+    def update(self, week: int, stress: int) -> Optional[Hit]:
+        contiguous = self.prev_week is not None and week == self.prev_week + 1
+        self.prev_week = week
+        if stress < self.threshold:
+            self.levels.clear()
+            return None
+        if not contiguous:
+            self.levels.clear()
+        self.levels.append(stress)
+        if len(self.levels) < self.weeks:
+            return None
+        self.last_hit = (week - self.weeks + 1, week, tuple(self.levels))
+        return self.last_hit
+
+
+@dataclass(frozen=True)
+class ConsecutiveRule(StreakRule):
+    weeks: int = 2
+    threshold: int = 4
+
+    def __post_init__(self):
+        if self.weeks < 1:
+            raise ValueError("weeks must be >= 1")
+
+    @property
+    def name(self) -> str:
+        return f"consecutive:{self.weeks}:{self.threshold}"
+
+    def consumer(self) -> StreakConsumer:
+        return _ConsecutiveConsumer(self.weeks, self.threshold)
+
+    def describe(self, hit: Hit, module_id: Optional[int]) -> str:
+        return (
+            f"Stress >= {self.threshold} for {self.weeks} consecutive weeks "
+            f"{hit[0]} to {hit[1]} (module_id={module_id})."
+        )
+
+
+# =========================================================
+# 2. 最近 w 周中至少 k 周 >= t
+# =========================================================
+class _WindowCountConsumer(StreakConsumer):
+    __slots__ = ("count", "window", "threshold", "high", "last_hit")
+
+    def __init__(self, count: int, window: int, threshold: int):
+        self.count = count
+        self.window = window
+        self.threshold = threshold
+        self.high: deque = deque()  # 窗口内的高压周：(week, stress)
+        self.last_hit: Optional[Hit] = None
+
+    def update(self, week: int, stress: int) -> Optional[Hit]:
+        # 窗口按日历周计算：缺失的周视为未达阈值
+        while self.high and self.high[0][0] <= week - self.window:
+            self.high.popleft()
+        if stress < self.threshold:
+            return None
+        if self.high and self.high[-1][0] == week:
+            return None  # 同一周重复填写只算一次
+        self.high.append((week, stress))
+        # 只在“本周是高压周”时判断，避免同一段高压在后续低压周被重复报告
+        if len(self.high) < self.count:
+            return None
+        self.last_hit = (self.high[0][0], week, tuple(level for _, level in self.high))
+        return self.last_hit
+
+
+@dataclass(frozen=True)
+class WindowCountRule(StreakRule):
+    count: int = 3
+    window: int = 4
+    threshold: int = 4
+
+    def __post_init__(self):
+        if not 1 <= self.count <= self.window:
+            raise ValueError("count must be between 1 and window")
+
+    @property
+    def name(self) -> str:
+        return f"window:{self.count}:{self.window}:{self.threshold}"
+
+    def consumer(self) -> StreakConsumer:
+        return _WindowCountConsumer(self.count, self.window, self.threshold)
+
+    def describe(self, hit: Hit, module_id: Optional[int]) -> str:
+        return (
+            f"Stress >= {self.threshold} in {len(hit[2])} of the last {self.window} weeks "
+            f"up to week {hit[1]} (module_id={module_id})."
+        )
+
+
+# =========================================================
+# 3. 连续 N 周压力逐周上升
+# =========================================================
+class _RisingConsumer(StreakConsumer):
+    __slots__ = ("weeks", "prev_week", "levels", "last_hit")
+
+    def __init__(self, weeks: int):
+        self.weeks = weeks
+        self.prev_week: Optional[int] = None
+        self.levels: deque = deque(maxlen=weeks)
+        self.last_hit: Optional[Hit] = None
+
+    def update(self, week: int, stress: int) -> Optional[Hit]:
+        rising = (
+            self.prev_week is not None
+            and week == self.prev_week + 1
+            and len(self.levels) > 0
+            and stress > self.levels[-1]
+        )
+        self.prev_week = week
+        if not rising:
+            self.levels.clear()
+        self.levels.append(stress)
+        if len(self.levels) < self.weeks:
+            return None
+        self.last_hit = (week - self.weeks + 1, week, tuple(self.levels))
+        return self.last_hit
+
+
+@dataclass(frozen=True)
+class RisingRule(StreakRule):
+    weeks: int = 3
+
+    def __post_init__(self):
+        if self.weeks < 2:
+            raise ValueError("weeks must be >= 2")
+
+    @property
+    def name(self) -> str:
+        return f"rising:{self.weeks}"
+
+    def consumer(self) -> StreakConsumer:
+        return _RisingConsumer(self.weeks)
+
+    def describe(self, hit: Hit, module_id: Optional[int]) -> str:
+        levels = " -> ".join(str(level) for level in hit[2])
+        return (
+            f"Stress rising for {self.weeks} consecutive weeks "
+            f"{hit[0]} to {hit[1]} ({levels}) (module_id={module_id})."
+        )
+
+
+# =========================================================
+# 规则解析
+# =========================================================
+_RULE_TYPES = {
+    "consecutive": (ConsecutiveRule, 2),
+    "window": (WindowCountRule, 3),
+    "rising": (RisingRule, 1),
+}
+
+
+def parse_rule(spec: str) -> StreakRule:
+    """把 "consecutive:3:4" / "window:3:4:4" / "rising:3" 解析成规则对象；格式不对时抛 ValueError。"""
+    kind, _, rest = spec.strip().partition(":")
+    if kind not in _RULE_TYPES:
+        raise ValueError(f"unknown rule type {kind!r}; expected one of {sorted(_RULE_TYPES)}")
+    rule_cls, arity = _RULE_TYPES[kind]
+    try:
+        args = [int(part) for part in rest.split(":")] if rest else []
+    except ValueError:
+        raise ValueError(f"rule {spec!r} must use integer parameters")
+    if len(args) != arity:
+        raise ValueError(f"rule {spec!r} expects {arity} integer parameter(s)")
+    return rule_cls(*args)
+
+
+# =========================================================
+# 单遍扫描引擎
+# =========================================================
+class StreakEngine:
+    def __init__(self, rules: Sequence[StreakRule]):
+        if not rules:
+            raise ValueError("at least one rule is required")
+        names = [rule.name for rule in rules]
+        if len(set(names)) != len(names):
+            raise ValueError("duplicate rules")
+        self.rules = list(rules)
+        # feed() 的推送式状态（scan() 使用自己的局部状态，互不影响）
+        self._pair: Optional[Tuple[int, Optional[int]]] = None
+        self._consumers: List[StreakConsumer] = []
+
+    def feed(self, student_id: int, module_id: Optional[int], week: int, stress: int) -> List[Dict[str, Any]]:
+        """
+        推送式扫描：按 scan() 相同的顺序逐条喂入问卷，返回本条问卷触发的命中事件。
+        供多个分析共享同一遍扫描时使用（见 app/analysis/batch.py）。
+        """
+        if (student_id, module_id) != self._pair:
+            self._pair = (student_id, module_id)
+            self._consumers = [rule.consumer() for rule in self.rules]
+        events = []
+        for rule, consumer in zip(self.rules, self._consumers):
+            hit = consumer.update(week, stress)
+            if hit is not None:
+                events.append(self._event(rule, student_id, module_id, hit))
+        return events
+
+    def scan(self, rows: Iterable[Tuple[int, Optional[int], int, int]]) -> Iterator[Dict[str, Any]]:
+        """
+        rows：按 (student_id, module_id, week_number) 排序的 (student_id, module_id, week_number, stress_level)。
+        逐条产出命中事件（每条规则每次命中一条）。
+        """
+        rules = self.rules
+        pair = None
+        consumers: List[StreakConsumer] = []
+        for student_id, module_id, week, stress in rows:
+            if (student_id, module_id) != pair:
+                pair = (student_id, module_id)
+                consumers = [rule.consumer() for rule in rules]
+            for rule, consumer in zip(rules, consumers):
+                hit = consumer.update(week, stress)
+                if hit is not None:
+                    yield self._event(rule, student_id, module_id, hit)
+
+    def latest(self, rows: Iterable[Tuple[int, Optional[int], int, int]]) -> List[Dict[str, Any]]:
+        """每个 (student_id, module_id, 规则) 只保留最近一次命中（用于生成预警）。"""
+        latest: Dict[Tuple, Dict[str, Any]] = {}
+        for event in self.scan(rows):
+            latest[(event["student_id"], event["module_id"], event["rule"])] = event
+        return list(latest.values())
+
+    @staticmethod
+    def _event(rule: StreakRule, student_id: int, module_id: Optional[int], hit: Hit) -> Dict[str, Any]:
+        return {
+            "rule": rule.name,
+            "student_id": student_id,
+            "module_id": module_id,
+            "week_start": hit[0],
+            "week_end": hit[1],
+            "stress_levels": list(hit[2]),
+            "reason": rule.describe(hit, module_id),
+        }
@@ -2,4 +2,4 @@ from flask import Blueprint
 
 api_bp = Blueprint("api", __name__)
 
-from . import routes  # noqa: E402,F401
+from . import routes, bulk_import  # noqa: E402,F401
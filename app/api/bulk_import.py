@@ -0,0 +1,248 @@
+import contextlib
+import csv
+import io
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+import click
+from flask import Flask, abort, current_app, jsonify, request
+from flask.cli import with_appcontext
+from werkzeug.exceptions import HTTPException
+
+from app.api import api_bp
+from app.api.routes import (
+    _optional_int,
+    _parse_attendance_payload,
+    _parse_grade_payload,
+    _parse_submission_payload,
+    _parse_survey_payload,
+)
+from app.db import run_write
+from app.repositories.AttendanceRecordRepository import AttendanceRecordRepository
+from app.repositories.GradeRepository import GradeRepository
+from app.repositories.SubmissionRecordRepository import SubmissionRecordRepository
+from app.repositories.SurveyResponseRepository import SurveyResponseRepository
+from utils.serializer_util import to_camel
+
+
+"""
+批量导入（学期初从教务系统导入出勤 / 问卷 / 提交 / 成绩）：
+
+- POST /api/import/<resource>（attendance / surveys / submissions / grades），请求体为 CSV 或 NDJSON，
+  按 Content-Type（text/csv、application/x-ndjson）或 ?format=csv|ndjson 判断
+- CLI：flask import-data <resource> <文件路径或 ->
+- 边读边解析，不把整个文件读进内存；每行用与单条 POST 相同的 _parse_*_payload 校验
+  （字段名可用 camelCase 或 snake_case），校验失败的行记入报告，不中断导入
+- 通过校验的行每 chunk_size 条交给写线程，用 add_many（executemany）在一个事务里写入；
+  数据库拒绝的行（约束冲突等）同样记入报告
+- 报告：总行数 / 写入数 / 失败数、前 max_errors 条错误（行号 + 原因）、耗时与每秒行数
+"""
+
+
+# resource -> (Repository, 解析函数, CSV 中需要转换成 bool 的列)
+IMPORTERS: Dict[str, Tuple[type, Callable[[dict], Any], Tuple[str, ...]]] = {
+    "attendance": (AttendanceRecordRepository, _parse_attendance_payload, ()),
+    "surveys": (SurveyResponseRepository, _parse_survey_payload, ()),
+    "submissions": (SubmissionRecordRepository, _parse_submission_payload, ("isSubmitted", "isLate")),
+    "grades": (GradeRepository, _parse_grade_payload, ()),
+}
+FORMATS = {"csv", "ndjson"}
+_TRUE = {"1", "true", "yes", "on"}
+
+
+@dataclass
+class ImportReport:
+    """一次导入的结果；errors 只保留前 max_errors 条，failed 为全部失败行数。"""
+    resource: str
+    rows: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    seconds: float = 0.0
+    aborted: Optional[str] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return round(self.rows / self.seconds, 1) if self.seconds > 0 else float(self.rows)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "resource": self.resource,
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errorsTruncated": self.failed > len(self.errors),
+            "seconds": round(self.seconds, 3),
+            "rowsPerSecond": self.rows_per_second,
+        }
+        if self.aborted is not None:
+            data["aborted"] = self.aborted
+        return data
+
+
+def iter_records(
+    text: TextIO, fmt: str, bool_fields: Iterable[str] = ()
+) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    逐行读取，yield (行号, payload, 错误)：能解析时错误为 None，否则 payload 为 None。
+    CSV 的空单元格视为未填写；bool_fields 中的列按 true / false / 1 / 0 转换。
+    """
+    bool_fields = set(bool_fields)
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            payload = {}
+            for key, value in row.items():
+                if key is None or value in (None, ""):
+                    continue
+                key = to_camel(key.strip())
+                payload[key] = value.strip().lower() in _TRUE if key in bool_fields else value
+            yield reader.line_num, payload, None
+        return
+
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            payload = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(payload, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        yield line_no, {to_camel(key): value for key, value in payload.items()}, None
+
+
+def import_records(
+    resource: str,
+    records: Iterable[Tuple[int, Optional[dict], Optional[str]]],
+    chunk_size: int = 1000,
+    max_errors: int = 100,
+    write: Callable[[Callable[[Any], Any]], Any] = run_write,
+) -> ImportReport:
+    """校验 records 并按 chunk_size 分批写入；write 负责在写连接上执行 fn(conn)（默认交给写线程）。"""
+    repo_cls, parse, _ = IMPORTERS[resource]
+    report = ImportReport(resource=resource)
+    batch: List[Tuple[int, Any]] = []
+
+    def fail(line: int, error: str) -> None:
+        report.failed += 1
+        if len(report.errors) < max_errors:
+            report.errors.append({"line": line, "error": error})
+
+    def flush() -> None:
+        models = [model for _, model in batch]
+        result = write(lambda conn: repo_cls(conn).add_many(models))
+        report.inserted += len(result.ids)
+        for failure in result.failures:
+            fail(batch[failure["index"]][0], failure["error"])
+        batch.clear()
+
+    started = time.perf_counter()
+    try:
+        for line, payload, error in records:
+            report.rows += 1
+            if error is not None:
+                fail(line, error)
+                continue
+            try:
+                batch.append((line, parse(payload)))
+            except HTTPException as e:
+                fail(line, e.description)
+                continue
+            except Exception as e:
+                # 单条 POST 上这类输入会变成 500；导入时只算这一行失败，不中断整批
+                fail(line, f"Invalid row: {e}")
+                continue
+            if len(batch) >= chunk_size:
+                flush()
+        if batch:
+            flush()
+    except (RuntimeError, UnicodeDecodeError, csv.Error) as e:
+        # 数据库错误或文件本身无法继续读取：之前的批次已经提交，当前批次不写入
+        report.aborted = f"line {batch[0][0] if batch else report.rows}: {e}"
+    finally:
+        report.seconds = time.perf_counter() - started
+    return report
+
+
+def _format_from_path(path: str) -> Optional[str]:
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return None
+
+
+# ------------------------------------------------------------
+# POST /api/import/<resource>
+# - 请求体直接是 CSV / NDJSON（不是 multipart 表单），例如
+#   curl -X POST -H 'Content-Type: text/csv' --data-binary @attendance.csv /api/import/attendance
+# - 可选参数：format（csv / ndjson，覆盖 Content-Type），chunkSize，maxErrors
+# ------------------------------------------------------------
+@api_bp.post("/import/<resource>")
+def import_data(resource: str):
+    if resource not in IMPORTERS:
+        abort(404, description=f"Cannot import {resource}")
+    fmt = request.args.get("format") or {
+        "text/csv": "csv",
+        "application/x-ndjson": "ndjson",
+        "application/jsonl": "ndjson",
+    }.get(request.mimetype)
+    if fmt not in FORMATS:
+        abort(400, description="Body must be text/csv or application/x-ndjson (or pass format=csv|ndjson)")
+    chunk_size = _optional_int(request.args.get("chunkSize"), current_app.config.get("IMPORT_CHUNK_SIZE", 1000))
+    max_errors = _optional_int(request.args.get("maxErrors"), current_app.config.get("IMPORT_MAX_ERRORS", 100))
+    if chunk_size < 1 or max_errors < 0:
+        abort(400, description="chunkSize must be >= 1 and maxErrors >= 0")
+
+    text = io.TextIOWrapper(io.BufferedReader(request.stream), encoding="utf-8-sig", newline="")
+    report = import_records(
+        resource, iter_records(text, fmt, IMPORTERS[resource][2]), chunk_size=chunk_size, max_errors=max_errors
+    )
+    return jsonify(report.to_dict()), 500 if report.aborted else 200
+
+
+@click.command("import-data")
+@with_appcontext
+@click.argument("resource", type=click.Choice(sorted(IMPORTERS)))
+@click.argument("path", type=click.Path(allow_dash=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(sorted(FORMATS)), help="默认按文件扩展名判断")
+@click.option("--chunk-size", type=int, default=None, help="每个事务写入的行数（默认 IMPORT_CHUNK_SIZE）")
+@click.option("--max-errors", type=int, default=None, help="报告中最多列出多少条错误（默认 IMPORT_MAX_ERRORS）")
+def import_data_command(
+    resource: str, path: str, fmt: Optional[str], chunk_size: Optional[int], max_errors: Optional[int]
+):
+    """从 CSV / NDJSON 文件批量导入 RESOURCE（PATH 为 - 时读标准输入）。"""
+    fmt = fmt or _format_from_path(path)
+    if fmt is None:
+        raise click.UsageError("Cannot infer the format from the file name; pass --format csv|ndjson")
+    config = current_app.config
+    source = contextlib.nullcontext(sys.stdin) if path == "-" else open(path, encoding="utf-8-sig", newline="")
+    with source as text:
+        report = import_records(
+            resource,
+            iter_records(text, fmt, IMPORTERS[resource][2]),
+            chunk_size=chunk_size or config.get("IMPORT_CHUNK_SIZE", 1000),
+            max_errors=config.get("IMPORT_MAX_ERRORS", 100) if max_errors is None else max_errors,
+        )
+
+    for error in report.errors:
+        click.echo(f"line {error['line']}: {error['error']}", err=True)
+    if report.failed > len(report.errors):
+        click.echo(f"... {report.failed - len(report.errors)} more errors", err=True)
+    click.echo(
+        f"{resource}: {report.inserted}/{report.rows} rows imported, {report.failed} failed "
+        f"in {report.seconds:.2f}s ({report.rows_per_second:.0f} rows/s)"
+    )
+    if report.aborted:
+        raise click.ClickException(f"import aborted at {report.aborted}")
+
+
+def init_app(app: Flask) -> None:
+    app.cli.add_command(import_data_command)
@@ -1,8 +1,14 @@
-import os
-import sqlite3
-from flask import jsonify, request, abort, current_app
+import base64
+import json
+import re
+
+from flask import jsonify, request, abort, current_app, url_for
 
 from app.api import api_bp
+from app.conditional import conditional_get
+from app.analysis.services import AnalysisServiceRepository
+from app.db import db_stats, get_db, get_result_cache, resolve_db_path, run_write
+from app.streaming import stream_json, wants_stream
 from app.repositories.StudentRepository import StudentRepository
 from app.repositories.AttendanceRecordRepository import AttendanceRecordRepository
 from app.repositories.SubmissionRecordRepository import SubmissionRecordRepository
@@ -13,55 +19,38 @@ from app.models.AttendanceRecord import AttendanceRecord
 from app.models.SubmissionRecord import SubmissionRecord
 from app.models.SurveyResponse import SurveyResponse
 from app.models.Alert import Alert
+from app.models.Grade import Grade
+from utils.json_convert_util import JsonHelper
+from utils.serializer_util import ModelSerializer, to_camel
 
 
 def _get_db_path() -> str:
-    """
-    Resolve the sqlite database path from the DATABASE env or default config.
-    Supports values like sqlite:////absolute/path/to/db.sqlite3.
-    """
-    db_url = os.environ.get("DATABASE") or current_app.config.get("DATABASE", "")
+    """Database path used by the app-wide connection pool (see app.db.resolve_db_path)."""
+    return resolve_db_path(current_app)
 
-    # sqlite:///absolute/path -> absolute/path
-    if db_url.startswith("sqlite:///"):
-        return db_url.replace("sqlite:///", "", 1)
-    if db_url:
-        return db_url
 
-    # Fallbacks: prefer dev DB if present, otherwise data.db in repo root
-    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-    dev_db = os.path.join(repo_root, "db_dev.sqlite3")
-    if os.path.exists(dev_db):
-        return dev_db
-    return os.path.join(repo_root, "data.db")
+@api_bp.get("/db/stats")
+def database_stats():
+    """Return connection pool and single-writer queue statistics."""
+    return jsonify(db_stats())
 
 
 @api_bp.get("/students")
+@conditional_get("students")
 def list_students():
-    """Return all active students as JSON."""
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = StudentRepository(conn)
-        students = repo.list_all()
-        return jsonify([_serialize_student(s) for s in students])
-    finally:
-        conn.close()
+    """Return active students as JSON (keyset-paginated when limit/after is given)."""
+    return _list_response(StudentRepository(get_db()), _STUDENT_SERIALIZER)
 
 
 @api_bp.get("/students/<int:student_id>")
+@conditional_get("students")
 def get_student(student_id: int):
     """Return a single student by id."""
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = StudentRepository(conn)
-        student = repo.get_by_id(student_id)
-        if student is None or not student.is_active:
-            abort(404, description="Student not found")
-        return jsonify(_serialize_student(student))
-    finally:
-        conn.close()
+    repo = StudentRepository(get_db())
+    student = repo.get_by_id(student_id)
+    if student is None or not student.is_active:
+        abort(404, description="Student not found")
+    return jsonify(_field_encoder(_STUDENT_SERIALIZER)(student))
 
 
 @api_bp.post("/students")
@@ -70,308 +59,401 @@ def create_student():
     payload = request.get_json(silent=True) or {}
     student = _parse_student_payload(payload)
 
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = StudentRepository(conn)
-        created = repo.add(student)
-        return jsonify(_serialize_student(created)), 201
-    finally:
-        conn.close()
+    created = run_write(lambda conn: StudentRepository(conn).add(student))
+    return jsonify(_serialize_student(created)), 201
 
 
 @api_bp.put("/students/<int:student_id>")
 def update_student(student_id: int):
     """Update an existing student record."""
     payload = request.get_json(silent=True) or {}
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = StudentRepository(conn)
-        existing = repo.get_by_id(student_id)
-        if existing is None or not existing.is_active:
-            abort(404, description="Student not found")
+    repo = StudentRepository(get_db())
+    existing = repo.get_by_id(student_id)
+    if existing is None or not existing.is_active:
+        abort(404, description="Student not found")
 
-        updated_student = _parse_student_payload(payload, existing_student=existing)
-        updated_student.id = student_id
-        repo.update(updated_student)
-        refreshed = repo.get_by_id(student_id)
-        return jsonify(_serialize_student(refreshed))
-    finally:
-        conn.close()
+    updated_student = _parse_student_payload(payload, existing_student=existing)
+    updated_student.id = student_id
+    stored = run_write(lambda conn: _update_and_fetch(StudentRepository(conn), updated_student))
+    return jsonify(_serialize_student(stored))
 
 
 @api_bp.delete("/students/<int:student_id>")
 def delete_student(student_id: int):
     """Hard-delete a student record (remove row from DB)."""
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = StudentRepository(conn)
-        existing = repo.get_by_id(student_id)
-        if existing is None or not existing.is_active:
-            abort(404, description="Student not found")
-        # Use hard delete so the row disappears from the DB file (not just is_active=0).
-        repo.hard_delete(student_id)
-        return "", 204
-    finally:
-        conn.close()
+    if not StudentRepository(get_db()).exists(id=student_id):
+        abort(404, description="Student not found")
+    # Use hard delete so the row disappears from the DB file (not just is_active=0).
+    run_write(lambda conn: StudentRepository(conn).hard_delete(student_id))
+    return "", 204
 
 
 @api_bp.get("/attendance")
+@conditional_get("attendance_records")
 def list_attendance():
-    """Return all attendance records."""
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = AttendanceRecordRepository(conn)
-        records = repo.list_all()
-        return jsonify([_serialize_attendance(r) for r in records])
-    finally:
-        conn.close()
+    """Return attendance records (keyset-paginated when limit/after is given)."""
+    return _list_response(AttendanceRecordRepository(get_db()), _ATTENDANCE_SERIALIZER)
 
 
 @api_bp.post("/attendance")
 def create_attendance():
     payload = request.get_json(silent=True) or {}
     record = _parse_attendance_payload(payload)
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = AttendanceRecordRepository(conn)
-        created = repo.add(record)
-        return jsonify(_serialize_attendance(created)), 201
-    finally:
-        conn.close()
+    created = run_write(lambda conn: AttendanceRecordRepository(conn).add(record))
+    return jsonify(_serialize_attendance(created)), 201
 
 
 @api_bp.put("/attendance/<int:record_id>")
 def update_attendance(record_id: int):
     payload = request.get_json(silent=True) or {}
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = AttendanceRecordRepository(conn)
-        existing = repo.get_by_id(record_id)
-        if existing is None or not existing.is_active:
-            abort(404, description="Attendance record not found")
-        updated = _parse_attendance_payload(payload, existing_record=existing)
-        updated.id = record_id
-        repo.update(updated)
-        refreshed = repo.get_by_id(record_id)
-        return jsonify(_serialize_attendance(refreshed))
-    finally:
-        conn.close()
+    repo = AttendanceRecordRepository(get_db())
+    existing = repo.get_by_id(record_id)
+    if existing is None or not existing.is_active:
+        abort(404, description="Attendance record not found")
+    updated = _parse_attendance_payload(payload, existing_record=existing)
+    updated.id = record_id
+    stored = run_write(lambda conn: _update_and_fetch(AttendanceRecordRepository(conn), updated))
+    return jsonify(_serialize_attendance(stored))
 
 
 @api_bp.delete("/attendance/<int:record_id>")
 def delete_attendance(record_id: int):
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = AttendanceRecordRepository(conn)
-        existing = repo.get_by_id(record_id)
-        if existing is None or not existing.is_active:
-            abort(404, description="Attendance record not found")
-        repo.soft_delete(record_id)
-        return "", 204
-    finally:
-        conn.close()
+    if not AttendanceRecordRepository(get_db()).exists(id=record_id):
+        abort(404, description="Attendance record not found")
+    run_write(lambda conn: AttendanceRecordRepository(conn).soft_delete(record_id))
+    return "", 204
 
 
 @api_bp.get("/submissions")
+@conditional_get("submission_records")
 def list_submissions():
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = SubmissionRecordRepository(conn)
-        records = repo.list_all()
-        return jsonify([_serialize_submission(r) for r in records])
-    finally:
-        conn.close()
+    return _list_response(SubmissionRecordRepository(get_db()), _SUBMISSION_SERIALIZER)
 
 
 @api_bp.post("/submissions")
 def create_submission():
     payload = request.get_json(silent=True) or {}
     record = _parse_submission_payload(payload)
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = SubmissionRecordRepository(conn)
-        created = repo.add(record)
-        return jsonify(_serialize_submission(created)), 201
-    finally:
-        conn.close()
+    created = run_write(lambda conn: SubmissionRecordRepository(conn).add(record))
+    return jsonify(_serialize_submission(created)), 201
 
 
 @api_bp.put("/submissions/<int:record_id>")
 def update_submission(record_id: int):
     payload = request.get_json(silent=True) or {}
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = SubmissionRecordRepository(conn)
-        existing = repo.get_by_id(record_id)
-        if existing is None or not existing.is_active:
-            abort(404, description="Submission record not found")
-        updated = _parse_submission_payload(payload, existing_record=existing)
-        updated.id = record_id
-        repo.update(updated)
-        refreshed = repo.get_by_id(record_id)
-        return jsonify(_serialize_submission(refreshed))
-    finally:
-        conn.close()
+    repo = SubmissionRecordRepository(get_db())
+    existing = repo.get_by_id(record_id)
+    if existing is None or not existing.is_active:
+        abort(404, description="Submission record not found")
+    updated = _parse_submission_payload(payload, existing_record=existing)
+    updated.id = record_id
+    stored = run_write(lambda conn: _update_and_fetch(SubmissionRecordRepository(conn), updated))
+    return jsonify(_serialize_submission(stored))
 
 
 @api_bp.delete("/submissions/<int:record_id>")
 def delete_submission(record_id: int):
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = SubmissionRecordRepository(conn)
-        existing = repo.get_by_id(record_id)
-        if existing is None or not existing.is_active:
-            abort(404, description="Submission record not found")
-        repo.soft_delete(record_id)
-        return "", 204
-    finally:
-        conn.close()
+    if not SubmissionRecordRepository(get_db()).exists(id=record_id):
+        abort(404, description="Submission record not found")
+    run_write(lambda conn: SubmissionRecordRepository(conn).soft_delete(record_id))
+    return "", 204
 
 
 @api_bp.get("/surveys")
+@conditional_get("survey_responses")
 def list_surveys():
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = SurveyResponseRepository(conn)
-        records = repo.list_all()
-        return jsonify([_serialize_survey(r) for r in records])
-    finally:
-        conn.close()
+    return _list_response(SurveyResponseRepository(get_db()), _SURVEY_SERIALIZER)
 
 
 @api_bp.post("/surveys")
 def create_survey():
     payload = request.get_json(silent=True) or {}
     record = _parse_survey_payload(payload)
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = SurveyResponseRepository(conn)
-        created = repo.add(record)
-        return jsonify(_serialize_survey(created)), 201
-    finally:
-        conn.close()
+    created = run_write(lambda conn: SurveyResponseRepository(conn).add(record))
+    return jsonify(_serialize_survey(created)), 201
 
 
 @api_bp.put("/surveys/<int:record_id>")
 def update_survey(record_id: int):
     payload = request.get_json(silent=True) or {}
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = SurveyResponseRepository(conn)
-        existing = repo.get_by_id(record_id)
-        if existing is None or not existing.is_active:
-            abort(404, description="Survey response not found")
-        updated = _parse_survey_payload(payload, existing_record=existing)
-        updated.id = record_id
-        repo.update(updated)
-        refreshed = repo.get_by_id(record_id)
-        return jsonify(_serialize_survey(refreshed))
-    finally:
-        conn.close()
+    repo = SurveyResponseRepository(get_db())
+    existing = repo.get_by_id(record_id)
+    if existing is None or not existing.is_active:
+        abort(404, description="Survey response not found")
+    updated = _parse_survey_payload(payload, existing_record=existing)
+    updated.id = record_id
+    stored = run_write(lambda conn: _update_and_fetch(SurveyResponseRepository(conn), updated))
+    return jsonify(_serialize_survey(stored))
 
 
 @api_bp.delete("/surveys/<int:record_id>")
 def delete_survey(record_id: int):
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = SurveyResponseRepository(conn)
-        existing = repo.get_by_id(record_id)
-        if existing is None or not existing.is_active:
-            abort(404, description="Survey response not found")
-        repo.soft_delete(record_id)
-        return "", 204
-    finally:
-        conn.close()
+    if not SurveyResponseRepository(get_db()).exists(id=record_id):
+        abort(404, description="Survey response not found")
+    run_write(lambda conn: SurveyResponseRepository(conn).soft_delete(record_id))
+    return "", 204
 
 
 @api_bp.get("/alerts")
+@conditional_get("alerts", "students")
 def list_alerts():
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = AlertRepository(conn)
-        records = repo.list_all()
-        return jsonify([_serialize_alert(r) for r in records])
-    finally:
-        conn.close()
+    return _list_response(
+        AlertRepository(get_db()),
+        _ALERT_SERIALIZER,
+        expanders={"student": _expand_alert_students},
+    )
 
 
 @api_bp.post("/alerts")
 def create_alert():
     payload = request.get_json(silent=True) or {}
     record = _parse_alert_payload(payload)
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = AlertRepository(conn)
-        created = repo.add(record)
-        return jsonify(_serialize_alert(created)), 201
-    finally:
-        conn.close()
+    created = run_write(lambda conn: AlertRepository(conn).add(record))
+    return jsonify(_serialize_alert(created)), 201
 
 
 @api_bp.put("/alerts/<int:record_id>")
 def update_alert(record_id: int):
     payload = request.get_json(silent=True) or {}
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = AlertRepository(conn)
-        existing = repo.get_by_id(record_id)
-        if existing is None or not existing.is_active:
-            abort(404, description="Alert not found")
-        updated = _parse_alert_payload(payload, existing_alert=existing)
-        updated.id = record_id
-        repo.update(updated)
-        refreshed = repo.get_by_id(record_id)
-        return jsonify(_serialize_alert(refreshed))
-    finally:
-        conn.close()
+    repo = AlertRepository(get_db())
+    existing = repo.get_by_id(record_id)
+    if existing is None or not existing.is_active:
+        abort(404, description="Alert not found")
+    updated = _parse_alert_payload(payload, existing_alert=existing)
+    updated.id = record_id
+    stored = run_write(lambda conn: _update_and_fetch(AlertRepository(conn), updated))
+    return jsonify(_serialize_alert(stored))
 
 
 @api_bp.delete("/alerts/<int:record_id>")
 def delete_alert(record_id: int):
-    db_path = _get_db_path()
-    conn = sqlite3.connect(db_path)
-    try:
-        repo = AlertRepository(conn)
-        existing = repo.get_by_id(record_id)
-        if existing is None or not existing.is_active:
-            abort(404, description="Alert not found")
-        repo.soft_delete(record_id)
-        return "", 204
-    finally:
-        conn.close()
-
-
-def _serialize_student(student: Student) -> dict:
-    """Convert a Student entity to JSON-ready dict."""
-    return {
-        "id": student.id,
-        "studentNumber": student.student_number,
-        "fullName": student.full_name,
-        "courseName": student.course_name,
-        "yearOfStudy": student.year_of_study,
-        "email": student.email,
-        # risk is not yet calculated in DB; default to low for UI
-        "riskLevel": "low",
-    }
+    if not AlertRepository(get_db()).exists(id=record_id):
+        abort(404, description="Alert not found")
+    run_write(lambda conn: AlertRepository(conn).soft_delete(record_id))
+    return "", 204
+
 
+_DASHBOARD_TABLES = ("students", "modules", "attendance_records", "submission_records", "survey_responses", "alerts")
+
+
+@api_bp.get("/dashboard/summary")
+@conditional_get(*_DASHBOARD_TABLES)
+def dashboard_summary():
+    """
+    KPI cards and charts for DashboardView in one response (see AnalysisServiceRepository.get_dashboard_summary).
+    Optional: atRiskThreshold (default 4), atRiskLimit (20), upcomingLimit (6), recentLimit (4).
+    """
+    max_limit = current_app.config.get("API_MAX_PAGE_SIZE", 500)
+    limits = {
+        "at_risk_limit": _optional_int(request.args.get("atRiskLimit"), 20),
+        "upcoming_limit": _optional_int(request.args.get("upcomingLimit"), 6),
+        "recent_limit": _optional_int(request.args.get("recentLimit"), 4),
+    }
+    if any(not 0 <= value <= max_limit for value in limits.values()):
+        abort(400, description=f"limits must be between 0 and {max_limit}")
+
+    service = AnalysisServiceRepository(get_db(), cache=get_result_cache())
+    summary = service.get_dashboard_summary(
+        at_risk_threshold=_optional_int(request.args.get("atRiskThreshold"), 4),
+        **limits,
+    )
+    return jsonify(_camel_case_keys(summary))
+
+
+def _camel_case_keys(value):
+    """Recursively convert snake_case dict keys to the camelCase used by the frontend."""
+    if isinstance(value, dict):
+        return {to_camel(key): _camel_case_keys(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_camel_case_keys(item) for item in value]
+    return value
+
+
+# ------------------------------------------------------------
+# 列表分页：?limit=&after=&sort=
+# - 不带 limit / after 时与之前一样返回全部记录（仍按 sort 排序）
+# - sort 支持 camelCase 或 snake_case 字段名，前缀 "-" 表示降序，例如 sort=-weekNumber
+# - 还有下一页时，在响应头返回 X-Next-Cursor 与 Link: <...>; rel="next"，响应体仍是数组
+# - ?stream=1：用 fetchmany 逐批读取并边序列化边发送（可配合 sort / after，不能与 limit 同用）
+# - 其余参数都是过滤条件，写法同 BaseRepository._build_where_clause，字段名可用 camelCase：
+#   ?moduleId=3&weekNumber__gte=4&weekNumber__lte=8&studentId__in=1,2,3&submittedDate__isnull=true
+# - ?expand=student（目前仅 /alerts）：每批记录用一次 get_many 补充关联对象，避免逐条 get_by_id
+# - ?fields=id,studentId：稀疏字段集，只输出这些键（每种组合的编码函数编译一次并缓存）
+# - ?format=columnar：响应体为 {"columns": [...], "data": {列名: [值...]}}，直接由查询元组按列转置，
+#   每个键只出现一次（可配合 limit / after / sort / fields，不能与 stream / expand 同用）
+# ------------------------------------------------------------
+_LIST_RESERVED_ARGS = {"limit", "after", "sort", "stream", "expand", "fields", "format"}
+
+
+def _requested_fields(ignore=()):
+    """?fields=id,studentId 中的键；不带 fields 时为 None。ignore 中的名字（expand）不算字段。"""
+    raw = request.args.get("fields")
+    if not raw:
+        return None
+    return [key.strip() for key in raw.split(",") if key.strip() and key.strip() not in ignore]
+
+
+def _field_encoder(serializer, ignore=()):
+    """?fields=id,studentId：只输出这些键（稀疏字段集）；不带 fields 时输出全部。"""
+    keys = _requested_fields(ignore)
+    if keys is None:
+        return serializer.encode
+    try:
+        return serializer.encoder(keys)
+    except ValueError as e:
+        abort(400, description=str(e))
+
+
+def _wants_columnar() -> bool:
+    fmt = request.args.get("format", "rows")
+    if fmt not in ("rows", "columnar"):
+        abort(400, description="format must be rows or columnar")
+    return fmt == "columnar"
+
+
+def _list_response(repo, serializer, expanders=None):
+    limit = _optional_int(request.args.get("limit"))
+    stream = wants_stream(request.args)
+    if stream and limit is not None:
+        abort(400, description="stream cannot be combined with limit")
+    max_limit = current_app.config.get("API_MAX_PAGE_SIZE", 500)
+    if limit is not None and not 1 <= limit <= max_limit:
+        abort(400, description=f"limit must be between 1 and {max_limit}")
+
+    sort_param = request.args.get("sort") or "id"
+    descending = sort_param.startswith("-")
+    sort = _snake_case(sort_param.lstrip("-"))
+    if sort != "id" and sort not in repo.SORTABLE_FIELDS:
+        abort(400, description=f"Cannot sort by {sort_param.lstrip('-')}")
+
+    filters = _parse_list_filters(repo)
+    expand = [name.strip() for name in request.args.get("expand", "").split(",") if name.strip()]
+    for name in expand:
+        if name not in (expanders or {}):
+            abort(400, description=f"Cannot expand {name}")
+    columnar = _wants_columnar()
+    if columnar and (stream or expand):
+        abort(400, description="format=columnar cannot be combined with stream or expand")
+    serialize = serializer.encode if columnar else _field_encoder(serializer, ignore=expand)
+
+    def serialize_batch(records: list) -> list:
+        serialized = [serialize(record) for record in records]
+        for name in expand:
+            expanders[name](records, serialized)
+        return serialized
+
+    after = None
+    cursor = request.args.get("after")
+    if cursor:
+        after = _decode_cursor(cursor, sort_param)
+        if limit is None and not stream:
+            limit = max_limit
+
+    if stream:
+        batch_size = current_app.config.get("API_STREAM_BATCH_SIZE", 500)
+        items = repo.iter_page(
+            after=after, sort=sort, descending=descending, batch_size=batch_size, filters=filters
+        )
+        serialized = (
+            item for batch in _batched(items, batch_size) for item in serialize_batch(batch)
+        )
+        return stream_json(JsonHelper.iter_json_array(serialized, chunk_size=batch_size))
+
+    page = repo.list_page(limit=limit, after=after, sort=sort, descending=descending, filters=filters, raw=columnar)
+    if columnar:
+        try:
+            body = serializer.encode_columns(
+                page.items, ("id",) + repo.WRITE_COLUMNS, _requested_fields(), from_row=repo._from_row
+            )
+        except ValueError as e:
+            abort(400, description=str(e))
+        response = jsonify(body)
+    else:
+        response = jsonify(serialize_batch(page.items))
+    if page.next_key is not None:
+        next_cursor = _encode_cursor(sort_param, page.next_key)
+        args = request.args.to_dict()
+        args.update(after=next_cursor, limit=limit)
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{url_for(request.endpoint, **args)}>; rel="next"'
+    return response
+
+
+def _parse_list_filters(repo) -> dict:
+    filters = {}
+    for key in request.args:
+        if key in _LIST_RESERVED_ARGS:
+            continue
+        raw_field, sep, op = key.partition("__")
+        field = _snake_case(raw_field)
+        op = op if sep else "eq"
+        # is_active 不对外开放：列表接口只返回未删除的记录
+        if field == "is_active" or field not in repo.ALLOWED_FILTERS:
+            abort(400, description=f"Cannot filter by {raw_field}")
+        if op not in repo.FILTER_OPERATORS:
+            abort(400, description=f"Unknown filter operator: {op}")
+
+        value = request.args.get(key)
+        if op in ("in", "not_in"):
+            filters[f"{field}__{op}"] = [v.strip() for v in value.split(",") if v.strip()]
+        elif op == "isnull":
+            filters[f"{field}__{op}"] = value.lower() in {"1", "true", "yes", "on"}
+        elif value.lower() in {"true", "false"}:
+            # 布尔列（resolved / is_submitted / is_late）在库里存的是 0/1
+            filters[f"{field}__{op}"] = 1 if value.lower() == "true" else 0
+        else:
+            # 其余值按字符串绑定，SQLite 会按列的类型亲和性（INTEGER / REAL）转换后比较
+            filters[f"{field}__{op}"] = value
+    return filters
+
+
+def _expand_alert_students(records: list, serialized: list) -> None:
+    students = StudentRepository(get_db()).get_many(record.student_id for record in records)
+    for record, item in zip(records, serialized):
+        student = students.get(record.student_id)
+        item["student"] = _serialize_student(student) if student is not None else None
+
+
+def _batched(items, size: int):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _snake_case(name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def _encode_cursor(sort_param: str, key: tuple) -> str:
+    raw = json.dumps([sort_param, key[0], key[1]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort_param: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, last_id = json.loads(raw)
+    except (ValueError, TypeError):
+        abort(400, description="Invalid cursor")
+    if cursor_sort != sort_param or not isinstance(last_id, int):
+        abort(400, description="Cursor does not match the requested sort")
+    return value, last_id
+
+
+_STUDENT_SERIALIZER = ModelSerializer(
+    Student,
+    fields=("id", "student_number", "full_name", "course_name", "year_of_study", "email"),
+    rename=to_camel,
+    # risk is not yet calculated in DB; default to low for UI
+    computed={"riskLevel": lambda student: "low"},
+    computed_columns={"riskLevel": lambda columns, n: ["low"] * n},
+)
+_serialize_student = _STUDENT_SERIALIZER.encode
 
 def _parse_student_payload(payload: dict, existing_student: Student | None = None) -> Student:
     """
@@ -397,23 +479,20 @@ def _parse_student_payload(payload: dict, existing_student: Student | None = Non
     if year_value is not None:
         try:
             student.year_of_study = int(year_value)
-        except (TypeError, ValueError):
+        except (TypeError, ValueError, OverflowError):
             abort(400, description="yearOfStudy must be an integer")
 
     return student
 
 
-def _serialize_attendance(record: AttendanceRecord) -> dict:
-    return {
-        "id": record.id,
-        "studentId": record.student_id,
-        "moduleId": record.module_id,
-        "weekNumber": record.week_number,
-        "attendedSessions": record.attended_sessions,
-        "totalSessions": record.total_sessions,
-        "attendanceRate": record.attendance_rate,
-    }
-
+_ATTENDANCE_SERIALIZER = ModelSerializer(
+    AttendanceRecord,
+    fields=(
+        "id", "student_id", "module_id", "week_number", "attended_sessions", "total_sessions", "attendance_rate",
+    ),
+    rename=to_camel,
+)
+_serialize_attendance = _ATTENDANCE_SERIALIZER.encode
 
 def _parse_attendance_payload(payload: dict, existing_record: AttendanceRecord | None = None) -> AttendanceRecord:
     required_fields = ["studentId", "moduleId", "weekNumber"]
@@ -437,18 +516,14 @@ def _parse_attendance_payload(payload: dict, existing_record: AttendanceRecord |
     return record
 
 
-def _serialize_submission(record: SubmissionRecord) -> dict:
-    return {
-        "id": record.id,
-        "studentId": record.student_id,
-        "moduleId": record.module_id,
-        "assessmentName": record.assessment_name,
-        "dueDate": record.due_date,
-        "submittedDate": record.submitted_date,
-        "isSubmitted": record.is_submitted,
-        "isLate": record.is_late,
-    }
-
+_SUBMISSION_SERIALIZER = ModelSerializer(
+    SubmissionRecord,
+    fields=(
+        "id", "student_id", "module_id", "assessment_name", "due_date", "submitted_date", "is_submitted", "is_late",
+    ),
+    rename=to_camel,
+)
+_serialize_submission = _SUBMISSION_SERIALIZER.encode
 
 def _parse_submission_payload(
     payload: dict, existing_record: SubmissionRecord | None = None
@@ -470,18 +545,14 @@ def _parse_submission_payload(
     return record
 
 
-def _serialize_survey(record: SurveyResponse) -> dict:
-    return {
-        "id": record.id,
-        "studentId": record.student_id,
-        "moduleId": record.module_id,
-        "weekNumber": record.week_number,
-        "stressLevel": record.stress_level,
-        "hoursSlept": record.hours_slept,
-        "moodComment": record.mood_comment,
-        "createdAt": record.created_at,
-    }
-
+_SURVEY_SERIALIZER = ModelSerializer(
+    SurveyResponse,
+    fields=(
+        "id", "student_id", "module_id", "week_number", "stress_level", "hours_slept", "mood_comment", "created_at",
+    ),
+    rename=to_camel,
+)
+_serialize_survey = _SURVEY_SERIALIZER.encode
 
 def _parse_survey_payload(payload: dict, existing_record: SurveyResponse | None = None) -> SurveyResponse:
     required_fields = ["studentId", "weekNumber", "stressLevel"]
@@ -501,18 +572,15 @@ def _parse_survey_payload(payload: dict, existing_record: SurveyResponse | None
     return record
 
 
-def _serialize_alert(record: Alert) -> dict:
-    return {
-        "id": record.id,
-        "studentId": record.student_id,
-        "moduleId": record.module_id,
-        "weekNumber": record.week_number,
-        "reason": record.reason,
-        "createdAt": record.created_at,
-        "resolved": record.resolved,
-        "severity": record.severity or "medium",
-    }
-
+_ALERT_SERIALIZER = ModelSerializer(
+    Alert,
+    fields=("id", "student_id", "module_id", "week_number", "reason", "created_at", "resolved"),
+    rename=to_camel,
+    computed={"severity": lambda record: record.severity or "medium"},
+    # severity 不是存储列，从数据库读出的告警都是默认值
+    computed_columns={"severity": lambda columns, n: ["medium"] * n},
+)
+_serialize_alert = _ALERT_SERIALIZER.encode
 
 def _parse_alert_payload(payload: dict, existing_alert: Alert | None = None) -> Alert:
     required_fields = ["studentId", "reason"]
@@ -532,12 +600,33 @@ def _parse_alert_payload(payload: dict, existing_alert: Alert | None = None) ->
     return record
 
 
+def _parse_grade_payload(payload: dict, existing_record: Grade | None = None) -> Grade:
+    required_fields = ["studentId", "moduleId", "assessmentName"]
+    if existing_record is None:
+        missing = [f for f in required_fields if payload.get(f) in (None, "")]
+        if missing:
+            abort(400, description=f"Missing required fields: {', '.join(missing)}")
+
+    record = existing_record or Grade()
+    record.student_id = _require_int(payload.get("studentId"), "studentId", record.student_id)
+    record.module_id = _require_int(payload.get("moduleId"), "moduleId", record.module_id)
+    record.assessment_name = payload.get("assessmentName", record.assessment_name)
+    record.grade = _optional_float(payload.get("grade"), record.grade)
+    return record
+
+
+def _update_and_fetch(repo, record):
+    """在同一个写任务里更新并重新读出该行：响应只包含实际存储的列（例如 alert 的 severity 是计算值）。"""
+    repo.update(record)
+    return repo.get_by_id(record.id)
+
+
 def _require_int(value, field_name: str, fallback=None) -> int:
     if value is None and fallback is not None:
         return fallback
     try:
         return int(value)
-    except (TypeError, ValueError):
+    except (TypeError, ValueError, OverflowError):
         abort(400, description=f"{field_name} must be an integer")
 
 
@@ -546,7 +635,7 @@ def _optional_int(value, fallback=None):
         return fallback
     try:
         return int(value)
-    except (TypeError, ValueError):
+    except (TypeError, ValueError, OverflowError):
         abort(400, description="Expected integer value")
 
 
@@ -555,5 +644,5 @@ def _optional_float(value, fallback=None):
         return fallback
     try:
         return float(value)
-    except (TypeError, ValueError):
+    except (TypeError, ValueError, OverflowError):
         abort(400, description="Expected numeric value")
@@ -0,0 +1,161 @@
+import gzip
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from flask import Flask, Response, current_app, request
+
+from utils.table_version_util import ResultCache
+
+try:  # 可选依赖：安装后才提供对应的编码
+    import brotli
+except ImportError:  # pragma: no cover - 取决于环境
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 取决于环境
+    zstandard = None
+
+
+"""
+响应压缩（after_request，作用于序列化完成后的响应体）：
+
+- 按请求的 Accept-Encoding 协商编码：q 值最高者优先，q 相同时按 COMPRESS_ALGORITHMS 的顺序；
+  gzip 总是可用，br / zstd 需要安装 brotli / zstandard
+- 只压缩 COMPRESS_MIMETYPES 中的类型、状态码 200 的响应；小于 COMPRESS_MIN_SIZE 字节的响应原样返回
+  （压缩收益小于开销）；各编码的压缩级别见 COMPRESS_LEVELS
+- 流式响应（?stream=1）逐段压缩，每段之后 flush，客户端仍能边收边解析
+- 可压缩的响应都带 Vary: Accept-Encoding；压缩后的 ETag 加上编码后缀（"<etag>-gz"），
+  同一资源的不同编码不会共用一个强 ETag；app/conditional.py 在比较 If-None-Match 时认得这些后缀
+- 带 ETag 的响应（conditional_get 的列表 / 分析接口）的压缩结果按 (ETag, 编码) 缓存在
+  app.extensions["compressed_cache"]（LRU，COMPRESS_CACHE_SIZE 条）：ETag 已经包含请求参数与表版本，
+  数据不变时热点响应不必每次重新压缩；表写入后 ETag 改变，旧条目自然不再命中并被淘汰
+"""
+
+
+def _gzip_stream(level: int) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return (lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+
+def _brotli_stream(level: int) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    compressor = brotli.Compressor(quality=level)
+    return (lambda chunk: compressor.process(chunk) + compressor.flush()), compressor.finish
+
+
+def _zstd_stream(level: int) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    return (
+        (lambda chunk: compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)),
+        compressor.flush,
+    )
+
+
+# 编码名 -> (一次性压缩, 流式压缩器工厂, ETag 后缀)
+CODECS: Dict[str, tuple] = {
+    "gzip": (lambda data, level: gzip.compress(data, compresslevel=level, mtime=0), _gzip_stream, "gz"),
+}
+if brotli is not None:
+    CODECS["br"] = (lambda data, level: brotli.compress(data, quality=level), _brotli_stream, "br")
+if zstandard is not None:
+    CODECS["zstd"] = (lambda data, level: zstandard.ZstdCompressor(level=level).compress(data), _zstd_stream, "zst")
+
+DEFAULT_LEVELS = {"gzip": 6, "br": 4, "zstd": 3}
+
+
+def encoded_etags(etag: str) -> List[str]:
+    """etag 及其各编码版本（压缩响应实际发出的 ETag），用于比较 If-None-Match。"""
+    return [etag] + [f"{etag}-{codec[2]}" for codec in CODECS.values()]
+
+
+def negotiate(accept_encodings, algorithms: Iterable[str]) -> Optional[str]:
+    """在服务端启用且可用的编码中选出客户端最想要的一个；都不接受时返回 None（不压缩）。"""
+    best, best_q = None, 0
+    for name in algorithms:
+        if name not in CODECS:
+            continue
+        q = accept_encodings[name]
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def _algorithms(app: Flask) -> List[str]:
+    configured = app.config.get("COMPRESS_ALGORITHMS", "gzip")
+    if isinstance(configured, str):
+        configured = configured.split(",")
+    return [name.strip() for name in configured if name.strip()]
+
+
+def _level(app: Flask, coding: str) -> int:
+    return {**DEFAULT_LEVELS, **(app.config.get("COMPRESS_LEVELS") or {})}[coding]
+
+
+def _compress_stream(original, chunks: Iterator[bytes], compress_chunk, finish) -> Iterator[bytes]:
+    try:
+        for chunk in chunks:
+            out = compress_chunk(chunk)
+            if out:
+                yield out
+        yield finish()
+    finally:
+        # 客户端中途断开时也要关闭原始生成器（stream_with_context 在那里归还数据库连接）
+        close = getattr(original, "close", None)
+        if close is not None:
+            close()
+
+
+def compress_response(response: Response) -> Response:
+    app = current_app
+    if response.status_code == 304:
+        # 304 与它所验证的 200 响应带相同的 Vary
+        response.vary.add("Accept-Encoding")
+        return response
+    if response.status_code != 200 or response.mimetype not in app.config.get("COMPRESS_MIMETYPES", ()):
+        return response
+    if "Content-Encoding" in response.headers or response.direct_passthrough:
+        return response
+    response.vary.add("Accept-Encoding")
+
+    coding = negotiate(request.accept_encodings, _algorithms(app))
+    if coding is None:
+        return response
+    compress, stream_factory, suffix = CODECS[coding]
+    level = _level(app, coding)
+    etag, weak = response.get_etag()
+
+    if response.is_streamed:
+        original = response.response
+        response.response = _compress_stream(original, response.iter_encoded(), *stream_factory(level))
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < app.config.get("COMPRESS_MIN_SIZE", 1024):
+            return response
+        cache = get_compressed_cache(app)
+        key = (etag, coding)
+        hit, compressed = cache.get(key, ()) if etag else (False, None)
+        if not hit:
+            compressed = compress(data, level)
+            if etag:
+                cache.put(key, (), compressed)
+        if len(compressed) >= len(data):
+            return response
+        response.set_data(compressed)
+
+    response.headers["Content-Encoding"] = coding
+    if etag:
+        response.set_etag(f"{etag}-{suffix}", weak=weak)
+    return response
+
+
+def get_compressed_cache(app: Flask | None = None) -> ResultCache:
+    return (app or current_app).extensions["compressed_cache"]
+
+
+def init_app(app: Flask) -> None:
+    unknown = [name for name in _algorithms(app) if name not in ("gzip", "br", "zstd")]
+    if unknown:
+        raise ValueError(f"Unknown COMPRESS_ALGORITHMS {unknown!r}")
+    app.extensions["compressed_cache"] = ResultCache(maxsize=app.config.get("COMPRESS_CACHE_SIZE", 64))
+    app.after_request(compress_response)
@@ -0,0 +1,80 @@
+import functools
+import hashlib
+from datetime import datetime, timezone
+from typing import Callable, Sequence, Tuple
+
+from flask import Response, make_response, request
+
+from app.compression import encoded_etags
+from app.db import get_db
+from utils.table_version_util import table_versions
+
+
+"""
+HTTP 条件请求（ETag / Last-Modified）：
+
+- 视图用 @conditional_get("表名", ...) 声明它读取哪些表
+- 表的版本 = 进程内变更计数器（Repository 写入时递增，见 utils/table_version_util.py）
+  + 各表当前的 MAX(rowid)（一次主键查找，能发现其他进程新插入的行，例如重新导入示例数据）
+- ETag = 进程 epoch + hash(请求路径与参数, 表版本)；客户端带 If-None-Match 且匹配时直接返回 304，
+  不执行视图（不查询、不序列化）
+- 只按 ETag 判断是否返回 304：Last-Modified 只反映表的最后写入时间，不包含请求参数，
+  也看不到其他进程的写入，所以单独的 If-Modified-Since 不会得到 304（响应照常带 Last-Modified 供参考）
+- 视图的响应必须只由请求参数与表数据决定（例如抽样接口默认使用固定种子），否则同一个 ETag 会对应不同的响应体
+- 只给 200 响应加 ETag；Cache-Control: private, no-cache 让浏览器每次都带上 If-None-Match 重新验证，
+  前端不需要改动
+- 压缩后的响应 ETag 带编码后缀（见 app/compression.py），比较 If-None-Match 时这些变体同样有效，
+  304 响应回传客户端手里的那一个
+
+限制：计数器只在当前进程内可见；多进程部署时其他进程的 UPDATE / DELETE 不会改变本进程的 ETag。
+"""
+
+
+def _max_rowids(tables: Sequence[str]) -> Tuple:
+    # 表名来自代码中的常量，不来自请求参数
+    sql = "SELECT " + ", ".join(f"(SELECT MAX(rowid) FROM {table})" for table in tables) + ";"
+    return tuple(get_db().execute(sql).fetchone())
+
+
+def current_etag(tables: Sequence[str]) -> str:
+    """当前请求（路径 + 查询参数）在这些表的当前版本下的 ETag（不带引号）。"""
+    state = f"{request.full_path}|{table_versions.snapshot(tables)}|{_max_rowids(tables)}"
+    digest = hashlib.sha1(state.encode("utf-8")).hexdigest()[:20]
+    return f"{table_versions.epoch}-{digest}"
+
+
+def _not_modified(etag: str):
+    """客户端的 If-None-Match 仍然有效时返回应回传的 ETag（客户端持有的编码变体），否则返回 None。"""
+    if request.if_none_match:
+        for candidate in encoded_etags(etag):
+            if request.if_none_match.contains_weak(candidate):
+                return candidate
+    return None
+
+
+def conditional_get(*tables: str) -> Callable:
+    """视图装饰器：为 GET 响应加上 ETag / Last-Modified，并在客户端缓存仍然有效时返回 304。"""
+
+    def decorator(view: Callable) -> Callable:
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # 先取版本再执行视图：执行期间发生的写入只会让下一次验证失败，不会得到过期的 304
+            etag = current_etag(tables)
+            last_modified = datetime.fromtimestamp(int(table_versions.last_modified(tables)), tz=timezone.utc)
+
+            matched = _not_modified(etag)
+            if matched is not None:
+                etag = matched
+                resp = Response(status=304)
+            else:
+                resp = make_response(view(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+            resp.set_etag(etag)
+            resp.last_modified = last_modified
+            resp.headers["Cache-Control"] = "private, no-cache"
+            return resp
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,100 @@
+import os
+import sqlite3
+from typing import Any, Callable
+
+from flask import Flask, current_app, g
+
+from utils.db_connect_util import ConnectionPool, WriteQueue
+from utils.table_version_util import ResultCache
+
+
+"""
+应用级数据库连接：
+- create_app 时调用 init_app(app)，为应用创建一个连接池（存放在 app.extensions["db_pool"]）
+- 请求内通过 get_db() 拿到连接；同一个应用上下文内多次调用返回同一个连接
+- 应用上下文结束（teardown_appcontext）时自动把连接归还给连接池
+- 写操作通过 run_write(fn) 交给单写线程（WriteQueue）串行执行并合并提交；
+  读操作继续使用连接池，WAL 模式下读写可以并发
+- 分析接口的结果缓存（app.extensions["result_cache"]）按表版本失效，见 utils/table_version_util.py
+"""
+
+
+def resolve_db_path(app: Flask) -> str:
+    """
+    Resolve the sqlite database path from the DATABASE env or app config.
+    Supports values like sqlite:////absolute/path/to/db.sqlite3.
+    """
+    db_url = os.environ.get("DATABASE") or app.config.get("DATABASE", "")
+
+    # sqlite:///absolute/path -> absolute/path
+    if db_url.startswith("sqlite:///"):
+        return db_url.replace("sqlite:///", "", 1)
+    if db_url:
+        return db_url
+
+    # Fallbacks: prefer dev DB if present, otherwise data.db in repo root
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    dev_db = os.path.join(repo_root, "db_dev.sqlite3")
+    if os.path.exists(dev_db):
+        return dev_db
+    return os.path.join(repo_root, "data.db")
+
+
+def init_app(app: Flask) -> None:
+    """创建连接池与写队列并注册 teardown；连接与写线程都在第一次使用时才真正建立。"""
+    db_path = resolve_db_path(app)
+    app.extensions["db_pool"] = ConnectionPool(
+        db_path,
+        size=app.config.get("DB_POOL_SIZE", 5),
+        timeout=app.config.get("DB_POOL_TIMEOUT", 5.0),
+        pragmas=app.config.get("DB_PRAGMAS"),
+    )
+    app.extensions["db_writer"] = WriteQueue(
+        db_path,
+        pragmas=app.config.get("DB_PRAGMAS"),
+        max_batch=app.config.get("DB_WRITE_BATCH_SIZE", 64),
+        timeout=app.config.get("DB_POOL_TIMEOUT", 5.0),
+    )
+    app.extensions["result_cache"] = ResultCache(maxsize=app.config.get("ANALYSIS_CACHE_SIZE", 256))
+    app.teardown_appcontext(_release_db)
+
+
+def get_pool(app: Flask | None = None) -> ConnectionPool:
+    return (app or current_app).extensions["db_pool"]
+
+
+def get_writer(app: Flask | None = None) -> WriteQueue:
+    return (app or current_app).extensions["db_writer"]
+
+
+def get_result_cache(app: Flask | None = None) -> ResultCache:
+    return (app or current_app).extensions["result_cache"]
+
+
+def run_write(fn: Callable[[Any], Any]) -> Any:
+    """
+    在单写线程中执行 fn(conn) 并等待提交完成，返回 fn 的返回值。
+    fn 内部调用 conn.commit() 是安全的（为空操作，由写线程统一提交）。
+    """
+    return get_writer().run(fn)
+
+
+def db_stats() -> dict:
+    return {
+        "pool": get_pool().stats(),
+        "writer": get_writer().stats(),
+        "result_cache": get_result_cache().stats(),
+    }
+
+
+def get_db() -> sqlite3.Connection:
+    """返回当前应用上下文绑定的连接（首次调用时从连接池借出）。"""
+    if "db_conn" not in g:
+        g.db_conn = get_pool().acquire()
+    return g.db_conn
+
+
+def _release_db(exc=None) -> None:
+    conn = g.pop("db_conn", None)
+    if conn is not None:
+        get_pool().release(conn)
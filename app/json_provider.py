@@ -0,0 +1,55 @@
+import dataclasses
+from typing import Any
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from utils.serializer_util import JSON_BACKEND, orjson, serializer_for
+
+
+"""
+应用的 JSON provider（jsonify 使用）：
+- dataclass 用 utils/serializer_util 中按模型类编译的序列化器转换，不再走 dataclasses.asdict 的递归深拷贝
+- JSON_BACKEND 配置为 "orjson"（或 "auto" 且已安装 orjson）时用 orjson 编码，
+  同样排序键、紧凑输出；debug 模式的缩进输出仍交给标准库 json
+"""
+
+
+def _default(obj: Any) -> Any:
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return serializer_for(type(obj)).encode(obj)
+    return DefaultJSONProvider.default(obj)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+
+    def __init__(self, app: Flask, backend: str = "json"):
+        super().__init__(app)
+        self.backend = backend
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # 只有 response() 的紧凑输出（separators）可以直接换成 orjson，其余参数保持标准库的语义
+        if self.backend == "orjson" and set(kwargs) <= {"separators"}:
+            return orjson.dumps(
+                obj,
+                default=self.default,
+                option=(
+                    orjson.OPT_SORT_KEYS
+                    | orjson.OPT_NON_STR_KEYS
+                    | orjson.OPT_PASSTHROUGH_DATACLASS
+                    | orjson.OPT_PASSTHROUGH_DATETIME
+                ),
+            ).decode("utf-8")
+        return super().dumps(obj, **kwargs)
+
+
+def init_app(app: Flask) -> None:
+    backend = app.config.get("JSON_BACKEND", "auto")
+    if backend == "auto":
+        backend = JSON_BACKEND
+    if backend == "orjson" and orjson is None:
+        raise RuntimeError("JSON_BACKEND=orjson but orjson is not installed")
+    if backend not in {"json", "orjson"}:
+        raise ValueError(f"Unknown JSON_BACKEND {backend!r}")
+    app.json = FastJSONProvider(app, backend=backend)
@@ -8,7 +8,7 @@ from app.models.BaseModel import BaseModel
 # =========================================================
 # 11. Alert（继承 BaseModel）
 # =========================================================
-@dataclass
+@dataclass(slots=True)
 class Alert(BaseModel):
     student_id: int = 0
     module_id: Optional[int] = None
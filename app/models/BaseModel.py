@@ -6,11 +6,13 @@ from typing import Optional
 # =========================================================
 # 1. 抽象父类：所有模型共享的基础字段
 # =========================================================
-@dataclass
+@dataclass(slots=True)
 class BaseModel(ABC):
     """
     所有模型类的父类。
     展示 OOP 的继承结构。
+    所有模型都用 slots=True：实例没有 __dict__，批量读取时内存占用和创建开销都更小；
+    代价是不能给实例临时添加字段之外的属性。
     """
     id: Optional[int] = None
     created_at: Optional[str] = None  # ISO8601 时间戳，可选
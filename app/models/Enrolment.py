@@ -8,7 +8,7 @@ from app.models.BaseModel import BaseModel
 # =========================================================
 # 6. Enrolment（继承 BaseModel）
 # =========================================================
-@dataclass
+@dataclass(slots=True)
 class Enrolment(BaseModel):
     student_id: int = 0
     module_id: int = 0
@@ -8,7 +8,7 @@ from app.models.BaseModel import BaseModel
 # =========================================================
 # 10. Grade（继承 BaseModel）
 # =========================================================
-@dataclass
+@dataclass(slots=True)
 class Grade(BaseModel):
     student_id: int = 0
     module_id: int = 0
@@ -8,7 +8,7 @@ from app.models.BaseModel import BaseModel
 # =========================================================
 # 5. Module（继承 BaseModel）
 # =========================================================
-@dataclass
+@dataclass(slots=True)
 class Module(BaseModel):
     module_code: str = ""
     module_title: str = ""
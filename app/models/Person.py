@@ -5,7 +5,7 @@ from typing import Optional
 from app.models.BaseModel import BaseModel
 
 
-@dataclass
+@dataclass(slots=True)
 class Person(BaseModel, ABC):
     """
     抽象类：表示具有姓名和邮件属性的所有“人”类。
@@ -8,7 +8,7 @@ from app.models.BaseModel import BaseModel
 # =========================================================
 # StressEvent（单次高压力事件）
 # =========================================================
-@dataclass
+@dataclass(slots=True)
 class StressEvent(BaseModel):
     """
     对应表：stress_events
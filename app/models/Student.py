@@ -8,7 +8,7 @@ from app.models.Person import Person
 # =========================================================
 # 4. Student（继承 Person）
 # =========================================================
-@dataclass
+@dataclass(slots=True)
 class Student(Person):
     """
     对应 students 表
@@ -8,7 +8,7 @@ from app.models.BaseModel import BaseModel
 # =========================================================
 # 8. SubmissionRecord（继承 BaseModel）
 # =========================================================
-@dataclass
+@dataclass(slots=True)
 class SubmissionRecord(BaseModel):
     student_id: int = 0
     module_id: int = 0
@@ -8,7 +8,7 @@ from app.models.BaseModel import BaseModel
 # =========================================================
 # 9. SurveyResponse（继承 BaseModel）
 # =========================================================
-@dataclass
+@dataclass(slots=True)
 class SurveyResponse(BaseModel):
     student_id: int = 0
     module_id: Optional[int] = None
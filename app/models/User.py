@@ -9,7 +9,7 @@ from app.models.Person import Person
 
 Role = Literal["admin", "course_director", "wellbeing_officer"]
 
-@dataclass
+@dataclass(slots=True)
 class User(Person):
     """
     对应 users 表
@@ -9,6 +9,7 @@ from ..models.Alert import Alert
 # =========================================================
 class AlertRepository(BaseRepository):
     TABLE_NAME = "alerts"
+    MODEL = Alert
     ALLOWED_FILTERS = {
         "id",
         "student_id",
@@ -19,6 +20,27 @@ class AlertRepository(BaseRepository):
         "resolved",
         "is_active",
     }
+    SORTABLE_FIELDS = {"student_id", "module_id", "week_number", "created_at"}
+    WRITE_COLUMNS = (
+        "student_id",
+        "module_id",
+        "week_number",
+        "reason",
+        "created_at",
+        "resolved",
+        "is_active",
+    )
+
+    def _to_row(self, alert: Alert) -> tuple:
+        return (
+            alert.student_id,
+            alert.module_id,
+            alert.week_number,
+            alert.reason,
+            alert.created_at,
+            1 if alert.resolved else 0,
+            1 if alert.is_active else 0,
+        )
 
     def add(self, alert: Alert) -> Alert:
         try:
@@ -31,17 +53,9 @@ class AlertRepository(BaseRepository):
                 )
                 VALUES (?, ?, ?, ?, ?, ?, ?);
                 """,
-                (
-                    alert.student_id,
-                    alert.module_id,
-                    alert.week_number,
-                    alert.reason,
-                    alert.created_at,
-                    1 if alert.resolved else 0,
-                    1 if alert.is_active else 0,
-                ),
+                self._to_row(alert),
             )
-            self.conn.commit()
+            self._commit()
             alert.id = cursor.lastrowid
             return alert
         except sqlite3.Error as e:
@@ -62,16 +76,7 @@ class AlertRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return Alert(
-                id=row[0],
-                student_id=row[1],
-                module_id=row[2],
-                week_number=row[3],
-                reason=row[4],
-                created_at=row[5],
-                resolved=bool(row[6]),
-                is_active=bool(row[7]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database fetch failed (AlertRepository.get_by_id): {e}")
 
@@ -90,44 +95,25 @@ class AlertRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return Alert(
-                id=row[0],
-                student_id=row[1],
-                module_id=row[2],
-                week_number=row[3],
-                reason=row[4],
-                created_at=row[5],
-                resolved=bool(row[6]),
-                is_active=bool(row[7]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_one failed: {e}")
 
-    def find_all(self, **filters) -> List[Alert]:
+    def find_all(self, order_by=None, limit=None, offset=None, **filters) -> List[Alert]:
         try:
             where_sql, params = self._build_where_clause(filters, add_default_is_active=True)
+            tail_sql, tail_params = self._build_order_limit(order_by, limit, offset)
             sql = f"""
                 SELECT id, student_id, module_id, week_number,
                        reason, created_at, resolved, is_active
                 FROM {self.TABLE_NAME}
-                {where_sql};
+                {where_sql}
+                {tail_sql};
             """
             cursor = self.conn.cursor()
-            cursor.execute(sql, params)
+            cursor.execute(sql, params + tail_params)
             rows = cursor.fetchall()
-            return [
-                Alert(
-                    id=row[0],
-                    student_id=row[1],
-                    module_id=row[2],
-                    week_number=row[3],
-                    reason=row[4],
-                    created_at=row[5],
-                    resolved=bool(row[6]),
-                    is_active=bool(row[7]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_all failed: {e}")
 
@@ -152,19 +138,7 @@ class AlertRepository(BaseRepository):
                     """
                 )
             rows = cursor.fetchall()
-            return [
-                Alert(
-                    id=row[0],
-                    student_id=row[1],
-                    module_id=row[2],
-                    week_number=row[3],
-                    reason=row[4],
-                    created_at=row[5],
-                    resolved=bool(row[6]),
-                    is_active=bool(row[7]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database list_all failed: {e}")
 
@@ -181,17 +155,8 @@ class AlertRepository(BaseRepository):
                     reason = ?, created_at = ?, resolved = ?, is_active = ?
                 WHERE id = ?;
                 """,
-                (
-                    alert.student_id,
-                    alert.module_id,
-                    alert.week_number,
-                    alert.reason,
-                    alert.created_at,
-                    1 if alert.resolved else 0,
-                    1 if alert.is_active else 0,
-                    alert.id,
-                ),
+                self._to_row(alert) + (alert.id,),
             )
-            self.conn.commit()
+            self._commit()
         except sqlite3.Error as e:
             raise RuntimeError(f"Database update failed (AlertRepository.update): {e}")
\ No newline at end of file
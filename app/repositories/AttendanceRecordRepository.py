@@ -9,6 +9,7 @@ from ..models.AttendanceRecord import AttendanceRecord
 # =========================================================
 class AttendanceRecordRepository(BaseRepository):
     TABLE_NAME = "attendance_records"
+    MODEL = AttendanceRecord
     ALLOWED_FILTERS = {
         "id",
         "student_id",
@@ -19,6 +20,27 @@ class AttendanceRecordRepository(BaseRepository):
         "attendance_rate",
         "is_active",
     }
+    SORTABLE_FIELDS = {"student_id", "module_id", "week_number", "attendance_rate"}
+    WRITE_COLUMNS = (
+        "student_id",
+        "module_id",
+        "week_number",
+        "attended_sessions",
+        "total_sessions",
+        "attendance_rate",
+        "is_active",
+    )
+
+    def _to_row(self, record: AttendanceRecord) -> tuple:
+        return (
+            record.student_id,
+            record.module_id,
+            record.week_number,
+            record.attended_sessions,
+            record.total_sessions,
+            record.attendance_rate,
+            1 if record.is_active else 0,
+        )
 
     def add(self, record: AttendanceRecord) -> AttendanceRecord:
         try:
@@ -31,17 +53,9 @@ class AttendanceRecordRepository(BaseRepository):
                 )
                 VALUES (?, ?, ?, ?, ?, ?, ?);
                 """,
-                (
-                    record.student_id,
-                    record.module_id,
-                    record.week_number,
-                    record.attended_sessions,
-                    record.total_sessions,
-                    record.attendance_rate,
-                    1 if record.is_active else 0,
-                ),
+                self._to_row(record),
             )
-            self.conn.commit()
+            self._commit()
             record.id = cursor.lastrowid
             return record
         except sqlite3.Error as e:
@@ -62,16 +76,7 @@ class AttendanceRecordRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return AttendanceRecord(
-                id=row[0],
-                student_id=row[1],
-                module_id=row[2],
-                week_number=row[3],
-                attended_sessions=row[4],
-                total_sessions=row[5],
-                attendance_rate=row[6],
-                is_active=bool(row[7]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database fetch failed (Attendance.get_by_id): {e}")
 
@@ -90,44 +95,25 @@ class AttendanceRecordRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return AttendanceRecord(
-                id=row[0],
-                student_id=row[1],
-                module_id=row[2],
-                week_number=row[3],
-                attended_sessions=row[4],
-                total_sessions=row[5],
-                attendance_rate=row[6],
-                is_active=bool(row[7]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_one failed: {e}")
 
-    def find_all(self, **filters) -> List[AttendanceRecord]:
+    def find_all(self, order_by=None, limit=None, offset=None, **filters) -> List[AttendanceRecord]:
         try:
             where_sql, params = self._build_where_clause(filters, add_default_is_active=True)
+            tail_sql, tail_params = self._build_order_limit(order_by, limit, offset)
             sql = f"""
                 SELECT id, student_id, module_id, week_number,
                        attended_sessions, total_sessions, attendance_rate, is_active
                 FROM {self.TABLE_NAME}
-                {where_sql};
+                {where_sql}
+                {tail_sql};
             """
             cursor = self.conn.cursor()
-            cursor.execute(sql, params)
+            cursor.execute(sql, params + tail_params)
             rows = cursor.fetchall()
-            return [
-                AttendanceRecord(
-                    id=row[0],
-                    student_id=row[1],
-                    module_id=row[2],
-                    week_number=row[3],
-                    attended_sessions=row[4],
-                    total_sessions=row[5],
-                    attendance_rate=row[6],
-                    is_active=bool(row[7]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_all failed: {e}")
 
@@ -152,19 +138,7 @@ class AttendanceRecordRepository(BaseRepository):
                     """
                 )
             rows = cursor.fetchall()
-            return [
-                AttendanceRecord(
-                    id=row[0],
-                    student_id=row[1],
-                    module_id=row[2],
-                    week_number=row[3],
-                    attended_sessions=row[4],
-                    total_sessions=row[5],
-                    attendance_rate=row[6],
-                    is_active=bool(row[7]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database list_all failed: {e}")
 
@@ -181,17 +155,8 @@ class AttendanceRecordRepository(BaseRepository):
                     attended_sessions = ?, total_sessions = ?, attendance_rate = ?, is_active = ?
                 WHERE id = ?;
                 """,
-                (
-                    record.student_id,
-                    record.module_id,
-                    record.week_number,
-                    record.attended_sessions,
-                    record.total_sessions,
-                    record.attendance_rate,
-                    1 if record.is_active else 0,
-                    record.id,
-                ),
+                self._to_row(record) + (record.id,),
             )
-            self.conn.commit()
+            self._commit()
         except sqlite3.Error as e:
             raise RuntimeError(f"Database update failed (Attendance.update): {e}")
\ No newline at end of file
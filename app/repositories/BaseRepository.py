@@ -1,5 +1,56 @@
+import dataclasses
 import sqlite3
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Callable, Sequence
+
+from utils.table_version_util import notify_write
+
+
+@dataclass
+class BulkWriteResult:
+    """
+    批量写入的结果：
+    - ids：成功写入的记录 id（按输入顺序；失败的行不在其中）
+    - failures：失败的行，[{"index": 输入中的下标, "error": "..."}]
+    """
+    ids: List[int] = field(default_factory=list)
+    failures: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+
+@dataclass
+class Page:
+    """
+    一页查询结果（keyset 分页）：
+    - items：本页的模型列表（list_page(raw=True) 时为原始元组 (id, *WRITE_COLUMNS)）
+    - next_key：下一页的起点 (排序列的值, id)；None 表示已经是最后一页
+    """
+    items: List[Any] = field(default_factory=list)
+    next_key: Optional[tuple] = None
+
+
+def build_row_mapper(model: type, columns: Sequence[str]) -> Callable[[tuple], Any]:
+    """
+    根据模型的字段元数据生成 “一行 -> 模型” 的函数，等价于手写的
+    Model(id=row[0], student_id=row[1], ..., is_active=bool(row[7]))。
+    源码只在定义 Repository 时生成并编译一次，之后每行只是一次普通函数调用。
+    类型为 bool 的字段用 bool() 转换（SQLite 中存的是 0/1）。
+    """
+    field_types = {f.name: f.type for f in dataclasses.fields(model)}
+    args: List[str] = []
+    for i, column in enumerate(columns):
+        if column not in field_types:
+            raise ValueError(f"{model.__name__} has no field for column {column}")
+        value = f"row[{i}]"
+        args.append(f"{column}=bool({value})" if field_types[column] is bool else f"{column}={value}")
+
+    source = f"def _from_row(row):\n    return Model({', '.join(args)})\n"
+    namespace: Dict[str, Any] = {"Model": model}
+    exec(source, namespace)
+    return namespace["_from_row"]
 
 
 class BaseRepository:
@@ -7,15 +58,35 @@ class BaseRepository:
     所有 Repository 的父类，封装：
     - 逻辑删除 soft_delete
     - 物理删除 hard_delete
-    - 通用 WHERE 过滤构造 _build_where_clause
+    - 批量写入 add_many / update_many / soft_delete_many（一个事务 + executemany）
+    - 分页查询 list_page（按 (排序列, id) 做 keyset 分页）与流式遍历 iter_page（fetchmany）
+    - 惰性遍历 iter_all / iter_where（fetchmany 分批，yield 模型或原始元组）
+    - 按主键批量读取 get_many，以及不构造模型的 count / exists
+    - 通用 WHERE 过滤构造 _build_where_clause（等值、IN、范围、NULL 判断）与 ORDER BY / LIMIT / OFFSET 构造
     """
 
     TABLE_NAME: str = ""
     ALLOWED_FILTERS: set[str] = set()
+    # add / update 写入的列（不含 id），顺序与子类 _to_row 返回的元组一致
+    WRITE_COLUMNS: tuple = ()
+    # list_page 允许排序的列（id 总是允许）
+    SORTABLE_FIELDS: set[str] = set()
+    # 对应的模型类；子类设置后按 ("id",) + WRITE_COLUMNS 自动生成 _from_row
+    MODEL: Optional[type] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.MODEL is not None and "_from_row" not in cls.__dict__:
+            cls._from_row = staticmethod(build_row_mapper(cls.MODEL, ("id",) + cls.WRITE_COLUMNS))
 
     def __init__(self, conn: sqlite3.Connection):
         self.conn = conn
 
+    def _commit(self) -> None:
+        """提交写入，并递增本表的变更计数（分析结果缓存据此失效，见 utils/table_version_util.py）。"""
+        self.conn.commit()
+        notify_write(self.conn, self.TABLE_NAME)
+
     def soft_delete(self, record_id: int) -> None:
         """
         逻辑删除：is_active = 0
@@ -26,7 +97,7 @@ class BaseRepository:
                 f"UPDATE {self.TABLE_NAME} SET is_active = 0 WHERE id = ?;",
                 (record_id,),
             )
-            self.conn.commit()
+            self._commit()
         except sqlite3.Error as e:
             raise RuntimeError(f"Database soft_delete failed ({self.TABLE_NAME}): {e}")
 
@@ -40,10 +111,373 @@ class BaseRepository:
                 f"DELETE FROM {self.TABLE_NAME} WHERE id = ?;",
                 (record_id,),
             )
-            self.conn.commit()
+            self._commit()
         except sqlite3.Error as e:
             raise RuntimeError(f"Database hard_delete failed ({self.TABLE_NAME}): {e}")
 
+    def _to_row(self, model) -> tuple:
+        """把模型转换为与 WRITE_COLUMNS 对应的参数元组，由子类实现。"""
+        raise NotImplementedError
+
+    def _from_row(self, row):
+        """把 SELECT id, *WRITE_COLUMNS 的一行转换为模型；设置了 MODEL 的子类会自动生成（见 build_row_mapper）。"""
+        raise NotImplementedError
+
+    # ------------------------------------------------------------------
+    # 按主键批量读取 / 计数
+    # ------------------------------------------------------------------
+    def get_many(self, ids: Iterable[int]) -> Dict[int, Any]:
+        """
+        一次性按 id 批量读取（与 get_by_id 一样不过滤 is_active），代替循环调用 get_by_id。
+        - 按 SQLite 的绑定变量上限分块执行 WHERE id IN (...)
+        - 返回 {id: 模型}，顺序与输入一致（重复的 id 只保留一次），不存在的 id 不出现在结果中
+        """
+        ordered = list(dict.fromkeys(ids))
+        if not ordered:
+            return {}
+
+        columns = ", ".join(("id",) + self.WRITE_COLUMNS)
+        found: Dict[int, Any] = {}
+        chunk = self._max_variables()
+        try:
+            cursor = self.conn.cursor()
+            for start in range(0, len(ordered), chunk):
+                part = ordered[start:start + chunk]
+                placeholders = ", ".join(["?"] * len(part))
+                cursor.execute(
+                    f"SELECT {columns} FROM {self.TABLE_NAME} WHERE id IN ({placeholders});",
+                    part,
+                )
+                for row in cursor.fetchall():
+                    found[row[0]] = self._from_row(row)
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Database get_many failed ({self.TABLE_NAME}): {e}")
+
+        return {record_id: found[record_id] for record_id in ordered if record_id in found}
+
+    def count(self, **filters) -> int:
+        """按过滤条件计数（写法同 find_all，默认只统计 is_active = 1），不构造模型。"""
+        where_sql, params = self._build_where_clause(filters, add_default_is_active=True)
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM {self.TABLE_NAME} {where_sql};", params)
+            return cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Database count failed ({self.TABLE_NAME}): {e}")
+
+    def exists(self, **filters) -> bool:
+        """是否存在满足条件的记录（默认只看 is_active = 1）；找到第一行即停止。"""
+        where_sql, params = self._build_where_clause(filters, add_default_is_active=True)
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(f"SELECT 1 FROM {self.TABLE_NAME} {where_sql} LIMIT 1;", params)
+            return cursor.fetchone() is not None
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Database exists failed ({self.TABLE_NAME}): {e}")
+
+    def _max_variables(self) -> int:
+        """当前连接允许的绑定变量个数（SQLITE_LIMIT_VARIABLE_NUMBER）；拿不到时按旧版默认值 999。"""
+        try:
+            return self.conn.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+        except (AttributeError, sqlite3.Error):
+            return 999
+
+    # ------------------------------------------------------------------
+    # 分页查询
+    # ------------------------------------------------------------------
+    def list_page(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[tuple] = None,
+        sort: str = "id",
+        descending: bool = False,
+        include_inactive: bool = False,
+        filters: Optional[Dict[str, Any]] = None,
+        raw: bool = False,
+    ) -> Page:
+        """
+        keyset 分页：按 (sort, id) 排序，从 after=(排序列的值, id) 之后开始取 limit 条。
+        limit 为 None 时返回剩余的全部记录。
+        filters 与 find_all 的过滤条件写法相同（见 _build_where_clause）。
+        raw=True 时 items 为原始元组 (id, *WRITE_COLUMNS)，不构造模型（列式输出用）。
+        与 OFFSET 不同，翻到第 N 页不需要先扫描前面 N-1 页，每页耗时与表大小无关
+        （按 id 排序时直接走主键；其他列需要排序，LIMIT 下只保留前 limit 条）。
+        """
+        # 多取一条，用来判断是否还有下一页
+        sql, params = self._page_query(
+            None if limit is None else limit + 1, after, sort, descending, include_inactive, filters
+        )
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Database list_page failed ({self.TABLE_NAME}): {e}")
+
+        next_key = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            sort_value = last[0] if sort == "id" else last[1 + self.WRITE_COLUMNS.index(sort)]
+            next_key = (sort_value, last[0])
+        return Page(items=rows if raw else list(map(self._from_row, rows)), next_key=next_key)
+
+    def iter_page(
+        self,
+        after: Optional[tuple] = None,
+        sort: str = "id",
+        descending: bool = False,
+        include_inactive: bool = False,
+        batch_size: int = 500,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Any]:
+        """
+        list_page 的流式版本：同样的排序与起点，但用 fetchmany 每次只取 batch_size 行，
+        逐个 yield 模型，内存占用与表大小无关。
+        """
+        sql, params = self._page_query(None, after, sort, descending, include_inactive, filters)
+        for row in self._iter_rows(sql, params, batch_size):
+            yield self._from_row(row)
+
+    # ------------------------------------------------------------------
+    # 惰性遍历（生成器）
+    # ------------------------------------------------------------------
+    def iter_all(
+        self,
+        chunk_size: int = 500,
+        include_inactive: bool = False,
+        raw: bool = False,
+    ) -> Iterator[Any]:
+        """
+        list_all 的惰性版本：按 id 顺序每次 fetchmany(chunk_size) 行，逐个 yield。
+        raw=True 时直接 yield 原始元组 (id, *WRITE_COLUMNS)，省掉构造模型的开销。
+        """
+        return self.iter_where(chunk_size=chunk_size, raw=raw, include_inactive=include_inactive)
+
+    def iter_where(
+        self,
+        chunk_size: int = 500,
+        raw: bool = False,
+        columns: Optional[Sequence[str]] = None,
+        order_by: Optional[Any] = "id",
+        include_inactive: bool = False,
+        **filters,
+    ) -> Iterator[Any]:
+        """
+        find_all 的惰性版本：过滤条件写法相同（见 _build_where_clause），结果按 order_by 排序
+        （默认 id），用 fetchmany 分批读取，内存占用不随表大小增长，消费方也不必等查询全部结束。
+        - raw=True：yield 原始元组 (id, *WRITE_COLUMNS)
+        - columns：只查询这些列并 yield 对应的元组（隐含 raw=True），适合只需要少数列的批处理
+        - include_inactive=True：不自动加 is_active = 1
+        """
+        if columns is not None:
+            for column in columns:
+                if column != "id" and column not in self.ALLOWED_FILTERS:
+                    raise ValueError(f"字段 {column} 不允许查询（表 {self.TABLE_NAME}）")
+            select_columns = tuple(columns)
+            raw = True
+        else:
+            select_columns = ("id",) + self.WRITE_COLUMNS
+
+        where_sql, params = self._build_where_clause(filters, add_default_is_active=not include_inactive)
+        tail_sql, tail_params = self._build_order_limit(order_by)
+        sql = f"SELECT {', '.join(select_columns)} FROM {self.TABLE_NAME} {where_sql} {tail_sql};"
+
+        rows = self._iter_rows(sql, params + tail_params, chunk_size)
+        return rows if raw else map(self._from_row, rows)
+
+    def _page_query(
+        self,
+        limit: Optional[int],
+        after: Optional[tuple],
+        sort: str,
+        descending: bool,
+        include_inactive: bool,
+        filters: Optional[Dict[str, Any]],
+    ) -> (str, List[Any]):
+        if sort != "id" and sort not in self.SORTABLE_FIELDS:
+            raise ValueError(f"字段 {sort} 不允许排序（表 {self.TABLE_NAME}）")
+
+        filter_sql, params = self._build_where_clause(filters or {}, add_default_is_active=not include_inactive)
+        conditions: List[str] = [filter_sql[len("WHERE "):]] if filter_sql else []
+        if after is not None:
+            keyset_sql, keyset_params = self._keyset_condition(sort, descending, after)
+            conditions.append(keyset_sql)
+            params.extend(keyset_params)
+
+        where_sql = "WHERE " + " AND ".join(conditions) if conditions else ""
+        direction = "DESC" if descending else "ASC"
+        order_sql = f"ORDER BY id {direction}" if sort == "id" else f"ORDER BY {sort} {direction}, id {direction}"
+        limit_sql = ""
+        if limit is not None:
+            limit_sql = "LIMIT ?"
+            params.append(limit)
+
+        columns = ", ".join(("id",) + self.WRITE_COLUMNS)
+        sql = f"SELECT {columns} FROM {self.TABLE_NAME} {where_sql} {order_sql} {limit_sql};"
+        return sql, params
+
+    def _iter_rows(self, sql: str, params: Any, batch_size: int) -> Iterator[tuple]:
+        """执行查询并用 fetchmany 分批取行；使用独立游标，遍历期间可以继续用 self.conn 做其他查询。"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Database iteration failed ({self.TABLE_NAME}): {e}")
+
+    @staticmethod
+    def _keyset_condition(sort: str, descending: bool, after: tuple) -> (str, List[Any]):
+        """
+        生成 “排在 after 之后” 的条件。SQLite 中 NULL 最小：升序排在最前，降序排在最后。
+        """
+        value, last_id = after
+        if sort == "id":
+            return ("id < ?" if descending else "id > ?"), [last_id]
+
+        if not descending:
+            if value is None:
+                return f"(({sort} IS NULL AND id > ?) OR {sort} IS NOT NULL)", [last_id]
+            return f"({sort} > ? OR ({sort} = ? AND id > ?))", [value, value, last_id]
+
+        if value is None:
+            return f"({sort} IS NULL AND id < ?)", [last_id]
+        return f"({sort} < ? OR {sort} IS NULL OR ({sort} = ? AND id < ?))", [value, value, last_id]
+
+    # ------------------------------------------------------------------
+    # 批量写入
+    # ------------------------------------------------------------------
+    def add_many(self, models: Iterable[Any]) -> BulkWriteResult:
+        """
+        批量插入：一个事务内 executemany，成功后为每个模型回填 id。
+        某些行失败（如唯一约束冲突）时，其余行照常写入，失败行记录在 failures 中。
+        """
+        models = list(models)
+        columns = ", ".join(self.WRITE_COLUMNS)
+        placeholders = ", ".join(["?"] * len(self.WRITE_COLUMNS))
+        sql = f"INSERT INTO {self.TABLE_NAME} ({columns}) VALUES ({placeholders});"
+
+        rows = [(idx, self._to_row(m)) for idx, m in enumerate(models)]
+        result = self._execute_bulk(sql, rows, returns_ids=True)
+        for idx, new_id in zip(result.pop("indexes"), result["ids"]):
+            models[idx].id = new_id
+        return BulkWriteResult(ids=result["ids"], failures=result["failures"])
+
+    def update_many(self, models: Iterable[Any]) -> BulkWriteResult:
+        """批量更新（按 id）；没有 id 或 id 不存在的行记为失败。"""
+        assignments = ", ".join(f"{col} = ?" for col in self.WRITE_COLUMNS)
+        sql = f"UPDATE {self.TABLE_NAME} SET {assignments} WHERE id = ?;"
+
+        rows, failures = [], []
+        for idx, m in enumerate(models):
+            if m.id is None:
+                failures.append({"index": idx, "error": "missing id"})
+            else:
+                rows.append((idx, self._to_row(m) + (m.id,)))
+        result = self._execute_bulk(sql, rows, returns_ids=False)
+        failures.extend(result["failures"])
+        failures.sort(key=lambda f: f["index"])
+        return BulkWriteResult(ids=result["ids"], failures=failures)
+
+    def soft_delete_many(self, record_ids: Iterable[int]) -> BulkWriteResult:
+        """批量逻辑删除：is_active = 0；不存在的 id 记为失败。"""
+        sql = f"UPDATE {self.TABLE_NAME} SET is_active = 0 WHERE id = ?;"
+        rows = [(idx, (rid,)) for idx, rid in enumerate(record_ids)]
+        result = self._execute_bulk(sql, rows, returns_ids=False)
+        return BulkWriteResult(ids=result["ids"], failures=result["failures"])
+
+    def _execute_bulk(self, sql: str, rows: List[tuple], returns_ids: bool) -> Dict[str, Any]:
+        """
+        rows: [(输入下标, 参数元组), ...]
+
+        快速路径：SAVEPOINT 内一次 executemany；每行都恰好影响 1 行时直接提交。
+        慢速路径：快速路径报错或影响行数不符时，回滚到 SAVEPOINT，
+                  再逐行执行（每行一个内层 SAVEPOINT），找出具体失败的行。
+        插入时 id 的获取：同一事务内连续插入 AUTOINCREMENT 表，id 是连续的，
+                  因此快速路径用 last_insert_rowid() 反推整批 id。
+        """
+        ids: List[int] = []
+        indexes: List[int] = []
+        failures: List[Dict[str, Any]] = []
+        if not rows:
+            return {"ids": ids, "indexes": indexes, "failures": failures}
+
+        params = [p for _, p in rows]
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SAVEPOINT bulk_write;")
+            try:
+                cursor.executemany(sql, params)
+                fast_path_ok = cursor.rowcount == len(params)
+            except sqlite3.Error:
+                fast_path_ok = False
+
+            if fast_path_ok:
+                if returns_ids:
+                    last_id = cursor.execute("SELECT last_insert_rowid();").fetchone()[0]
+                    ids = list(range(last_id - len(params) + 1, last_id + 1))
+                else:
+                    ids = [p[-1] for p in params]
+                indexes = [idx for idx, _ in rows]
+            else:
+                cursor.execute("ROLLBACK TO bulk_write;")
+                for idx, p in rows:
+                    cursor.execute("SAVEPOINT bulk_row;")
+                    try:
+                        cursor.execute(sql, p)
+                        affected, new_id = cursor.rowcount, cursor.lastrowid
+                    except sqlite3.Error as e:
+                        cursor.execute("ROLLBACK TO bulk_row;")
+                        cursor.execute("RELEASE bulk_row;")
+                        failures.append({"index": idx, "error": str(e)})
+                        continue
+                    cursor.execute("RELEASE bulk_row;")
+                    if affected == 0:
+                        failures.append({"index": idx, "error": f"no row with id {p[-1]}"})
+                        continue
+                    ids.append(new_id if returns_ids else p[-1])
+                    indexes.append(idx)
+
+            cursor.execute("RELEASE bulk_write;")
+            self._commit()
+        except sqlite3.Error as e:
+            try:
+                cursor.execute("ROLLBACK TO bulk_write;")
+                cursor.execute("RELEASE bulk_write;")
+            except sqlite3.Error:
+                pass  # SAVEPOINT 本身未建立成功
+            raise RuntimeError(f"Database bulk write failed ({self.TABLE_NAME}): {e}")
+
+        return {"ids": ids, "indexes": indexes, "failures": failures}
+
+    # ------------------------------------------------------------------
+    # 过滤 / 排序 / 分页
+    # ------------------------------------------------------------------
+    # 过滤条件的写法：字段名[__操作符]=值，例如 week_number__gte=3、module_id__in=[1, 2]
+    FILTER_OPERATORS: Dict[str, str] = {
+        "eq": "=",
+        "ne": "!=",
+        "gt": ">",
+        "gte": ">=",
+        "lt": "<",
+        "lte": "<=",
+        "in": "IN",
+        "not_in": "NOT IN",
+        "isnull": "IS NULL",
+    }
+
+    @classmethod
+    def parse_filter_key(cls, key: str) -> (str, str):
+        """把 "week_number__gte" 拆成 ("week_number", "gte")；没有操作符时为 "eq"。"""
+        field, sep, op = key.rpartition("__")
+        if sep and op in cls.FILTER_OPERATORS:
+            return field, op
+        return key, "eq"
+
     def _build_where_clause(
         self,
         filters: Dict[str, Any],
@@ -51,6 +485,12 @@ class BaseRepository:
     ) -> (str, List[Any]):
         """
         动态生成 WHERE 子句。过滤不支持的字段会抛异常。
+        支持的操作符见 FILTER_OPERATORS：
+        - field=值 / field__eq=值：等于；值为 None 时为 IS NULL
+        - field__ne=值：不等于（SQL 语义，NULL 行不会匹配）；值为 None 时为 IS NOT NULL
+        - field__gt / __gte / __lt / __lte：范围
+        - field__in / __not_in：列表；空列表时 in 不匹配任何行、not_in 匹配所有行
+        - field__isnull=True/False：IS NULL / IS NOT NULL
         """
         try:
             filters = dict(filters)  # 拷贝内部安全处理
@@ -58,22 +498,75 @@ class BaseRepository:
             if (
                 add_default_is_active
                 and "is_active" in self.ALLOWED_FILTERS
-                and "is_active" not in filters
+                and not any(self.parse_filter_key(key)[0] == "is_active" for key in filters)
             ):
                 filters["is_active"] = 1
 
             conditions: List[str] = []
             params: List[Any] = []
 
-            for field, value in filters.items():
+            for key, value in filters.items():
+                field, op = self.parse_filter_key(key)
                 if field not in self.ALLOWED_FILTERS:
                     raise ValueError(f"字段 {field} 不允许过滤（表 {self.TABLE_NAME}）")
-                conditions.append(f"{field} = ?")
-                params.append(value)
+
+                if op == "isnull":
+                    conditions.append(f"{field} IS NULL" if value else f"{field} IS NOT NULL")
+                elif op in ("in", "not_in"):
+                    values = list(value)
+                    if not values:
+                        conditions.append("0" if op == "in" else "1")
+                        continue
+                    placeholders = ", ".join(["?"] * len(values))
+                    conditions.append(f"{field} {self.FILTER_OPERATORS[op]} ({placeholders})")
+                    params.extend(values)
+                elif value is None and op in ("eq", "ne"):
+                    conditions.append(f"{field} IS NULL" if op == "eq" else f"{field} IS NOT NULL")
+                else:
+                    conditions.append(f"{field} {self.FILTER_OPERATORS[op]} ?")
+                    params.append(value)
 
             where_sql = "WHERE " + " AND ".join(conditions) if conditions else ""
 
             return where_sql, params
 
         except Exception as e:
-            raise RuntimeError(f"Build where clause failed ({self.TABLE_NAME}): {e}")
\ No newline at end of file
+            raise RuntimeError(f"Build where clause failed ({self.TABLE_NAME}): {e}")
+
+    def _build_order_limit(
+        self,
+        order_by: Optional[Any] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+    ) -> (str, List[Any]):
+        """
+        生成 ORDER BY / LIMIT / OFFSET 子句。
+        order_by：字段名或字段名列表，前缀 "-" 表示降序，例如 ["module_id", "-week_number"]；
+                  字段必须在 ALLOWED_FILTERS 中（或为 id）。
+        """
+        try:
+            clauses: List[str] = []
+            params: List[Any] = []
+
+            if order_by:
+                terms = [order_by] if isinstance(order_by, str) else list(order_by)
+                parts: List[str] = []
+                for term in terms:
+                    field = term.lstrip("-")
+                    if field != "id" and field not in self.ALLOWED_FILTERS:
+                        raise ValueError(f"字段 {field} 不允许排序（表 {self.TABLE_NAME}）")
+                    parts.append(f"{field} DESC" if term.startswith("-") else f"{field} ASC")
+                clauses.append("ORDER BY " + ", ".join(parts))
+
+            if limit is not None or offset is not None:
+                # SQLite 中 OFFSET 必须跟在 LIMIT 后面；LIMIT -1 表示不限制
+                clauses.append("LIMIT ?")
+                params.append(-1 if limit is None else int(limit))
+                if offset is not None:
+                    clauses.append("OFFSET ?")
+                    params.append(int(offset))
+
+            return " ".join(clauses), params
+
+        except Exception as e:
+            raise RuntimeError(f"Build order/limit clause failed ({self.TABLE_NAME}): {e}")
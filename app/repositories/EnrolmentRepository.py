@@ -9,7 +9,22 @@ from ..models.Enrolment import Enrolment
 # =========================================================
 class EnrolmentRepository(BaseRepository):
     TABLE_NAME = "enrolments"
+    MODEL = Enrolment
     ALLOWED_FILTERS = {"id", "student_id", "module_id", "enrol_date", "is_active"}
+    WRITE_COLUMNS = (
+        "student_id",
+        "module_id",
+        "enrol_date",
+        "is_active",
+    )
+
+    def _to_row(self, enrolment: Enrolment) -> tuple:
+        return (
+            enrolment.student_id,
+            enrolment.module_id,
+            enrolment.enrol_date,
+            1 if enrolment.is_active else 0,
+        )
 
     def add(self, enrolment: Enrolment) -> Enrolment:
         try:
@@ -19,14 +34,9 @@ class EnrolmentRepository(BaseRepository):
                 INSERT INTO enrolments (student_id, module_id, enrol_date, is_active)
                 VALUES (?, ?, ?, ?);
                 """,
-                (
-                    enrolment.student_id,
-                    enrolment.module_id,
-                    enrolment.enrol_date,
-                    1 if enrolment.is_active else 0,
-                ),
+                self._to_row(enrolment),
             )
-            self.conn.commit()
+            self._commit()
             enrolment.id = cursor.lastrowid
             return enrolment
         except sqlite3.Error as e:
@@ -46,13 +56,7 @@ class EnrolmentRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return Enrolment(
-                id=row[0],
-                student_id=row[1],
-                module_id=row[2],
-                enrol_date=row[3],
-                is_active=bool(row[4]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database fetch failed (Enrolment.get_by_id): {e}")
 
@@ -70,37 +74,24 @@ class EnrolmentRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return Enrolment(
-                id=row[0],
-                student_id=row[1],
-                module_id=row[2],
-                enrol_date=row[3],
-                is_active=bool(row[4]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_one failed: {e}")
 
-    def find_all(self, **filters) -> List[Enrolment]:
+    def find_all(self, order_by=None, limit=None, offset=None, **filters) -> List[Enrolment]:
         try:
             where_sql, params = self._build_where_clause(filters, add_default_is_active=True)
+            tail_sql, tail_params = self._build_order_limit(order_by, limit, offset)
             sql = f"""
                 SELECT id, student_id, module_id, enrol_date, is_active
                 FROM {self.TABLE_NAME}
-                {where_sql};
+                {where_sql}
+                {tail_sql};
             """
             cursor = self.conn.cursor()
-            cursor.execute(sql, params)
+            cursor.execute(sql, params + tail_params)
             rows = cursor.fetchall()
-            return [
-                Enrolment(
-                    id=row[0],
-                    student_id=row[1],
-                    module_id=row[2],
-                    enrol_date=row[3],
-                    is_active=bool(row[4]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_all failed: {e}")
 
@@ -123,16 +114,7 @@ class EnrolmentRepository(BaseRepository):
                     """
                 )
             rows = cursor.fetchall()
-            return [
-                Enrolment(
-                    id=row[0],
-                    student_id=row[1],
-                    module_id=row[2],
-                    enrol_date=row[3],
-                    is_active=bool(row[4]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database list_all failed: {e}")
 
@@ -147,14 +129,8 @@ class EnrolmentRepository(BaseRepository):
                 SET student_id = ?, module_id = ?, enrol_date = ?, is_active = ?
                 WHERE id = ?;
                 """,
-                (
-                    enrolment.student_id,
-                    enrolment.module_id,
-                    enrolment.enrol_date,
-                    1 if enrolment.is_active else 0,
-                    enrolment.id,
-                ),
+                self._to_row(enrolment) + (enrolment.id,),
             )
-            self.conn.commit()
+            self._commit()
         except sqlite3.Error as e:
             raise RuntimeError(f"Database update failed (Enrolment.update): {e}")
\ No newline at end of file
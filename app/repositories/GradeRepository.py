@@ -9,6 +9,7 @@ from ..models.Grade import Grade
 # =========================================================
 class GradeRepository(BaseRepository):
     TABLE_NAME = "grades"
+    MODEL = Grade
     ALLOWED_FILTERS = {
         "id",
         "student_id",
@@ -17,6 +18,22 @@ class GradeRepository(BaseRepository):
         "grade",
         "is_active",
     }
+    WRITE_COLUMNS = (
+        "student_id",
+        "module_id",
+        "assessment_name",
+        "grade",
+        "is_active",
+    )
+
+    def _to_row(self, grade: Grade) -> tuple:
+        return (
+            grade.student_id,
+            grade.module_id,
+            grade.assessment_name,
+            grade.grade,
+            1 if grade.is_active else 0,
+        )
 
     def add(self, grade: Grade) -> Grade:
         try:
@@ -28,15 +45,9 @@ class GradeRepository(BaseRepository):
                 )
                 VALUES (?, ?, ?, ?, ?);
                 """,
-                (
-                    grade.student_id,
-                    grade.module_id,
-                    grade.assessment_name,
-                    grade.grade,
-                    1 if grade.is_active else 0,
-                ),
+                self._to_row(grade),
             )
-            self.conn.commit()
+            self._commit()
             grade.id = cursor.lastrowid
             return grade
         except sqlite3.Error as e:
@@ -56,14 +67,7 @@ class GradeRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return Grade(
-                id=row[0],
-                student_id=row[1],
-                module_id=row[2],
-                assessment_name=row[3],
-                grade=row[4],
-                is_active=bool(row[5]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database fetch failed (Grade.get_by_id): {e}")
 
@@ -81,39 +85,24 @@ class GradeRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return Grade(
-                id=row[0],
-                student_id=row[1],
-                module_id=row[2],
-                assessment_name=row[3],
-                grade=row[4],
-                is_active=bool(row[5]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_one failed (Grade.find_one): {e}")
 
-    def find_all(self, **filters) -> List[Grade]:
+    def find_all(self, order_by=None, limit=None, offset=None, **filters) -> List[Grade]:
         try:
             where_sql, params = self._build_where_clause(filters, add_default_is_active=True)
+            tail_sql, tail_params = self._build_order_limit(order_by, limit, offset)
             sql = f"""
                 SELECT id, student_id, module_id, assessment_name, grade, is_active
                 FROM {self.TABLE_NAME}
-                {where_sql};
+                {where_sql}
+                {tail_sql};
             """
             cursor = self.conn.cursor()
-            cursor.execute(sql, params)
+            cursor.execute(sql, params + tail_params)
             rows = cursor.fetchall()
-            return [
-                Grade(
-                    id=row[0],
-                    student_id=row[1],
-                    module_id=row[2],
-                    assessment_name=row[3],
-                    grade=row[4],
-                    is_active=bool(row[5]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_all failed (Grade.find_all): {e}")
 
@@ -136,17 +125,7 @@ class GradeRepository(BaseRepository):
                     """
                 )
             rows = cursor.fetchall()
-            return [
-                Grade(
-                    id=row[0],
-                    student_id=row[1],
-                    module_id=row[2],
-                    assessment_name=row[3],
-                    grade=row[4],
-                    is_active=bool(row[5]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database list_all failed (Grade.list_all): {e}")
 
@@ -161,15 +140,8 @@ class GradeRepository(BaseRepository):
                 SET student_id = ?, module_id = ?, assessment_name = ?, grade = ?, is_active = ?
                 WHERE id = ?;
                 """,
-                (
-                    grade.student_id,
-                    grade.module_id,
-                    grade.assessment_name,
-                    grade.grade,
-                    1 if grade.is_active else 0,
-                    grade.id,
-                ),
+                self._to_row(grade) + (grade.id,),
             )
-            self.conn.commit()
+            self._commit()
         except sqlite3.Error as e:
             raise RuntimeError(f"Database update failed (Grade.update): {e}")
\ No newline at end of file
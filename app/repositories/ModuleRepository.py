@@ -9,7 +9,24 @@ from ..models.Module import Module
 # =========================================================
 class ModuleRepository(BaseRepository):
     TABLE_NAME = "modules"
+    MODEL = Module
     ALLOWED_FILTERS = {"id", "module_code", "module_title", "credit", "academic_year", "is_active"}
+    WRITE_COLUMNS = (
+        "module_code",
+        "module_title",
+        "credit",
+        "academic_year",
+        "is_active",
+    )
+
+    def _to_row(self, module: Module) -> tuple:
+        return (
+            module.module_code,
+            module.module_title,
+            module.credit,
+            module.academic_year,
+            1 if module.is_active else 0,
+        )
 
     def add(self, module: Module) -> Module:
         try:
@@ -19,15 +36,9 @@ class ModuleRepository(BaseRepository):
                 INSERT INTO modules (module_code, module_title, credit, academic_year, is_active)
                 VALUES (?, ?, ?, ?, ?);
                 """,
-                (
-                    module.module_code,
-                    module.module_title,
-                    module.credit,
-                    module.academic_year,
-                    1 if module.is_active else 0,
-                ),
+                self._to_row(module),
             )
-            self.conn.commit()
+            self._commit()
             module.id = cursor.lastrowid
             return module
         except sqlite3.Error as e:
@@ -47,14 +58,7 @@ class ModuleRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return Module(
-                id=row[0],
-                module_code=row[1],
-                module_title=row[2],
-                credit=row[3],
-                academic_year=row[4],
-                is_active=bool(row[5]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database fetch failed (Module.get_by_id): {e}")
 
@@ -72,39 +76,24 @@ class ModuleRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return Module(
-                id=row[0],
-                module_code=row[1],
-                module_title=row[2],
-                credit=row[3],
-                academic_year=row[4],
-                is_active=bool(row[5]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_one failed (Module.find_one): {e}")
 
-    def find_all(self, **filters) -> List[Module]:
+    def find_all(self, order_by=None, limit=None, offset=None, **filters) -> List[Module]:
         try:
             where_sql, params = self._build_where_clause(filters, add_default_is_active=True)
+            tail_sql, tail_params = self._build_order_limit(order_by, limit, offset)
             sql = f"""
                 SELECT id, module_code, module_title, credit, academic_year, is_active
                 FROM {self.TABLE_NAME}
-                {where_sql};
+                {where_sql}
+                {tail_sql};
             """
             cursor = self.conn.cursor()
-            cursor.execute(sql, params)
+            cursor.execute(sql, params + tail_params)
             rows = cursor.fetchall()
-            return [
-                Module(
-                    id=row[0],
-                    module_code=row[1],
-                    module_title=row[2],
-                    credit=row[3],
-                    academic_year=row[4],
-                    is_active=bool(row[5]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_all failed (Module.find_all): {e}")
 
@@ -127,17 +116,7 @@ class ModuleRepository(BaseRepository):
                     """
                 )
             rows = cursor.fetchall()
-            return [
-                Module(
-                    id=row[0],
-                    module_code=row[1],
-                    module_title=row[2],
-                    credit=row[3],
-                    academic_year=row[4],
-                    is_active=bool(row[5]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database list_all failed (Module.list_all): {e}")
 
@@ -153,15 +132,8 @@ class ModuleRepository(BaseRepository):
                 SET module_code = ?, module_title = ?, credit = ?, academic_year = ?, is_active = ?
                 WHERE id = ?;
                 """,
-                (
-                    module.module_code,
-                    module.module_title,
-                    module.credit,
-                    module.academic_year,
-                    1 if module.is_active else 0,
-                    module.id,
-                ),
+                self._to_row(module) + (module.id,),
             )
-            self.conn.commit()
+            self._commit()
         except sqlite3.Error as e:
             raise RuntimeError(f"Database update failed (Module.update): {e}")
\ No newline at end of file
@@ -9,6 +9,7 @@ from ..models.StressEvent import StressEvent
 # =========================================================
 class StressEventRepository(BaseRepository):
     TABLE_NAME = "stress_events"
+    MODEL = StressEvent
     ALLOWED_FILTERS = {
         "id",
         "student_id",
@@ -22,6 +23,32 @@ class StressEventRepository(BaseRepository):
         "created_at",
         "is_active",
     }
+    WRITE_COLUMNS = (
+        "student_id",
+        "module_id",
+        "survey_response_id",
+        "week_number",
+        "stress_level",
+        "cause_category",
+        "description",
+        "source",
+        "created_at",
+        "is_active",
+    )
+
+    def _to_row(self, event: StressEvent) -> tuple:
+        return (
+            event.student_id,
+            event.module_id,
+            event.survey_response_id,
+            event.week_number,
+            event.stress_level,
+            event.cause_category,
+            event.description,
+            event.source,
+            event.created_at,
+            1 if event.is_active else 0,
+        )
 
     def add(self, event: StressEvent) -> StressEvent:
         try:
@@ -35,20 +62,9 @@ class StressEventRepository(BaseRepository):
                 )
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
                 """,
-                (
-                    event.student_id,
-                    event.module_id,
-                    event.survey_response_id,
-                    event.week_number,
-                    event.stress_level,
-                    event.cause_category,
-                    event.description,
-                    event.source,
-                    event.created_at,
-                    1 if event.is_active else 0,
-                ),
+                self._to_row(event),
             )
-            self.conn.commit()
+            self._commit()
             event.id = cursor.lastrowid
             return event
         except sqlite3.Error as e:
@@ -70,19 +86,7 @@ class StressEventRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return StressEvent(
-                id=row[0],
-                student_id=row[1],
-                module_id=row[2],
-                survey_response_id=row[3],
-                week_number=row[4],
-                stress_level=row[5],
-                cause_category=row[6],
-                description=row[7],
-                source=row[8],
-                created_at=row[9],
-                is_active=bool(row[10]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database fetch failed (StressEvent.get_by_id): {e}")
 
@@ -102,51 +106,26 @@ class StressEventRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return StressEvent(
-                id=row[0],
-                student_id=row[1],
-                module_id=row[2],
-                survey_response_id=row[3],
-                week_number=row[4],
-                stress_level=row[5],
-                cause_category=row[6],
-                description=row[7],
-                source=row[8],
-                created_at=row[9],
-                is_active=bool(row[10]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_one failed (StressEvent.find_one): {e}")
 
-    def find_all(self, **filters) -> List[StressEvent]:
+    def find_all(self, order_by=None, limit=None, offset=None, **filters) -> List[StressEvent]:
         try:
             where_sql, params = self._build_where_clause(filters, add_default_is_active=True)
+            tail_sql, tail_params = self._build_order_limit(order_by, limit, offset)
             sql = f"""
                 SELECT id, student_id, module_id, survey_response_id,
                        week_number, stress_level, cause_category, description,
                        source, created_at, is_active
                 FROM {self.TABLE_NAME}
-                {where_sql};
+                {where_sql}
+                {tail_sql};
             """
             cursor = self.conn.cursor()
-            cursor.execute(sql, params)
+            cursor.execute(sql, params + tail_params)
             rows = cursor.fetchall()
-            return [
-                StressEvent(
-                    id=row[0],
-                    student_id=row[1],
-                    module_id=row[2],
-                    survey_response_id=row[3],
-                    week_number=row[4],
-                    stress_level=row[5],
-                    cause_category=row[6],
-                    description=row[7],
-                    source=row[8],
-                    created_at=row[9],
-                    is_active=bool(row[10]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_all failed (StressEvent.find_all): {e}")
 
@@ -173,22 +152,7 @@ class StressEventRepository(BaseRepository):
                     """
                 )
             rows = cursor.fetchall()
-            return [
-                StressEvent(
-                    id=row[0],
-                    student_id=row[1],
-                    module_id=row[2],
-                    survey_response_id=row[3],
-                    week_number=row[4],
-                    stress_level=row[5],
-                    cause_category=row[6],
-                    description=row[7],
-                    source=row[8],
-                    created_at=row[9],
-                    is_active=bool(row[10]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database list_all failed (StressEvent.list_all): {e}")
 
@@ -205,20 +169,8 @@ class StressEventRepository(BaseRepository):
                     created_at = ?, is_active = ?
                 WHERE id = ?;
                 """,
-                (
-                    event.student_id,
-                    event.module_id,
-                    event.survey_response_id,
-                    event.week_number,
-                    event.stress_level,
-                    event.cause_category,
-                    event.description,
-                    event.source,
-                    event.created_at,
-                    1 if event.is_active else 0,
-                    event.id,
-                ),
+                self._to_row(event) + (event.id,),
             )
-            self.conn.commit()
+            self._commit()
         except sqlite3.Error as e:
             raise RuntimeError(f"Database update failed (StressEvent.update): {e}")
\ No newline at end of file
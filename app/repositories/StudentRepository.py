@@ -9,6 +9,7 @@ from ..models.Student import Student
 # =========================================================
 class StudentRepository(BaseRepository):
     TABLE_NAME = "students"
+    MODEL = Student
     ALLOWED_FILTERS = {
         "id",
         "student_number",
@@ -18,6 +19,25 @@ class StudentRepository(BaseRepository):
         "year_of_study",
         "is_active",
     }
+    SORTABLE_FIELDS = {"student_number", "full_name", "course_name", "year_of_study"}
+    WRITE_COLUMNS = (
+        "student_number",
+        "full_name",
+        "email",
+        "course_name",
+        "year_of_study",
+        "is_active",
+    )
+
+    def _to_row(self, student: Student) -> tuple:
+        return (
+            student.student_number,
+            student.full_name,
+            student.email,
+            student.course_name,
+            student.year_of_study,
+            1 if student.is_active else 0,
+        )
 
     def add(self, student: Student) -> Student:
         try:
@@ -29,16 +49,9 @@ class StudentRepository(BaseRepository):
                 )
                 VALUES (?, ?, ?, ?, ?, ?);
                 """,
-                (
-                    student.student_number,
-                    student.full_name,
-                    student.email,
-                    student.course_name,
-                    student.year_of_study,
-                    1 if student.is_active else 0,
-                ),
+                self._to_row(student),
             )
-            self.conn.commit()
+            self._commit()
             student.id = cursor.lastrowid
             return student
         except sqlite3.Error as e:
@@ -58,15 +71,7 @@ class StudentRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return Student(
-                id=row[0],
-                student_number=row[1],
-                full_name=row[2],
-                email=row[3],
-                course_name=row[4],
-                year_of_study=row[5],
-                is_active=bool(row[6]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database fetch failed (Student.get_by_id): {e}")
 
@@ -84,41 +89,24 @@ class StudentRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return Student(
-                id=row[0],
-                student_number=row[1],
-                full_name=row[2],
-                email=row[3],
-                course_name=row[4],
-                year_of_study=row[5],
-                is_active=bool(row[6]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_one failed (Student.find_one): {e}")
 
-    def find_all(self, **filters) -> List[Student]:
+    def find_all(self, order_by=None, limit=None, offset=None, **filters) -> List[Student]:
         try:
             where_sql, params = self._build_where_clause(filters, add_default_is_active=True)
+            tail_sql, tail_params = self._build_order_limit(order_by, limit, offset)
             sql = f"""
                 SELECT id, student_number, full_name, email, course_name, year_of_study, is_active
                 FROM {self.TABLE_NAME}
-                {where_sql};
+                {where_sql}
+                {tail_sql};
             """
             cursor = self.conn.cursor()
-            cursor.execute(sql, params)
+            cursor.execute(sql, params + tail_params)
             rows = cursor.fetchall()
-            return [
-                Student(
-                    id=row[0],
-                    student_number=row[1],
-                    full_name=row[2],
-                    email=row[3],
-                    course_name=row[4],
-                    year_of_study=row[5],
-                    is_active=bool(row[6]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_all failed (Student.find_all): {e}")
 
@@ -141,18 +129,7 @@ class StudentRepository(BaseRepository):
                     """
                 )
             rows = cursor.fetchall()
-            return [
-                Student(
-                    id=row[0],
-                    student_number=row[1],
-                    full_name=row[2],
-                    email=row[3],
-                    course_name=row[4],
-                    year_of_study=row[5],
-                    is_active=bool(row[6]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database list_all failed (Student.list_all): {e}")
 
@@ -168,16 +145,8 @@ class StudentRepository(BaseRepository):
                     year_of_study = ?, is_active = ?
                 WHERE id = ?;
                 """,
-                (
-                    student.student_number,
-                    student.full_name,
-                    student.email,
-                    student.course_name,
-                    student.year_of_study,
-                    1 if student.is_active else 0,
-                    student.id,
-                ),
+                self._to_row(student) + (student.id,),
             )
-            self.conn.commit()
+            self._commit()
         except sqlite3.Error as e:
             raise RuntimeError(f"Database update failed (Student.update): {e}")
\ No newline at end of file
@@ -9,6 +9,7 @@ from ..models.SubmissionRecord import SubmissionRecord
 # =========================================================
 class SubmissionRecordRepository(BaseRepository):
     TABLE_NAME = "submission_records"
+    MODEL = SubmissionRecord
     ALLOWED_FILTERS = {
         "id",
         "student_id",
@@ -20,6 +21,29 @@ class SubmissionRecordRepository(BaseRepository):
         "is_late",
         "is_active",
     }
+    SORTABLE_FIELDS = {"student_id", "module_id", "due_date", "submitted_date"}
+    WRITE_COLUMNS = (
+        "student_id",
+        "module_id",
+        "assessment_name",
+        "due_date",
+        "submitted_date",
+        "is_submitted",
+        "is_late",
+        "is_active",
+    )
+
+    def _to_row(self, record: SubmissionRecord) -> tuple:
+        return (
+            record.student_id,
+            record.module_id,
+            record.assessment_name,
+            record.due_date,
+            record.submitted_date,
+            1 if record.is_submitted else 0,
+            1 if record.is_late else 0,
+            1 if record.is_active else 0,
+        )
 
     def add(self, record: SubmissionRecord) -> SubmissionRecord:
         try:
@@ -32,18 +56,9 @@ class SubmissionRecordRepository(BaseRepository):
                 )
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?);
                 """,
-                (
-                    record.student_id,
-                    record.module_id,
-                    record.assessment_name,
-                    record.due_date,
-                    record.submitted_date,
-                    1 if record.is_submitted else 0,
-                    1 if record.is_late else 0,
-                    1 if record.is_active else 0,
-                ),
+                self._to_row(record),
             )
-            self.conn.commit()
+            self._commit()
             record.id = cursor.lastrowid
             return record
         except sqlite3.Error as e:
@@ -64,17 +79,7 @@ class SubmissionRecordRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return SubmissionRecord(
-                id=row[0],
-                student_id=row[1],
-                module_id=row[2],
-                assessment_name=row[3],
-                due_date=row[4],
-                submitted_date=row[5],
-                is_submitted=bool(row[6]),
-                is_late=bool(row[7]),
-                is_active=bool(row[8]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database fetch failed (SubmissionRecord.get_by_id): {e}")
 
@@ -93,46 +98,25 @@ class SubmissionRecordRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return SubmissionRecord(
-                id=row[0],
-                student_id=row[1],
-                module_id=row[2],
-                assessment_name=row[3],
-                due_date=row[4],
-                submitted_date=row[5],
-                is_submitted=bool(row[6]),
-                is_late=bool(row[7]),
-                is_active=bool(row[8]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_one failed (SubmissionRecord.find_one): {e}")
 
-    def find_all(self, **filters) -> List[SubmissionRecord]:
+    def find_all(self, order_by=None, limit=None, offset=None, **filters) -> List[SubmissionRecord]:
         try:
             where_sql, params = self._build_where_clause(filters, add_default_is_active=True)
+            tail_sql, tail_params = self._build_order_limit(order_by, limit, offset)
             sql = f"""
                 SELECT id, student_id, module_id, assessment_name,
                        due_date, submitted_date, is_submitted, is_late, is_active
                 FROM {self.TABLE_NAME}
-                {where_sql};
+                {where_sql}
+                {tail_sql};
             """
             cursor = self.conn.cursor()
-            cursor.execute(sql, params)
+            cursor.execute(sql, params + tail_params)
             rows = cursor.fetchall()
-            return [
-                SubmissionRecord(
-                    id=row[0],
-                    student_id=row[1],
-                    module_id=row[2],
-                    assessment_name=row[3],
-                    due_date=row[4],
-                    submitted_date=row[5],
-                    is_submitted=bool(row[6]),
-                    is_late=bool(row[7]),
-                    is_active=bool(row[8]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_all failed (SubmissionRecord.find_all): {e}")
 
@@ -157,20 +141,7 @@ class SubmissionRecordRepository(BaseRepository):
                     """
                 )
             rows = cursor.fetchall()
-            return [
-                SubmissionRecord(
-                    id=row[0],
-                    student_id=row[1],
-                    module_id=row[2],
-                    assessment_name=row[3],
-                    due_date=row[4],
-                    submitted_date=row[5],
-                    is_submitted=bool(row[6]),
-                    is_late=bool(row[7]),
-                    is_active=bool(row[8]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database list_all failed (SubmissionRecord.list_all): {e}")
 
@@ -186,18 +157,8 @@ class SubmissionRecordRepository(BaseRepository):
                     due_date = ?, submitted_date = ?, is_submitted = ?, is_late = ?, is_active = ?
                 WHERE id = ?;
                 """,
-                (
-                    record.student_id,
-                    record.module_id,
-                    record.assessment_name,
-                    record.due_date,
-                    record.submitted_date,
-                    1 if record.is_submitted else 0,
-                    1 if record.is_late else 0,
-                    1 if record.is_active else 0,
-                    record.id,
-                ),
+                self._to_row(record) + (record.id,),
             )
-            self.conn.commit()
+            self._commit()
         except sqlite3.Error as e:
             raise RuntimeError(f"Database update failed (SubmissionRecord.update): {e}")
\ No newline at end of file
@@ -9,6 +9,7 @@ from ..models.SurveyResponse import SurveyResponse
 # =========================================================
 class SurveyResponseRepository(BaseRepository):
     TABLE_NAME = "survey_responses"
+    MODEL = SurveyResponse
     ALLOWED_FILTERS = {
         "id",
         "student_id",
@@ -20,6 +21,29 @@ class SurveyResponseRepository(BaseRepository):
         "created_at",
         "is_active",
     }
+    SORTABLE_FIELDS = {"student_id", "module_id", "week_number", "stress_level", "created_at"}
+    WRITE_COLUMNS = (
+        "student_id",
+        "module_id",
+        "week_number",
+        "stress_level",
+        "hours_slept",
+        "mood_comment",
+        "created_at",
+        "is_active",
+    )
+
+    def _to_row(self, resp: SurveyResponse) -> tuple:
+        return (
+            resp.student_id,
+            resp.module_id,
+            resp.week_number,
+            resp.stress_level,
+            resp.hours_slept,
+            resp.mood_comment,
+            resp.created_at,
+            1 if resp.is_active else 0,
+        )
 
     def add(self, resp: SurveyResponse) -> SurveyResponse:
         try:
@@ -32,18 +56,9 @@ class SurveyResponseRepository(BaseRepository):
                 )
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?);
                 """,
-                (
-                    resp.student_id,
-                    resp.module_id,
-                    resp.week_number,
-                    resp.stress_level,
-                    resp.hours_slept,
-                    resp.mood_comment,
-                    resp.created_at,
-                    1 if resp.is_active else 0,
-                ),
+                self._to_row(resp),
             )
-            self.conn.commit()
+            self._commit()
             resp.id = cursor.lastrowid
             return resp
         except sqlite3.Error as e:
@@ -64,17 +79,7 @@ class SurveyResponseRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return SurveyResponse(
-                id=row[0],
-                student_id=row[1],
-                module_id=row[2],
-                week_number=row[3],
-                stress_level=row[4],
-                hours_slept=row[5],
-                mood_comment=row[6],
-                created_at=row[7],
-                is_active=bool(row[8]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database fetch failed (SurveyResponse.get_by_id): {e}")
 
@@ -93,46 +98,25 @@ class SurveyResponseRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return SurveyResponse(
-                id=row[0],
-                student_id=row[1],
-                module_id=row[2],
-                week_number=row[3],
-                stress_level=row[4],
-                hours_slept=row[5],
-                mood_comment=row[6],
-                created_at=row[7],
-                is_active=bool(row[8]),
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_one failed (SurveyResponse.find_one): {e}")
 
-    def find_all(self, **filters) -> List[SurveyResponse]:
+    def find_all(self, order_by=None, limit=None, offset=None, **filters) -> List[SurveyResponse]:
         try:
             where_sql, params = self._build_where_clause(filters, add_default_is_active=True)
+            tail_sql, tail_params = self._build_order_limit(order_by, limit, offset)
             sql = f"""
                 SELECT id, student_id, module_id, week_number,
                        stress_level, hours_slept, mood_comment, created_at, is_active
                 FROM {self.TABLE_NAME}
-                {where_sql};
+                {where_sql}
+                {tail_sql};
             """
             cursor = self.conn.cursor()
-            cursor.execute(sql, params)
+            cursor.execute(sql, params + tail_params)
             rows = cursor.fetchall()
-            return [
-                SurveyResponse(
-                    id=row[0],
-                    student_id=row[1],
-                    module_id=row[2],
-                    week_number=row[3],
-                    stress_level=row[4],
-                    hours_slept=row[5],
-                    mood_comment=row[6],
-                    created_at=row[7],
-                    is_active=bool(row[8]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_all failed (SurveyResponse.find_all): {e}")
 
@@ -157,20 +141,7 @@ class SurveyResponseRepository(BaseRepository):
                     """
                 )
             rows = cursor.fetchall()
-            return [
-                SurveyResponse(
-                    id=row[0],
-                    student_id=row[1],
-                    module_id=row[2],
-                    week_number=row[3],
-                    stress_level=row[4],
-                    hours_slept=row[5],
-                    mood_comment=row[6],
-                    created_at=row[7],
-                    is_active=bool(row[8]),
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database list_all failed (SurveyResponse.list_all): {e}")
 
@@ -186,18 +157,8 @@ class SurveyResponseRepository(BaseRepository):
                     stress_level = ?, hours_slept = ?, mood_comment = ?, created_at = ?, is_active = ?
                 WHERE id = ?;
                 """,
-                (
-                    resp.student_id,
-                    resp.module_id,
-                    resp.week_number,
-                    resp.stress_level,
-                    resp.hours_slept,
-                    resp.mood_comment,
-                    resp.created_at,
-                    1 if resp.is_active else 0,
-                    resp.id,
-                ),
+                self._to_row(resp) + (resp.id,),
             )
-            self.conn.commit()
+            self._commit()
         except sqlite3.Error as e:
             raise RuntimeError(f"Database update failed (SurveyResponse.update): {e}")
\ No newline at end of file
@@ -9,9 +9,26 @@ from ..models.User import User
 # =========================================================
 class UserRepository(BaseRepository):
     TABLE_NAME = "users"
+    MODEL = User
     # 注意：我们在表结构中其实没有 email 字段，只有 username。
     # 如果你之后给 users 增加 email 字段，可以在这里加上 "email"。
     ALLOWED_FILTERS = {"id", "username", "password_hash", "role", "created_at", "is_active"}
+    WRITE_COLUMNS = (
+        "username",
+        "password_hash",
+        "role",
+        "created_at",
+        "is_active",
+    )
+
+    def _to_row(self, user: User) -> tuple:
+        return (
+            user.username,
+            user.password_hash,
+            user.role,
+            user.created_at,
+            1 if user.is_active else 0,
+        )
 
     def add(self, user: User) -> User:
         try:
@@ -21,15 +38,9 @@ class UserRepository(BaseRepository):
                 INSERT INTO users (username, password_hash, role, created_at, is_active)
                 VALUES (?, ?, ?, ?, ?);
                 """,
-                (
-                    user.username,
-                    user.password_hash,
-                    user.role,
-                    user.created_at,
-                    1 if user.is_active else 0,
-                ),
+                self._to_row(user),
             )
-            self.conn.commit()
+            self._commit()
             user.id = cursor.lastrowid
             return user
         except sqlite3.Error as e:
@@ -49,16 +60,7 @@ class UserRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return User(
-                id=row[0],
-                username=row[1],
-                password_hash=row[2],
-                role=row[3],
-                created_at=row[4],
-                is_active=bool(row[5]),
-                full_name="",  # Person 的字段这里简化不使用
-                email=None,
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database fetch failed (User.get_by_id): {e}")
 
@@ -77,43 +79,24 @@ class UserRepository(BaseRepository):
             row = cursor.fetchone()
             if row is None:
                 return None
-            return User(
-                id=row[0],
-                username=row[1],
-                password_hash=row[2],
-                role=row[3],
-                created_at=row[4],
-                is_active=bool(row[5]),
-                full_name="",
-                email=None,
-            )
+            return self._from_row(row)
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_one failed (User.find_one): {e}")
 
-    def find_all(self, **filters) -> List[User]:
+    def find_all(self, order_by=None, limit=None, offset=None, **filters) -> List[User]:
         try:
             where_sql, params = self._build_where_clause(filters, add_default_is_active=True)
+            tail_sql, tail_params = self._build_order_limit(order_by, limit, offset)
             sql = f"""
                 SELECT id, username, password_hash, role, created_at, is_active
                 FROM {self.TABLE_NAME}
-                {where_sql};
+                {where_sql}
+                {tail_sql};
             """
             cursor = self.conn.cursor()
-            cursor.execute(sql, params)
+            cursor.execute(sql, params + tail_params)
             rows = cursor.fetchall()
-            return [
-                User(
-                    id=row[0],
-                    username=row[1],
-                    password_hash=row[2],
-                    role=row[3],
-                    created_at=row[4],
-                    is_active=bool(row[5]),
-                    full_name="",
-                    email=None,
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database find_all failed (User.find_all): {e}")
 
@@ -136,19 +119,7 @@ class UserRepository(BaseRepository):
                     """
                 )
             rows = cursor.fetchall()
-            return [
-                User(
-                    id=row[0],
-                    username=row[1],
-                    password_hash=row[2],
-                    role=row[3],
-                    created_at=row[4],
-                    is_active=bool(row[5]),
-                    full_name="",
-                    email=None,
-                )
-                for row in rows
-            ]
+            return list(map(self._from_row, rows))
         except sqlite3.Error as e:
             raise RuntimeError(f"Database list_all failed (User.list_all): {e}")
 
@@ -163,15 +134,8 @@ class UserRepository(BaseRepository):
                 SET username = ?, password_hash = ?, role = ?, created_at = ?, is_active = ?
                 WHERE id = ?;
                 """,
-                (
-                    user.username,
-                    user.password_hash,
-                    user.role,
-                    user.created_at,
-                    1 if user.is_active else 0,
-                    user.id,
-                ),
+                self._to_row(user) + (user.id,),
             )
-            self.conn.commit()
+            self._commit()
         except sqlite3.Error as e:
             raise RuntimeError(f"Database update failed (User.update): {e}")
\ No newline at end of file
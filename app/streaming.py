@@ -0,0 +1,24 @@
+from itertools import chain
+from typing import Iterator
+
+from flask import Response, stream_with_context
+
+
+"""
+流式 JSON 响应：
+- 路由把 JsonHelper.iter_json_array / iter_success_json 产生的字符串片段交给 stream_json
+- stream_with_context 让请求上下文（以及 get_db() 借出的连接）一直保留到生成器结束，
+  连接在最后一段发送完之后才归还给连接池
+"""
+
+
+def wants_stream(args) -> bool:
+    return str(args.get("stream", "")).lower() in {"1", "true", "yes", "on"}
+
+
+def stream_json(chunks: Iterator[str]) -> Response:
+    chunks = iter(chunks)
+    # 先在视图函数内取出第一段：查询在这里执行，SQL 出错时仍能返回普通的错误响应；
+    # 一旦开始发送，状态码就已经是 200 了
+    first = next(chunks)
+    return Response(stream_with_context(chain([first], chunks)), mimetype="application/json")
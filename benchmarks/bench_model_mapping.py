@@ -0,0 +1,129 @@
+"""
+基准测试：每 10 万行记录的 “行 -> 模型” 物化耗时与内存占用
+
+对每个 Repository 比较两种模型：
+- dict    ：普通 @dataclass（每个实例带 __dict__，即改动前的模型）
+- slotted ：app/models 中的 @dataclass(slots=True) 模型
+两者都使用 build_row_mapper 生成的映射函数，差别只在模型本身。
+
+运行：python benchmarks/bench_model_mapping.py [--rows 100000] [--repeat 5]
+"""
+import argparse
+import contextlib
+import dataclasses
+import gc
+import io
+import itertools
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import db_establish
+from app.repositories.BaseRepository import build_row_mapper
+from app.repositories.AlertRepository import AlertRepository
+from app.repositories.AttendanceRecordRepository import AttendanceRecordRepository
+from app.repositories.EnrolmentRepository import EnrolmentRepository
+from app.repositories.GradeRepository import GradeRepository
+from app.repositories.ModuleRepository import ModuleRepository
+from app.repositories.StressEventRepository import StressEventRepository
+from app.repositories.StudentRepository import StudentRepository
+from app.repositories.SubmissionRecordRepository import SubmissionRecordRepository
+from app.repositories.SurveyResponseRepository import SurveyResponseRepository
+from app.repositories.UserRepository import UserRepository
+
+REPOSITORIES = [
+    UserRepository,
+    StudentRepository,
+    ModuleRepository,
+    EnrolmentRepository,
+    AttendanceRecordRepository,
+    SubmissionRecordRepository,
+    SurveyResponseRepository,
+    GradeRepository,
+    StressEventRepository,
+    AlertRepository,
+]
+
+
+def unslotted_copy(model: type) -> type:
+    """按模型的字段生成一个同名的普通 dataclass（带 __dict__），作为对照组。"""
+    fields = [
+        (f.name, f.type, dataclasses.field(default=f.default))
+        for f in dataclasses.fields(model)
+    ]
+    return dataclasses.make_dataclass(model.__name__, fields)
+
+
+def sample_rows(conn: sqlite3.Connection, repo_cls, n: int) -> list:
+    columns = ", ".join(("id",) + repo_cls.WRITE_COLUMNS)
+    rows = conn.execute(f"SELECT {columns} FROM {repo_cls.TABLE_NAME};").fetchall()
+    if not rows:
+        return []
+    return list(itertools.islice(itertools.cycle(rows), n))
+
+
+def measure(mapper, rows: list, repeat: int) -> tuple:
+    """返回 (最快一次的耗时秒数, 结果列表占用的字节数)。"""
+    best = float("inf")
+    for _ in range(repeat):
+        # 关闭 GC：否则大量分配触发的分代回收会让计时抖动很大
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            models = list(map(mapper, rows))
+            best = min(best, time.perf_counter() - started)
+        finally:
+            gc.enable()
+        del models
+
+    tracemalloc.start()
+    models = list(map(mapper, rows))
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del models
+    return best, size
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            conn = db_establish.init_database(os.path.join(tmp, "bench.sqlite3"))
+        print(f"\n{'model':<18}{'variant':<10}{'ms / 100k':>12}{'MiB / 100k':>12}{'speedup':>10}{'memory':>9}")
+        print("-" * 71)
+        scale = 100_000 / args.rows
+        for repo_cls in REPOSITORIES:
+            rows = sample_rows(conn, repo_cls, args.rows)
+            if not rows:
+                continue
+            columns = ("id",) + repo_cls.WRITE_COLUMNS
+            baseline = build_row_mapper(unslotted_copy(repo_cls.MODEL), columns)
+            base_t, base_m = measure(baseline, rows, args.repeat)
+            slot_t, slot_m = measure(repo_cls._from_row, rows, args.repeat)
+
+            name = repo_cls.MODEL.__name__
+            for variant, t, m in (("dict", base_t, base_m), ("slotted", slot_t, slot_m)):
+                ratio_t = f"{base_t / t:.2f}x" if variant == "slotted" else ""
+                ratio_m = f"{m / base_m:.0%}" if variant == "slotted" else ""
+                print(
+                    f"{name:<18}{variant:<10}{t * 1000 * scale:>12.1f}"
+                    f"{m / 2**20 * scale:>12.2f}{ratio_t:>10}{ratio_m:>9}"
+                )
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
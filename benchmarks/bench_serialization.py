@@ -0,0 +1,107 @@
+"""
+基准测试：每 10 万条记录的 “模型 -> JSON” 序列化耗时
+
+比较以下几种做法（都输出同一份 JSON 文档）：
+- asdict        ：dataclasses.asdict + json.dumps（JsonHelper.to_serializable 改动前的路径）
+- hand-written  ：手写的 {"id": r.id, "studentId": r.student_id, ...}（API 改动前的 _serialize_*）+ json.dumps
+- compiled      ：utils/serializer_util.ModelSerializer 生成的编码函数 + json.dumps
+- compiled+orjson：同上，用 orjson 编码（未安装 orjson 时跳过）
+
+运行：python benchmarks/bench_serialization.py [--rows 100000] [--repeat 5]
+"""
+import argparse
+import contextlib
+import dataclasses
+import gc
+import io
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import db_establish
+from app.repositories.SurveyResponseRepository import SurveyResponseRepository
+from utils.serializer_util import ModelSerializer, json_dumps, orjson, to_camel
+
+SURVEY_FIELDS = (
+    "id", "student_id", "module_id", "week_number", "stress_level", "hours_slept", "mood_comment", "created_at",
+)
+
+
+def via_asdict(record) -> dict:
+    data = dataclasses.asdict(record)
+    return {to_camel(name): data[name] for name in SURVEY_FIELDS}
+
+
+def hand_written(record) -> dict:
+    return {
+        "id": record.id,
+        "studentId": record.student_id,
+        "moduleId": record.module_id,
+        "weekNumber": record.week_number,
+        "stressLevel": record.stress_level,
+        "hoursSlept": record.hours_slept,
+        "moodComment": record.mood_comment,
+        "createdAt": record.created_at,
+    }
+
+
+def measure(encode, dumps, records: list, repeat: int) -> float:
+    """返回最快一次的耗时秒数（对象 -> dict -> JSON 字符串）。"""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            dumps(list(map(encode, records)))
+            best = min(best, time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return best
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            conn = db_establish.init_database(os.path.join(tmp, "bench.sqlite3"))
+        surveys = list(SurveyResponseRepository(conn).iter_all())
+        conn.close()
+    records = list(itertools.islice(itertools.cycle(surveys), args.rows))
+
+    compiled = ModelSerializer(records[0].__class__, fields=SURVEY_FIELDS, rename=to_camel).encode
+    std_dumps = lambda value: json_dumps(value, backend="json")
+    variants = [
+        ("asdict", via_asdict, std_dumps),
+        ("hand-written", hand_written, std_dumps),
+        ("compiled", compiled, std_dumps),
+    ]
+    if orjson is not None:
+        variants.append(("compiled+orjson", compiled, lambda value: json_dumps(value, backend="orjson")))
+
+    expected = json.loads(std_dumps(list(map(hand_written, records[:100]))))
+    print(f"\n{'variant':<18}{'ms / 100k':>12}{'speedup':>10}")
+    print("-" * 40)
+    scale = 100_000 / args.rows
+    baseline = None
+    for name, encode, dumps in variants:
+        assert json.loads(dumps(list(map(encode, records[:100])))) == expected, name
+        elapsed = measure(encode, dumps, records, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{name:<18}{elapsed * 1000 * scale:>12.1f}{baseline / elapsed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
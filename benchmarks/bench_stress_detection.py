@@ -0,0 +1,120 @@
+"""
+基准测试：连续两周高压检测的两种引擎（detect_consecutive_high_stress）
+
+- python：按 (student_id, module_id, week_number) 顺序把全部问卷读进 Python，逐行比较相邻两条
+- sql   ：SQLite 窗口函数 LAG() 在库内完成比较与阈值过滤，只有命中行返回 Python
+
+数据：在 init_database 建好的临时库中写入 --rows 条合成问卷（每个 学生 + 课程 组合 12 周，压力 1~5 随机），
+并执行 ANALYZE；两种引擎的结果会先做一致性校验。
+
+运行：python benchmarks/bench_stress_detection.py [--rows 1000000] [--repeat 3] [--threshold 4]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import db_establish
+from app.analysis.services import AnalysisServiceRepository
+
+WEEKS = 12
+MODULES_PER_STUDENT = 4
+
+
+def fill_surveys(conn: sqlite3.Connection, rows: int, seed: int = 42) -> None:
+    """清空示例问卷，写入 rows 条合成问卷（插入顺序按周次打乱，接近真实的提交顺序）。"""
+    rng = random.Random(seed)
+    pairs = max(1, rows // WEEKS)
+
+    def generate():
+        written = 0
+        for week in range(1, WEEKS + 1):
+            for pair in range(pairs):
+                if written >= rows:
+                    return
+                written += 1
+                yield (
+                    pair // MODULES_PER_STUDENT + 1,
+                    pair % MODULES_PER_STUDENT + 1,
+                    week,
+                    rng.randint(1, 5),
+                    "2025-01-01T00:00:00",
+                )
+
+    conn.execute("DELETE FROM survey_responses;")
+    conn.executemany(
+        """
+        INSERT INTO survey_responses (student_id, module_id, week_number, stress_level, created_at, is_active)
+        VALUES (?, ?, ?, ?, ?, 1);
+        """,
+        generate(),
+    )
+    conn.commit()
+    conn.execute("ANALYZE;")
+
+
+def measure(fn, repeat: int) -> tuple:
+    """返回 (最快一次的耗时秒数, 最后一次的结果)。"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return best, result
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 关掉外键：合成数据的 student_id / module_id 不需要在主表中存在
+        with contextlib.redirect_stdout(io.StringIO()):
+            db_establish.init_database(os.path.join(tmp, "bench.sqlite3")).close()
+        conn = sqlite3.connect(os.path.join(tmp, "bench.sqlite3"))
+        conn.execute("PRAGMA foreign_keys = OFF;")
+        started = time.perf_counter()
+        fill_surveys(conn, args.rows)
+        print(f"\n{args.rows:,} survey rows generated in {time.perf_counter() - started:.1f}s")
+
+        service = AnalysisServiceRepository(conn)
+        timings = {}
+        results = {}
+        for engine in ("python", "sql"):
+            timings[engine], results[engine] = measure(
+                lambda: service.detect_consecutive_high_stress(threshold=args.threshold, engine=engine),
+                args.repeat,
+            )
+        if results["python"] != results["sql"]:
+            raise SystemExit("engines disagree")
+
+        hits = len(results["sql"])
+        print(f"{'engine':<10}{'seconds':>10}{'rows to Python':>17}{'speedup':>10}")
+        print("-" * 47)
+        for engine, crossed in (("python", args.rows), ("sql", hits)):
+            speedup = f"{timings['python'] / timings[engine]:.2f}x" if engine == "sql" else ""
+            print(f"{engine:<10}{timings[engine]:>10.3f}{crossed:>17,}{speedup:>10}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,50 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'hard to guess string'
-    # Default to the pre-seeded dev database; override with env DATABASE if needed.
-    DATABASE = os.environ.get('DATABASE') or 'sqlite:///' + os.path.join(basedir, 'db_dev.sqlite3')
+    # Default to the pre-seeded dev database; override with env DATABASE if needed
+    # (the env var is read at runtime by app.db.resolve_db_path).
+    DATABASE = 'sqlite:///' + os.path.join(basedir, 'db_dev.sqlite3')
+
+    # 连接池：最多 DB_POOL_SIZE 个连接，借不到连接时最多等待 DB_POOL_TIMEOUT 秒
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 5)
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT') or 5.0)
+    # 每个连接创建时执行一次的 PRAGMA
+    DB_PRAGMAS = {
+        # WAL：读不阻塞写、写不阻塞读；synchronous=NORMAL 在 WAL 下仍保证崩溃一致性
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,  # 毫秒
+        'temp_store': 'MEMORY',
+        'cache_size': -8000,  # 负数单位为 KiB，约 8MB 页缓存
+    }
+    # 单写线程一次最多合并提交多少个写任务
+    DB_WRITE_BATCH_SIZE = int(os.environ.get('DB_WRITE_BATCH_SIZE') or 64)
+    # JSON 编码后端：auto（安装了 orjson 时使用 orjson）/ orjson / json
+    JSON_BACKEND = os.environ.get('JSON_BACKEND') or 'auto'
+    # 分析接口结果缓存最多保存多少条（LRU 淘汰；相关表写入后自动失效）
+    ANALYSIS_CACHE_SIZE = int(os.environ.get('ANALYSIS_CACHE_SIZE') or 256)
+
+    # 响应压缩（见 app/compression.py）：按顺序列出启用的编码（q 值相同时靠前者优先，br / zstd 需要安装
+    # brotli / zstandard，未安装时跳过），小于 COMPRESS_MIN_SIZE 字节的响应不压缩
+    COMPRESS_ALGORITHMS = os.environ.get('COMPRESS_ALGORITHMS', 'zstd,br,gzip')
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE') or 1024)
+    COMPRESS_LEVELS = {
+        'gzip': int(os.environ.get('COMPRESS_GZIP_LEVEL') or 6),  # 1-9
+        'br': int(os.environ.get('COMPRESS_BR_LEVEL') or 4),  # 0-11
+        'zstd': int(os.environ.get('COMPRESS_ZSTD_LEVEL') or 3),  # 1-22
+    }
+    COMPRESS_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/csv', 'text/html', 'text/plain'}
+    # 带 ETag 的响应的压缩结果最多缓存多少条
+    COMPRESS_CACHE_SIZE = int(os.environ.get('COMPRESS_CACHE_SIZE') or 64)
+
+    # /api 列表接口分页：?limit= 的上限
+    API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE') or 500)
+    # ?stream=1 时每次 fetchmany 的行数（同时也是每段输出包含的元素个数）
+    API_STREAM_BATCH_SIZE = int(os.environ.get('API_STREAM_BATCH_SIZE') or 500)
+
+    # 批量导入（/api/import/<resource>、flask import-data）：每个事务写入的行数、报告中最多列出的错误数
+    IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE') or 1000)
+    IMPORT_MAX_ERRORS = int(os.environ.get('IMPORT_MAX_ERRORS') or 100)
 
     @staticmethod
     def init_app(app):
@@ -3,7 +3,28 @@ import os
 import sqlite3
 import random
 from datetime import date, timedelta, datetime
-from typing import Optional, Dict, Tuple
+import sys
+from typing import Optional, Dict, Tuple, List, Any
+
+from app.models.User import User
+from app.models.Module import Module
+from app.models.Student import Student
+from app.models.Enrolment import Enrolment
+from app.models.AttendanceRecord import AttendanceRecord
+from app.models.SurveyResponse import SurveyResponse
+from app.models.SubmissionRecord import SubmissionRecord
+from app.models.Grade import Grade
+from app.models.StressEvent import StressEvent
+from app.repositories.UserRepository import UserRepository
+from app.repositories.ModuleRepository import ModuleRepository
+from app.repositories.StudentRepository import StudentRepository
+from app.repositories.EnrolmentRepository import EnrolmentRepository
+from app.repositories.AttendanceRecordRepository import AttendanceRecordRepository
+from app.repositories.SurveyResponseRepository import SurveyResponseRepository
+from app.repositories.SubmissionRecordRepository import SubmissionRecordRepository
+from app.repositories.GradeRepository import GradeRepository
+from app.repositories.StressEventRepository import StressEventRepository
+from app.analysis.services import AnalysisServiceRepository
 
 
 # =======================
@@ -213,6 +234,9 @@ def init_database(db_path: str) -> sqlite3.Connection:
         """
     )
 
+    # 二级索引（见 INDEX_STATEMENTS）
+    create_indexes(conn)
+
     conn.commit()
 
     if db_exists:
@@ -230,6 +254,148 @@ def init_database(db_path: str) -> sqlite3.Connection:
     return conn
 
 
+# =======================
+# 1.1 二级索引
+# =======================
+# 按 app/analysis/services.py 中的实际查询设计：
+# - 分析查询几乎都带 is_active = 1，因此用部分索引（WHERE is_active = 1），只索引活跃行；
+# - 索引列包含查询用到的全部列（覆盖索引），避免回表；
+#   注意 SQLite 不会从部分索引的 WHERE 推断 is_active 的值，所以 is_active 也放进索引列末尾；
+# - 列顺序与 GROUP BY / ORDER BY 一致，避免临时 B-tree 排序。
+INDEX_STATEMENTS: List[str] = [
+    # get_students_average_attendance / get_student_average_attendance：
+    #   WHERE is_active = 1 [AND module_id = ?] GROUP BY student_id -> AVG(attendance_rate)
+    """
+    CREATE INDEX IF NOT EXISTS idx_attendance_active_student
+        ON attendance_records (student_id, module_id, week_number, attendance_rate, is_active)
+        WHERE is_active = 1;
+    """,
+    # 同上，但指定 module_id 时从该课程的数据开始扫描
+    """
+    CREATE INDEX IF NOT EXISTS idx_attendance_active_module
+        ON attendance_records (module_id, student_id, attendance_rate, is_active)
+        WHERE is_active = 1;
+    """,
+    # detect_consecutive_high_stress / get_stress_grade_pairs：
+    #   ORDER BY student_id, module_id, week_number；get_student_stress_trend：student_id = ?
+    """
+    CREATE INDEX IF NOT EXISTS idx_survey_active_student_module_week
+        ON survey_responses (student_id, module_id, week_number, stress_level, is_active)
+        WHERE is_active = 1;
+    """,
+    # 同上（module_id = ?），以及 compare_stress_grade_by_module 的 GROUP BY sr.module_id
+    """
+    CREATE INDEX IF NOT EXISTS idx_survey_active_module_student_week
+        ON survey_responses (module_id, student_id, week_number, stress_level, is_active)
+        WHERE is_active = 1;
+    """,
+    # survey_responses ⋈ grades ON student_id + module_id（内表按此索引查找）
+    """
+    CREATE INDEX IF NOT EXISTS idx_grades_active_student_module
+        ON grades (student_id, module_id, grade, is_active)
+        WHERE is_active = 1;
+    """,
+    # get_grade_distribution：WHERE is_active = 1 只读 grade
+    """
+    CREATE INDEX IF NOT EXISTS idx_grades_active_grade
+        ON grades (grade, is_active)
+        WHERE is_active = 1;
+    """,
+    # get_grade_distribution：WHERE is_active = 1 AND module_id = ?
+    """
+    CREATE INDEX IF NOT EXISTS idx_grades_active_module
+        ON grades (module_id, grade, is_active)
+        WHERE is_active = 1;
+    """,
+    # 其他事实表：按学生 / 课程查找（含非活跃行，供 API 查询与删除使用）
+    """
+    CREATE INDEX IF NOT EXISTS idx_submissions_student_module
+        ON submission_records (student_id, module_id);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_alerts_student_module
+        ON alerts (student_id, module_id);
+    """,
+    # create_high_stress_alerts：DELETE FROM alerts WHERE module_id = ?
+    """
+    CREATE INDEX IF NOT EXISTS idx_alerts_module
+        ON alerts (module_id);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_stress_events_student_module_week
+        ON stress_events (student_id, module_id, week_number);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_enrolments_student_module
+        ON enrolments (student_id, module_id);
+    """,
+]
+
+
+def create_indexes(conn: sqlite3.Connection) -> None:
+    """创建（或补齐）INDEX_STATEMENTS 中的全部索引；已存在的索引会被跳过。"""
+    cursor = conn.cursor()
+    for stmt in INDEX_STATEMENTS:
+        cursor.execute(stmt)
+    conn.commit()
+
+
+def migrate_database(db_path: str) -> sqlite3.Connection:
+    """
+    原地迁移已有数据库（不删表、不重建数据）：
+    - 补齐 INDEX_STATEMENTS 中缺失的索引
+    - ANALYZE 一次，让查询规划器拿到新索引的统计信息
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database file not found: {db_path}")
+
+    conn = sqlite3.connect(db_path)
+    create_indexes(conn)
+    conn.execute("ANALYZE;")
+    conn.commit()
+    print(f"[migrate_database] 索引已补齐并完成 ANALYZE -> {db_path}")
+    return conn
+
+
+def explain_query_plan(conn: sqlite3.Connection, sql: str, params: Any = ()) -> List[str]:
+    """返回 EXPLAIN QUERY PLAN 的 detail 列，例如 'SEARCH grades USING COVERING INDEX ...'。"""
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql.strip().rstrip(';')}", params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def check_index_usage(conn: sqlite3.Connection) -> Dict[str, List[str]]:
+    """
+    运行 AnalysisServiceRepository 的主要查询，并对实际执行的每条 SELECT 做 EXPLAIN QUERY PLAN。
+    返回 {SQL: [plan detail, ...]}，用于确认索引是否被使用。
+    """
+    from app.analysis.services import AnalysisServiceRepository
+
+    statements: List[str] = []
+    conn.set_trace_callback(statements.append)
+    try:
+        service = AnalysisServiceRepository(conn=conn)
+        service.get_students_average_attendance()
+        service.get_students_average_attendance(module_id=1)
+        service.get_student_average_attendance(student_id=1)
+        service.get_student_stress_trend(student_id=1)
+        service.detect_consecutive_high_stress()
+        service.detect_consecutive_high_stress(module_id=1)
+        service.compare_stress_grade_by_module()
+        service.get_grade_distribution()
+        service.get_grade_distribution(module_id=1)
+        service.get_stress_grade_pairs()
+        service.get_stress_grade_pairs(module_id=1)
+    finally:
+        conn.set_trace_callback(None)
+
+    plans: Dict[str, List[str]] = {}
+    for sql in statements:
+        normalized = " ".join(sql.split())
+        if normalized.upper().startswith("SELECT") and normalized not in plans:
+            plans[normalized] = explain_query_plan(conn, normalized)
+    return plans
+
+
 # =======================
 # 2. 插入基础模拟数据
 # =======================
@@ -241,8 +407,10 @@ def seed_demo_data(conn: sqlite3.Connection) -> None:
     - 8 门课程
     - 随机选课
     - 出勤、作业、成绩、福祉问卷数据
+
+    先按原来的顺序生成全部模型（随机数序列不变，数据与逐行插入时一致），
+    再通过各 Repository 的 add_many 按表批量写入（executemany + 单事务）。
     """
-    cursor = conn.cursor()
     random.seed(42)
 
     # 2.1 用户
@@ -251,14 +419,13 @@ def seed_demo_data(conn: sqlite3.Connection) -> None:
         ("course_director", "hashed_cd_password", "course_director"),
         ("wellbeing_officer", "hashed_swo_password", "wellbeing_officer"),
     ]
-    for username, pwd, role in users:
-        cursor.execute(
-            """
-            INSERT INTO users (username, password_hash, role, created_at, is_active)
-            VALUES (?, ?, ?, ?, 1);
-            """,
-            (username, pwd, role, "2025-01-01T09:00:00"),
-        )
+    _bulk_insert(
+        UserRepository(conn),
+        [
+            User(username=username, password_hash=pwd, role=role, created_at="2025-01-01T09:00:00")
+            for username, pwd, role in users
+        ],
+    )
 
     # 2.2 课程（8 门）
     module_codes = [f"MOD10{i}" for i in range(1, 9)]
@@ -272,34 +439,28 @@ def seed_demo_data(conn: sqlite3.Connection) -> None:
         "Software Engineering",
         "AI Ethics and Society",
     ]
-    module_ids = []
-    for code, title in zip(module_codes, module_titles):
-        cursor.execute(
-            """
-            INSERT INTO modules (module_code, module_title, credit, academic_year, is_active)
-            VALUES (?, ?, ?, ?, 1);
-            """,
-            (code, title, 15, "2025/2026"),
-        )
-        module_ids.append(cursor.lastrowid)
+    module_ids = _bulk_insert(
+        ModuleRepository(conn),
+        [
+            Module(module_code=code, module_title=title, credit=15, academic_year="2025/2026")
+            for code, title in zip(module_codes, module_titles)
+        ],
+    )
 
     # 2.3 学生（50 人）
     course_options = ["MSc Applied AI", "MSc Data Science", "MSc Cyber Security"]
-    student_ids = []
+    students = []
     for i in range(1, 51):
-        student_number = f"S{i:04d}"
-        full_name = f"Student {i}"
-        email = f"student{i}@example.com"
-        course_name = random.choice(course_options)
-        year_of_study = random.randint(1, 2)
-        cursor.execute(
-            """
-            INSERT INTO students (student_number, full_name, email, course_name, year_of_study, is_active)
-            VALUES (?, ?, ?, ?, ?, 1);
-            """,
-            (student_number, full_name, email, course_name, year_of_study),
+        students.append(
+            Student(
+                student_number=f"S{i:04d}",
+                full_name=f"Student {i}",
+                email=f"student{i}@example.com",
+                course_name=random.choice(course_options),
+                year_of_study=random.randint(1, 2),
+            )
         )
-        student_ids.append(cursor.lastrowid)
+    student_ids = _bulk_insert(StudentRepository(conn), students)
 
     # 2.4 选课
     enrolments = []
@@ -309,36 +470,36 @@ def seed_demo_data(conn: sqlite3.Connection) -> None:
         chosen_modules = random.sample(module_ids, k)
         for mid in chosen_modules:
             enrol_date = base_enrol_date + timedelta(days=random.randint(0, 10))
-            cursor.execute(
-                """
-                INSERT INTO enrolments (student_id, module_id, enrol_date, is_active)
-                VALUES (?, ?, ?, 1);
-                """,
-                (sid, mid, enrol_date.isoformat()),
-            )
-            enrolments.append((sid, mid))
+            enrolments.append(Enrolment(student_id=sid, module_id=mid, enrol_date=enrol_date.isoformat()))
+    _bulk_insert(EnrolmentRepository(conn), enrolments)
 
     # 2.5 出勤 + 问卷 + 作业 + 成绩
     weeks = list(range(1, 11))
     base_week_date = date(2025, 2, 3)
     assessment_names = ["Assignment 1", "Assignment 2"]
 
-    for sid, mid in enrolments:
+    attendance_records = []
+    survey_responses = []
+    submission_records = []
+    grades = []
+
+    for enrolment in enrolments:
+        sid, mid = enrolment.student_id, enrolment.module_id
         # 每个学生-课程 10 周的出勤 & 问卷
         for w in weeks:
             # 出勤
             total_sessions = 2
             attended_sessions = random.randint(0, total_sessions)
             attendance_rate = attended_sessions / total_sessions if total_sessions > 0 else None
-            cursor.execute(
-                """
-                INSERT INTO attendance_records (
-                    student_id, module_id, week_number,
-                    attended_sessions, total_sessions, attendance_rate, is_active
+            attendance_records.append(
+                AttendanceRecord(
+                    student_id=sid,
+                    module_id=mid,
+                    week_number=w,
+                    attended_sessions=attended_sessions,
+                    total_sessions=total_sessions,
+                    attendance_rate=attendance_rate,
                 )
-                VALUES (?, ?, ?, ?, ?, ?, 1);
-                """,
-                (sid, mid, w, attended_sessions, total_sessions, attendance_rate),
             )
 
             # 问卷（压力 & 睡眠）
@@ -354,15 +515,16 @@ def seed_demo_data(conn: sqlite3.Connection) -> None:
             week_date = base_week_date + timedelta(weeks=w - 1)
             created_at = f"{week_date.isoformat()}T21:00:00"
 
-            cursor.execute(
-                """
-                INSERT INTO survey_responses (
-                    student_id, module_id, week_number,
-                    stress_level, hours_slept, mood_comment, created_at, is_active
+            survey_responses.append(
+                SurveyResponse(
+                    student_id=sid,
+                    module_id=mid,
+                    week_number=w,
+                    stress_level=stress_level,
+                    hours_slept=hours_slept,
+                    mood_comment=None,
+                    created_at=created_at,
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, 1);
-                """,
-                (sid, mid, w, stress_level, hours_slept, None, created_at),
             )
 
         # 作业 & 成绩
@@ -393,31 +555,35 @@ def seed_demo_data(conn: sqlite3.Connection) -> None:
             else:
                 grade_value = random.uniform(0, 35)
 
-            cursor.execute(
-                """
-                INSERT INTO submission_records (
-                    student_id, module_id, assessment_name,
-                    due_date, submitted_date, is_submitted, is_late, is_active
+            submission_records.append(
+                SubmissionRecord(
+                    student_id=sid,
+                    module_id=mid,
+                    assessment_name=aname,
+                    due_date=due_date_str,
+                    submitted_date=submitted_date_str,
+                    is_submitted=bool(is_submitted),
+                    is_late=bool(is_late),
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, 1);
-                """,
-                (sid, mid, aname, due_date_str, submitted_date_str, is_submitted, is_late),
             )
+            grades.append(Grade(student_id=sid, module_id=mid, assessment_name=aname, grade=grade_value))
 
-            cursor.execute(
-                """
-                INSERT INTO grades (
-                    student_id, module_id, assessment_name, grade, is_active
-                )
-                VALUES (?, ?, ?, ?, 1);
-                """,
-                (sid, mid, aname, grade_value),
-            )
+    _bulk_insert(AttendanceRecordRepository(conn), attendance_records)
+    _bulk_insert(SurveyResponseRepository(conn), survey_responses)
+    _bulk_insert(SubmissionRecordRepository(conn), submission_records)
+    _bulk_insert(GradeRepository(conn), grades)
 
-    conn.commit()
     print("[seed_demo_data] 已插入示例用户、学生、课程、选课、出勤、作业、成绩与福祉数据。")
 
 
+def _bulk_insert(repo, models) -> List[int]:
+    """调用 repo.add_many；示例数据不应出现失败行，出现即视为错误。"""
+    result = repo.add_many(models)
+    if not result.ok:
+        raise RuntimeError(f"[seed_demo_data] {repo.TABLE_NAME} 插入失败: {result.failures[:3]}")
+    return result.ids
+
+
 # =======================
 # 3. 从问卷生成 stress_events
 # =======================
@@ -427,56 +593,35 @@ def seed_stress_events(conn: sqlite3.Connection, threshold: int = 4) -> None:
     - is_active = 1
     - stress_level >= threshold 视为一次单独的高压力事件
     """
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT id, student_id, module_id, week_number, stress_level, created_at
-        FROM survey_responses
-        WHERE is_active = 1 AND stress_level >= ?;
-        """,
-        (threshold,),
+    high_stress_rows = SurveyResponseRepository(conn).iter_where(
+        columns=("id", "student_id", "module_id", "week_number", "stress_level", "created_at"),
+        order_by=None,  # 沿用原来的扫描顺序（走 survey 的部分索引），保证生成的示例数据不变
+        stress_level__gte=threshold,
     )
-    rows = cursor.fetchall()
-
-    if not rows:
-        print("[seed_stress_events] 没有高压力问卷记录，未生成 stress_events。")
-        return
 
     cause_categories = ["academic", "personal", "health", "financial", "other"]
     events_to_insert = []
 
-    for survey_id, student_id, module_id, week_number, stress_level, created_at in rows:
-        cause_category = random.choice(cause_categories)
-        description = f"High stress reported (level {stress_level}) in week {week_number}."
-        source = "system"
+    for survey_id, student_id, module_id, week_number, stress_level, created_at in high_stress_rows:
         events_to_insert.append(
-            (
-                student_id,
-                module_id,
-                survey_id,
-                week_number,
-                stress_level,
-                cause_category,
-                description,
-                source,
-                created_at,
-                1,  # is_active
+            StressEvent(
+                student_id=student_id,
+                module_id=module_id,
+                survey_response_id=survey_id,
+                week_number=week_number,
+                stress_level=stress_level,
+                cause_category=random.choice(cause_categories),
+                description=f"High stress reported (level {stress_level}) in week {week_number}.",
+                source="system",
+                created_at=created_at,
             )
         )
 
-    cursor.executemany(
-        """
-        INSERT INTO stress_events (
-            student_id, module_id, survey_response_id, week_number,
-            stress_level, cause_category, description, source,
-            created_at, is_active
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
-        """,
-        events_to_insert,
-    )
+    if not events_to_insert:
+        print("[seed_stress_events] 没有高压力问卷记录，未生成 stress_events。")
+        return
 
-    conn.commit()
+    _bulk_insert(StressEventRepository(conn), events_to_insert)
     print(f"[seed_stress_events] 已生成 {len(events_to_insert)} 条 stress_events 记录。")
 
 
@@ -496,54 +641,27 @@ def generate_stress_alerts(conn: sqlite3.Connection, threshold: int = 4, clear_o
     if clear_old:
         cursor.execute("DELETE FROM alerts;")
 
-    cursor.execute(
-        """
-        SELECT student_id, module_id, week_number, stress_level
-        FROM survey_responses
-        WHERE is_active = 1
-        ORDER BY student_id, module_id, week_number;
-        """
-    )
-    rows = cursor.fetchall()
-
-    prev_student_id: Optional[int] = None
-    prev_module_id: Optional[int] = None
-    prev_week: Optional[int] = None
-    prev_stress: Optional[int] = None
+    # 检测逻辑与 /analysis/stress/high 共用（默认 python 引擎按索引顺序流式扫描；
+    # engine="sql" 时改用 SQLite 的 LAG() 窗口函数，只返回命中行）
+    events = AnalysisServiceRepository(conn).detect_consecutive_high_stress(threshold=threshold)
 
     latest_alert_by_student: Dict[int, Tuple[int, Optional[int], int, str, str, int]] = {}
 
-    for student_id, module_id, week_number, stress_level in rows:
-        if (student_id != prev_student_id) or (module_id != prev_module_id):
-            prev_student_id = student_id
-            prev_module_id = module_id
-            prev_week = week_number
-            prev_stress = stress_level
-            continue
-
-        if (
-            prev_week is not None
-            and week_number == prev_week + 1
-            and prev_stress is not None
-            and prev_stress >= threshold
-            and stress_level >= threshold
-        ):
-            reason = (
-                f"Stress level >= {threshold} for two consecutive weeks "
-                f"({prev_week} and {week_number}) in module_id={module_id}."
-            )
-            created_at = datetime.now().isoformat(timespec="seconds")
-            candidate = (student_id, module_id, week_number, reason, created_at, 0)
-
-            if student_id not in latest_alert_by_student:
+    for evt in events:
+        student_id, module_id, week_number = evt["student_id"], evt["module_id"], evt["week_next"]
+        reason = (
+            f"Stress level >= {threshold} for two consecutive weeks "
+            f"({evt['week_start']} and {week_number}) in module_id={module_id}."
+        )
+        created_at = datetime.now().isoformat(timespec="seconds")
+        candidate = (student_id, module_id, week_number, reason, created_at, 0)
+
+        if student_id not in latest_alert_by_student:
+            latest_alert_by_student[student_id] = candidate
+        else:
+            _, _, existing_week, *_ = latest_alert_by_student[student_id]
+            if week_number > existing_week:
                 latest_alert_by_student[student_id] = candidate
-            else:
-                _, _, existing_week, *_ = latest_alert_by_student[student_id]
-                if week_number > existing_week:
-                    latest_alert_by_student[student_id] = candidate
-
-        prev_week = week_number
-        prev_stress = stress_level
 
     alerts_to_insert = list(latest_alert_by_student.values())
 
@@ -579,5 +697,27 @@ def init_dev_and_test_databases():
     print("=== 所有数据库初始化完成 ===")
 
 
+# =======================
+# 6. 命令行入口
+# =======================
+# python db_establish.py                    -> 重建开发库 + 测试库
+# python db_establish.py migrate [db_path]  -> 原地补齐索引（默认 db_dev.sqlite3），并打印查询计划
+def main(argv: List[str]) -> None:
+    if argv and argv[0] == "migrate":
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        db_path = argv[1] if len(argv) > 1 else os.path.join(base_dir, "db_dev.sqlite3")
+        conn = migrate_database(db_path)
+        try:
+            for sql, plan in check_index_usage(conn).items():
+                print(f"\n{sql}")
+                for detail in plan:
+                    print(f"    {detail}")
+        finally:
+            conn.close()
+        return
+
+    init_dev_and_test_databases()
+
+
 if __name__ == "__main__":
-    init_dev_and_test_databases()
\ No newline at end of file
+    main(sys.argv[1:])
\ No newline at end of file
@@ -9,6 +9,7 @@ import type {
   SurveyPayload,
   Alert,
   AlertPayload,
+  DashboardSummary,
 } from '@/types'
 
 const base = '/api'
@@ -31,8 +32,23 @@ async function request<T>(path: string, options: RequestInit = {}): Promise<T> {
   return res.json() as Promise<T>
 }
 
-export async function fetchStudents(): Promise<Student[]> {
-  return request<Student[]>('/students')
+// List filters are applied server-side, e.g. { moduleId: 3, weekNumber__gte: 4, studentId__in: [1, 2] }
+// plus the pagination/sort params (limit, after, sort)
+export type ListQuery = Record<string, string | number | boolean | Array<string | number> | undefined>
+
+function withQuery(path: string, query?: ListQuery): string {
+  if (!query) return path
+  const params = new URLSearchParams()
+  for (const [key, value] of Object.entries(query)) {
+    if (value === undefined) continue
+    params.append(key, Array.isArray(value) ? value.join(',') : String(value))
+  }
+  const qs = params.toString()
+  return qs ? `${path}?${qs}` : path
+}
+
+export async function fetchStudents(query?: ListQuery): Promise<Student[]> {
+  return request<Student[]>(withQuery('/students', query))
 }
 
 export async function createStudent(payload: StudentPayload): Promise<Student> {
@@ -54,8 +70,8 @@ export async function deleteStudent(id: number): Promise<void> {
 }
 
 // Attendance
-export async function fetchAttendance(): Promise<AttendanceRecord[]> {
-  return request<AttendanceRecord[]>('/attendance')
+export async function fetchAttendance(query?: ListQuery): Promise<AttendanceRecord[]> {
+  return request<AttendanceRecord[]>(withQuery('/attendance', query))
 }
 
 export async function createAttendance(payload: AttendancePayload): Promise<AttendanceRecord> {
@@ -77,8 +93,8 @@ export async function deleteAttendance(id: number): Promise<void> {
 }
 
 // Submissions
-export async function fetchSubmissions(): Promise<SubmissionRecord[]> {
-  return request<SubmissionRecord[]>('/submissions')
+export async function fetchSubmissions(query?: ListQuery): Promise<SubmissionRecord[]> {
+  return request<SubmissionRecord[]>(withQuery('/submissions', query))
 }
 
 export async function createSubmission(payload: SubmissionPayload): Promise<SubmissionRecord> {
@@ -100,8 +116,8 @@ export async function deleteSubmission(id: number): Promise<void> {
 }
 
 // Surveys
-export async function fetchSurveys(): Promise<SurveyResponse[]> {
-  return request<SurveyResponse[]>('/surveys')
+export async function fetchSurveys(query?: ListQuery): Promise<SurveyResponse[]> {
+  return request<SurveyResponse[]>(withQuery('/surveys', query))
 }
 
 export async function createSurvey(payload: SurveyPayload): Promise<SurveyResponse> {
@@ -123,8 +139,8 @@ export async function deleteSurvey(id: number): Promise<void> {
 }
 
 // Alerts
-export async function fetchAlerts(): Promise<Alert[]> {
-  return request<Alert[]>('/alerts')
+export async function fetchAlerts(query?: ListQuery): Promise<Alert[]> {
+  return request<Alert[]>(withQuery('/alerts', query))
 }
 
 export async function createAlert(payload: AlertPayload): Promise<Alert> {
@@ -144,3 +160,8 @@ export async function updateAlert(id: number, payload: AlertPayload): Promise<Al
 export async function deleteAlert(id: number): Promise<void> {
   await request<void>(`/alerts/${id}`, { method: 'DELETE' })
 }
+
+// Dashboard
+export async function fetchDashboardSummary(): Promise<DashboardSummary> {
+  return request<DashboardSummary>('/dashboard/summary')
+}
@@ -99,6 +99,8 @@ export interface Alert {
   createdAt?: string
   resolved: boolean
   severity: 'low' | 'medium' | 'high'
+  // present when requested with ?expand=student
+  student?: Student | null
 }
 
 export interface AlertPayload {
@@ -118,3 +120,24 @@ export interface Grade {
   assessmentName: string
   grade: number
 }
+
+// GET /api/dashboard/summary: KPIs aggregated server-side (active records only)
+export interface DashboardSummary {
+  studentCount: number
+  moduleCount: number
+  averageAttendance: number | null
+  averageStress: number | null
+  submissions: {
+    submitted: number
+    late: number
+    lateRate: number | null
+    onTimeRate: number | null
+  }
+  stressByWeek: Array<{ weekNumber: number; averageStress: number; responses: number }>
+  openAlerts: number
+  openAlertsByModule: Array<{ moduleId: number | null; openAlerts: number }>
+  atRiskCount: number
+  atRiskStudents: Array<Pick<Student, 'id' | 'fullName' | 'courseName' | 'yearOfStudy'>>
+  upcomingSubmissions: Array<Pick<SubmissionRecord, 'id' | 'studentId' | 'moduleId' | 'assessmentName' | 'dueDate' | 'isLate'>>
+  recentSurveys: Array<Omit<SurveyResponse, 'createdAt'>>
+}
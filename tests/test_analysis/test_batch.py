@@ -0,0 +1,113 @@
+# tests/test_analysis/test_batch.py
+import pytest
+
+import db_establish
+from app.analysis.batch import BatchAnalysisRunner, parse_batch
+from app.analysis.services import AnalysisServiceRepository
+
+# 运行本测试文件的指令：pytest -vv tests/test_analysis/test_batch.py
+
+
+@pytest.fixture
+def seeded_conn(tmp_path):
+    conn = db_establish.init_database(str(tmp_path / "batch.sqlite3"))
+    # 让部分数据失效，检验各 sink 自己的 is_active 过滤
+    conn.execute("UPDATE survey_responses SET is_active = 0 WHERE id % 7 = 0;")
+    conn.execute("UPDATE grades SET is_active = 0 WHERE id % 5 = 0;")
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def _approx_rows(rows):
+    return [{k: pytest.approx(v) if isinstance(v, float) else v for k, v in row.items()} for row in rows]
+
+
+def test_fused_scans_match_individual_service_calls(seeded_conn):
+    analyses = parse_batch({"analyses": [
+        {"name": "attendance_averages"},
+        {"name": "grade_distribution"},
+        {"name": "grade_distribution", "key": "dist_all", "params": {"include_inactive": True, "by_module": True}},
+        {"name": "stress_grade_by_module"},
+        {"name": "stress_grade_by_module", "key": "corr_m1", "params": {"module_ids": [1], "include_inactive": True}},
+        {"name": "stress_high", "params": {"threshold": 4}},
+        {"name": "stress_high", "key": "high_m1", "params": {"threshold": 3, "module_id": 1}},
+        {"name": "stress_streaks", "params": {"rules": ["rising:3", "window:2:3:4"], "latest_only": True}},
+    ]})
+    runner = BatchAnalysisRunner(seeded_conn)
+    data = runner.run(analyses)
+
+    service = AnalysisServiceRepository(seeded_conn)
+    assert list(data) == [a.key for a in analyses]
+    assert data["attendance_averages"] == service.get_students_average_attendance()
+    assert data["grade_distribution"] == service.get_grade_distribution()
+    assert data["dist_all"] == service.get_grade_distribution(include_inactive=True, by_module=True)
+    assert data["stress_grade_by_module"] == _approx_rows(service.compare_stress_grade_by_module())
+    assert data["corr_m1"] == _approx_rows(
+        service.compare_stress_grade_by_module(module_ids=[1], include_inactive=True)
+    )
+    assert data["stress_high"] == service.detect_consecutive_high_stress(threshold=4)
+    assert data["high_m1"] == service.detect_consecutive_high_stress(threshold=3, module_id=1)
+    expected_streaks = service.detect_streaks(
+        [a for a in analyses if a.key == "stress_streaks"][0].params["rules"], latest_only=True
+    )
+    assert sorted(data["stress_streaks"], key=repr) == sorted(expected_streaks, key=repr)
+
+    # survey_responses 与 grades 各只扫描一次
+    assert runner.scans == {"grades": 1, "survey_responses": 1, "attendance_records": 1}
+    assert not seeded_conn.in_transaction
+
+
+def test_duplicates_run_once_and_single_readers_use_the_service(seeded_conn):
+    analyses = parse_batch({"analyses": [
+        {"name": "stress_high", "key": "a", "params": {"threshold": 4}},
+        {"name": "stress_high", "key": "b", "params": {"threshold": "4"}},
+        {"name": "grade_distribution", "params": {"quantiles": 4}},
+    ]})
+    runner = BatchAnalysisRunner(seeded_conn)
+    data = runner.run(analyses)
+
+    assert data["a"] is data["b"]
+    assert runner.scans == {"survey_responses": 1, "grades": 1}
+
+
+def test_fused_grade_scan_skips_null_grades(seeded_conn):
+    seeded_conn.execute("UPDATE grades SET grade = NULL WHERE id IN (1, 2, 3);")
+    seeded_conn.commit()
+    analyses = parse_batch({"analyses": [
+        {"name": "grade_distribution"},
+        {"name": "grade_distribution", "key": "dist_all", "params": {"include_inactive": True}},
+        {"name": "stress_high"},
+        {"name": "stress_grade_by_module"},
+    ]})
+    runner = BatchAnalysisRunner(seeded_conn)
+    data = runner.run(analyses)
+
+    service = AnalysisServiceRepository(seeded_conn)
+    assert data["grade_distribution"] == service.get_grade_distribution()
+    assert data["dist_all"] == service.get_grade_distribution(include_inactive=True)
+    assert data["stress_grade_by_module"] == _approx_rows(service.compare_stress_grade_by_module())
+    assert runner.scans["grades"] == 1
+
+
+def test_parse_batch_rejects_bad_requests():
+    for payload in (
+        None,
+        {"analyses": []},
+        {"analyses": [{"name": "nope"}]},
+        {"analyses": [{"name": "stress_high"}, {"name": "stress_high"}]},
+        {"analyses": [{"name": "stress_high", "params": {"thresold": 4}}]},
+        {"analyses": [{"name": "stress_trend"}]},
+        {"analyses": [{"name": "stress_streaks", "params": {"rules": ["rising:1"]}}]},
+        {"analyses": [{"name": "stress_high", "params": {"threshold": "high"}}]},
+        {"analyses": [{"name": "threshold_sweep", "params": {"max_threshold": 10**9}}]},
+        {"analyses": [{"name": "threshold_sweep", "params": {"min_threshold": 0}}]},
+        {"analyses": [{"name": "threshold_sweep", "params": {"max_weeks": 10**6}}]},
+        {"analyses": [{"name": "grade_distribution", "params": {"equal_width": 10**6}}]},
+        {"analyses": [{"name": "grade_distribution", "params": {"quantiles": 1000}}]},
+        {"analyses": [{"name": "grade_distribution", "params": {"edges": list(range(1000))}}]},
+        {"analyses": [{"name": "grade_distribution", "params": {"edges": [0, 50], "quantiles": 2}}]},
+    ):
+        with pytest.raises(ValueError):
+            parse_batch(payload)
+
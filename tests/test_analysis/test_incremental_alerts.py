@@ -0,0 +1,185 @@
+# tests/test_analysis/test_incremental_alerts.py
+import sqlite3
+
+import pytest
+
+import db_establish
+from app.analysis.incremental_alerts import IncrementalAlertEngine, scan_streak
+from app.analysis.services import AnalysisServiceRepository
+
+# 运行本测试文件的指令：pytest -vv tests/test_analysis/test_incremental_alerts.py
+
+
+@pytest.fixture
+def conn():
+    """内存库：survey_responses + alerts，表结构与正式库一致。"""
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        """
+        CREATE TABLE survey_responses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            module_id INTEGER,
+            week_number INTEGER NOT NULL,
+            stress_level INTEGER NOT NULL,
+            hours_slept REAL,
+            mood_comment TEXT,
+            created_at TEXT,
+            is_active INTEGER NOT NULL DEFAULT 1
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            module_id INTEGER,
+            week_number INTEGER,
+            reason TEXT NOT NULL,
+            created_at TEXT,
+            resolved INTEGER NOT NULL DEFAULT 0,
+            is_active INTEGER NOT NULL DEFAULT 1
+        );
+        """
+    )
+    _add_surveys(conn, [
+        (1, 101, 1, 3), (1, 101, 2, 4), (1, 101, 3, 5),  # 命中 (2,3)
+        (2, 101, 1, 5), (2, 101, 2, 2),                  # 未命中
+        (3, 102, 1, 4), (3, 102, 2, 4),                  # 命中 (1,2)
+    ])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def _add_surveys(conn, rows):
+    conn.executemany(
+        "INSERT INTO survey_responses (student_id, module_id, week_number, stress_level) VALUES (?, ?, ?, ?);",
+        rows,
+    )
+
+
+def _active_alerts(conn):
+    rows = conn.execute(
+        "SELECT student_id, module_id, week_number, resolved FROM alerts WHERE is_active = 1;"
+    ).fetchall()
+    return {(s, m): (w, r) for s, m, w, r in rows}
+
+
+def test_scan_streak_resumes_from_state():
+    rows = [(1, 5), (2, 5), (3, 1), (4, 5), (5, 5)]
+    full = scan_streak(rows, 4)
+    assert full == (5, 5, (4, 5))
+    # 分两段扫描与一次扫描结果相同
+    first = scan_streak(rows[:3], 4)
+    assert scan_streak(rows[3:], 4, *first) == full
+
+
+def test_bootstrap_matches_full_mode(tmp_path):
+    path = str(tmp_path / "alerts.sqlite3")
+    db_establish.init_database(path).close()
+    conn = sqlite3.connect(path)
+    try:
+        service = AnalysisServiceRepository(conn)
+        full = service.create_high_stress_alerts(threshold=4)
+        expected = {(a["student_id"], a["module_id"]): a["week_number"] for a in full}
+
+        conn.execute("DELETE FROM alerts;")
+        conn.commit()
+        changes = service.create_high_stress_alerts(threshold=4, incremental=True)
+
+        assert {c["action"] for c in changes} == {"inserted"}
+        got = {(s, m): w for (s, m), (w, _) in _active_alerts(conn).items()}
+        assert got == expected
+    finally:
+        conn.close()
+
+
+def test_second_run_without_delta_keeps_resolved(conn):
+    engine = IncrementalAlertEngine(conn)
+    assert len(engine.run(threshold=4)) == 2
+    conn.execute("UPDATE alerts SET resolved = 1;")
+    conn.commit()
+
+    assert engine.run(threshold=4) == []
+    assert _active_alerts(conn) == {(1, 101): (3, 1), (3, 102): (2, 1)}
+
+
+def test_new_rows_extend_streaks_and_upsert(conn):
+    engine = IncrementalAlertEngine(conn)
+    engine.run(threshold=4)
+    conn.execute("UPDATE alerts SET resolved = 1;")
+    _add_surveys(conn, [
+        (1, 101, 4, 4),   # 接着第 3 周：新的一段命中 (3,4)，重新打开
+        (2, 101, 3, 4),   # 第 2 周是 2，不构成命中
+        (4, 103, 1, 5), (4, 103, 2, 5),  # 新组合
+    ])
+    conn.commit()
+
+    changes = {(c["student_id"], c["module_id"]): c["action"] for c in engine.run(threshold=4)}
+
+    assert changes == {(1, 101): "updated", (4, 103): "inserted"}
+    assert _active_alerts(conn) == {(1, 101): (4, 0), (3, 102): (2, 1), (4, 103): (2, 0)}
+
+
+def test_updated_and_backfilled_rows_are_recomputed(conn):
+    engine = IncrementalAlertEngine(conn)
+    engine.run(threshold=4)
+
+    # 修改已处理过的问卷（触发器记脏）-> (3,102) 的命中消失，alert 被逻辑删除
+    conn.execute("UPDATE survey_responses SET stress_level = 1 WHERE student_id = 3 AND week_number = 2;")
+    # 补录更早的周次 -> (2,101) 周 0 与周 1 连续命中
+    _add_surveys(conn, [(2, 101, 0, 5)])
+    conn.commit()
+
+    changes = {(c["student_id"], c["module_id"]): c["action"] for c in engine.run(threshold=4)}
+
+    assert changes == {(3, 102): "retired", (2, 101): "inserted"}
+    assert _active_alerts(conn) == {(1, 101): (3, 0), (2, 101): (1, 0)}
+    # 脏记录处理完即清理
+    assert conn.execute("SELECT COUNT(*) FROM alert_dirty_pairs;").fetchone()[0] == 0
+
+
+def test_bootstrap_adopts_existing_alerts(conn):
+    AnalysisServiceRepository(conn).create_high_stress_alerts(threshold=4)
+    conn.execute("UPDATE alerts SET resolved = 1 WHERE student_id = 1;")
+    conn.commit()
+
+    assert IncrementalAlertEngine(conn).run(threshold=4) == []
+    assert _active_alerts(conn) == {(1, 101): (3, 1), (3, 102): (2, 0)}
+    assert conn.execute("SELECT COUNT(*) FROM alerts;").fetchone()[0] == 2
+
+
+def test_scopes_keep_independent_watermarks(conn):
+    engine = IncrementalAlertEngine(conn)
+    engine.run(threshold=4, module_id=101)
+    assert set(_active_alerts(conn)) == {(1, 101)}
+
+    # 阈值 5 是另一个 scope，从头处理；(1,101) 只有周 3 为 5，不命中。
+    # 已有的 alert 属于阈值 4 的 scope，不会被接管或收回
+    assert engine.run(threshold=5, module_id=101) == []
+    assert set(_active_alerts(conn)) == {(1, 101)}
+
+    _add_surveys(conn, [(1, 101, 4, 5)])  # 阈值 5：周 3、4 连续命中，插入自己的 alert
+    conn.commit()
+    assert [c["action"] for c in engine.run(threshold=5, module_id=101)] == ["inserted"]
+    assert [c["action"] for c in engine.run(threshold=4, module_id=101)] == ["updated"]
+    scopes = conn.execute("SELECT scope, COUNT(*) FROM alert_scopes GROUP BY scope ORDER BY scope;").fetchall()
+    assert scopes == [("consecutive:4:101:0", 1), ("consecutive:5:101:0", 1)]
+
+    watermarks = dict(conn.execute("SELECT scope, last_survey_id FROM alert_watermarks;").fetchall())
+    assert watermarks == {"consecutive:4:101:0": 8, "consecutive:5:101:0": 8}
+
+
+def test_full_mode_rebuild_resets_incremental_state(conn):
+    engine = IncrementalAlertEngine(conn)
+    engine.run(threshold=4)
+    AnalysisServiceRepository(conn).create_high_stress_alerts(threshold=4)  # clear_old：删除并重建 alerts
+
+    for table in ("alert_streak_state", "alert_watermarks", "alert_scopes"):
+        assert conn.execute(f"SELECT COUNT(*) FROM {table};").fetchone()[0] == 0
+    # 下一次增量运行重新扫描，接管重建后的 alert，不重复插入
+    assert engine.run(threshold=4) == []
+    assert conn.execute("SELECT COUNT(*) FROM alerts;").fetchone()[0] == 2
+    assert conn.execute("SELECT COUNT(*) FROM alert_scopes;").fetchone()[0] == 2
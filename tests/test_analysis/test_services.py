@@ -1,5 +1,6 @@
 
 import sqlite3
+import statistics
 import sys
 from pathlib import Path
 from typing import Dict
@@ -268,6 +269,47 @@ def test_detect_consecutive_high_stress_all_modules(survey_conn):
 # 功能块：测试“自动创建预警记录”（alerts）
 # ----------------------------------------------------------------------
 
+def test_detect_consecutive_high_stress_engines_agree(survey_conn):
+    # 补充边界数据：同一周重复填写、module_id 为空、非活跃记录夹在中间
+    survey_conn.executemany(
+        """
+        INSERT INTO survey_responses (student_id, module_id, week_number, stress_level, is_active)
+        VALUES (?, ?, ?, ?, ?);
+        """,
+        [
+            (7, 201, 1, 5, 1), (7, 201, 2, 2, 1), (7, 201, 2, 5, 1), (7, 201, 3, 5, 1),
+            (8, None, 1, 4, 1), (8, None, 2, 4, 1),
+            (9, 202, 1, 5, 1), (9, 202, 2, 5, 0), (9, 202, 3, 5, 1),
+        ],
+    )
+    survey_conn.commit()
+    service = AnalysisServiceRepository(conn=survey_conn)
+
+    for include_inactive in (False, True):
+        for threshold in (3, 4, 5):
+            kwargs = {"threshold": threshold, "include_inactive": include_inactive}
+            assert service.detect_consecutive_high_stress(engine="sql", **kwargs) == \
+                service.detect_consecutive_high_stress(engine="python", **kwargs)
+
+    hits = service.detect_consecutive_high_stress(threshold=4)
+    assert {(h["student_id"], h["module_id"], h["week_next"]) for h in hits if h["student_id"] >= 7} == {
+        (7, 201, 3),
+        (8, None, 2),
+    }
+    with pytest.raises(ValueError):
+        service.detect_consecutive_high_stress(engine="pandas")
+
+
+def test_detect_consecutive_high_stress_defaults_to_python_engine(survey_conn, monkeypatch):
+    # 基准测试中 LAG() 版本更慢，只在显式 engine="sql" 时使用
+    def fail(*args, **kwargs):
+        raise AssertionError("the sql engine should be opt-in")
+
+    monkeypatch.setattr(AnalysisServiceRepository, "_detect_consecutive_high_stress_sql", fail)
+    service = AnalysisServiceRepository(conn=survey_conn)
+    assert service.detect_consecutive_high_stress(threshold=4)
+
+
 @pytest.fixture
 def alerts_conn():
     """
@@ -440,7 +482,7 @@ def stress_grade_conn():
             student_id INTEGER NOT NULL,
             module_id INTEGER NOT NULL,
             assessment_name TEXT,
-            grade REAL NOT NULL,
+            grade REAL,
             is_active INTEGER NOT NULL
         );
         """
@@ -533,6 +575,35 @@ def test_compare_stress_grade_by_module_filter_and_inactive(stress_grade_conn):
     assert m102["pearson_corr"] is None
 
 
+def test_compare_stress_grade_by_module_spearman_and_regression(stress_grade_conn):
+    service = AnalysisServiceRepository(conn=stress_grade_conn)
+    data = {row["module_id"]: row for row in service.compare_stress_grade_by_module(include_spearman=True)}
+
+    # module 101：x=[4,2,3]，y=[80,80,60] -> 秩 x=[3,1,2]，y=[2.5,2.5,1]
+    expected = statistics.correlation([3, 1, 2], [2.5, 2.5, 1])
+    assert data[101]["spearman_corr"] == pytest.approx(expected)
+    assert data[102]["spearman_corr"] is None
+    assert "spearman_corr" not in service.compare_stress_grade_by_module()[0]
+    # 回归：grade = slope * stress + intercept，x=[4,2,3]，y=[80,80,60] 协方差为 0 -> 斜率 0
+    assert data[101]["slope"] == pytest.approx(0.0, abs=1e-9)
+    assert data[101]["intercept"] == pytest.approx(73.333, rel=1e-3)
+
+
+def test_compare_stress_grade_by_module_skips_null_grades(stress_grade_conn):
+    # grades.grade 可为 NULL（尚未录入）：这些记录不参与均值与相关系数，与 SQL AVG 的口径一致
+    stress_grade_conn.execute(
+        "INSERT INTO grades (student_id, module_id, assessment_name, grade, is_active) VALUES (2, 101, 'cw', NULL, 1);"
+    )
+    stress_grade_conn.execute("UPDATE grades SET grade = NULL WHERE student_id = 3;")
+    service = AnalysisServiceRepository(conn=stress_grade_conn)
+
+    data = _to_module_map(service.compare_stress_grade_by_module(include_spearman=True))
+    assert list(data) == [101]
+    assert data[101]["sample_size"] == 3
+    assert data[101]["average_grade"] == pytest.approx(73.333, rel=1e-3)
+    assert data[101]["spearman_corr"] == pytest.approx(statistics.correlation([3, 1, 2], [2.5, 2.5, 1]))
+
+
 # ----------------------------------------------------------------------
 # 新增功能块：成绩分布 & 压力-成绩散点
 # ----------------------------------------------------------------------
@@ -604,6 +675,35 @@ def test_get_grade_distribution_module_filter_and_inactive(grade_distribution_co
     assert sum(_to_label_map(data_all).values()) == 6
 
 
+def test_get_grade_distribution_custom_edges_and_equal_width(grade_distribution_conn):
+    service = AnalysisServiceRepository(conn=grade_distribution_conn)
+
+    data = service.get_grade_distribution(edges=[0, 70, 95])
+    # 最后一个桶包含上边界 95
+    assert [(d["label"], d["count"]) for d in data] == [("0-70", 2), ("70-95", 3)]
+
+    data = service.get_grade_distribution(equal_width=3)
+    assert [(d["label"], d["count"]) for d in data] == [("50-65", 1), ("65-80", 2), ("80-95", 2)]
+
+    with pytest.raises(ValueError):
+        service.get_grade_distribution(edges=[0, 70], quantiles=2)
+    # 桶数超过 MAX_GRADE_BINS 时是参数错误（ValueError），不是查询失败
+    for params in ({"equal_width": 1000}, {"quantiles": 1000}, {"edges": list(range(1000))}):
+        with pytest.raises(ValueError):
+            service.get_grade_distribution(**params)
+
+
+def test_get_grade_distribution_quantiles_and_by_module(grade_distribution_conn):
+    service = AnalysisServiceRepository(conn=grade_distribution_conn)
+
+    data = service.get_grade_distribution(quantiles=2, include_inactive=True)
+    assert [d["count"] for d in data] == [3, 3]
+
+    per_module = service.get_grade_distribution(include_inactive=True, by_module=True)
+    assert [m["module_id"] for m in per_module] == [101, 102]
+    assert _to_label_map(per_module[1]["bins"]) == {"0-60": 1, "60-70": 0, "70-80": 0, "80-90": 0, "90-100": 0}
+
+
 def test_get_stress_grade_pairs_basic(stress_grade_conn):
     service = AnalysisServiceRepository(conn=stress_grade_conn)
 
@@ -627,3 +727,61 @@ def test_get_stress_grade_pairs_filter_and_inactive(stress_grade_conn):
     all_rows = service.get_stress_grade_pairs(include_inactive=True)
     # 多了一条 module 102 的非活跃记录
     assert len(all_rows) == 5
+
+
+def test_get_stress_grade_summary_grid_and_student_mean(stress_grade_conn):
+    service = AnalysisServiceRepository(conn=stress_grade_conn)
+
+    grid = service.get_stress_grade_summary("grid", grade_bin=20)
+    # 活跃点：(4,80) (2,80) (3,60) (5,90)
+    assert [(c["stress_level"], c["grade_low"], c["count"]) for c in grid] == [
+        (2, 80, 1), (3, 60, 1), (4, 80, 1), (5, 80, 1)
+    ]
+    assert sum(c["count"] for c in grid) == len(service.get_stress_grade_pairs())
+
+    means = {m["student_id"]: m for m in service.get_stress_grade_summary("student_mean")}
+    assert means[1]["stress_level"] == pytest.approx(3.0)
+    assert means[1]["grade"] == pytest.approx(80.0)
+    assert means[1]["count"] == 2
+
+    with pytest.raises(ValueError):
+        service.get_stress_grade_summary("hexbin")
+
+
+def test_get_stress_grade_summary_skips_null_grades(stress_grade_conn):
+    stress_grade_conn.execute("UPDATE grades SET grade = NULL WHERE student_id = 2;")
+    service = AnalysisServiceRepository(conn=stress_grade_conn)
+
+    grid = service.get_stress_grade_summary("grid", grade_bin=20)
+    assert [(c["stress_level"], c["grade_low"], c["count"]) for c in grid] == [(2, 80, 1), (4, 80, 1), (5, 80, 1)]
+    means = service.get_stress_grade_summary("student_mean")
+    assert [m["student_id"] for m in means] == [1, 3]
+
+
+def test_get_stress_grade_summary_stratified_sample(stress_grade_conn):
+    # 扩充数据：module 101 的 student 1 再加 200 周问卷，压力 1~5 循环
+    stress_grade_conn.executemany(
+        """
+        INSERT INTO survey_responses (student_id, module_id, week_number, stress_level, is_active)
+        VALUES (1, 101, ?, ?, 1);
+        """,
+        [(week, week % 5 + 1) for week in range(3, 203)],
+    )
+    service = AnalysisServiceRepository(conn=stress_grade_conn)
+    everything = service.get_stress_grade_pairs()
+
+    sample = service.get_stress_grade_summary("sample", max_points=20, seed=3)
+    assert len(sample) == 20
+    # 每个压力等级都被抽到，且样本保持原始排序、都是真实存在的点
+    assert {p["stress_level"] for p in sample} == {1, 2, 3, 4, 5}
+    keys = [(p["student_id"], p["module_id"], p["week_number"]) for p in sample]
+    assert keys == sorted(keys)
+    assert all(p in everything for p in sample)
+    assert sample == service.get_stress_grade_summary("sample", max_points=20, seed=3)
+    # 不指定 seed 时同样是确定的（ETag 依赖这一点）；结果缓存未启用，每次都重新抽样
+    default = service.get_stress_grade_summary("sample", max_points=20)
+    assert default == AnalysisServiceRepository(conn=stress_grade_conn).get_stress_grade_summary("sample", max_points=20)
+
+    # 总数不超过上限时返回全部点
+    assert len(service.get_stress_grade_summary("sample", max_points=10_000)) == len(everything)
+
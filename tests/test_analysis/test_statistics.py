@@ -0,0 +1,71 @@
+# tests/test_analysis/test_statistics.py
+import random
+import statistics
+
+import pytest
+
+from app.analysis.statistics import CoMoments, Moments, grouped_comoments
+
+# 运行本测试文件的指令：pytest -vv tests/test_analysis/test_statistics.py
+
+
+def _sample(n=500, seed=7):
+    rng = random.Random(seed)
+    xs = [rng.uniform(1, 5) for _ in range(n)]
+    ys = [60 + 5 * x + rng.gauss(0, 3) for x in xs]
+    return xs, ys
+
+
+def test_moments_match_statistics_module():
+    xs, _ = _sample()
+    acc = Moments().update(xs)
+    assert acc.mean == pytest.approx(statistics.fmean(xs))
+    assert acc.variance() == pytest.approx(statistics.variance(xs))
+    assert Moments().variance() is None
+
+
+def test_comoments_pearson_and_regression():
+    xs, ys = _sample()
+    acc = CoMoments().update(zip(xs, ys))
+
+    assert acc.pearson() == pytest.approx(statistics.correlation(xs, ys))
+    slope, intercept = acc.linear_regression()
+    expected = statistics.linear_regression(xs, ys)
+    assert slope == pytest.approx(expected.slope)
+    assert intercept == pytest.approx(expected.intercept)
+
+
+def test_merge_equals_single_pass():
+    xs, ys = _sample()
+    whole = CoMoments().update(zip(xs, ys))
+    parts = [CoMoments().update(zip(xs[i:i + 97], ys[i:i + 97])) for i in range(0, len(xs), 97)]
+    merged = CoMoments()
+    for part in parts:
+        merged.merge(part)
+
+    for field in ("n", "mean_x", "mean_y", "m2_x", "m2_y", "c_xy"):
+        assert getattr(merged, field) == pytest.approx(getattr(whole, field))
+    assert Moments().update(xs[:10]).merge(Moments().update(xs[10:])).variance() == pytest.approx(
+        statistics.variance(xs)
+    )
+
+
+def test_large_offset_does_not_cancel():
+    # 数值整体偏移 1e9：用 SUM(x^2) - n*mean^2 会失去全部有效位
+    xs, ys = _sample(n=2000)
+    offset = 1e9
+    acc = CoMoments().update((x + offset, y + offset) for x, y in zip(xs, ys))
+    assert acc.pearson() == pytest.approx(statistics.correlation(xs, ys), abs=1e-6)
+
+
+def test_degenerate_inputs_return_none():
+    acc = CoMoments().update([(1, 5), (2, 5), (3, 5)])
+    assert acc.pearson() is None
+    assert CoMoments().update([(2, 1), (2, 3)]).linear_regression() is None
+
+
+def test_grouped_comoments_keeps_first_seen_order():
+    groups = grouped_comoments([("b", 1, 2), ("a", 1, 1), ("b", 2, 4), ("a", 2, 3)])
+    assert list(groups) == ["b", "a"]
+    assert groups["b"].linear_regression() == pytest.approx((2.0, 0.0))
+
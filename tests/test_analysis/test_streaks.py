@@ -0,0 +1,158 @@
+# tests/test_analysis/test_streaks.py
+import sqlite3
+
+import pytest
+
+from app.analysis.services import AnalysisServiceRepository
+from app.analysis.streaks import (
+    ConsecutiveRule,
+    RisingRule,
+    StreakEngine,
+    WindowCountRule,
+    parse_rule,
+)
+
+# 运行本测试文件的指令：pytest -vv tests/test_analysis/test_streaks.py
+
+
+def _hits(rule, weeks):
+    rows = [(1, 101, week, stress) for week, stress in weeks]
+    return [(h["week_start"], h["week_end"]) for h in StreakEngine([rule]).scan(rows)]
+
+
+def test_consecutive_rule_needs_n_adjacent_weeks():
+    weeks = [(1, 4), (2, 5), (3, 5), (5, 5), (6, 5), (7, 2)]
+    assert _hits(ConsecutiveRule(3, 4), weeks) == [(1, 3)]
+    assert _hits(ConsecutiveRule(2, 4), weeks) == [(1, 2), (2, 3), (5, 6)]
+
+
+def test_window_rule_counts_calendar_weeks():
+    # 第 4 周缺失，视为未达阈值
+    weeks = [(1, 5), (2, 1), (3, 5), (5, 5), (6, 4)]
+    assert _hits(WindowCountRule(2, 3, 4), weeks) == [(1, 3), (3, 5), (5, 6)]
+    assert _hits(WindowCountRule(3, 4, 4), weeks) == [(3, 6)]
+
+
+def test_rising_rule():
+    weeks = [(1, 1), (2, 2), (3, 3), (4, 3), (5, 4), (6, 5), (8, 5)]
+    assert _hits(RisingRule(3), weeks) == [(1, 3), (4, 6)]
+
+
+def test_engine_evaluates_all_rules_in_one_pass():
+    rules = [ConsecutiveRule(2, 4), RisingRule(2)]
+    rows = [(1, 101, 1, 4), (1, 101, 2, 5), (1, 102, 1, 5), (2, 101, 1, 1), (2, 101, 2, 2)]
+    consumed = []
+
+    def tracked():
+        for row in rows:
+            consumed.append(row)
+            yield row
+
+    hits = StreakEngine(rules).scan(tracked())
+    assert sorted((h["rule"], h["student_id"], h["module_id"]) for h in hits) == [
+        ("consecutive:2:4", 1, 101),
+        ("rising:2", 1, 101),
+        ("rising:2", 2, 101),
+    ]
+    # 换组合时状态重置，且问卷流只被读了一遍
+    assert consumed == rows
+
+
+def test_parse_rule():
+    assert parse_rule("consecutive:3:4") == ConsecutiveRule(3, 4)
+    assert parse_rule(" window:2:4:5 ") == WindowCountRule(2, 4, 5)
+    assert parse_rule("rising:3") == RisingRule(3)
+    for bad in ("weekly:2", "consecutive:3", "rising:x", "window:5:4:4", "rising:1"):
+        with pytest.raises(ValueError):
+            parse_rule(bad)
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        """
+        CREATE TABLE survey_responses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            module_id INTEGER,
+            week_number INTEGER NOT NULL,
+            stress_level INTEGER NOT NULL,
+            is_active INTEGER NOT NULL DEFAULT 1
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            module_id INTEGER,
+            week_number INTEGER,
+            reason TEXT NOT NULL,
+            created_at TEXT,
+            resolved INTEGER NOT NULL DEFAULT 0,
+            is_active INTEGER NOT NULL DEFAULT 1
+        );
+        """
+    )
+    conn.executemany(
+        "INSERT INTO survey_responses (student_id, module_id, week_number, stress_level) VALUES (?, ?, ?, ?);",
+        [
+            (1, 101, 1, 3), (1, 101, 2, 4), (1, 101, 3, 5), (1, 101, 4, 5),
+            (2, 101, 1, 5), (2, 101, 2, 2), (2, 101, 2, 5), (2, 101, 3, 5),
+            (3, None, 1, 4), (3, None, 2, 4),
+        ],
+    )
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_two_week_rule_matches_existing_detector(conn):
+    service = AnalysisServiceRepository(conn)
+    expected = [
+        (e["student_id"], e["module_id"], e["week_start"], e["week_next"])
+        for e in service.detect_consecutive_high_stress(threshold=4)
+    ]
+    got = [
+        (h["student_id"], h["module_id"], h["week_start"], h["week_end"])
+        for h in service.detect_streaks([ConsecutiveRule(2, 4)])
+    ]
+    assert sorted(got, key=repr) == sorted(expected, key=repr)
+
+
+def test_create_high_stress_alerts_with_rules(conn):
+    service = AnalysisServiceRepository(conn)
+    created = service.create_high_stress_alerts(rules=[ConsecutiveRule(3, 4), RisingRule(3)])
+
+    assert sorted((a["rule"], a["student_id"], a["week_number"]) for a in created) == [
+        ("consecutive:3:4", 1, 4),
+        ("rising:3", 1, 3),
+    ]
+    rows = conn.execute("SELECT student_id, week_number, reason FROM alerts ORDER BY week_number;").fetchall()
+    assert [r[:2] for r in rows] == [(1, 3), (1, 4)]
+    assert "3 consecutive weeks 2 to 4" in rows[1][2]
+
+    with pytest.raises(ValueError):
+        service.create_high_stress_alerts(incremental=True, rules=[RisingRule(3)])
+
+
+def test_threshold_sweep_matches_per_threshold_detection(conn):
+    service = AnalysisServiceRepository(conn)
+    sweep = service.sweep_high_stress_thresholds(min_threshold=3, max_threshold=5, max_weeks=3)
+
+    assert [(r["threshold"], r["weeks"]) for r in sweep] == [(3, 2), (3, 3), (4, 2), (4, 3), (5, 2), (5, 3)]
+    for row in sweep:
+        hits = service.detect_streaks([ConsecutiveRule(row["weeks"], row["threshold"])])
+        assert row["flagged_pairs"] == len({(h["student_id"], h["module_id"]) for h in hits})
+        assert row["flagged_students"] == len({h["student_id"] for h in hits})
+
+    # weeks = 2 与原有的两周检测一致
+    at_4 = next(r for r in sweep if (r["threshold"], r["weeks"]) == (4, 2))
+    events = service.detect_consecutive_high_stress(threshold=4)
+    assert at_4["flagged_students"] == len({e["student_id"] for e in events}) == 3
+
+    for params in ({"max_weeks": 1}, {"max_weeks": 53}, {"min_threshold": 0}, {"max_threshold": 10**9}):
+        with pytest.raises(ValueError):
+            service.sweep_high_stress_thresholds(**params)
@@ -0,0 +1,16 @@
+import pytest
+
+import db_establish
+from app import create_app
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    """用 init_database 在临时目录建一个带示例数据的库，并让应用指向它。"""
+    db_path = tmp_path / "api.sqlite3"
+    db_establish.init_database(str(db_path)).close()
+    monkeypatch.setenv("DATABASE", f"sqlite:///{db_path}")
+    app = create_app()
+    yield app.test_client()
+    app.extensions["db_writer"].close()
+    app.extensions["db_pool"].close_all()
@@ -0,0 +1,35 @@
+# tests/test_api/test_batch_analysis.py
+
+# 运行本测试文件的指令：pytest -vv tests/test_api/test_batch_analysis.py
+
+
+def test_batch_route(client):
+    resp = client.post("/analysis/analysis", json={"analyses": [
+        {"name": "attendance_averages"},
+        {"name": "grade_distribution", "params": {"module_id": 1}},
+        {"name": "stress_grade_by_module"},
+        {"name": "stress_high", "params": {"threshold": 4}},
+    ]})
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["success"] is True
+    assert set(body["data"]) == {"attendance_averages", "grade_distribution", "stress_grade_by_module", "stress_high"}
+    single = client.get("/analysis/analysis/grades/distribution?module_id=1").get_json()["data"]
+    assert body["data"]["grade_distribution"] == single
+
+    assert client.post("/analysis/analysis", json={"analyses": [{"name": "nope"}]}).status_code == 400
+    bad_edges = {"analyses": [{"name": "grade_distribution", "params": {"edges": [3, 1]}}]}
+    assert client.post("/analysis/analysis", json=bad_edges).status_code == 400
+    too_many_bins = {"analyses": [{"name": "grade_distribution", "params": {"equal_width": 10**6}}]}
+    assert client.post("/analysis/analysis", json=too_many_bins).status_code == 400
+
+
+def test_threshold_sweep_limits(client):
+    assert client.get("/analysis/analysis/stress/sweep?max_weeks=52").status_code == 200
+    for query in ("max_threshold=1000000000", "min_threshold=0", "max_weeks=53", "min_threshold=4&max_threshold=3"):
+        assert client.get(f"/analysis/analysis/stress/sweep?{query}").status_code == 400
+
+
+def test_grade_distribution_bin_limit(client):
+    for query in ("equal_width=1000", "quantiles=1000", "edges=" + ",".join(map(str, range(1000)))):
+        assert client.get(f"/analysis/analysis/grades/distribution?{query}").status_code == 400
@@ -0,0 +1,105 @@
+# tests/test_api/test_bulk_import.py
+import json
+
+from app.api.bulk_import import import_records, iter_records
+from app.repositories.BaseRepository import BulkWriteResult
+
+# 运行本测试文件的指令：pytest -vv tests/test_api/test_bulk_import.py
+
+ATTENDANCE_CSV = """student_id,moduleId,weekNumber,attendedSessions,totalSessions
+1,1,40,3,4
+1,1,,3,4
+2,x,41,3,4
+2,1,42,,
+"""
+
+
+def test_csv_import_validates_rows_and_writes_in_chunks(client):
+    before = len(client.get("/api/attendance").get_json())
+    resp = client.post(
+        "/api/import/attendance?chunkSize=1", data=ATTENDANCE_CSV, headers={"Content-Type": "text/csv"}
+    )
+    assert resp.status_code == 200
+    report = resp.get_json()
+    assert (report["rows"], report["inserted"], report["failed"]) == (4, 2, 2)
+    assert report["errors"] == [
+        {"line": 3, "error": "Missing required fields: weekNumber"},
+        {"line": 4, "error": "moduleId must be an integer"},
+    ]
+    assert report["rowsPerSecond"] > 0
+
+    items = client.get("/api/attendance?weekNumber__gte=40").get_json()
+    assert len(client.get("/api/attendance").get_json()) == before + 2
+    assert [(item["weekNumber"], item["attendanceRate"]) for item in items] == [(40, 75.0), (42, None)]
+
+
+def test_ndjson_import_of_submissions_and_grades(client):
+    lines = [
+        {"studentId": 1, "moduleId": 1, "assessmentName": "Imported", "isSubmitted": True, "isLate": False},
+        "not json",
+        [1, 2],
+        {"student_id": 2, "module_id": 1, "assessment_name": "Imported", "is_late": True},
+    ]
+    body = "\n".join(item if isinstance(item, str) else json.dumps(item) for item in lines) + "\n\n"
+    report = client.post("/api/import/submissions?format=ndjson", data=body).get_json()
+    assert (report["rows"], report["inserted"], report["failed"]) == (4, 2, 2)
+    assert [error["line"] for error in report["errors"]] == [2, 3]
+    imported = client.get("/api/submissions?assessmentName=Imported").get_json()
+    assert [(s["isSubmitted"], s["isLate"]) for s in imported] == [(True, False), (False, True)]
+
+    csv_body = "studentId,moduleId,assessmentName,grade\n1,1,Final,71.5\n1,1,,60\n"
+    report = client.post(
+        "/api/import/grades?maxErrors=0", data=csv_body, headers={"Content-Type": "text/csv"}
+    ).get_json()
+    assert (report["inserted"], report["failed"], report["errors"], report["errorsTruncated"]) == (1, 1, [], True)
+
+
+def test_import_rejects_unknown_resources_and_formats(client):
+    assert client.post("/api/import/students", data="", headers={"Content-Type": "text/csv"}).status_code == 404
+    assert client.post("/api/import/attendance", json={"studentId": 1}).status_code == 400
+    assert client.post("/api/import/attendance?format=csv&chunkSize=0", data="").status_code == 400
+
+
+def test_database_failures_abort_after_committed_chunks():
+    calls = []
+
+    def write(fn):
+        calls.append(fn)
+        if len(calls) == 2:
+            raise RuntimeError("disk I/O error")
+        return BulkWriteResult(ids=[1, 2])
+
+    text = "studentId,moduleId,weekNumber\n" + "1,1,1\n" * 5
+    report = import_records("attendance", iter_records(text.splitlines(True), "csv"), chunk_size=2, write=write)
+    assert (report.rows, report.inserted) == (4, 2)
+    assert report.aborted == "line 4: disk I/O error"
+
+
+def test_cli_import(client, tmp_path):
+    path = tmp_path / "surveys.ndjson"
+    path.write_text(
+        json.dumps({"studentId": 1, "weekNumber": 50, "stressLevel": 3}) + "\n"
+        + json.dumps({"studentId": 1, "stressLevel": 3}) + "\n",
+        encoding="utf-8",
+    )
+    result = client.application.test_cli_runner().invoke(args=["import-data", "surveys", str(path)])
+    assert result.exit_code == 0, result.output
+    assert "surveys: 1/2 rows imported, 1 failed" in result.output
+    assert "line 2: Missing required fields: weekNumber" in result.output
+    assert client.get("/api/surveys?weekNumber=50").get_json()[0]["stressLevel"] == 3
+
+
+def test_ndjson_import_reports_overflowing_numbers_as_row_errors(client):
+    body = "\n".join([
+        '{"studentId": 1, "weekNumber": 1e999, "stressLevel": 3}',
+        '{"studentId": 1, "weekNumber": 1, "stressLevel": 1e999}',
+        '{"studentId": 1, "weekNumber": 1, "stressLevel": 3}',
+    ])
+    resp = client.post("/api/import/surveys?format=ndjson", data=body)
+    assert resp.status_code == 200
+    report = resp.get_json()
+    assert (report["rows"], report["inserted"], report["failed"]) == (3, 1, 2)
+    assert [error["line"] for error in report["errors"]] == [1, 2]
+
+    assert client.post("/api/surveys", data='{"studentId": 1, "weekNumber": 1, "stressLevel": 1e999}',
+                       headers={"Content-Type": "application/json"}).status_code == 400
@@ -0,0 +1,69 @@
+# tests/test_api/test_columnar.py
+from app.repositories.AlertRepository import AlertRepository
+from app.repositories.StudentRepository import StudentRepository
+
+# 运行本测试文件的指令：pytest -vv tests/test_api/test_columnar.py
+
+
+def _rows(columnar: dict) -> list:
+    """列式结构还原为逐行 dict，便于与默认格式比较。"""
+    # JSON 对象的键会被排序，列的顺序以 columns 为准
+    columns = columnar["columns"]
+    assert set(columnar["data"]) == set(columns)
+    return [dict(zip(columns, values)) for values in zip(*(columnar["data"][c] for c in columns))]
+
+
+def test_columnar_lists_match_row_format(client):
+    rows = client.get("/api/attendance?limit=5&sort=-attendanceRate").get_json()
+    resp = client.get("/api/attendance?limit=5&sort=-attendanceRate&format=columnar")
+    assert resp.status_code == 200
+    assert _rows(resp.get_json()) == rows
+    assert resp.headers["X-Next-Cursor"]
+
+    # bool 字段同样转换，computed 字段（severity）也能输出
+    alerts = client.get("/api/alerts?format=columnar&fields=id,resolved,severity").get_json()
+    assert alerts["columns"] == ["id", "resolved", "severity"]
+    assert all(isinstance(value, bool) for value in alerts["data"]["resolved"])
+    assert _rows(alerts) == client.get("/api/alerts?fields=id,resolved,severity").get_json()
+
+
+def test_columnar_computed_keys_do_not_build_models(client, monkeypatch):
+    expected = {
+        "alerts": client.get("/api/alerts").get_json(),
+        "students": client.get("/api/students").get_json(),
+    }
+
+    def fail(self, row):
+        raise AssertionError("format=columnar should not build a model per row")
+
+    monkeypatch.setattr(AlertRepository, "_from_row", fail)
+    monkeypatch.setattr(StudentRepository, "_from_row", fail)
+    for resource, rows in expected.items():
+        resp = client.get(f"/api/{resource}?format=columnar")
+        assert resp.status_code == 200
+        assert _rows(resp.get_json()) == rows
+
+
+def test_columnar_rejects_unsupported_combinations(client):
+    assert client.get("/api/attendance?format=csv").status_code == 400
+    assert client.get("/api/attendance?format=columnar&stream=1").status_code == 400
+    assert client.get("/api/alerts?format=columnar&expand=student").status_code == 400
+    assert client.get("/api/attendance?format=columnar&fields=nope").status_code == 400
+
+
+def test_columnar_analysis_endpoints(client):
+    for path in (
+        "/analysis/analysis/stress-grade/pairs?module_id=1",
+        "/analysis/analysis/attendance/averages",
+        "/analysis/analysis/stress-grade/pairs?mode=grid",
+    ):
+        rows = client.get(path).get_json()["data"]
+        columnar = client.get(f"{path}&format=columnar" if "?" in path else f"{path}?format=columnar").get_json()
+        assert _rows(columnar["data"]) == rows
+
+    empty = client.get("/analysis/analysis/stress-grade/pairs?module_id=999&format=columnar").get_json()
+    assert empty["data"]["data"] == {
+        "student_id": [], "module_id": [], "week_number": [], "stress_level": [], "grade": [],
+    }
+    assert client.get("/analysis/analysis/stress-grade/pairs?format=columnar&stream=1").status_code == 400
+    assert client.get("/analysis/analysis/attendance/averages?format=table").status_code == 400
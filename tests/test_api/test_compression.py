@@ -0,0 +1,60 @@
+# tests/test_api/test_compression.py
+import gzip
+import json
+
+from werkzeug.http import parse_accept_header
+
+from app import compression
+
+# 运行本测试文件的指令：pytest -vv tests/test_api/test_compression.py
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+def test_large_json_is_gzipped_and_small_responses_are_not(client):
+    plain = client.get("/api/surveys")
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    resp = client.get("/api/surveys", headers=GZIP)
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert int(resp.headers["Content-Length"]) == len(resp.data) < len(plain.data)
+    assert json.loads(gzip.decompress(resp.data)) == plain.get_json()
+
+    small = client.get("/api/students/1", headers=GZIP)
+    assert "Content-Encoding" not in small.headers
+    assert client.get("/api/surveys", headers={"Accept-Encoding": "gzip;q=0, identity"}).get_json()
+
+
+def test_compressed_etag_revalidates_and_hot_responses_reuse_cached_bytes(client):
+    cache = client.application.extensions["compressed_cache"]
+    first = client.get("/api/surveys", headers=GZIP)
+    etag = first.headers["ETag"]
+    assert etag.endswith('-gz"')
+    assert client.get("/api/surveys").headers["ETag"] != etag
+
+    second = client.get("/api/surveys", headers=GZIP)
+    assert second.data == first.data
+    assert cache.stats()["hits"] == 1
+
+    not_modified = client.get("/api/surveys", headers={**GZIP, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    assert "Accept-Encoding" in not_modified.headers["Vary"]
+
+
+def test_streamed_responses_are_compressed_incrementally(client):
+    plain = client.get("/api/surveys?stream=1")
+    resp = client.get("/api/surveys?stream=1", headers=GZIP)
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in resp.headers
+    assert gzip.decompress(resp.data) == plain.data
+
+
+def test_negotiation_prefers_client_quality_then_server_order():
+    accept = parse_accept_header
+    assert compression.negotiate(accept("gzip, deflate"), ["zstd", "br", "gzip"]) == "gzip"
+    assert compression.negotiate(accept("*"), ["gzip"]) == "gzip"
+    assert compression.negotiate(accept("gzip;q=0"), ["gzip"]) is None
+    assert compression.negotiate(accept("identity"), ["gzip"]) is None
+    assert compression.negotiate(accept("gzip"), []) is None
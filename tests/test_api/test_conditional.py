@@ -0,0 +1,50 @@
+# tests/test_api/test_conditional.py
+from app.api import routes as api_routes
+
+# 运行本测试文件的指令：pytest -vv tests/test_api/test_conditional.py
+
+
+def test_list_returns_etag_and_304_without_running_the_view(client, monkeypatch):
+    first = client.get("/api/students")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the list query should not run for a 304")
+
+    monkeypatch.setattr(api_routes, "_list_response", fail)
+    second = client.get("/api/students", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.data == b""
+    assert second.headers["ETag"] == etag
+
+
+def test_etag_depends_on_query_and_changes_after_write(client):
+    url = "/analysis/analysis/stress-trend?student_id=1"
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url + "&module_id=1").headers["ETag"] != etag
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    resp = client.post("/api/surveys", json={"studentId": 1, "weekNumber": 99, "stressLevel": 5})
+    assert resp.status_code == 201
+
+    fresh = client.get(url, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert fresh.get_json()["data"][-1]["week_number"] == 99
+
+
+def test_if_modified_since_alone_does_not_validate_and_errors(client):
+    first = client.get("/analysis/analysis/grades/distribution")
+    # Last-Modified 不区分请求参数：同一张表上的另一个查询不能因为它得到 304
+    for url in ("/analysis/analysis/grades/distribution", "/analysis/analysis/grades/distribution?quantiles=2"):
+        resp = client.get(url, headers={"If-Modified-Since": first.headers["Last-Modified"]})
+        assert resp.status_code == 200
+        assert resp.get_json()["success"] is True
+
+    # 错误响应不带 ETag
+    bad = client.get("/analysis/analysis/stress-trend")
+    assert bad.status_code == 400
+    assert "ETag" not in bad.headers
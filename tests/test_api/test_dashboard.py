@@ -0,0 +1,54 @@
+# tests/test_api/test_dashboard.py
+import pytest
+
+# 运行本测试文件的指令：pytest -vv tests/test_api/test_dashboard.py
+
+
+def test_summary_matches_client_side_aggregation(client):
+    summary = client.get("/api/dashboard/summary").get_json()
+    students = client.get("/api/students").get_json()
+    attendance = client.get("/api/attendance").get_json()
+    submissions = client.get("/api/submissions").get_json()
+    surveys = client.get("/api/surveys").get_json()
+    alerts = client.get("/api/alerts").get_json()
+
+    # 与 DashboardView 原来在浏览器里的算法一致
+    rates = [
+        min(100, max(0, round(r["attendedSessions"] / r["totalSessions"] * 100))) if r["totalSessions"] else 0
+        for r in attendance
+    ]
+    assert summary["studentCount"] == len(students)
+    assert summary["averageAttendance"] == round(sum(rates) / len(rates))
+    assert summary["averageStress"] == pytest.approx(sum(s["stressLevel"] for s in surveys) / len(surveys))
+
+    submitted = [s for s in submissions if s["isSubmitted"]]
+    late = [s for s in submitted if s["isLate"]]
+    assert summary["submissions"]["submitted"] == len(submitted)
+    assert summary["submissions"]["late"] == len(late)
+
+    weeks = {s["weekNumber"] for s in surveys}
+    assert [w["weekNumber"] for w in summary["stressByWeek"]] == sorted(weeks)
+    assert sum(w["responses"] for w in summary["stressByWeek"]) == len(surveys)
+
+    open_alerts = [a for a in alerts if not a["resolved"]]
+    assert summary["openAlerts"] == len(open_alerts)
+    at_risk = {s["studentId"] for s in surveys if s["stressLevel"] >= 4} | {a["studentId"] for a in open_alerts}
+    assert summary["atRiskCount"] == len(at_risk)
+    assert len(summary["atRiskStudents"]) == min(20, len(at_risk))
+
+    assert len(summary["recentSurveys"]) == 4
+    assert summary["recentSurveys"][0]["id"] == max(s["id"] for s in surveys)
+    assert all(not s["isSubmitted"] for s in submissions if s["id"] in {u["id"] for u in summary["upcomingSubmissions"]})
+
+
+def test_summary_is_cacheable(client):
+    first = client.get("/api/dashboard/summary?recentLimit=2")
+    assert len(first.get_json()["recentSurveys"]) == 2
+    assert client.get("/api/dashboard/summary?recentLimit=2", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+    client.post("/api/alerts", json={"studentId": 1, "moduleId": 1, "reason": "check in"})
+    after = client.get("/api/dashboard/summary?recentLimit=2", headers={"If-None-Match": first.headers["ETag"]})
+    assert after.status_code == 200
+    assert after.get_json()["openAlerts"] == first.get_json()["openAlerts"] + 1
+
+    assert client.get("/api/dashboard/summary?atRiskLimit=-1").status_code == 400
@@ -1,5 +1,7 @@
 import os
 from app import create_app
+from app.analysis.services import AnalysisServiceRepository
+from app.db import get_db
 from app.api.routes import _get_db_path
 
 
@@ -30,3 +32,9 @@ def test_get_db_path_falls_back_to_dev(monkeypatch):
 
     assert path.endswith("db_dev.sqlite3"), "Fallback should point to db_dev.sqlite3"
     assert os.path.exists(path), f"Expected fallback DB to exist at {path}"
+
+
+def test_analysis_service_defaults_to_the_app_connection(client):
+    """不传 conn 时，分析服务使用当前应用上下文的连接，而不是固定的测试库。"""
+    with client.application.app_context():
+        assert AnalysisServiceRepository().conn is get_db()
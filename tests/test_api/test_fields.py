@@ -0,0 +1,39 @@
+# tests/test_api/test_fields.py
+from flask import Flask
+
+from app.json_provider import FastJSONProvider
+from app.models.Student import Student
+from utils.serializer_util import orjson
+
+# 运行本测试文件的指令：pytest -vv tests/test_api/test_fields.py
+
+
+def test_sparse_fieldsets_on_lists_and_items(client):
+    full = client.get("/api/surveys?limit=3").get_json()
+    sparse = client.get("/api/surveys?limit=3&fields=id,stressLevel").get_json()
+    assert sparse == [{"id": item["id"], "stressLevel": item["stressLevel"]} for item in full]
+
+    streamed = client.get("/api/surveys?stream=1&fields=id").get_json()
+    assert streamed[:3] == [{"id": item["id"]} for item in full]
+
+    assert client.get("/api/students/1?fields=fullName").get_json() == {
+        "fullName": client.get("/api/students/1").get_json()["fullName"]
+    }
+    assert client.get("/api/students?fields=id,password").status_code == 400
+
+
+def test_fields_can_be_combined_with_expand(client):
+    items = client.get("/api/alerts?limit=2&expand=student&fields=id,student").get_json()
+    assert all(set(item) == {"id", "student"} for item in items)
+    assert items[0]["student"]["riskLevel"] == "low"
+
+
+def test_json_provider_backends_produce_the_same_document():
+    app = Flask(__name__)
+    student = Student(id=1, full_name="Zoë", student_number="S1", is_active=1)
+    payload = {"student": student, "values": [1, 2.5, None]}
+    backends = ["json"] + (["orjson"] if orjson is not None else [])
+    with app.app_context():
+        documents = [FastJSONProvider(app, backend=b).response(payload).get_json() for b in backends]
+    assert all(doc == documents[0] for doc in documents)
+    assert documents[0]["student"]["is_active"] is True
@@ -0,0 +1,29 @@
+def test_list_endpoint_filters_in_sql(client):
+    everything = client.get("/api/surveys").get_json()
+
+    resp = client.get("/api/surveys?moduleId__in=1,2&weekNumber__gte=9&sort=-weekNumber")
+    assert resp.status_code == 200
+    data = resp.get_json()
+
+    expected = [s for s in everything if s["moduleId"] in (1, 2) and s["weekNumber"] >= 9]
+    assert sorted(s["id"] for s in data) == sorted(s["id"] for s in expected)
+    assert [s["weekNumber"] for s in data] == sorted((s["weekNumber"] for s in data), reverse=True)
+
+
+def test_filters_combine_with_pagination_and_booleans(client):
+    resp = client.get("/api/submissions?isLate=true&limit=10")
+    assert resp.status_code == 200
+    page = resp.get_json()
+    assert len(page) == 10
+    assert all(r["isLate"] for r in page)
+    # 下一页链接保留过滤条件
+    assert "isLate=true" in resp.headers["Link"]
+
+    pending = client.get("/api/submissions?submittedDate__isnull=true").get_json()
+    assert pending and all(r["submittedDate"] is None for r in pending)
+
+
+def test_invalid_filters_are_rejected(client):
+    assert client.get("/api/students?password=x").status_code == 400
+    assert client.get("/api/students?isActive=0").status_code == 400
+    assert client.get("/api/students?yearOfStudy__between=1").status_code == 400
@@ -0,0 +1,41 @@
+def test_alerts_expand_student(client):
+    alerts = client.get("/api/alerts?expand=student").get_json()
+
+    assert alerts
+    for alert in alerts:
+        assert alert["student"]["id"] == alert["studentId"]
+
+    streamed = client.get("/api/alerts?expand=student&stream=1")
+    assert streamed.get_json() == alerts
+
+    assert client.get("/api/students?expand=student").status_code == 400
+
+
+def test_update_returns_the_stored_state(client):
+    student = client.get("/api/students/1").get_json()
+    student["fullName"] = "Renamed Student"
+
+    resp = client.put("/api/students/1", json=student)
+
+    assert resp.status_code == 200
+    assert resp.get_json() == client.get("/api/students/1").get_json()
+    assert resp.get_json()["fullName"] == "Renamed Student"
+
+
+def test_update_alert_does_not_echo_unstored_fields(client):
+    alert = client.get("/api/alerts").get_json()[0]
+    alert["reason"] = "Reviewed"
+    alert["severity"] = "critical"  # severity 不是存储列
+
+    resp = client.put(f"/api/alerts/{alert['id']}", json=alert)
+
+    assert resp.status_code == 200
+    stored = next(a for a in client.get("/api/alerts").get_json() if a["id"] == alert["id"])
+    assert resp.get_json() == stored
+    assert stored["reason"] == "Reviewed"
+
+
+def test_delete_checks_existence(client):
+    assert client.delete("/api/surveys/1").status_code == 204
+    assert client.delete("/api/surveys/1").status_code == 404
+    assert client.delete("/api/alerts/999999").status_code == 404
@@ -0,0 +1,48 @@
+def _walk(client, url):
+    """沿着 Link rel="next" 翻完所有页，返回 (全部记录, 页数)。"""
+    items, pages = [], 0
+    while url:
+        resp = client.get(url)
+        assert resp.status_code == 200
+        items.extend(resp.get_json())
+        pages += 1
+        link = resp.headers.get("Link")
+        url = link[1:link.index(">")] if link else None
+    return items, pages
+
+
+def test_list_without_limit_returns_everything(client):
+    resp = client.get("/api/students")
+    assert resp.status_code == 200
+    assert len(resp.get_json()) == 50
+    assert "Link" not in resp.headers
+
+
+def test_keyset_pages_cover_the_table_once(client):
+    everything = client.get("/api/students").get_json()
+
+    resp = client.get("/api/students?limit=20")
+    assert len(resp.get_json()) == 20
+    assert resp.headers["X-Next-Cursor"]
+
+    items, pages = _walk(client, "/api/students?limit=20")
+    assert pages == 3
+    assert [s["id"] for s in items] == [s["id"] for s in everything]
+
+
+def test_sort_with_ties_and_descending(client):
+    items, _ = _walk(client, "/api/surveys?limit=97&sort=-weekNumber")
+    keys = [(s["weekNumber"], s["id"]) for s in items]
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(s["id"] for s in items)) == len(client.get("/api/surveys").get_json())
+
+
+def test_invalid_parameters_are_rejected(client):
+    assert client.get("/api/students?limit=0").status_code == 400
+    assert client.get("/api/students?limit=100000").status_code == 400
+    assert client.get("/api/students?sort=email").status_code == 400
+    assert client.get("/api/students?after=not-a-cursor").status_code == 400
+
+    cursor = client.get("/api/students?limit=5").headers["X-Next-Cursor"]
+    # 游标与 sort 绑定，换了排序方式不能继续用
+    assert client.get(f"/api/students?limit=5&sort=fullName&after={cursor}").status_code == 400
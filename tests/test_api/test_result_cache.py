@@ -0,0 +1,46 @@
+# tests/test_api/test_result_cache.py
+
+# 运行本测试文件的指令：pytest -vv tests/test_api/test_result_cache.py
+
+
+def _cache_stats(client):
+    return client.get("/analysis/analysis/cache/stats").get_json()["data"]
+
+
+def test_repeated_analysis_request_is_served_from_cache(client):
+    first = client.get("/analysis/analysis/grades/distribution?module_id=1").get_json()
+    second = client.get("/analysis/analysis/grades/distribution?module_id=1").get_json()
+
+    assert first == second
+    stats = _cache_stats(client)
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert client.get("/api/db/stats").get_json()["result_cache"]["size"] == 1
+
+
+def test_repository_write_invalidates_cached_result(client):
+    url = "/analysis/analysis/stress-trend?student_id=1"
+    before = client.get(url).get_json()["data"]
+    assert client.get(url).get_json()["data"] == before
+
+    resp = client.post("/api/surveys", json={"studentId": 1, "weekNumber": 99, "stressLevel": 5})
+    assert resp.status_code == 201
+
+    after = client.get(url).get_json()["data"]
+    assert len(after) == len(before) + 1
+    assert after[-1]["week_number"] == 99
+    assert _cache_stats(client)["invalidations"] == 1
+
+
+def test_cache_is_cleared_only_by_delete(client):
+    client.get("/analysis/analysis/grades/distribution?module_id=1")
+    size = lambda: client.get("/api/db/stats").get_json()["result_cache"]["size"]
+
+    # GET 是只读的：带 clear 参数也不会清空缓存
+    client.get("/analysis/analysis/cache/stats?clear=true")
+    assert size() == 1
+
+    resp = client.delete("/analysis/analysis/cache")
+    assert resp.status_code == 200
+    assert resp.get_json()["data"]["misses"] == 1
+    assert size() == 0
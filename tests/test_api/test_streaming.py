@@ -0,0 +1,41 @@
+import json
+
+
+def _read_stream(resp):
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    chunks = list(resp.response)
+    return json.loads(b"".join(c if isinstance(c, bytes) else c.encode() for c in chunks)), len(chunks)
+
+
+def test_streamed_list_matches_regular_list(client):
+    expected = client.get("/api/attendance").get_json()
+
+    resp = client.get("/api/attendance?stream=1")
+    data, chunks = _read_stream(resp)
+
+    assert data == expected
+    assert chunks > 2  # 按批次分段输出，而不是一次性写出
+
+
+def test_streamed_list_supports_sort_and_rejects_limit(client):
+    expected = client.get("/api/surveys?sort=-stressLevel").get_json()
+    data, _ = _read_stream(client.get("/api/surveys?sort=-stressLevel&stream=true"))
+    assert data == expected
+
+    assert client.get("/api/surveys?stream=1&limit=10").status_code == 400
+
+
+def test_streamed_analysis_pairs_keep_the_envelope(client):
+    expected = client.get("/analysis/analysis/stress-grade/pairs?module_id=1").get_json()
+
+    data, _ = _read_stream(client.get("/analysis/analysis/stress-grade/pairs?module_id=1&stream=1"))
+
+    assert data == expected
+    assert data["success"] is True
+    assert len(data["data"]) > 0
+
+
+def test_streamed_empty_result_is_valid_json(client):
+    data, _ = _read_stream(client.get("/analysis/analysis/stress-grade/pairs?module_id=999&stream=1"))
+    assert data == {"success": True, "message": "success", "data": []}
@@ -0,0 +1,75 @@
+# tests/test_db_establish/test_indexes.py
+import sqlite3
+
+import pytest
+
+import db_establish
+
+# 测试执行语句：pytest tests/test_db_establish/test_indexes.py -vv
+
+
+def _index_names(conn):
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%';"
+    ).fetchall()
+    return {row[0] for row in rows}
+
+
+@pytest.fixture
+def seeded_db(tmp_path):
+    """用 init_database 建一个带示例数据的完整库。"""
+    db_path = str(tmp_path / "seeded.sqlite3")
+    conn = db_establish.init_database(db_path)
+    conn.close()
+    return db_path
+
+
+def test_init_database_creates_indexes(seeded_db):
+    conn = sqlite3.connect(seeded_db)
+    try:
+        names = _index_names(conn)
+        assert "idx_survey_active_student_module_week" in names
+        assert "idx_grades_active_student_module" in names
+        assert len(names) == len(db_establish.INDEX_STATEMENTS)
+    finally:
+        conn.close()
+
+
+def test_migrate_database_adds_missing_indexes_in_place(seeded_db):
+    conn = sqlite3.connect(seeded_db)
+    for name in _index_names(conn):
+        conn.execute(f"DROP INDEX {name};")
+    conn.commit()
+    survey_count = conn.execute("SELECT COUNT(*) FROM survey_responses;").fetchone()[0]
+    conn.close()
+
+    migrated = db_establish.migrate_database(seeded_db)
+    try:
+        assert len(_index_names(migrated)) == len(db_establish.INDEX_STATEMENTS)
+        # 数据保持不变（不重建）
+        assert migrated.execute("SELECT COUNT(*) FROM survey_responses;").fetchone()[0] == survey_count
+    finally:
+        migrated.close()
+
+    # 重复执行是安全的
+    db_establish.migrate_database(seeded_db).close()
+
+
+def test_analysis_queries_use_indexes(seeded_db):
+    conn = db_establish.migrate_database(seeded_db)
+    try:
+        plans = db_establish.check_index_usage(conn)
+    finally:
+        conn.close()
+
+    assert plans, "Expected to capture analysis SELECT statements"
+    for sql, plan in plans.items():
+        detail = " | ".join(plan)
+        # 每条分析查询都应命中 idx_* 索引
+        assert "USING COVERING INDEX idx_" in detail or "USING INDEX idx_" in detail, (sql, detail)
+        # 除单个学生的趋势查询（按 week_number 排序，行数很少）外，不应出现临时 B-tree 排序
+        if "ORDER BY week_number" not in sql:
+            assert "TEMP B-TREE" not in detail, (sql, detail)
+
+    grouped = [plan for sql, plan in plans.items() if "GROUP BY student_id" in sql]
+    assert any("COVERING INDEX idx_attendance_active_student" in " ".join(p) for p in grouped)
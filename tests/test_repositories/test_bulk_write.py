@@ -0,0 +1,99 @@
+# tests/test_repositories/test_bulk_write.py
+import sqlite3
+
+import pytest
+
+import db_establish
+from app.models.Module import Module
+from app.repositories.ModuleRepository import ModuleRepository
+from utils.db_connect_util import WriteQueue
+
+# 运行本测试文件的指令：pytest -vv tests/test_repositories/test_bulk_write.py
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """用 init_database 在临时目录建一个带示例数据的库（MOD101~MOD108 已存在）。"""
+    path = str(tmp_path / "bulk.sqlite3")
+    db_establish.init_database(path).close()
+    return path
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    yield conn
+    conn.close()
+
+
+def _modules(*codes):
+    return [Module(module_code=c, module_title=f"Title {c}", credit=15) for c in codes]
+
+
+def test_add_many_inserts_all_and_backfills_ids(conn):
+    repo = ModuleRepository(conn)
+    models = _modules("NEW1", "NEW2", "NEW3")
+
+    result = repo.add_many(models)
+
+    assert result.ok
+    assert result.ids == [m.id for m in models]
+    assert len(set(result.ids)) == 3
+    for m in models:
+        assert repo.get_by_id(m.id).module_code == m.module_code
+    assert not conn.in_transaction
+
+
+def test_add_many_reports_failed_rows_and_keeps_the_rest(conn):
+    repo = ModuleRepository(conn)
+    # 第 2 行与已有的 MOD101 冲突（UNIQUE）
+    models = _modules("NEW1", "MOD101", "NEW2")
+
+    result = repo.add_many(models)
+
+    assert not result.ok
+    assert [f["index"] for f in result.failures] == [1]
+    assert "UNIQUE" in result.failures[0]["error"]
+    assert result.ids == [models[0].id, models[2].id]
+    assert models[1].id is None
+    assert repo.find_one(module_code="NEW2") is not None
+
+
+def test_update_many_and_soft_delete_many(conn):
+    repo = ModuleRepository(conn)
+    models = _modules("NEW1", "NEW2")
+    repo.add_many(models)
+
+    models[0].credit = 30
+    models[1].credit = 45
+    ghost = Module(id=999999, module_code="GHOST", module_title="x")
+    unsaved = Module(module_code="UNSAVED", module_title="x")
+
+    result = repo.update_many([models[0], ghost, models[1], unsaved])
+    assert result.ids == [models[0].id, models[1].id]
+    assert [f["index"] for f in result.failures] == [1, 3]
+    assert repo.get_by_id(models[1].id).credit == 45
+
+    result = repo.soft_delete_many([models[0].id, 999999])
+    assert result.ids == [models[0].id]
+    assert [f["index"] for f in result.failures] == [1]
+    assert repo.find_one(module_code="NEW1") is None
+    assert repo.find_one(module_code="NEW2") is not None
+
+
+def test_add_many_inside_write_queue_job(db_path):
+    writer = WriteQueue(db_path)
+    try:
+        result = writer.run(lambda c: ModuleRepository(c).add_many(_modules("Q1", "Q2")))
+    finally:
+        writer.close()
+
+    assert result.ok
+    reader = sqlite3.connect(db_path)
+    try:
+        count = reader.execute(
+            "SELECT COUNT(*) FROM modules WHERE module_code IN ('Q1', 'Q2');"
+        ).fetchone()[0]
+    finally:
+        reader.close()
+    assert count == 2
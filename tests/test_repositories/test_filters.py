@@ -0,0 +1,72 @@
+# tests/test_repositories/test_filters.py
+import sqlite3
+
+import pytest
+
+import db_establish
+from app.repositories.SubmissionRecordRepository import SubmissionRecordRepository
+from app.repositories.SurveyResponseRepository import SurveyResponseRepository
+
+# 运行本测试文件的指令：pytest -vv tests/test_repositories/test_filters.py
+
+
+@pytest.fixture
+def conn(tmp_path):
+    path = str(tmp_path / "filters.sqlite3")
+    conn = db_establish.init_database(path)
+    yield conn
+    conn.close()
+
+
+def _ids(conn, sql, params=()):
+    return [row[0] for row in conn.execute(sql, params)]
+
+
+def test_range_and_in_filters(conn):
+    repo = SurveyResponseRepository(conn)
+
+    surveys = repo.find_all(module_id__in=[1, 2], week_number__gte=3, week_number__lt=5)
+
+    expected = _ids(
+        conn,
+        "SELECT id FROM survey_responses WHERE is_active = 1 AND module_id IN (1, 2) "
+        "AND week_number >= 3 AND week_number < 5;",
+    )
+    assert sorted(s.id for s in surveys) == sorted(expected)
+    assert expected
+    assert repo.find_all(module_id__in=[]) == []
+
+
+def test_null_checks(conn):
+    repo = SubmissionRecordRepository(conn)
+
+    missing = repo.find_all(submitted_date__isnull=True)
+    also_missing = repo.find_all(submitted_date=None)
+    present = repo.find_all(submitted_date__isnull=False)
+
+    assert missing and all(r.submitted_date is None for r in missing)
+    assert [r.id for r in also_missing] == [r.id for r in missing]
+    assert len(missing) + len(present) == len(repo.find_all())
+
+
+def test_order_by_limit_offset(conn):
+    repo = SurveyResponseRepository(conn)
+
+    first = repo.find_all(student_id=1, order_by=["-week_number", "id"], limit=3)
+    rest = repo.find_all(student_id=1, order_by=["-week_number", "id"], offset=3)
+
+    keys = [(-s.week_number, s.id) for s in first + rest]
+    assert keys == sorted(keys)
+    assert len(first) == 3
+    assert len(first) + len(rest) == len(repo.find_all(student_id=1))
+
+
+def test_unknown_fields_and_operators_are_rejected(conn):
+    repo = SurveyResponseRepository(conn)
+
+    with pytest.raises(RuntimeError):
+        repo.find_all(grade__gte=1)
+    with pytest.raises(RuntimeError):
+        repo.find_all(week_number__between=1)
+    with pytest.raises(RuntimeError):
+        repo.find_all(order_by="grade")
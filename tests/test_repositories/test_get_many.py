@@ -0,0 +1,56 @@
+# tests/test_repositories/test_get_many.py
+import pytest
+
+import db_establish
+from app.repositories.StudentRepository import StudentRepository
+from app.repositories.SurveyResponseRepository import SurveyResponseRepository
+
+# 运行本测试文件的指令：pytest -vv tests/test_repositories/test_get_many.py
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = db_establish.init_database(str(tmp_path / "many.sqlite3"))
+    yield conn
+    conn.close()
+
+
+def test_get_many_keeps_input_order_and_skips_missing(conn):
+    repo = StudentRepository(conn)
+
+    result = repo.get_many([5, 3, 999, 5, 1])
+
+    assert list(result) == [5, 3, 1]
+    assert result[3] == repo.get_by_id(3)
+
+
+def test_get_many_chunks_at_variable_limit(conn, monkeypatch):
+    repo = SurveyResponseRepository(conn)
+    monkeypatch.setattr(repo, "_max_variables", lambda: 7)
+    ids = list(range(100, 0, -1))
+
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        result = repo.get_many(ids)
+    finally:
+        conn.set_trace_callback(None)
+
+    assert list(result) == ids
+    assert len([sql for sql in statements if "IN (" in sql]) == 15  # ceil(100 / 7)
+
+
+def test_count_and_exists(conn):
+    repo = SurveyResponseRepository(conn)
+
+    high = repo.count(stress_level__gte=4)
+
+    assert high == len(repo.find_all(stress_level__gte=4))
+    assert repo.count() == len(repo.list_all())
+    assert repo.exists(id=1)
+    assert not repo.exists(id=10**9)
+
+    conn.execute("UPDATE survey_responses SET is_active = 0 WHERE id = 1;")
+    conn.commit()
+    assert not repo.exists(id=1)
+    assert repo.exists(id=1, is_active=0)
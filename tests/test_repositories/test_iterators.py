@@ -0,0 +1,60 @@
+# tests/test_repositories/test_iterators.py
+import itertools
+
+import pytest
+
+import db_establish
+from app.repositories.SurveyResponseRepository import SurveyResponseRepository
+
+# 运行本测试文件的指令：pytest -vv tests/test_repositories/test_iterators.py
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = db_establish.init_database(str(tmp_path / "iter.sqlite3"))
+    yield conn
+    conn.close()
+
+
+def test_iter_all_matches_list_all(conn):
+    repo = SurveyResponseRepository(conn)
+
+    lazy = repo.iter_all(chunk_size=64)
+
+    assert not isinstance(lazy, list)
+    assert list(lazy) == sorted(repo.list_all(), key=lambda s: s.id)
+
+
+def test_iter_where_filters_and_raw_tuples(conn):
+    repo = SurveyResponseRepository(conn)
+
+    models = list(repo.iter_where(module_id=1, week_number__gte=5, chunk_size=7))
+    raw = list(repo.iter_where(module_id=1, week_number__gte=5, raw=True))
+    columns = list(
+        repo.iter_where(columns=("id", "stress_level"), order_by="-id", module_id=1, week_number__gte=5)
+    )
+
+    assert models and all(m.module_id == 1 and m.week_number >= 5 for m in models)
+    assert [r[0] for r in raw] == [m.id for m in models]
+    assert columns == [(m.id, m.stress_level) for m in reversed(models)]
+
+
+def test_iter_where_is_lazy(conn):
+    repo = SurveyResponseRepository(conn)
+    total = len(repo.list_all())
+
+    head = list(itertools.islice(repo.iter_where(chunk_size=10), 3))
+
+    assert len(head) == 3
+    assert total > 3
+
+
+def test_iter_where_include_inactive_and_bad_columns(conn):
+    repo = SurveyResponseRepository(conn)
+    conn.execute("UPDATE survey_responses SET is_active = 0 WHERE id = 1;")
+    conn.commit()
+
+    assert 1 not in [m.id for m in repo.iter_all()]
+    assert 1 in [m.id for m in repo.iter_all(include_inactive=True)]
+    with pytest.raises(ValueError):
+        repo.iter_where(columns=("id", "password"))
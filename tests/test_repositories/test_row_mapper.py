@@ -0,0 +1,41 @@
+# tests/test_repositories/test_row_mapper.py
+import pytest
+
+from app.models.Alert import Alert
+from app.models.User import User
+from app.repositories.AlertRepository import AlertRepository
+from app.repositories.BaseRepository import build_row_mapper
+from app.repositories.UserRepository import UserRepository
+
+# 运行本测试文件的指令：pytest -vv tests/test_repositories/test_row_mapper.py
+
+
+def test_generated_mapper_builds_models_and_coerces_bools():
+    row = (7, 3, 2, 5, "High stress", "2025-03-01T21:00:00", 1, 0)
+
+    alert = AlertRepository(None)._from_row(row)
+
+    assert alert == Alert(
+        id=7,
+        student_id=3,
+        module_id=2,
+        week_number=5,
+        reason="High stress",
+        created_at="2025-03-01T21:00:00",
+        resolved=True,
+        is_active=False,
+    )
+    assert alert.severity == "medium"  # 不在表中的字段保持默认值
+
+
+def test_models_are_slotted():
+    user = UserRepository(None)._from_row((1, "admin", "hash", "admin", None, 1))
+
+    assert not hasattr(user, "__dict__")
+    with pytest.raises(AttributeError):
+        user.nickname = "x"
+
+
+def test_mapper_rejects_unknown_columns():
+    with pytest.raises(ValueError):
+        build_row_mapper(User, ("id", "not_a_field"))
@@ -0,0 +1,232 @@
+# tests/test_utils/test_db_connect_util.py
+import sqlite3
+import threading
+
+import pytest
+
+from utils.db_connect_util import ConnectionPool, PoolTimeoutError, WriteQueue
+
+# 测试执行语句：pytest tests/test_utils/test_db_connect_util.py -vv
+
+
+@pytest.fixture
+def pool(tmp_path):
+    p = ConnectionPool(
+        str(tmp_path / "pool.sqlite3"),
+        size=2,
+        timeout=0.05,
+        pragmas={"temp_store": "MEMORY"},
+    )
+    yield p
+    p.close_all()
+
+
+def test_pool_reuses_released_connection(pool):
+    conn = pool.acquire()
+    pool.release(conn)
+
+    again = pool.acquire()
+    assert again is conn
+    assert pool.stats()["created"] == 1
+    pool.release(again)
+
+
+def test_pool_applies_pragmas_once_per_connection(pool):
+    conn = pool.acquire()
+    # temp_store: 0=DEFAULT, 1=FILE, 2=MEMORY
+    assert conn.execute("PRAGMA temp_store;").fetchone()[0] == 2
+    pool.release(conn)
+
+
+def test_pool_is_bounded_and_times_out(pool):
+    first = pool.acquire()
+    second = pool.acquire()
+
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+
+    stats = pool.stats()
+    assert stats["created"] == 2
+    assert stats["in_use"] == 2
+    assert stats["timeouts"] == 1
+
+    pool.release(first)
+    pool.release(second)
+    assert pool.stats()["idle"] == 2
+
+
+def test_pool_waiter_gets_connection_after_release(pool):
+    held = [pool.acquire(), pool.acquire()]
+    pool.timeout = 1.0
+    got = []
+
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    waiter.start()
+    pool.release(held.pop())
+    waiter.join(timeout=2)
+
+    assert len(got) == 1
+    assert pool.stats()["waits"] == 1
+    pool.release(got[0])
+    pool.release(held.pop())
+
+
+def test_pool_rolls_back_open_transaction_on_release(pool):
+    conn = pool.acquire()
+    conn.execute("CREATE TABLE t (x INTEGER);")
+    conn.commit()
+    conn.execute("INSERT INTO t VALUES (1);")
+    assert conn.in_transaction
+    pool.release(conn)
+
+    conn = pool.acquire()
+    assert conn.execute("SELECT COUNT(*) FROM t;").fetchone()[0] == 0
+    pool.release(conn)
+
+
+# ----------------------------------------------------------------------
+# 单写线程队列（WriteQueue）
+# ----------------------------------------------------------------------
+
+WAL_PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 1000}
+
+
+@pytest.fixture
+def wal_db(tmp_path):
+    db_path = str(tmp_path / "wal.sqlite3")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY AUTOINCREMENT, x INTEGER NOT NULL);")
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+@pytest.fixture
+def writer(wal_db):
+    w = WriteQueue(wal_db, pragmas=WAL_PRAGMAS, max_batch=16)
+    yield w
+    w.close()
+
+
+def _insert(value):
+    def job(conn):
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO t (x) VALUES (?);", (value,))
+        conn.commit()  # 空操作，由写线程统一提交
+        return cursor.lastrowid
+    return job
+
+
+def test_write_queue_runs_job_and_commits(writer, wal_db):
+    new_id = writer.run(_insert(7))
+    assert new_id == 1
+
+    reader = sqlite3.connect(wal_db)
+    try:
+        assert reader.execute("PRAGMA journal_mode;").fetchone()[0] == "wal"
+        assert reader.execute("SELECT x FROM t WHERE id = ?;", (new_id,)).fetchone()[0] == 7
+    finally:
+        reader.close()
+
+
+def test_write_queue_failed_job_does_not_affect_batch(writer, wal_db):
+    def bad(conn):
+        conn.execute("INSERT INTO t (x) VALUES (?);", (99,))
+        conn.execute("INSERT INTO t (x) VALUES (NULL);")  # NOT NULL 约束失败
+
+    futures = [writer.submit(_insert(i)) for i in range(5)]
+    futures.insert(2, writer.submit(bad))
+
+    with pytest.raises(sqlite3.IntegrityError):
+        futures[2].result(timeout=5)
+    ids = [f.result(timeout=5) for i, f in enumerate(futures) if i != 2]
+    assert len(ids) == 5
+
+    reader = sqlite3.connect(wal_db)
+    try:
+        values = [row[0] for row in reader.execute("SELECT x FROM t ORDER BY id;")]
+    finally:
+        reader.close()
+    # bad 任务中已执行的第一条 INSERT 也被回滚
+    assert values == [0, 1, 2, 3, 4]
+
+    stats = writer.stats()
+    assert stats["jobs"] == 6
+    assert stats["failed_jobs"] == 1
+    assert stats["batches"] >= 1
+    assert stats["commit_seconds_total"] >= 0
+
+
+# 写线程按设计因 SystemExit 退出，pytest 会把它报告为线程中的未处理异常
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_write_queue_survives_base_exception_in_job(writer, wal_db):
+    def exits(conn):
+        conn.execute("INSERT INTO t (x) VALUES (?);", (99,))
+        raise SystemExit(1)
+
+    futures = [writer.submit(_insert(1)), writer.submit(exits), writer.submit(_insert(2))]
+    old_thread = writer._thread
+    with pytest.raises(SystemExit):
+        futures[1].result(timeout=5)
+    assert all(f.result(timeout=5) for f in (futures[0], futures[2]))
+    old_thread.join(timeout=5)
+
+    # 写线程退出后，后续任务会启动新的写线程，而不是等到超时
+    assert writer.run(_insert(3), timeout=5)
+    reader = sqlite3.connect(wal_db)
+    try:
+        assert [row[0] for row in reader.execute("SELECT x FROM t ORDER BY id;")] == [1, 2, 3]
+    finally:
+        reader.close()
+
+
+def test_write_queue_resolves_futures_when_after_commit_hook_raises(writer, caplog):
+    calls = []
+
+    def job(conn):
+        conn.execute("INSERT INTO t (x) VALUES (?);", (7,))
+        conn.after_commit(lambda: 1 / 0)
+        conn.after_commit(lambda: calls.append("ran"))
+        return "done"
+
+    # 数据已经提交：回调出错只记日志，调用方仍然拿到结果，后面的回调照常执行
+    assert writer.run(job, timeout=5) == "done"
+    assert calls == ["ran"]
+    assert "after_commit callback" in caplog.text
+    assert writer.run(_insert(8), timeout=5)
+
+
+def test_write_queue_groups_concurrent_jobs(writer):
+    threads = [threading.Thread(target=writer.run, args=(_insert(i),)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+
+    stats = writer.stats()
+    assert stats["jobs"] == 20
+    assert stats["batches"] <= 20
+    assert stats["max_batch_seen"] <= 16
+
+
+def test_write_queue_reader_not_blocked_by_open_write(writer, wal_db):
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow(conn):
+        conn.execute("INSERT INTO t (x) VALUES (1);")
+        started.set()
+        release.wait(timeout=5)
+
+    future = writer.submit(slow)
+    assert started.wait(timeout=5)
+
+    # 写事务未提交期间，WAL 下读连接可以立即读取（看到的是提交前的快照）
+    reader = sqlite3.connect(wal_db, timeout=0.1)
+    try:
+        assert reader.execute("SELECT COUNT(*) FROM t;").fetchone()[0] == 0
+    finally:
+        reader.close()
+
+    release.set()
+    future.result(timeout=5)
@@ -195,4 +195,32 @@ def test_success_json_and_error_json():
     # error_json
     assert error_obj["success"] is False
     assert error_obj["message"] == "not ok"
-    assert error_obj["details"]["code"] == "E001"
\ No newline at end of file
+    assert error_obj["details"]["code"] == "E001"
+
+def test_iter_json_array_and_success_json_stream():
+    """
+    测试流式输出：
+    - 每 chunk_size 个元素一段
+    - 拼接后与一次性序列化的结果等价
+    """
+    items = [
+        TestStudent(
+            id=i,
+            student_number=f"S{i:04d}",
+            full_name=f"Student {i}",
+            email=f"s{i}@example.com",
+            course_name="AI",
+            year_of_study=1,
+            is_active=True,
+        )
+        for i in range(5)
+    ]
+
+    chunks = list(JsonHelper.iter_json_array(items, chunk_size=2))
+    assert len(chunks) == 4  # 2 + 2 + 1 个元素，再加结尾的 "]"
+    assert json.loads("".join(chunks)) == JsonHelper.to_serializable(items)
+
+    streamed = json.loads("".join(JsonHelper.iter_success_json(iter(items), chunk_size=2)))
+    assert streamed == JsonHelper.success_dict(items)
+
+    assert json.loads("".join(JsonHelper.iter_json_array([]))) == []
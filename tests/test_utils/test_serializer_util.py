@@ -0,0 +1,130 @@
+# tests/test_utils/test_serializer_util.py
+import dataclasses
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import pytest
+
+from app.models.Alert import Alert
+from app.models.SubmissionRecord import SubmissionRecord
+from utils.serializer_util import (
+    ModelSerializer,
+    columnar,
+    columnar_records,
+    json_dumps,
+    orjson,
+    serializer_for,
+    to_camel,
+)
+
+# 测试执行语句：pytest tests/test_utils/test_serializer_util.py -vv
+
+
+@dataclass
+class _Point:
+    x: int
+    y: int
+
+
+@dataclass
+class _Shape:
+    name: str
+    points: List[_Point] = field(default_factory=list)
+    closed: bool = False
+    area: Optional[float] = None
+
+
+def test_generic_serializer_matches_asdict():
+    shape = _Shape("tri", [_Point(0, 0), _Point(1, 0), _Point(0, 1)], True, 0.5)
+    assert serializer_for(_Shape).encode(shape) == dataclasses.asdict(shape)
+    assert serializer_for(_Shape) is serializer_for(_Shape)
+
+    alert = Alert(id=1, student_id=2, reason="r", resolved=True)
+    assert serializer_for(Alert).encode(alert) == dataclasses.asdict(alert)
+
+
+def test_renaming_bool_coercion_and_computed_fields():
+    serializer = ModelSerializer(
+        SubmissionRecord,
+        fields=("id", "student_id", "is_late"),
+        rename=to_camel,
+        computed={"status": lambda r: "late" if r.is_late else "ok"},
+    )
+    record = SubmissionRecord(id=3, student_id=7, is_late=1)  # SQLite 的 0/1
+    assert serializer.encode(record) == {"id": 3, "studentId": 7, "isLate": True, "status": "late"}
+    assert serializer.keys == ("id", "studentId", "isLate", "status")
+
+    with pytest.raises(ValueError):
+        ModelSerializer(SubmissionRecord, fields=("id", "grade"))
+
+
+def test_sparse_fieldsets_are_compiled_once():
+    serializer = ModelSerializer(SubmissionRecord, rename=to_camel)
+    encode = serializer.encoder(["studentId", "id", "id"])
+    assert encode(SubmissionRecord(id=1, student_id=2)) == {"studentId": 2, "id": 1}
+    assert serializer.encoder(["studentId", "id"]) is encode
+
+    with pytest.raises(ValueError):
+        serializer.encoder(["id", "nope"])
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson"])
+def test_json_dumps_backends_agree(backend):
+    if backend == "orjson" and orjson is None:
+        pytest.skip("orjson not installed")
+    value = {"b": [1, 2.5, None, True], "a": {"名字": "学生"}}
+    text = json_dumps(value, backend=backend)
+    assert json.loads(text) == value
+    assert text.startswith('{"a":')
+
+
+def test_encode_columns_matches_row_encoding():
+    serializer = ModelSerializer(
+        SubmissionRecord,
+        fields=("id", "student_id", "is_late"),
+        rename=to_camel,
+        computed={"status": lambda r: "late" if r.is_late else "ok"},
+    )
+    row_columns = ("id", "is_late", "student_id")
+    rows = [(1, 0, 7), (2, 1, 8)]
+    from_row = lambda row: SubmissionRecord(id=row[0], is_late=row[1], student_id=row[2])
+
+    result = serializer.encode_columns(rows, row_columns, from_row=from_row)
+    assert result["columns"] == list(serializer.keys)
+    encoded = [serializer.encode(from_row(row)) for row in rows]
+    assert result["data"] == {key: [item[key] for item in encoded] for key in serializer.keys}
+
+    assert serializer.encode_columns([], row_columns, ["id"]) == {"columns": ["id"], "data": {"id": []}}
+    with pytest.raises(ValueError):
+        serializer.encode_columns(rows, row_columns, ["status"])  # computed 键需要 from_row
+    with pytest.raises(ValueError):
+        serializer.encode_columns(rows, row_columns, ["nope"])
+
+
+def test_encode_columns_uses_computed_columns_without_models():
+    serializer = ModelSerializer(
+        SubmissionRecord,
+        fields=("id", "is_late"),
+        rename=to_camel,
+        computed={"status": lambda r: "late" if r.is_late else "ok"},
+        computed_columns={"status": lambda columns, n: ["late" if v else "ok" for v in columns["is_late"]]},
+    )
+    rows = [(1, 0), (2, 1)]
+
+    def from_row(row):
+        raise AssertionError("computed_columns should not build models")
+
+    result = serializer.encode_columns(rows, ("id", "is_late"), from_row=from_row)
+    assert result["data"] == {"id": [1, 2], "isLate": [False, True], "status": ["ok", "late"]}
+    with pytest.raises(ValueError):
+        ModelSerializer(SubmissionRecord, computed_columns={"status": lambda columns, n: []})
+
+
+def test_columnar_helpers():
+    assert columnar(("a", "b"), [(1, 2), (3, 4)]) == {"columns": ["a", "b"], "data": {"a": [1, 3], "b": [2, 4]}}
+    assert columnar(("a",), []) == {"columns": ["a"], "data": {"a": []}}
+    assert columnar_records([{"x": 1, "y": 2}, {"x": 3, "y": 4}]) == {
+        "columns": ["x", "y"],
+        "data": {"x": [1, 3], "y": [2, 4]},
+    }
@@ -0,0 +1,95 @@
+# tests/test_utils/test_table_version_util.py
+import sqlite3
+
+import pytest
+
+from utils.db_connect_util import WriteQueue
+from utils.table_version_util import ResultCache, TableVersions, memoize, notify_write, table_versions
+
+# 测试执行语句：pytest tests/test_utils/test_table_version_util.py -vv
+
+
+class _Service:
+    def __init__(self, cache):
+        self.cache = cache
+        self.calls = 0
+
+    @memoize("t")
+    def total(self, ids=None, scale=1):
+        self.calls += 1
+        return sum(ids or []) * scale
+
+
+def test_cache_hits_and_evicts_least_recently_used():
+    cache = ResultCache(maxsize=2, versions=TableVersions())
+    cache.put("a", (0,), 1)
+    cache.put("b", (0,), 2)
+    assert cache.get("a", (0,)) == (True, 1)  # a 变为最近使用
+    cache.put("c", (0,), 3)
+
+    assert cache.get("b", (0,)) == (False, None)
+    assert cache.get("a", (0,)) == (True, 1)
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 2, 1, 1)
+
+    with pytest.raises(ValueError):
+        ResultCache(maxsize=0)
+
+
+def test_memoize_keys_on_arguments_and_invalidates_on_bump():
+    versions = TableVersions()
+    service = _Service(ResultCache(versions=versions))
+
+    assert service.total([1, 2], scale=2) == 6
+    assert service.total([1, 2], scale=2) == 6
+    assert service.total([1, 2], scale=3) == 9
+    assert service.calls == 2
+
+    versions.bump("other")
+    service.total([1, 2], scale=2)
+    assert service.calls == 2  # 无关表的写入不影响
+
+    versions.bump("t")
+    service.total([1, 2], scale=2)
+    assert service.calls == 3
+    assert service.cache.stats()["invalidations"] == 1
+
+
+def test_memoize_without_cache_calls_through():
+    service = _Service(None)
+    service.total([1])
+    service.total([1])
+    assert service.calls == 2
+
+
+def test_notify_write_is_deferred_until_the_write_queue_commits(tmp_path):
+    db_path = str(tmp_path / "versions.sqlite3")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE t (x INTEGER NOT NULL);")
+    conn.commit()
+    conn.close()
+
+    writer = WriteQueue(db_path, pragmas={"journal_mode": "WAL"})
+    try:
+        seen = []
+
+        def ok(conn):
+            conn.execute("INSERT INTO t (x) VALUES (1);")
+            notify_write(conn, "versions_test_t")
+            seen.append(table_versions.snapshot(["versions_test_t"]))
+
+        def bad(conn):
+            notify_write(conn, "versions_test_t")
+            conn.execute("INSERT INTO t (x) VALUES (NULL);")
+
+        before = table_versions.snapshot(["versions_test_t"])
+        writer.run(ok)
+        assert seen == [before]  # 任务执行时尚未提交，版本不变
+        assert table_versions.snapshot(["versions_test_t"]) == (before[0] + 1,)
+
+        with pytest.raises(sqlite3.IntegrityError):
+            writer.run(bad)
+        # 失败任务登记的回调被丢弃
+        assert table_versions.snapshot(["versions_test_t"]) == (before[0] + 1,)
+    finally:
+        writer.close()
@@ -1,5 +1,14 @@
 import sqlite3
 import os
+import queue
+import threading
+import time
+import atexit
+import logging
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
 
 
 """
@@ -15,6 +24,349 @@ def get_conn():
     return conn
 
 
+class PoolTimeoutError(RuntimeError):
+    """在 timeout 秒内没有空闲连接可借出。"""
+
+
+class ConnectionPool:
+    """
+    有界的 SQLite 连接池（线程安全）：
+    - 连接按需创建，最多 size 个；PRAGMA 只在创建连接时执行一次
+    - acquire() 借出连接，池满且无空闲时最多等待 timeout 秒
+    - release() 归还连接；未提交的事务会先回滚，避免脏状态流到下一个请求
+    - stats() 返回池的运行统计
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        size: int = 5,
+        timeout: float = 5.0,
+        pragmas: Optional[Dict[str, Any]] = None,
+    ):
+        if size < 1:
+            raise ValueError("Pool size must be >= 1")
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = dict(pragmas or {})
+
+        # LIFO：优先复用最近归还的连接（页缓存更“热”）
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._all = []
+        self._in_use = 0
+        self._acquired = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_seconds = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        # 同一连接可能被不同线程先后借用，因此关闭 check_same_thread；
+        # 池保证同一时刻只有一个线程持有它。
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value};")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+
+        if conn is None:
+            with self._lock:
+                can_create = len(self._all) < self.size
+                if can_create:
+                    conn = self._connect()
+                    self._all.append(conn)
+
+        if conn is None:
+            started = time.perf_counter()
+            try:
+                conn = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                with self._lock:
+                    self._timeouts += 1
+                raise PoolTimeoutError(
+                    f"No database connection available within {self.timeout}s (pool size {self.size})"
+                )
+            finally:
+                with self._lock:
+                    self._waits += 1
+                    self._wait_seconds += time.perf_counter() - started
+
+        with self._lock:
+            self._in_use += 1
+            self._acquired += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._in_use -= 1
+        self._idle.put(conn)
+
+    def close_all(self) -> None:
+        with self._lock:
+            conns, self._all = self._all, []
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for conn in conns:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "db_path": self.db_path,
+                "size": self.size,
+                "timeout": self.timeout,
+                "created": len(self._all),
+                "in_use": self._in_use,
+                "idle": len(self._all) - self._in_use,
+                "acquired_total": self._acquired,
+                "waits": self._waits,
+                "wait_seconds_total": round(self._wait_seconds, 6),
+                "timeouts": self._timeouts,
+            }
+
+
+class _WriterConnection:
+    """
+    交给写任务使用的连接代理：
+    - commit() 为空操作：由写线程在整批任务执行完后统一提交（group commit）
+    - rollback() 不允许调用：想放弃本次写入请直接抛出异常，写线程只回滚该任务自己的 SAVEPOINT
+    - after_commit(fn)：登记在整批事务提交成功后执行的回调（任务失败时它登记的回调被丢弃）
+    - 其余属性/方法直接转发给真实连接
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._after_commit: List[Callable[[], None]] = []
+
+    def commit(self) -> None:
+        pass
+
+    def after_commit(self, fn: Callable[[], None]) -> None:
+        self._after_commit.append(fn)
+
+    def rollback(self) -> None:
+        raise RuntimeError("Queued writes cannot rollback the shared transaction; raise an exception instead")
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+_STOP = object()
+
+
+class WriteQueue:
+    """
+    单写线程队列：
+    - 请求线程通过 submit(fn) / run(fn) 提交写任务，fn 接收一个连接（见 _WriterConnection）
+    - 专用写线程串行执行任务；队列里积压的任务（最多 max_batch 个）合并到同一个事务中提交
+    - 每个任务包在独立的 SAVEPOINT 中，失败只回滚自己，不影响同批其他任务
+    - 提交成功后才把结果交还给调用方，因此 run() 返回时数据已经落盘
+    - 读请求继续使用连接池中的连接；配合 WAL 模式读写互不阻塞
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pragmas: Optional[Dict[str, Any]] = None,
+        max_batch: int = 64,
+        timeout: float = 5.0,
+    ):
+        self.db_path = db_path
+        self.pragmas = dict(pragmas or {})
+        self.max_batch = max_batch
+        self.timeout = timeout
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {
+            "jobs": 0,
+            "failed_jobs": 0,
+            "batches": 0,
+            "max_batch_seen": 0,
+            "queue_wait_seconds_total": 0.0,
+            "lock_wait_seconds_total": 0.0,
+            "lock_wait_seconds_max": 0.0,
+            "commit_seconds_total": 0.0,
+            "commit_seconds_max": 0.0,
+        }
+
+    # ----------------------------------------------------------
+    # 调用方接口
+    # ----------------------------------------------------------
+    def submit(self, fn: Callable[[Any], Any]) -> Future:
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((fn, future, time.perf_counter()))
+        return future
+
+    def run(self, fn: Callable[[Any], Any], timeout: Optional[float] = None) -> Any:
+        """提交写任务并等待其提交完成，返回 fn 的返回值（fn 抛出的异常会在这里重新抛出）。"""
+        return self.submit(fn).result(timeout)
+
+    def close(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            data = {k: round(v, 6) if isinstance(v, float) else v for k, v in self._stats.items()}
+        batches = data["batches"] or 1
+        data["queue_depth"] = self._queue.qsize()
+        data["avg_batch_size"] = round(data["jobs"] / batches, 3)
+        data["avg_commit_seconds"] = round(data["commit_seconds_total"] / batches, 6)
+        data["avg_lock_wait_seconds"] = round(data["lock_wait_seconds_total"] / batches, 6)
+        return data
+
+    # ----------------------------------------------------------
+    # 写线程
+    # ----------------------------------------------------------
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, name="sqlite-writer", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None：事务由写线程显式 BEGIN / COMMIT 管理
+        conn = sqlite3.connect(
+            self.db_path, timeout=self.timeout, isolation_level=None, check_same_thread=False
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value};")
+        return conn
+
+    def _loop(self) -> None:
+        conn = self._connect()
+        proxy = _WriterConnection(conn)
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    return
+                batch = [item]
+                stop_after = False
+                while len(batch) < self.max_batch:
+                    try:
+                        nxt = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if nxt is _STOP:
+                        stop_after = True
+                        break
+                    batch.append(nxt)
+
+                self._run_batch(conn, proxy, batch)
+                if stop_after:
+                    return
+        except BaseException:
+            # 写任务抛出 SystemExit / KeyboardInterrupt 等：本批已经结算完毕，写线程随之退出；
+            # 清掉线程记录，下一次 submit（或已在排队的任务）会启动新的写线程，而不是一直等到超时
+            with self._lock:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+            if not self._queue.empty():
+                self._ensure_started()
+            raise
+        finally:
+            conn.close()
+
+    def _run_batch(self, conn: sqlite3.Connection, proxy: _WriterConnection, batch) -> None:
+        started = time.perf_counter()
+        queue_wait = sum(started - enqueued for _, _, enqueued in batch)
+
+        try:
+            # BEGIN IMMEDIATE 会等待其他进程释放写锁（受 busy_timeout 限制），这段时间计为锁等待
+            conn.execute("BEGIN IMMEDIATE;")
+        except sqlite3.Error as e:
+            for _, future, _ in batch:
+                future.set_exception(RuntimeError(f"Database write lock failed: {e}"))
+            self._record(len(batch), len(batch), queue_wait, time.perf_counter() - started, 0.0)
+            return
+        lock_wait = time.perf_counter() - started
+
+        outcomes = []
+        failed = 0
+        fatal: Optional[BaseException] = None
+        proxy._after_commit.clear()
+        for fn, future, _ in batch:
+            registered = len(proxy._after_commit)
+            conn.execute("SAVEPOINT queued_write;")
+            try:
+                result = fn(proxy)
+                conn.execute("RELEASE queued_write;")
+                outcomes.append((future, result, None))
+            except BaseException as e:  # 异常原样交还给调用方
+                conn.execute("ROLLBACK TO queued_write;")
+                conn.execute("RELEASE queued_write;")
+                del proxy._after_commit[registered:]  # 该任务的写入已回滚
+                outcomes.append((future, None, e))
+                failed += 1
+                if fatal is None and not isinstance(e, Exception):
+                    fatal = e
+
+        self._commit_batch(conn, proxy, outcomes, failed, queue_wait, lock_wait)
+        if fatal is not None:
+            # 整批都已提交并交还结果之后，再让写线程处理 SystemExit / KeyboardInterrupt 等
+            raise fatal
 
+    def _commit_batch(
+        self, conn: sqlite3.Connection, proxy: _WriterConnection, outcomes, failed: int, queue_wait: float, lock_wait: float
+    ) -> None:
+        commit_started = time.perf_counter()
+        try:
+            conn.execute("COMMIT;")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK;")
+            for future, _, _ in outcomes:
+                future.set_exception(RuntimeError(f"Database commit failed: {e}"))
+            self._record(len(outcomes), len(outcomes), queue_wait, lock_wait, time.perf_counter() - commit_started)
+            return
+        commit_seconds = time.perf_counter() - commit_started
 
+        # 先执行提交后回调（例如递增表版本），再把结果交还调用方：run() 返回后缓存已经失效。
+        # 数据已经提交，回调出错只记日志；无论如何都要交还结果，否则 run() 会一直等待
+        callbacks, proxy._after_commit = proxy._after_commit, []
+        try:
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception:
+                    logger.exception("after_commit callback %r failed", callback)
+        finally:
+            self._record(len(outcomes), failed, queue_wait, lock_wait, commit_seconds)
+            for future, result, error in outcomes:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
 
+    def _record(self, jobs: int, failed: int, queue_wait: float, lock_wait: float, commit_seconds: float) -> None:
+        with self._lock:
+            s = self._stats
+            s["jobs"] += jobs
+            s["failed_jobs"] += failed
+            s["batches"] += 1
+            s["max_batch_seen"] = max(s["max_batch_seen"], jobs)
+            s["queue_wait_seconds_total"] += queue_wait
+            s["lock_wait_seconds_total"] += lock_wait
+            s["lock_wait_seconds_max"] = max(s["lock_wait_seconds_max"], lock_wait)
+            s["commit_seconds_total"] += commit_seconds
+            s["commit_seconds_max"] = max(s["commit_seconds_max"], commit_seconds)
@@ -1,8 +1,10 @@
 # app/utils/json_helper.py
-from dataclasses import asdict, is_dataclass
-from typing import Any, Dict, List, Union
+from dataclasses import is_dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Union
 import json
 
+from utils.serializer_util import json_dumps, serializer_for
+
 
 """
 使用方法：
@@ -60,7 +62,8 @@ class JsonHelper:
     def to_serializable(obj: Any) -> Any:
         """
         将任意对象递归转换为可被 json.dumps 处理的结构：
-        - dataclass -> dict
+        - dataclass -> dict（按模型类编译一次的序列化器，见 utils/serializer_util.py；
+          与 dataclasses.asdict 的结果相同，但不递归深拷贝每个字段，bool 字段统一转为 bool）
         - list -> 列表中每个元素递归处理
         - dict -> 每个 value 递归处理
         - None / 基本类型 -> 直接返回
@@ -74,8 +77,8 @@ class JsonHelper:
             return [JsonHelper.to_serializable(item) for item in obj]
 
         # dataclass 对象：转为字典
-        if is_dataclass(obj):
-            return asdict(obj)
+        if is_dataclass(obj) and not isinstance(obj, type):
+            return serializer_for(type(obj)).encode(obj)
 
         # 字典：递归处理 value
         if isinstance(obj, dict):
@@ -142,3 +145,60 @@ class JsonHelper:
             JsonHelper.error_dict(message=message, details=details),
             **json_kwargs,
         )
+
+    # ======================
+    #   流式输出（返回字符串片段的生成器）
+    # ======================
+    @staticmethod
+    def iter_json_array(
+        items: Iterable[Any],
+        chunk_size: int = 500,
+        prefix: str = "",
+        suffix: str = "",
+        **json_kwargs,
+    ) -> Iterator[str]:
+        """
+        把可迭代对象逐段编码为 prefix + JSON 数组 + suffix：
+        每攒够 chunk_size 个元素产出一段字符串，整个数组不会同时存在于内存中。
+        第一段包含 prefix、"[" 和第一批元素，因此取第一段时就会开始读取 items。
+        """
+        opening = prefix + "["
+        batch: List[Any] = []
+
+        def encode(values: List[Any]) -> str:
+            if json_kwargs:
+                return ",".join(json.dumps(value, **json_kwargs) for value in values)
+            # 整批编码成一个数组再去掉方括号：一次调用代替每个元素一次（可使用 orjson）
+            return json_dumps(values)[1:-1]
+
+        for item in items:
+            batch.append(JsonHelper.to_serializable(item))
+            if len(batch) >= chunk_size:
+                yield opening + encode(batch)
+                opening = ","
+                batch = []
+        if batch:
+            yield opening + encode(batch)
+        elif opening != ",":
+            yield opening  # 空数组
+        yield "]" + suffix
+
+    @staticmethod
+    def iter_success_json(
+        items: Iterable[Any],
+        message: str = "success",
+        chunk_size: int = 500,
+        **json_kwargs,
+    ) -> Iterator[str]:
+        """
+        success_json 的流式版本：data 为数组，结构与 success_dict 相同：
+        {"success": true, "message": "...", "data": [ ... ]}
+        """
+        head = json.dumps({"success": True, "message": message}, **json_kwargs)
+        yield from JsonHelper.iter_json_array(
+            items,
+            chunk_size=chunk_size,
+            prefix=head[:-1] + ', "data": ',
+            suffix="}",
+            **json_kwargs,
+        )
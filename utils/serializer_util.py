@@ -0,0 +1,215 @@
+import dataclasses
+import json
+import re
+import threading
+import typing
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+try:  # 可选依赖：安装了 orjson 时用它做 JSON 编码
+    import orjson
+except ImportError:  # pragma: no cover - 取决于环境
+    orjson = None
+
+
+"""
+模型 -> JSON 的编译式序列化：
+
+- ModelSerializer(model, fields=..., computed=..., rename=...)：根据 dataclass 的字段元数据生成
+  “对象 -> dict” 的函数源码并编译一次，等价于手写的
+      {"id": obj.id, "studentId": obj.student_id, "isLate": bool(obj.is_late), ...}
+  （与 BaseRepository.build_row_mapper 的做法相同）。不像 dataclasses.asdict 那样递归深拷贝每个字段
+- 类型为 bool 的字段用 bool() 转换（SQLite 中存的是 0/1）；标量以外的字段（list / 嵌套 dataclass 等）
+  交给 JsonHelper.to_serializable 递归处理
+- 稀疏字段集：encoder(["id", "studentId"]) 只输出这些键（按输出键名指定），每种组合编译一次并缓存
+- serializer_for(model)：按字段名原样输出全部字段的通用序列化器（JsonHelper.to_serializable 使用），按模型类缓存
+- 列式输出：columnar(columns, rows) 把查询得到的元组直接转置成 {"columns": [...], "data": {列名: [值...]}}，
+  不构造逐行的 dict / 模型；ModelSerializer.encode_columns 在此基础上按序列化器的键名与类型输出
+- json_dumps / JSON_BACKEND：安装了 orjson 时用 orjson 编码（排序键、允许非字符串键），否则用标准库 json
+"""
+
+
+def to_camel(name: str) -> str:
+    """student_id -> studentId"""
+    return re.sub(r"_([a-z0-9])", lambda m: m.group(1).upper(), name)
+
+
+_SCALARS = (int, float, str, bool, type(None))
+
+
+def _is_scalar(annotation: Any) -> bool:
+    """int / float / str / bool 以及它们的 Optional 可以直接输出，不需要递归转换。"""
+    if annotation in _SCALARS:
+        return True
+    if typing.get_origin(annotation) is typing.Union:
+        return all(arg in _SCALARS for arg in typing.get_args(annotation))
+    return False
+
+
+class ModelSerializer:
+    """
+    单个模型类的序列化器。
+
+    - fields：输出哪些模型字段（默认全部，顺序即输出顺序）
+    - rename：字段名 -> 输出键名，默认原样输出；API 使用 to_camel
+    - computed：输出键名 -> 函数(obj)，用于模型中没有或需要加工的值（例如默认值）；同名时覆盖字段
+    - computed_columns：computed 键在列式输出时的算法，函数(列, 行数) -> 值列表，列为 {字段名: 该列的原始值}；
+      提供后 encode_columns 直接按列计算，不逐行构造模型
+    """
+
+    def __init__(
+        self,
+        model: type,
+        fields: Optional[Sequence[str]] = None,
+        rename: Callable[[str], str] = lambda name: name,
+        computed: Optional[Mapping[str, Callable[[Any], Any]]] = None,
+        computed_columns: Optional[Mapping[str, Callable[[Mapping[str, Sequence], int], list]]] = None,
+    ):
+        model_fields = {f.name: f for f in dataclasses.fields(model)}
+        names = list(fields) if fields is not None else list(model_fields)
+        unknown = [name for name in names if name not in model_fields]
+        if unknown:
+            raise ValueError(f"{model.__name__} has no field(s) {', '.join(unknown)}")
+
+        self.model = model
+        # 输出键 -> 取值表达式（生成源码用）
+        self._expressions: Dict[str, str] = {}
+        # 输出键 -> ("field", 字段名, 转换函数或 None) / ("computed", 函数)（列式输出用）
+        self._sources: Dict[str, tuple] = {}
+        self._namespace: Dict[str, Any] = {}
+        for name in names:
+            field_type = model_fields[name].type
+            if field_type is bool:
+                expression, transform = f"bool(obj.{name})", bool
+            elif _is_scalar(field_type):
+                expression, transform = f"obj.{name}", None
+            else:
+                expression, transform = f"convert(obj.{name})", _convert
+            self._expressions[rename(name)] = expression
+            self._sources[rename(name)] = ("field", name, transform)
+        for i, (key, fn) in enumerate((computed or {}).items()):
+            self._namespace[f"computed_{i}"] = fn
+            self._expressions[key] = f"computed_{i}(obj)"
+            self._sources[key] = ("computed", fn)
+
+        unknown = [key for key in (computed_columns or {}) if key not in (computed or {})]
+        if unknown:
+            raise ValueError(f"computed_columns without computed: {', '.join(unknown)}")
+        self._computed_columns = dict(computed_columns or {})
+
+        self.keys: Tuple[str, ...] = tuple(self._expressions)
+        self._encoders: Dict[Optional[Tuple[str, ...]], Callable[[Any], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.encode = self.encoder()
+
+    def encoder(self, keys: Optional[Iterable[str]] = None) -> Callable[[Any], Dict[str, Any]]:
+        """
+        返回 obj -> dict 的函数；keys 为输出键的子集（稀疏字段集），None 表示全部。
+        未知的键抛 ValueError。
+        """
+        selected = None if keys is None else tuple(dict.fromkeys(keys))
+        encoder = self._encoders.get(selected)
+        if encoder is not None:
+            return encoder
+        if selected is not None:
+            unknown = [key for key in selected if key not in self._expressions]
+            if unknown:
+                raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+        items = ", ".join(f"{key!r}: {self._expressions[key]}" for key in (selected or self.keys))
+        source = f"def _encode(obj):\n    return {{{items}}}\n"
+        namespace = dict(self._namespace, convert=_convert)
+        exec(source, namespace)
+        encoder = namespace["_encode"]
+        with self._lock:
+            # 组合数由调用方控制（API 的 ?fields=），只缓存有限个
+            if len(self._encoders) < 64:
+                self._encoders[selected] = encoder
+        return encoder
+
+    def encode_many(self, objects: Iterable[Any], keys: Optional[Iterable[str]] = None) -> list:
+        return list(map(self.encoder(keys), objects))
+
+    def encode_columns(
+        self,
+        rows: Sequence[tuple],
+        row_columns: Sequence[str],
+        keys: Optional[Iterable[str]] = None,
+        from_row: Optional[Callable[[tuple], Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        列式输出：rows 为查询得到的元组，row_columns 为元组各位置对应的模型字段名。
+        输出 {"columns": [键...], "data": {键: [值...]}}，值与 encode 的结果一致（bool 字段同样转换），
+        但不构造逐行的 dict / 模型。computed 键优先用 computed_columns 按列计算；没有时需要完整的模型，
+        用 from_row 构造；未知的键抛 ValueError。
+        """
+        selected = self.keys if keys is None else tuple(dict.fromkeys(keys))
+        unknown = [key for key in selected if key not in self._sources]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+        position = {name: i for i, name in enumerate(row_columns)}
+        transposed = list(zip(*rows)) if rows else [()] * len(row_columns)
+        models = None
+        data: Dict[str, list] = {}
+        for key in selected:
+            source = self._sources[key]
+            if source[0] == "field":
+                values = transposed[position[source[1]]]
+                data[key] = list(values) if source[2] is None else list(map(source[2], values))
+            elif key in self._computed_columns:
+                columns = {name: transposed[i] for name, i in position.items()}
+                data[key] = self._computed_columns[key](columns, len(rows))
+            else:
+                if from_row is None:
+                    raise ValueError(f"Field {key} cannot be built from raw rows")
+                if models is None:
+                    models = list(map(from_row, rows))
+                data[key] = list(map(source[1], models))
+        return {"columns": list(selected), "data": data}
+
+
+def _convert(value: Any) -> Any:
+    # 延迟导入：json_convert_util 依赖本模块
+    from utils.json_convert_util import JsonHelper
+
+    return JsonHelper.to_serializable(value)
+
+
+def columnar(columns: Sequence[str], rows: Sequence[tuple]) -> Dict[str, Any]:
+    """查询结果元组 -> {"columns": [...], "data": {列名: [值...]}}（按列转置，一列一个 list）。"""
+    transposed = zip(*rows) if rows else [()] * len(columns)
+    return {"columns": list(columns), "data": dict(zip(columns, map(list, transposed)))}
+
+
+def columnar_records(records: Sequence[Mapping[str, Any]], columns: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """已经是逐行 dict 的结果（例如聚合后的小结果集）转为同样的列式结构；columns 默认取第一行的键。"""
+    if columns is None:
+        columns = list(records[0]) if records else []
+    return {"columns": list(columns), "data": {column: [record[column] for record in records] for column in columns}}
+
+
+_generic: Dict[type, ModelSerializer] = {}
+
+
+def serializer_for(model: type) -> ModelSerializer:
+    """按字段名原样输出全部字段的序列化器（asdict 的替代），每个模型类只编译一次。"""
+    serializer = _generic.get(model)
+    if serializer is None:
+        serializer = _generic[model] = ModelSerializer(model)
+    return serializer
+
+
+# =========================================================
+# JSON 编码后端
+# =========================================================
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def json_dumps(value: Any, backend: Optional[str] = None) -> str:
+    """
+    紧凑、键有序的 JSON 字符串。backend 默认为 JSON_BACKEND（安装了 orjson 时为 "orjson"）。
+    两种后端的区别：orjson 不转义非 ASCII 字符（输出仍是合法的 UTF-8 JSON），NaN / Infinity 输出为 null。
+    """
+    if (backend or JSON_BACKEND) == "orjson":
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(value, separators=(",", ":"), sort_keys=True)
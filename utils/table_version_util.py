@@ -0,0 +1,170 @@
+import functools
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+
+"""
+按表的变更计数器 + 结果缓存：
+
+- TableVersions：进程内每张表一个单调递增的计数器。Repository 的写路径（BaseRepository._commit）
+  通过 notify_write() 递增对应表的计数；在 WriteQueue 的写任务里，递增推迟到整批事务提交之后，
+  这样读请求不会在“写入尚未提交”时把旧结果缓存到新版本号下
+- ResultCache：有上限的 LRU 缓存，每条结果记录计算前读取的相关表版本；版本变化后该条目失效
+- memoize(*tables)：给服务类方法用的装饰器，实例的 cache 属性为 None 时直接调用原方法
+- 同一组版本号也用于 HTTP 条件请求（ETag / Last-Modified，见 app/conditional.py）；
+  计数器从进程启动时的 0 开始，epoch 区分不同进程，重启后旧 ETag 不会被误判为仍然有效
+
+计数器只感知经过 Repository / notify_write 的写入；绕过它们直接写库（其他进程、手写 SQL）时，
+需要自行调用 notify_write 或 ResultCache.clear()。
+"""
+
+
+class TableVersions:
+    """线程安全的表级变更计数器（同时记录每张表最后一次写入的时间）。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._modified: Dict[str, float] = {}
+        self.epoch = uuid.uuid4().hex[:8]
+        self.started_at = time.time()
+
+    def bump(self, *tables: str) -> None:
+        now = time.time()
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+                self._modified[table] = now
+
+    def snapshot(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def last_modified(self, tables: Iterable[str]) -> float:
+        """tables 中最近一次写入的时间戳；进程启动后没有写入时为启动时间。"""
+        with self._lock:
+            return max((self._modified.get(table, self.started_at) for table in tables), default=self.started_at)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._versions)
+
+
+# 进程内共享的计数器（多个数据库共用也没关系：只会多失效，不会读到旧结果）
+table_versions = TableVersions()
+
+
+def notify_write(conn: Any, *tables: str) -> None:
+    """
+    记录 tables 发生了写入。conn 支持 after_commit(fn)（WriteQueue 交给写任务的连接）时，
+    在事务提交后再递增；普通连接立即递增（调用方已经 commit）。
+    """
+    after_commit = getattr(conn, "after_commit", None)
+    if after_commit is not None:
+        after_commit(lambda: table_versions.bump(*tables))
+    else:
+        table_versions.bump(*tables)
+
+
+class ResultCache:
+    """
+    有上限的 LRU 结果缓存（线程安全）：
+    - get(key, versions)：命中且版本一致时返回 (True, value)；版本不一致的旧条目会被删除（计为 invalidation）
+    - put(key, versions, value)：写入并在超出 maxsize 时淘汰最久未使用的条目（计为 eviction）
+    - 缓存的是原对象，调用方不应修改返回值
+    """
+
+    def __init__(self, maxsize: int = 256, versions: Optional[TableVersions] = None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self.versions = versions or table_versions
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Tuple[int, ...], Any]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, key: Hashable, versions: Tuple[int, ...]) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == versions:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return True, entry[1]
+                del self._entries[key]
+                self._invalidations += 1
+            self._misses += 1
+            return False, None
+
+    def put(self, key: Hashable, versions: Tuple[int, ...], value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (versions, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+                "table_versions": self.versions.stats(),
+            }
+
+
+def freeze(value: Any) -> Hashable:
+    """把参数转换成可哈希的缓存键（list / set / dict 递归转为 tuple）。"""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    return value
+
+
+def memoize(*tables: str) -> Callable:
+    """
+    方法装饰器：结果按 (方法名, 参数) 缓存在 self.cache（ResultCache）中，依赖的表为 tables。
+    self.cache 为 None 时不缓存。
+    """
+
+    def decorator(method: Callable) -> Callable:
+        name = method.__qualname__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache: Optional[ResultCache] = getattr(self, "cache", None)
+            if cache is None:
+                return method(self, *args, **kwargs)
+            key = (name, freeze(args), freeze(kwargs))
+            # 先读版本再计算：计算期间发生的写入会让这条结果在下次查找时失效
+            versions = cache.versions.snapshot(tables)
+            hit, value = cache.get(key, versions)
+            if hit:
+                return value
+            value = method(self, *args, **kwargs)
+            cache.put(key, versions, value)
+            return value
+
+        wrapper.cache_tables = tables
+        return wrapper
+
+    return decorator